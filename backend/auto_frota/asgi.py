@@ -3,6 +3,17 @@ ASGI config for auto_frota project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Modo ASGI: o dashboard e as listagens (veículos, empresas e sinistros) são views assíncronas
+(core/assincrono.py) que fazem as consultas independentes ao mesmo tempo. Servidas por um
+servidor ASGI, por exemplo:
+
+    pip install uvicorn
+    uvicorn auto_frota.asgi:application --workers 2
+
+(ou 'daphne auto_frota.asgi:application'), cada worker mantém várias requisições em andamento
+sem ocupar uma thread por requisição. Sob WSGI (auto_frota/wsgi.py e 'runserver') as mesmas
+views continuam funcionando: o Django as executa em um event loop por requisição.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os # Importa o módulo os para manipulação de caminhos de arquivos
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,7 +44,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MedicaoConsultasMiddleware', # Consultas SQL por requisição (primeiro, para medir todos os demais)
     'django.middleware.security.SecurityMiddleware',
+    'core.estaticos.EstaticosMiddleware', # CSS, JS e imagens do 'collectstatic', com cache imutável
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -75,11 +78,65 @@ WSGI_APPLICATION = 'auto_frota.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# O perfil do banco é escolhido pela variável de ambiente AUTO_FROTA_BANCO:
+# - 'sqlite' (padrão): arquivo em AUTO_FROTA_BANCO_NOME (padrão: backend/db.sqlite3), colocado em modo WAL
+#   (leitores não bloqueiam o escritor) uma única vez com 'python manage.py ativar_wal', com os PRAGMAs de
+#   AUTO_FROTA_SQLITE_PRAGMAS aplicados a cada conexão (core/banco.py), transações de escrita iniciadas
+#   com BEGIN IMMEDIATE e espera de até AUTO_FROTA_BANCO_TIMEOUT segundos por um lock, em vez do erro
+#   "database is locked";
+# - 'postgresql': AUTO_FROTA_BANCO_NOME, _USUARIO, _SENHA, _HOST e _PORTA; com AUTO_FROTA_BANCO_POOL=1,
+#   usa o pool de conexões do psycopg 3 (requer 'psycopg[pool]', dependência opcional), de
+#   AUTO_FROTA_BANCO_POOL_MIN a AUTO_FROTA_BANCO_POOL_MAX conexões por processo.
+# AUTO_FROTA_CONN_MAX_AGE: segundos que uma conexão é reaproveitada entre requisições (0 = uma conexão
+# por requisição). Sob ASGI as conexões não são reaproveitadas entre requisições: no PostgreSQL, use o pool.
+AUTO_FROTA_BANCO = os.environ.get('AUTO_FROTA_BANCO', 'sqlite')
+AUTO_FROTA_BANCO_TIMEOUT = int(os.environ.get('AUTO_FROTA_BANCO_TIMEOUT', 20))
+AUTO_FROTA_CONN_MAX_AGE = int(os.environ.get('AUTO_FROTA_CONN_MAX_AGE', 60))
+AUTO_FROTA_SQLITE_PRAGMAS = {
+    # journal_mode fica de fora: o modo WAL é gravado no arquivo uma vez, pelo comando 'ativar_wal'
+    'synchronous': 'NORMAL', # Seguro no modo WAL: sem fsync a cada commit, apenas nos checkpoints
+    'cache_size': -20000, # Cache de páginas por conexão, em KiB (20 MB)
+    'temp_store': 'MEMORY', # Ordenações e tabelas temporárias em memória
+    'mmap_size': 128 * 1024 * 1024, # Leitura do arquivo por memória mapeada (128 MB)
+}
+
+
+def _configuracao_banco():
+    """Configuração do banco 'default' para o perfil escolhido em AUTO_FROTA_BANCO."""
+    if AUTO_FROTA_BANCO == 'postgresql':
+        configuracao = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('AUTO_FROTA_BANCO_NOME', 'auto_frota'),
+            'USER': os.environ.get('AUTO_FROTA_BANCO_USUARIO', ''),
+            'PASSWORD': os.environ.get('AUTO_FROTA_BANCO_SENHA', ''),
+            'HOST': os.environ.get('AUTO_FROTA_BANCO_HOST', ''),
+            'PORT': os.environ.get('AUTO_FROTA_BANCO_PORTA', ''),
+            'CONN_MAX_AGE': AUTO_FROTA_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'connect_timeout': AUTO_FROTA_BANCO_TIMEOUT},
+        }
+        if os.environ.get('AUTO_FROTA_BANCO_POOL') == '1':
+            configuracao['OPTIONS']['pool'] = {
+                'min_size': int(os.environ.get('AUTO_FROTA_BANCO_POOL_MIN', 2)),
+                'max_size': int(os.environ.get('AUTO_FROTA_BANCO_POOL_MAX', 10)),
+                'timeout': AUTO_FROTA_BANCO_TIMEOUT,
+            }
+            configuracao['CONN_MAX_AGE'] = 0 # O pool substitui as conexões persistentes (exigido pelo Django)
+        return configuracao
+    return {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('AUTO_FROTA_BANCO_NOME') or BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': AUTO_FROTA_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': AUTO_FROTA_BANCO_TIMEOUT, # Espera por locks (busy timeout), em segundos
+            'transaction_mode': 'IMMEDIATE', # Reserva a escrita no início da transação: sem deadlock de upgrade
+        },
     }
+
+
+DATABASES = {
+    'default': _configuracao_banco(),
 }
 
 
@@ -128,7 +185,6 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ... (restante do arquivo) ...
 
-import os # Importa o módulo os para manipulação de caminhos de arquivos
 
 # Configuração para arquivos estáticos (CSS, JavaScript, Imagens)
 STATIC_URL = 'static/' # A URL que será usada para referenciar arquivos estáticos (ex: /static/main.css)
@@ -140,4 +196,113 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, '../frontend'),
 ]
 
-# STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles') # Configuração para deploy em produção
+# Destino do 'collectstatic' (deploy em produção)
+STATIC_ROOT = os.environ.get('AUTO_FROTA_STATIC_ROOT') or os.path.join(BASE_DIR, 'staticfiles')
+
+# Arquivos estáticos com hash do conteúdo no nome, minificados e pré-comprimidos (core/estaticos.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.estaticos.ArmazenamentoEstaticos'},
+}
+# Serve os arquivos do 'collectstatic' com cache imutável (EstaticosMiddleware, desligado em DEBUG);
+# False quando um servidor web na frente da aplicação entrega o STATIC_ROOT
+AUTO_FROTA_SERVIR_ESTATICOS = os.environ.get('AUTO_FROTA_SERVIR_ESTATICOS', '1') == '1'
+
+
+# Paginação das listagens (core/paginacao.py)
+AUTO_FROTA_TAMANHO_PAGINA = 50 # Itens por página quando 'por_pagina' não é informado
+AUTO_FROTA_TAMANHO_PAGINA_MAXIMO = 200 # Limite superior aceito em 'por_pagina'
+AUTO_FROTA_LIMITE_CONTAGEM = 1000 # Acima deste valor a contagem exibida é "mais de N"
+
+# Alertas de vencimento de seguro (core/alertas.py, atualizados pelo comando 'atualizar_alertas')
+AUTO_FROTA_HORIZONTE_ALERTAS_DASHBOARD = 60 # Horizonte (30, 60 ou 90 dias) dos alertas exibidos no dashboard
+AUTO_FROTA_LIMITE_ALERTAS_DASHBOARD = 20 # Quantidade máxima de alertas detalhados no dashboard
+
+# Cache (indicadores de sinistralidade e fragmentos das listas, core/fragmentos.py).
+# O backend é escolhido pela variável de ambiente AUTO_FROTA_CACHE:
+# - 'memoria' (padrão): memória local de cada processo;
+# - 'arquivo': diretório em AUTO_FROTA_CACHE_LOCAL (padrão: backend/cache), compartilhado entre processos;
+# - 'redis': servidor compatível com Redis em AUTO_FROTA_CACHE_LOCAL (ex: redis://127.0.0.1:6379/1),
+#   requer o pacote 'redis' (dependência opcional).
+AUTO_FROTA_CACHE = os.environ.get('AUTO_FROTA_CACHE', 'memoria')
+AUTO_FROTA_CACHE_LOCAL = os.environ.get('AUTO_FROTA_CACHE_LOCAL', '')
+
+
+def _configuracao_cache(alias, max_entradas):
+    """Configuração de um alias de cache para o backend escolhido em AUTO_FROTA_CACHE."""
+    if AUTO_FROTA_CACHE == 'arquivo':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(AUTO_FROTA_CACHE_LOCAL or os.path.join(BASE_DIR, 'cache'), alias),
+            'OPTIONS': {'MAX_ENTRIES': max_entradas},
+        }
+    if AUTO_FROTA_CACHE == 'redis':
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': AUTO_FROTA_CACHE_LOCAL or 'redis://127.0.0.1:6379/1',
+            'KEY_PREFIX': f'auto_frota:{alias}',
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'auto_frota-{alias}',
+        'OPTIONS': {'MAX_ENTRIES': max_entradas},
+    }
+
+
+CACHES = {
+    'default': _configuracao_cache('default', 1000),
+    # Linhas das tabelas: comporta uma lista de milhares de linhas (ver AUTO_FROTA_TAMANHO_PAGINA_MAXIMO)
+    'fragmentos': _configuracao_cache('fragmentos', 50000),
+}
+AUTO_FROTA_TIMEOUT_FRAGMENTOS = 24 * 60 * 60 # Validade (segundos) das linhas em cache; alterações mudam a chave antes
+
+# Análise de sinistralidade (core/sinistralidade.py)
+AUTO_FROTA_CACHE_SINISTRALIDADE = 3600 # Validade (segundos) dos indicadores em cache; alterações invalidam antes
+AUTO_FROTA_LIMITE_EMPRESAS_SINISTRALIDADE = 50 # Empresas exibidas na página (as com mais sinistros)
+
+# Executor de tarefas em segundo plano (core/tarefas.py, comando 'executar_tarefas')
+AUTO_FROTA_TAREFAS_EM_SEGUNDO_PLANO = True # Executa a tarefa no pool de threads do processo logo após o pedido; False: só pelo comando
+AUTO_FROTA_TAREFAS_THREADS = int(os.environ.get('AUTO_FROTA_TAREFAS_THREADS', 2)) # Tarefas simultâneas por processo
+AUTO_FROTA_TAREFAS_TENTATIVAS = 3 # Execuções de uma tarefa que falha (cada operação pode definir outro máximo)
+AUTO_FROTA_TAREFAS_ESPERA = 30 # Segundos até a segunda tentativa; a espera dobra a cada nova falha
+AUTO_FROTA_TAREFAS_INATIVIDADE = 300 # Segundos sem progresso para uma tarefa em andamento ser considerada interrompida
+# Arquivos enviados para as tarefas (ex: planilhas a importar), removidos ao final de cada uma
+AUTO_FROTA_PASTA_TAREFAS = os.environ.get('AUTO_FROTA_PASTA_TAREFAS', str(BASE_DIR / 'tarefas'))
+
+# Exclusão de empresas em segundo plano (veiculos/exclusao.py, comando 'processar_exclusoes')
+AUTO_FROTA_TAMANHO_LOTE_EXCLUSAO = 500 # Veículos (com seus sinistros) excluídos por transação
+AUTO_FROTA_EXCLUSAO_EM_SEGUNDO_PLANO = True # Registra a tarefa da exclusão logo após o pedido; False: só pelo comando
+AUTO_FROTA_EXCLUSAO_INATIVIDADE = 300 # Segundos sem progresso para uma exclusão em andamento ser considerada interrompida
+
+# Operações em massa sobre veículos (veiculos/operacoes.py)
+AUTO_FROTA_LIMITE_OPERACAO_EM_MASSA = 5000 # Máximo de veículos alterados por operação (um único UPDATE)
+
+# Sugestões dos campos com autocompletar (veiculos/sugestoes.py)
+AUTO_FROTA_CACHE_SUGESTOES = 60 # Validade (segundos) das sugestões de um prefixo, no cache e no navegador
+AUTO_FROTA_SUGESTOES_MINIMO = 1 # Caracteres digitados antes de sugerir
+
+# Feed incremental de alterações (core/alteracoes.py, /api/v1/alteracoes/ e comando 'exportar_alteracoes')
+# Segundos de atraso da leitura: no PostgreSQL, uma transação ainda aberta pode gravar um id menor que o último lido
+AUTO_FROTA_ATRASO_ALTERACOES = int(os.environ.get(
+    'AUTO_FROTA_ATRASO_ALTERACOES', 0 if AUTO_FROTA_BANCO == 'sqlite' else 5
+))
+
+# Medição das consultas SQL por requisição (core/middleware.py)
+AUTO_FROTA_MEDIR_CONSULTAS = True # Cabeçalhos X-Consultas-SQL, X-Tempo-SQL-ms e X-Consultas-Repetidas e log por requisição
+AUTO_FROTA_REPETICOES_ALERTA = 5 # Um mesmo SQL executado tantas vezes na requisição vira um aviso de possível N+1
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # Por padrão, apenas os avisos de N+1; com AUTO_FROTA_LOG_CONSULTAS=INFO, uma linha por requisição
+        # (os testes e o servidor de desenvolvimento não imprimem a contagem de cada requisição)
+        'auto_frota.consultas': {
+            'handlers': ['console'],
+            'level': os.environ.get('AUTO_FROTA_LOG_CONSULTAS', 'WARNING'),
+        },
+    },
+}
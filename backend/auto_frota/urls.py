@@ -24,4 +24,5 @@ urlpatterns = [
     path('', include('core.urls')),
     path('veiculos/', include('veiculos.urls')),
     path('sinistros/', include('sinistros.urls')), # <-- VERIFIQUE SE ESTÁ AQUI E NÃO ESTÁ COMENTADO
+    path('api/v1/', include('core.urls_api')), # API JSON somente leitura (versão 1)
 ]
\ No newline at end of file
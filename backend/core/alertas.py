@@ -0,0 +1,247 @@
+# backend/core/alertas.py
+
+"""
+Manutenção e leitura dos alertas de vencimento pré-calculados (modelo AlertaVencimento).
+
+A tabela de alertas guarda apenas os veículos ativos cujo seguro vence nos próximos 90 dias,
+já agrupados por horizonte (30/60/90 dias), empresa e seguradora. Ela é atualizada pelo
+comando 'atualizar_alertas' (agendado no cron) de forma incremental:
+- veículos alterados desde a última execução (AlertaPendente, preenchida pelos signals);
+- veículos cujo vencimento entrou na janela desde a última data de referência
+  (busca por intervalo de datas no índice parcial de veículos ativos);
+- alertas vencidos são removidos e os horizontes dos demais são recalculados,
+  operações que tocam apenas a própria tabela de alertas.
+"""
+
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Value, When
+from django.utils import timezone
+
+from veiculos.consultas import veiculos_a_vencer
+from veiculos.models import Empresa, Veiculo
+
+from .models import HORIZONTE_CHOICES, AlertaPendente, AlertaVencimento, ExecucaoAlertas
+
+# Horizontes de alerta, do menor para o maior
+HORIZONTES_ALERTA = tuple(sorted(dias for dias, _ in HORIZONTE_CHOICES))
+# Maior horizonte: vencimentos além dele não geram alerta
+HORIZONTE_MAXIMO = HORIZONTES_ALERTA[-1]
+
+# Quantidade de veículos processados por vez (limita o tamanho das cláusulas IN)
+TAMANHO_LOTE_ALERTAS = 500
+
+# Campos do veículo copiados para o alerta
+CAMPOS_ALERTA = ('pk', 'ativo', 'empresa_id', 'seguradora', 'data_vencimento_seguro')
+
+
+def horizonte_do_vencimento(data_vencimento, hoje):
+    """Menor horizonte que contém o vencimento, ou None se já venceu ou está além do maior horizonte."""
+    dias = (data_vencimento - hoje).days
+    if dias < 0:
+        return None
+    for horizonte in HORIZONTES_ALERTA:
+        if dias <= horizonte:
+            return horizonte
+    return None
+
+
+def _expressao_horizonte(hoje):
+    """Expressão SQL equivalente a horizonte_do_vencimento, para recalcular os horizontes em um único UPDATE."""
+    return Case(
+        *[
+            When(data_vencimento_seguro__lte=hoje + timedelta(days=horizonte), then=Value(horizonte))
+            for horizonte in HORIZONTES_ALERTA
+        ],
+        default=Value(HORIZONTE_MAXIMO),
+        output_field=IntegerField(),
+    )
+
+
+def marcar_pendentes(veiculo_ids):
+    """
+    Marca veículos para reprocessamento na próxima atualização dos alertas.
+    Se o veículo já estava pendente, apenas renova a data da marcação.
+    """
+    veiculo_ids = set(veiculo_ids)
+    if not veiculo_ids:
+        return
+    AlertaPendente.objects.bulk_create(
+        [AlertaPendente(veiculo_id=pk) for pk in veiculo_ids],
+        update_conflicts=True,
+        unique_fields=['veiculo'],
+        update_fields=['marcado_em'],
+    )
+
+
+def _em_lotes(itens, tamanho=TAMANHO_LOTE_ALERTAS):
+    itens = list(itens)
+    for inicio in range(0, len(itens), tamanho):
+        yield itens[inicio:inicio + tamanho]
+
+
+def _processar_veiculos(veiculo_ids, hoje):
+    """
+    Recalcula o alerta de cada veículo informado: cria, atualiza ou remove conforme o estado atual.
+    Retorna a quantidade de veículos processados.
+    """
+    processados = 0
+    for lote in _em_lotes(veiculo_ids):
+        novos = []
+        for veiculo in Veiculo.objects.filter(pk__in=lote).values(*CAMPOS_ALERTA):
+            horizonte = horizonte_do_vencimento(veiculo['data_vencimento_seguro'], hoje)
+            if veiculo['ativo'] and horizonte:
+                novos.append(AlertaVencimento(
+                    veiculo_id=veiculo['pk'],
+                    empresa_id=veiculo['empresa_id'],
+                    seguradora=veiculo['seguradora'],
+                    data_vencimento_seguro=veiculo['data_vencimento_seguro'],
+                    horizonte=horizonte,
+                ))
+        # Substitui os alertas do lote (veículos excluídos ou fora da janela simplesmente não voltam)
+        AlertaVencimento.objects.filter(veiculo_id__in=lote).delete()
+        AlertaVencimento.objects.bulk_create(novos)
+        processados += len(lote)
+    return processados
+
+
+def ultima_execucao():
+    """Última atualização dos alertas (ou None se eles nunca foram calculados)."""
+    return ExecucaoAlertas.objects.first()
+
+
+async def aultima_execucao():
+    """Versão assíncrona de ultima_execucao."""
+    return await ExecucaoAlertas.objects.afirst()
+
+
+def reconstruir_alertas(hoje=None):
+    """Apaga e recalcula todos os alertas a partir da tabela de veículos."""
+    hoje = hoje or date.today()
+    inicio = timezone.now()
+    with transaction.atomic():
+        AlertaVencimento.objects.all().delete()
+        ids = veiculos_a_vencer(hoje, HORIZONTE_MAXIMO).values_list('pk', flat=True)
+        processados = _processar_veiculos(ids, hoje)
+        # Tudo o que estava pendente antes do início já foi considerado
+        AlertaPendente.objects.filter(marcado_em__lte=inicio).delete()
+        return ExecucaoAlertas.objects.create(
+            data_referencia=hoje,
+            reconstrucao=True,
+            veiculos_processados=processados,
+            total_alertas=AlertaVencimento.objects.count(),
+        )
+
+
+def atualizar_alertas(hoje=None):
+    """
+    Atualização incremental dos alertas (ver o docstring do módulo).
+    Na primeira execução, ou se a data de referência voltar no tempo, faz a reconstrução completa.
+    Retorna o registro ExecucaoAlertas criado.
+    """
+    hoje = hoje or date.today()
+    anterior = ultima_execucao()
+    if anterior is None or hoje < anterior.data_referencia:
+        return reconstruir_alertas(hoje)
+
+    inicio = timezone.now()
+    with transaction.atomic():
+        pendentes = list(AlertaPendente.objects.filter(marcado_em__lte=inicio).values_list('pk', 'veiculo_id'))
+        veiculo_ids = {veiculo_id for _, veiculo_id in pendentes}
+
+        if hoje > anterior.data_referencia:
+            # Remove os vencidos e recalcula os horizontes: apenas sobre a tabela de alertas
+            AlertaVencimento.objects.filter(data_vencimento_seguro__lt=hoje).delete()
+            AlertaVencimento.objects.update(horizonte=_expressao_horizonte(hoje))
+            # Vencimentos que entraram na janela desde a última data de referência
+            veiculo_ids.update(Veiculo.ativos.filter(
+                data_vencimento_seguro__gt=anterior.data_referencia + timedelta(days=HORIZONTE_MAXIMO),
+                data_vencimento_seguro__lte=hoje + timedelta(days=HORIZONTE_MAXIMO),
+            ).values_list('pk', flat=True))
+
+        processados = _processar_veiculos(veiculo_ids, hoje)
+        # Remove as marcações consumidas; veículos alterados durante a execução continuam pendentes
+        for lote in _em_lotes(pk for pk, _ in pendentes):
+            AlertaPendente.objects.filter(pk__in=lote, marcado_em__lte=inicio).delete()
+
+        return ExecucaoAlertas.objects.create(
+            data_referencia=hoje,
+            veiculos_processados=processados,
+            total_alertas=AlertaVencimento.objects.count(),
+        )
+
+
+def verificar_alertas(hoje=None):
+    """
+    Compara a tabela de alertas com o cálculo direto a partir dos veículos.
+    Retorna a lista de divergências no formato (veiculo_id, materializado, esperado),
+    onde cada lado é a tupla (empresa_id, seguradora, data_vencimento_seguro, horizonte) ou None.
+    """
+    hoje = hoje or date.today()
+    esperados = {}
+    for veiculo in veiculos_a_vencer(hoje, HORIZONTE_MAXIMO).values(*CAMPOS_ALERTA):
+        esperados[veiculo['pk']] = (
+            veiculo['empresa_id'],
+            veiculo['seguradora'],
+            veiculo['data_vencimento_seguro'],
+            horizonte_do_vencimento(veiculo['data_vencimento_seguro'], hoje),
+        )
+    materializados = {
+        alerta[0]: alerta[1:]
+        for alerta in AlertaVencimento.objects.values_list(
+            'veiculo_id', 'empresa_id', 'seguradora', 'data_vencimento_seguro', 'horizonte'
+        )
+    }
+    return [
+        (pk, materializados.get(pk), esperados.get(pk))
+        for pk in sorted(set(esperados) | set(materializados))
+        if materializados.get(pk) != esperados.get(pk)
+    ]
+
+
+def alertas_ate(horizonte, queryset=None):
+    """Alertas que vencem dentro do horizonte informado (inclui os horizontes menores)."""
+    if queryset is None:
+        queryset = AlertaVencimento.objects.all()
+    return queryset.filter(horizonte__lte=horizonte)
+
+
+def resumo_alertas(queryset=None, limite_empresas=10):
+    """
+    Contagens de alertas lidas apenas da tabela de alertas.
+    Retorna um dicionário com:
+    - por_horizonte: {30: n, 60: n, 90: n}, cumulativo (o de 60 dias inclui o de 30);
+    - por_empresa: [(empresa_id, razao_social, n)] das 'limite_empresas' empresas com mais alertas;
+    - por_seguradora: [(codigo, nome, n)] ordenado pela quantidade de alertas.
+    """
+    if queryset is None:
+        queryset = AlertaVencimento.objects.all()
+    queryset = queryset.order_by()
+
+    contagens = dict(queryset.values_list('horizonte').annotate(n=Count('id')))
+    por_horizonte = {}
+    acumulado = 0
+    for horizonte in HORIZONTES_ALERTA:
+        acumulado += contagens.get(horizonte, 0)
+        por_horizonte[horizonte] = acumulado
+
+    maiores = list(
+        queryset.values_list('empresa_id').annotate(n=Count('id')).order_by('-n', 'empresa_id')[:limite_empresas]
+    )
+    nomes_empresas = dict(
+        Empresa.objects.filter(pk__in=[pk for pk, _ in maiores]).values_list('pk', 'razao_social')
+    )
+    por_empresa = [(pk, nomes_empresas.get(pk, pk), n) for pk, n in maiores]
+
+    nomes_seguradoras = dict(Veiculo._meta.get_field('seguradora').choices)
+    por_seguradora = [
+        (codigo, nomes_seguradoras.get(codigo, codigo), n)
+        for codigo, n in queryset.values_list('seguradora').annotate(n=Count('id')).order_by('-n', 'seguradora')
+    ]
+
+    return {
+        'por_horizonte': por_horizonte,
+        'por_empresa': por_empresa,
+        'por_seguradora': por_seguradora,
+    }
@@ -0,0 +1,117 @@
+# backend/core/alteracoes.py
+
+"""
+Feed incremental de alterações de empresas, veículos e sinistros (modelo Alteracao).
+
+Os portais das seguradoras e o data warehouse não precisam mais baixar a frota inteira a cada
+sincronização: cada criação, alteração, desativação/reativação (exclusão lógica de veículo) e
+exclusão definitiva é registrada pelos signals (core/signals.py), inclusive as feitas em lote
+(importação, operações em massa, exclusão de empresa). O consumidor guarda o cursor devolvido pela
+última leitura e pede apenas o que veio depois dele; o custo da sincronização acompanha a quantidade
+de alterações, não o tamanho da frota. A leitura é um intervalo de ids no índice da tabela.
+
+O feed informa o que mudou (modelo, id e operação); o estado atual de cada registro é lido nos recursos
+da API (/api/v1/veiculos/<id>/ etc.). Registros com várias alterações aparecem uma vez por alteração.
+
+Com o PostgreSQL, uma transação pode gravar uma alteração com id menor e terminar depois de outra que
+já foi lida: a leitura para antes das alterações registradas há menos de AUTO_FROTA_ATRASO_ALTERACOES
+segundos, o que cobre as transações curtas da aplicação. No SQLite as escritas são serializadas e o
+atraso é desnecessário.
+"""
+
+import heapq
+from datetime import timedelta
+from itertools import islice
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import OPERACAO_CRIACAO, Alteracao
+from .paginacao import CursorInvalido, codificar_cursor, decodificar_cursor
+
+# Quantidade padrão e máxima de alterações por leitura
+LIMITE_ALTERACOES = 500
+LIMITE_MAXIMO_ALTERACOES = 5000
+
+# Alterações gravadas por INSERT nos registros em lote
+TAMANHO_LOTE_ALTERACOES = 1000
+
+CAMPOS_ALTERACAO = ('id', 'modelo', 'objeto_id', 'operacao', 'campos', 'registrado_em')
+
+
+def registrar_alteracoes(modelo, alteracoes, campos=()):
+    """
+    Registra as alterações de um modelo ('empresa', 'veiculo' ou 'sinistro').
+    'alteracoes' é um iterável de (id do registro, operação); 'campos', os campos gravados, se conhecidos.
+    """
+    agora = timezone.now()
+    campos = sorted(campos or ())
+    novas = [
+        Alteracao(modelo=modelo, objeto_id=objeto_id, operacao=operacao, campos=campos, registrado_em=agora)
+        for objeto_id, operacao in alteracoes
+    ]
+    Alteracao.objects.bulk_create(novas, batch_size=TAMANHO_LOTE_ALTERACOES)
+
+
+def registrar_criacoes(modelo, objetos):
+    """Registra a criação de objetos gravados com bulk_create (que não dispara post_save)."""
+    registrar_alteracoes(modelo, ((objeto.pk, OPERACAO_CRIACAO) for objeto in objetos))
+
+
+def cursor_atual():
+    """Cursor da última alteração registrada: ponto de partida de quem acabou de copiar a frota inteira."""
+    ultimo = Alteracao.objects.order_by('-id').values_list('id', flat=True).first()
+    return codificar_cursor([ultimo or 0])
+
+
+def _id_do_cursor(cursor):
+    if not cursor:
+        return 0
+    valores, _ = decodificar_cursor(cursor)
+    if len(valores) != 1 or not isinstance(valores[0], int):
+        raise CursorInvalido('Cursor de alterações inválido.')
+    return valores[0]
+
+
+def ler_alteracoes(cursor=None, modelos=None, limite=LIMITE_ALTERACOES):
+    """
+    Alterações registradas depois do cursor (sem cursor: desde a primeira), em ordem de registro.
+    - modelos: restringe a alguns modelos (ex: ['veiculo', 'sinistro']);
+    - limite: máximo de alterações lidas (até LIMITE_MAXIMO_ALTERACOES).
+    Retorna {'alteracoes': [dicionários], 'proximo_cursor': texto, 'tem_mais': bool}. O próximo cursor
+    sempre vem preenchido: sem novidades, é o próprio cursor recebido. Levanta CursorInvalido.
+    """
+    ultimo_id = _id_do_cursor(cursor)
+    limite = max(1, min(limite, LIMITE_MAXIMO_ALTERACOES))
+    alteracoes = Alteracao.objects.filter(id__gt=ultimo_id).order_by('id').values(*CAMPOS_ALTERACAO)
+    if not modelos:
+        linhas = list(alteracoes[:limite + 1])
+    else:
+        # Um intervalo do índice (modelo, id) por modelo, intercalados pelo id: um único IN faria o banco
+        # ordenar tudo o que veio depois do cursor
+        linhas = list(islice(heapq.merge(
+            *[alteracoes.filter(modelo=modelo)[:limite + 1] for modelo in dict.fromkeys(modelos)],
+            key=itemgetter('id'),
+        ), limite + 1))
+    tem_mais = len(linhas) > limite
+    linhas = linhas[:limite]
+
+    atraso = getattr(settings, 'AUTO_FROTA_ATRASO_ALTERACOES', 0)
+    if atraso:
+        # Para na primeira alteração recente: uma transação ainda aberta pode gravar um id menor que o dela
+        limite_registro = timezone.now() - timedelta(seconds=atraso)
+        for posicao, linha in enumerate(linhas):
+            if linha['registrado_em'] > limite_registro:
+                linhas, tem_mais = linhas[:posicao], True
+                break
+
+    if linhas:
+        ultimo_id = linhas[-1]['id']
+    return {'alteracoes': linhas, 'proximo_cursor': codificar_cursor([ultimo_id]), 'tem_mais': tem_mais}
+
+
+def expurgar_alteracoes(antes_de):
+    """Remove as alterações registradas antes de 'antes_de' (datetime). Retorna a quantidade removida."""
+    removidas, _ = Alteracao.objects.filter(registrado_em__lt=antes_de).delete()
+    return removidas
@@ -0,0 +1,155 @@
+# backend/core/api.py
+
+"""
+API JSON somente leitura (versão 1), usada por ferramentas internas no lugar das páginas HTML.
+
+Cada recurso declara os campos que expõe (nome na API -> caminho do campo no ORM) e reutiliza
+os mesmos filtros das listagens HTML. As respostas:
+- trazem apenas os campos pedidos em 'fields=' (ex: ?fields=placa,modelo), buscados com .values():
+  nenhum objeto de modelo é instanciado e só as colunas necessárias são lidas do banco;
+- são paginadas por chave (core/paginacao.py): 'cursor' e 'por_pagina' funcionam como nas telas.
+"""
+
+from functools import wraps
+
+from django.http import JsonResponse
+
+from .alteracoes import LIMITE_ALTERACOES, cursor_atual, ler_alteracoes
+from .models import MODELO_ALTERACAO_CHOICES
+from .paginacao import CursorInvalido, paginar, tamanho_pagina
+
+VERSAO_API = 'v1'
+
+
+class ErroApi(Exception):
+    """Erro de uso da API (parâmetro inválido), devolvido ao cliente como JSON com status 400."""
+
+
+def resposta_erro(mensagem, status=400):
+    return JsonResponse({'erro': mensagem}, status=status)
+
+
+def login_obrigatorio_api(view):
+    """
+    Equivalente ao @login_required para a API: em vez de redirecionar para a página de login,
+    responde 401 em JSON. A autenticação é a mesma sessão usada pelas telas.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return resposta_erro('Autenticação necessária.', status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def campos_solicitados(parametros, campos):
+    """
+    Lê o parâmetro 'fields' (nomes separados por vírgula) e retorna a lista de nomes pedidos,
+    na ordem informada. Sem 'fields', retorna todos os campos do recurso.
+    Levanta ErroApi para nomes desconhecidos.
+    """
+    texto = parametros.get('fields', '').strip()
+    if not texto:
+        return list(campos)
+    nomes = list(dict.fromkeys(nome.strip() for nome in texto.split(',') if nome.strip()))
+    desconhecidos = [nome for nome in nomes if nome not in campos]
+    if desconhecidos:
+        raise ErroApi(
+            f"Campo(s) desconhecido(s) em 'fields': {', '.join(desconhecidos)}. "
+            f"Disponíveis: {', '.join(campos)}."
+        )
+    return nomes
+
+
+def _projecao(queryset, campos, nomes, extras=()):
+    """
+    Aplica .values() apenas com os caminhos dos campos pedidos (mais os 'extras', como as
+    chaves de ordenação usadas pelo cursor). Retorna (queryset, caminhos_dos_nomes).
+    """
+    caminhos = [campos[nome] for nome in nomes]
+    return queryset.values(*dict.fromkeys([*caminhos, *extras])), caminhos
+
+
+def _serializar(linha, nomes, caminhos):
+    return {nome: linha[caminho] for nome, caminho in zip(nomes, caminhos)}
+
+
+def listar_recurso(request, recurso, queryset, campos, ordenacao):
+    """
+    Resposta de listagem de um recurso.
+    - recurso: nome do recurso (ex: 'veiculos'), ecoado na resposta.
+    - queryset: já filtrada com os mesmos filtros da tela correspondente.
+    - campos: dicionário {nome_na_api: caminho_no_orm}.
+    - ordenacao: campos de ordenação da paginação por chave (o último deve ser único).
+    """
+    try:
+        nomes = campos_solicitados(request.GET, campos)
+        chaves = [campo.lstrip('-') for campo in ordenacao]
+        linhas, caminhos = _projecao(queryset, campos, nomes, extras=chaves)
+        pagina = paginar(linhas, ordenacao, cursor=request.GET.get('cursor'), tamanho=tamanho_pagina(request))
+    except ErroApi as erro:
+        return resposta_erro(str(erro))
+    except CursorInvalido as erro:
+        return resposta_erro(str(erro))
+
+    return JsonResponse({
+        'versao': VERSAO_API,
+        'recurso': recurso,
+        'campos': nomes,
+        'quantidade': len(pagina),
+        'proximo_cursor': pagina.proximo_cursor,
+        'cursor_anterior': pagina.cursor_anterior,
+        'resultados': [_serializar(linha, nomes, caminhos) for linha in pagina],
+    })
+
+
+def detalhar_recurso(request, recurso, queryset, campos, pk):
+    """Resposta de detalhe de um registro (404 em JSON se não existir)."""
+    try:
+        nomes = campos_solicitados(request.GET, campos)
+    except ErroApi as erro:
+        return resposta_erro(str(erro))
+    linhas, caminhos = _projecao(queryset.filter(pk=pk), campos, nomes)
+    linha = linhas.first()
+    if linha is None:
+        return resposta_erro('Registro não encontrado.', status=404)
+    return JsonResponse({
+        'versao': VERSAO_API,
+        'recurso': recurso,
+        'campos': nomes,
+        'resultado': _serializar(linha, nomes, caminhos),
+    })
+
+
+@login_obrigatorio_api
+def listar_alteracoes_api(request):
+    """
+    GET /api/v1/alteracoes/?cursor=&modelos=&limite= — feed incremental (core/alteracoes.py).
+    - cursor: 'proximo_cursor' da leitura anterior (sem cursor: desde a primeira alteração; 'agora': só as próximas);
+    - modelos: 'empresa', 'veiculo' e/ou 'sinistro', separados por vírgula (padrão: todos).
+    """
+    modelos = [nome.strip() for nome in request.GET.get('modelos', '').split(',') if nome.strip()]
+    validos = [nome for nome, _ in MODELO_ALTERACAO_CHOICES]
+    desconhecidos = [nome for nome in modelos if nome not in validos]
+    if desconhecidos:
+        return resposta_erro(
+            f"Modelo(s) desconhecido(s) em 'modelos': {', '.join(desconhecidos)}. Disponíveis: {', '.join(validos)}."
+        )
+    try:
+        limite = int(request.GET.get('limite') or LIMITE_ALTERACOES)
+    except ValueError:
+        return resposta_erro("O parâmetro 'limite' deve ser um número inteiro.")
+
+    cursor = request.GET.get('cursor')
+    try:
+        feed = ler_alteracoes(cursor_atual() if cursor == 'agora' else cursor, modelos, limite)
+    except CursorInvalido as erro:
+        return resposta_erro(str(erro))
+    return JsonResponse({
+        'versao': VERSAO_API,
+        'recurso': 'alteracoes',
+        'quantidade': len(feed['alteracoes']),
+        'proximo_cursor': feed['proximo_cursor'],
+        'tem_mais': feed['tem_mais'],
+        'resultados': feed['alteracoes'],
+    })
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import banco # noqa: F401 - ajusta cada nova conexão com o banco (PRAGMAs do SQLite)
+        from . import signals # noqa: F401 - registra os receivers das estatísticas da frota
+        autodiscover_modules('tarefas') # Operações executadas em segundo plano (core/tarefas.py)
@@ -0,0 +1,29 @@
+# backend/core/assincrono.py
+
+"""
+Utilitários para as views assíncronas (dashboard e listagens).
+
+As views assíncronas fazem as consultas com o ORM assíncrono (acount, aaggregate, async for...)
+e disparam as consultas independentes ao mesmo tempo com asyncio.gather. Enquanto esperam o
+banco, o event loop atende outras requisições: sob ASGI (auto_frota/asgi.py), um único processo
+mantém muitas requisições lentas abertas sem ocupar uma thread por requisição.
+
+O template, por sua vez, é renderizado na thread síncrona do Django (sync_to_async), porque
+pode acessar o banco de forma preguiçosa (request.user, opções de um ModelChoiceField...).
+"""
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render
+
+
+async def alistar(queryset):
+    """Executa a queryset com o ORM assíncrono e retorna a lista de resultados."""
+    return [item async for item in queryset]
+
+
+async def renderizar(request, template_name, context):
+    """Equivalente assíncrono de render(): os dados já devem vir carregados no contexto."""
+    # O usuário já foi carregado por request.auser() (login_required): o template reaproveita,
+    # em vez de consultá-lo de novo pelo request.user preguiçoso
+    request.user = await request.auser()
+    return await sync_to_async(render)(request, template_name, context)
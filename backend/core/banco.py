@@ -0,0 +1,43 @@
+# backend/core/banco.py
+
+"""
+Ajustes das conexões com o banco de dados (perfil escolhido em AUTO_FROTA_BANCO, ver settings.py).
+
+No SQLite, os PRAGMAs de AUTO_FROTA_SQLITE_PRAGMAS são aplicados a cada nova conexão pelo signal
+connection_created: eles (synchronous, cache_size...) valem apenas para a conexão que os executa.
+O modo WAL não entra nessa lista: ele fica gravado no próprio arquivo do banco e é ativado uma única
+vez, pelo comando 'ativar_wal' (ex: na implantação, depois do 'migrate'). Assim os comandos do dia a
+dia (check, test, runserver) não alteram o arquivo do banco nem criam os arquivos -wal/-shm.
+Conectado em CoreConfig.ready().
+"""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Modo de journal gravado no arquivo do banco pelo comando 'ativar_wal'
+MODO_JOURNAL_SQLITE = 'wal'
+
+
+def pragmas_sqlite():
+    """PRAGMAs aplicados a cada conexão SQLite ({nome: valor})."""
+    return getattr(settings, 'AUTO_FROTA_SQLITE_PRAGMAS', {})
+
+
+@receiver(connection_created)
+def ajustar_conexao(sender, connection, **kwargs):
+    """Aplica os PRAGMAs configurados à conexão SQLite recém-aberta."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for nome, valor in pragmas_sqlite().items():
+            cursor.execute(f'PRAGMA {nome} = {valor}')
+
+
+def ativar_wal(cursor):
+    """
+    Grava o modo WAL no arquivo do banco SQLite do cursor e retorna o modo resultante
+    ('wal'; 'memory' em um banco em memória, onde o WAL não se aplica).
+    """
+    cursor.execute(f'PRAGMA journal_mode = {MODO_JOURNAL_SQLITE}')
+    return cursor.fetchone()[0].lower()
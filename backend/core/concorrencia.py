@@ -0,0 +1,144 @@
+# backend/core/concorrencia.py
+
+"""
+Medição da vazão do banco sob carga concorrente (comando 'medir_concorrencia').
+
+Várias threads, cada uma com a sua conexão, simulam workers atendendo requisições ao mesmo tempo:
+- escritores: registram um sinistro ou renovam o seguro de um veículo (transação curta);
+- leitores: montam a primeira página da lista de veículos e contam os sinistros de uma empresa.
+Ao final de cada operação, a conexão passa pelo mesmo tratamento do fim de uma requisição
+(close_old_connections): com CONN_MAX_AGE = 0 ela é fechada e reaberta na operação seguinte.
+Cada perfil é medido em um banco de teste próprio, com a mesma frota sintética.
+"""
+
+import random
+import statistics
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connections, transaction
+from django.db.models import F
+
+from sinistros.models import Sinistro
+from veiculos.models import Empresa, Veiculo
+
+from .banco import MODO_JOURNAL_SQLITE
+from .sinteticos import gerar_frota_sintetica
+
+# Frota usada nas medições
+VEICULOS_CONCORRENCIA = 2000
+EMPRESAS_CONCORRENCIA = 50
+
+
+def perfis_para_comparar(configuracao):
+    """
+    Perfis medidos: {nome: (configuração do banco, PRAGMAs do SQLite)}.
+    - 'configurado': o perfil de settings.py, com o banco em modo WAL (o banco de teste é novo: recebe
+      aqui o modo que 'ativar_wal' grava no banco da aplicação);
+    - no SQLite, 'padrao': os padrões do Django (journal de rollback, sem PRAGMAs, espera de 5 s,
+      transações DEFERRED, uma conexão por requisição);
+    - no PostgreSQL com pool, 'sem_pool': uma conexão nova por requisição.
+    """
+    pragmas = {'journal_mode': MODO_JOURNAL_SQLITE, **settings.AUTO_FROTA_SQLITE_PRAGMAS}
+    perfis = {'configurado': (configuracao, pragmas)}
+    if configuracao['ENGINE'] == 'django.db.backends.sqlite3':
+        padrao = {**configuracao, 'OPTIONS': {}, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}
+        perfis['padrao'] = (padrao, {})
+    elif configuracao.get('OPTIONS', {}).get('pool'):
+        opcoes = {nome: valor for nome, valor in configuracao['OPTIONS'].items() if nome != 'pool'}
+        perfis['sem_pool'] = ({**configuracao, 'OPTIONS': opcoes, 'CONN_MAX_AGE': 0}, {})
+    return perfis
+
+
+def preparar_frota(semente=0):
+    """Frota sintética da medição (o banco de teste começa vazio)."""
+    gerar_frota_sintetica(
+        empresas=EMPRESAS_CONCORRENCIA,
+        veiculos=VEICULOS_CONCORRENCIA,
+        sinistros=VEICULOS_CONCORRENCIA // 4,
+        semente=semente,
+    )
+
+
+def _escrever(rng, veiculos):
+    """Uma requisição de escrita: metade registra um sinistro, metade renova um seguro."""
+    veiculo_id = rng.choice(veiculos)
+    with transaction.atomic():
+        if rng.random() < 0.5:
+            Sinistro.objects.create(
+                veiculo_id=veiculo_id,
+                data_sinistro=date.today(),
+                tipo_sinistro='colisao',
+                descricao='Registro da medição de concorrência.',
+                status_sinistro='aberto',
+            )
+        else:
+            Veiculo.objects.filter(pk=veiculo_id).update(franquia=F('franquia') + 1, versao=F('versao') + 1)
+
+
+def _ler(rng, empresas):
+    """Uma requisição de leitura: página da lista de veículos e contagem de sinistros de uma empresa."""
+    list(Veiculo.ativos.select_related('empresa').order_by('placa', 'id')[:50])
+    Sinistro.objects.filter(veiculo__empresa_id=rng.choice(empresas)).count()
+
+
+def _worker(operacao, argumentos, semente, inicio, fim, registro):
+    rng = random.Random(semente)
+    latencias, erros = [], 0
+    inicio.wait()
+    try:
+        while time.perf_counter() < fim[0]:
+            comeco = time.perf_counter()
+            try:
+                operacao(rng, argumentos)
+                latencias.append((time.perf_counter() - comeco) * 1000)
+            except OperationalError: # "database is locked" e afins: a requisição teria falhado
+                erros += 1
+            finally:
+                close_old_connections() # Fim da "requisição": respeita CONN_MAX_AGE
+    finally:
+        connections.close_all()
+        registro.append((latencias, erros))
+
+
+def _resumo(registros, duracao):
+    latencias = [latencia for registro, _ in registros for latencia in registro]
+    erros = sum(erros for _, erros in registros)
+    ordenadas = sorted(latencias)
+    return {
+        'operacoes': len(latencias),
+        'por_segundo': round(len(latencias) / duracao, 1),
+        'erros': erros,
+        'latencia_mediana_ms': round(statistics.median(ordenadas), 2) if ordenadas else None,
+        'latencia_p95_ms': round(ordenadas[int(len(ordenadas) * 0.95)], 2) if ordenadas else None,
+    }
+
+
+def medir_carga(escritores=4, leitores=4, duracao=5.0, semente=0):
+    """
+    Executa escritores e leitores em paralelo por 'duracao' segundos sobre a frota já gravada.
+    Retorna {'escritas': {...}, 'leituras': {...}} com operações por segundo, erros e latências.
+    """
+    veiculos = list(Veiculo.objects.values_list('pk', flat=True))
+    empresas = list(Empresa.objects.values_list('pk', flat=True))
+    connections.close_all() # Cada thread abre a sua conexão
+
+    inicio = threading.Event()
+    fim = [0.0]
+    escritas, leituras = [], []
+    threads = [
+        threading.Thread(target=_worker, args=(_escrever, veiculos, semente + i, inicio, fim, escritas))
+        for i in range(escritores)
+    ] + [
+        threading.Thread(target=_worker, args=(_ler, empresas, semente + 1000 + i, inicio, fim, leituras))
+        for i in range(leitores)
+    ]
+    for thread in threads:
+        thread.start()
+    fim[0] = time.perf_counter() + duracao
+    inicio.set()
+    for thread in threads:
+        thread.join()
+    return {'escritas': _resumo(escritas, duracao), 'leituras': _resumo(leituras, duracao)}
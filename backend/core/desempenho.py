@@ -0,0 +1,255 @@
+# backend/core/desempenho.py
+
+"""
+Medição de desempenho das telas e das consultas principais em vários tamanhos de frota
+(comando 'medir_desempenho').
+
+Para cada tamanho, a frota é gerada de forma determinística (core/sinteticos.py) e cada alvo é
+executado várias vezes: as telas por uma requisição autenticada do cliente de testes do Django
+(com os caches vazios e, em seguida, aquecidos) e as consultas diretamente pelo ORM.
+De cada alvo são registrados o tempo mínimo, a mediana e o máximo das execuções e a quantidade de
+consultas SQL. O resultado é um JSON com a versão do código (commit do git) e o ambiente, para
+comparar medições entre versões com comparar_resultados().
+"""
+
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.http import QueryDict
+from django.test import Client
+from django.urls import reverse
+
+from sinistros.consultas import contar_facetas, filtrar_sinistros
+from veiculos.consultas import filtrar_empresas, filtrar_veiculos
+from veiculos.models import Veiculo
+
+from .alertas import resumo_alertas
+from .estatisticas import resumo_dashboard
+from .middleware import MedicaoConsultas
+from .sinistralidade import calcular_sinistralidade
+from .sinteticos import gerar_frota_sintetica, limpar_frota
+
+# Tamanhos de frota (veículos) medidos por padrão
+TAMANHOS_PADRAO = (1000, 10000)
+# Execuções de cada alvo (a mediana descarta os desvios ocasionais)
+REPETICOES_PADRAO = 5
+# Proporções da frota gerada para cada tamanho: veículos por empresa e sinistros por veículo
+VEICULOS_POR_EMPRESA = 40
+SINISTROS_POR_VEICULO = 0.3
+# Variação da mediana (em relação à medição anterior) destacada como regressão ou melhora
+VARIACAO_SIGNIFICATIVA = 0.15
+# Diferenças menores que esta (em ms) são ruído de medição, qualquer que seja a variação relativa
+DIFERENCA_MINIMA_MS = 1.0
+
+USUARIO_MEDICAO = 'medicao-desempenho'
+
+
+def _commit_atual():
+    """Commit do git do código medido (vazio fora de um repositório)."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _limpar_caches():
+    caches['default'].clear()
+    caches['fragmentos'].clear()
+
+
+def _cronometrar(executar, repeticoes, antes=None):
+    """Executa 'repeticoes' vezes e retorna (tempos em ms, consultas SQL da última execução)."""
+    tempos = []
+    for _ in range(repeticoes):
+        if antes:
+            antes()
+        with MedicaoConsultas().medir() as medicao:
+            inicio = time.perf_counter()
+            executar()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos, medicao.quantidade
+
+
+def _resultado(tamanho, tipo, nome, tempos, consultas, **extras):
+    return {
+        'tamanho': tamanho,
+        'tipo': tipo,
+        'alvo': nome,
+        'minimo_ms': round(min(tempos), 2),
+        'mediana_ms': round(statistics.median(tempos), 2),
+        'maximo_ms': round(max(tempos), 2),
+        'consultas': consultas,
+        **extras,
+    }
+
+
+def alvos_telas(veiculo):
+    """Telas medidas: (nome, URL). 'veiculo' é um veículo ativo da frota gerada."""
+    busca = veiculo.placa[:4]
+    return [
+        ('core:dashboard', reverse('core:dashboard')),
+        ('core:listar_alertas', reverse('core:listar_alertas')),
+        ('core:analise_sinistralidade', reverse('core:analise_sinistralidade')),
+        ('veiculos:listar_empresas', reverse('veiculos:listar_empresas')),
+        ('veiculos:listar_carros', reverse('veiculos:listar_carros')),
+        ('veiculos:listar_carros?q', f"{reverse('veiculos:listar_carros')}?q={busca}"),
+        ('veiculos:exportar_carros', reverse('veiculos:exportar_carros')),
+        ('veiculos:editar_carro', reverse('veiculos:editar_carro', kwargs={'pk': veiculo.pk})),
+        ('sinistros:listar_sinistros', reverse('sinistros:listar_sinistros')),
+        ('sinistros:listar_sinistros?tipo', f"{reverse('sinistros:listar_sinistros')}?tipo=colisao"),
+        ('sinistros:exportar_sinistros', reverse('sinistros:exportar_sinistros')),
+        ('sinistros:registrar_sinistro', reverse('sinistros:registrar_sinistro')),
+        ('api_v1:veiculos', reverse('api_v1:veiculos')),
+        ('api_v1:sinistros', reverse('api_v1:sinistros')),
+    ]
+
+
+def alvos_consultas(veiculo):
+    """Consultas medidas diretamente: (nome, função que executa a consulta por completo)."""
+    busca = {'q': veiculo.placa[:4]}
+
+    def pagina_veiculos(parametros):
+        veiculos, ordenacao = filtrar_veiculos(parametros)
+        return lambda: list(veiculos.select_related('empresa').order_by(*ordenacao)[:51])
+
+    def pagina_sinistros(parametros):
+        sinistros, ordenacao = filtrar_sinistros(QueryDict(parametros))
+        return lambda: list(sinistros.select_related('veiculo', 'veiculo__empresa').order_by(*ordenacao)[:51])
+
+    empresas, ordenacao_empresas = filtrar_empresas({})
+    veiculos_exportados, ordenacao_veiculos = filtrar_veiculos({})
+    return [
+        ('veiculos.pagina', pagina_veiculos({})),
+        ('veiculos.busca', pagina_veiculos(busca)),
+        ('veiculos.exportacao', lambda: sum(
+            1 for _ in veiculos_exportados.order_by(*ordenacao_veiculos)
+            .values_list('placa', 'empresa__razao_social').iterator(chunk_size=2000)
+        )),
+        ('empresas.pagina', lambda: list(empresas.order_by(*ordenacao_empresas)[:51])),
+        ('sinistros.pagina', pagina_sinistros('')),
+        ('sinistros.facetas', lambda: contar_facetas(QueryDict(''))),
+        ('estatisticas.resumo_dashboard', resumo_dashboard),
+        ('alertas.resumo', resumo_alertas),
+        ('sinistralidade.calculo', calcular_sinistralidade),
+    ]
+
+
+def medir_tamanho(tamanho, repeticoes=REPETICOES_PADRAO, semente=0, hoje=None, progresso=None):
+    """
+    Substitui a frota por uma frota sintética de 'tamanho' veículos e mede telas e consultas.
+    Apaga todos os dados da frota: use apenas em um banco descartável (o comando cria um).
+    Retorna a lista de resultados (um dicionário por alvo e situação do cache).
+    """
+    hoje = hoje or date.today()
+    limpar_frota()
+    inicio = time.perf_counter()
+    gerados = gerar_frota_sintetica(
+        empresas=max(1, tamanho // VEICULOS_POR_EMPRESA),
+        veiculos=tamanho,
+        sinistros=int(tamanho * SINISTROS_POR_VEICULO),
+        semente=semente,
+        hoje=hoje,
+    )
+    if progresso:
+        progresso(f'{tamanho} veículos: frota gerada em {time.perf_counter() - inicio:.1f} s ({gerados}).')
+
+    veiculo = Veiculo.ativos.order_by('pk').first()
+    usuario, _ = get_user_model().objects.get_or_create(username=USUARIO_MEDICAO)
+    cliente = Client()
+    cliente.force_login(usuario)
+    resultados = []
+
+    for nome, url in alvos_telas(veiculo):
+        def requisitar():
+            resposta = cliente.get(url)
+            if resposta.streaming: # Exportações: o tempo inclui o envio do corpo inteiro
+                b''.join(resposta.streaming_content)
+            if resposta.status_code != 200: # Medir uma página de erro daria um resultado enganoso
+                raise RuntimeError(f'{url} respondeu {resposta.status_code}.')
+
+        tempos, consultas = _cronometrar(requisitar, repeticoes, antes=_limpar_caches)
+        resultados.append(_resultado(tamanho, 'tela', nome, tempos, consultas, cache='vazio'))
+        tempos, consultas = _cronometrar(requisitar, repeticoes)
+        resultados.append(_resultado(tamanho, 'tela', nome, tempos, consultas, cache='aquecido'))
+
+    for nome, executar in alvos_consultas(veiculo):
+        tempos, consultas = _cronometrar(executar, repeticoes, antes=_limpar_caches)
+        resultados.append(_resultado(tamanho, 'consulta', nome, tempos, consultas))
+
+    if progresso:
+        progresso(f'{tamanho} veículos: {len(resultados)} medição(ões).')
+    return resultados
+
+
+def medir_desempenho(tamanhos=TAMANHOS_PADRAO, repeticoes=REPETICOES_PADRAO, semente=0, progresso=None):
+    """Mede todos os tamanhos e retorna o relatório completo (dicionário serializável em JSON)."""
+    hoje = date.today()
+    resultados = []
+    for tamanho in tamanhos:
+        resultados.extend(medir_tamanho(tamanho, repeticoes, semente, hoje, progresso))
+    return {
+        'commit': _commit_atual(),
+        'data': hoje.isoformat(),
+        'semente': semente,
+        'repeticoes': repeticoes,
+        'ambiente': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'banco': connection.vendor,
+            'plataforma': platform.platform(),
+        },
+        'resultados': resultados,
+    }
+
+
+def _chave(resultado):
+    return (resultado['tamanho'], resultado['tipo'], resultado['alvo'], resultado.get('cache', ''))
+
+
+def comparar_resultados(anterior, atual, variacao_significativa=VARIACAO_SIGNIFICATIVA):
+    """
+    Compara dois relatórios de medir_desempenho, alvo a alvo.
+    Retorna a lista de dicionários com a chave do alvo, as medianas e as consultas dos dois lados,
+    a variação relativa da mediana e a 'situacao': 'regressao', 'melhora' ou 'estavel' (variação menor
+    que 'variacao_significativa' ou que DIFERENCA_MINIMA_MS). Mais consultas SQL é sempre regressão.
+    Alvos presentes em apenas um lado são ignorados.
+    """
+    anteriores = {_chave(resultado): resultado for resultado in anterior['resultados']}
+    comparacao = []
+    for resultado in atual['resultados']:
+        base = anteriores.get(_chave(resultado))
+        if base is None:
+            continue
+        diferenca = resultado['mediana_ms'] - base['mediana_ms']
+        variacao = diferenca / base['mediana_ms'] if base['mediana_ms'] else 0.0
+        significativa = abs(variacao) >= variacao_significativa and abs(diferenca) >= DIFERENCA_MINIMA_MS
+        if resultado['consultas'] > base['consultas'] or (significativa and diferenca > 0):
+            situacao = 'regressao'
+        elif resultado['consultas'] < base['consultas'] or (significativa and diferenca < 0):
+            situacao = 'melhora'
+        else:
+            situacao = 'estavel'
+        comparacao.append({
+            'tamanho': resultado['tamanho'],
+            'tipo': resultado['tipo'],
+            'alvo': resultado['alvo'],
+            'cache': resultado.get('cache', ''),
+            'mediana_anterior_ms': base['mediana_ms'],
+            'mediana_ms': resultado['mediana_ms'],
+            'consultas_anteriores': base['consultas'],
+            'consultas': resultado['consultas'],
+            'variacao': round(variacao, 4),
+            'situacao': situacao,
+        })
+    return comparacao
@@ -0,0 +1,296 @@
+# backend/core/estaticos.py
+
+"""
+Arquivos estáticos versionados pelo conteúdo, minificados e pré-comprimidos.
+
+No 'collectstatic' (ArmazenamentoEstaticos, em STORAGES['staticfiles']):
+- o CSS e o JS do projeto (pastas de STATICFILES_DIRS, ou seja, o frontend/) são minificados:
+  com os pacotes 'rcssmin' e 'rjsmin' (dependências opcionais), se instalados; sem eles, por uma
+  minificação conservadora que só remove comentários e espaços, sem reescrever o código;
+- cada arquivo ganha uma cópia com o hash do conteúdo no nome (css/main.3f2a9c1b7d4e.css), e o
+  {% static %} passa a apontar para ela (ManifestStaticFilesStorage);
+- os arquivos de texto ganham as versões .gz e, com o pacote 'brotli' (dependência opcional), .br.
+
+Na entrega (EstaticosMiddleware), os arquivos de STATIC_ROOT são servidos pela própria aplicação
+na versão comprimida aceita pelo navegador (Accept-Encoding). Os nomes com hash nunca mudam de
+conteúdo: vão com Cache-Control "immutable" de um ano, e as páginas seguintes não fazem nenhuma
+requisição de CSS, JS ou imagens. Um arquivo novo tem outro nome, então não há cache desatualizado.
+Em desenvolvimento (DEBUG), o 'runserver' serve os arquivos originais, sem hash.
+"""
+
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.http import HttpResponse
+
+try:
+    import brotli # Dependência opcional: versões .br
+except ImportError:
+    brotli = None
+
+try:
+    import rcssmin # Dependência opcional: minificação completa do CSS
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin # Dependência opcional: minificação completa do JS
+except ImportError:
+    rjsmin = None
+
+# Extensões comprimidas no collectstatic (as imagens já são comprimidas)
+EXTENSOES_COMPRIMIDAS = ('.css', '.js', '.json', '.svg', '.txt', '.html', '.map', '.xml', '.ico')
+# Arquivos menores que isto não compensam a compressão (o cabeçalho HTTP já é maior)
+TAMANHO_MINIMO_COMPRESSAO = 256
+# Versões comprimidas, da preferida para a menos preferida: (Content-Encoding, extensão)
+CODIFICACOES = (('br', '.br'), ('gzip', '.gz'))
+
+# Cache dos arquivos com hash (conteúdo imutável) e dos demais (podem mudar no próximo deploy)
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+CACHE_SEM_HASH = 'public, max-age=60'
+
+# Trechos do CSS que devem ser preservados (strings) ou removidos (comentários)
+PADRAO_CSS = re.compile(r'(?P<texto>"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|(?P<comentario>/\*.*?\*/)', re.S)
+# Caracteres após os quais uma "/" no JS começa uma expressão regular (e não uma divisão)
+ANTES_DE_REGEX_JS = set('(,=:[!&|?{};+-*%<>~^\n')
+PALAVRAS_ANTES_DE_REGEX_JS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete', 'new')
+
+
+def _minificar_css_trecho(trecho):
+    """Espaços de um trecho de CSS sem strings nem comentários."""
+    trecho = re.sub(r'\s+', ' ', trecho)
+    # Sem espaço ao redor de { } ; , e depois de ':' (antes do ':' o espaço pode ser um seletor: "a :hover")
+    trecho = re.sub(r'\s*([{};,])\s*', r'\1', trecho)
+    trecho = re.sub(r':\s+', ':', trecho)
+    return trecho.replace(';}', '}')
+
+
+def minificar_css(conteudo):
+    """Remove comentários e espaços desnecessários do CSS, preservando strings."""
+    if rcssmin is not None:
+        return rcssmin.cssmin(conteudo)
+    partes = []
+    posicao = 0
+    for encontrado in PADRAO_CSS.finditer(conteudo):
+        partes.append(_minificar_css_trecho(conteudo[posicao:encontrado.start()]))
+        if encontrado.group('texto'):
+            partes.append(encontrado.group('texto'))
+        posicao = encontrado.end()
+    partes.append(_minificar_css_trecho(conteudo[posicao:]))
+    return ''.join(partes).strip()
+
+
+def _fim_do_literal(codigo, inicio, delimitador):
+    """Posição logo após o fim da string (ou regex) que começa em 'inicio'."""
+    posicao = inicio + 1
+    em_classe = False # Dentro de [...] de uma regex, a "/" não encerra o literal
+    while posicao < len(codigo):
+        caractere = codigo[posicao]
+        if caractere == '\\':
+            posicao += 2
+            continue
+        if delimitador == '/' and caractere == '[':
+            em_classe = True
+        elif delimitador == '/' and caractere == ']':
+            em_classe = False
+        elif caractere == delimitador and not em_classe:
+            return posicao + 1
+        elif caractere == '\n' and delimitador != '`':
+            break # Literal sem fim na linha: devolve o resto como está
+        posicao += 1
+    return posicao
+
+
+def _inicia_regex(saida):
+    """Indica se uma "/" neste ponto do código começa uma expressão regular."""
+    anterior = ''.join(saida).rstrip(' ')
+    if not anterior or anterior[-1] in ANTES_DE_REGEX_JS:
+        return True
+    return any(re.search(rf'\b{palavra}$', anterior) for palavra in PALAVRAS_ANTES_DE_REGEX_JS)
+
+
+def minificar_js(conteudo):
+    """
+    Remove comentários, indentação, espaços repetidos e linhas em branco do JS, preservando strings,
+    template strings e expressões regulares. As quebras de linha são mantidas: o código continua
+    válido mesmo quando depende da inserção automática de ponto e vírgula.
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(conteudo)
+    saida = []
+    posicao = 0
+    while posicao < len(conteudo):
+        caractere = conteudo[posicao]
+        seguinte = conteudo[posicao + 1:posicao + 2]
+        if caractere in '\'"`':
+            fim = _fim_do_literal(conteudo, posicao, caractere)
+            saida.append(conteudo[posicao:fim])
+            posicao = fim
+        elif caractere == '/' and seguinte == '/':
+            fim = conteudo.find('\n', posicao)
+            posicao = len(conteudo) if fim == -1 else fim
+        elif caractere == '/' and seguinte == '*':
+            fim = conteudo.find('*/', posicao + 2)
+            posicao = len(conteudo) if fim == -1 else fim + 2
+            saida.append(' ')
+        elif caractere == '/' and _inicia_regex(saida[-20:]):
+            fim = _fim_do_literal(conteudo, posicao, '/')
+            saida.append(conteudo[posicao:fim])
+            posicao = fim
+        elif caractere in ' \t\r':
+            if saida and saida[-1] not in (' ', '\n'):
+                saida.append(' ')
+            posicao += 1
+        elif caractere == '\n':
+            while saida and saida[-1] == ' ':
+                saida.pop()
+            if saida and saida[-1] != '\n':
+                saida.append('\n')
+            posicao += 1
+        else:
+            saida.append(caractere)
+            posicao += 1
+    return ''.join(saida).strip() + '\n'
+
+
+MINIFICADORES = {'.css': minificar_css, '.js': minificar_js}
+
+
+def _pastas_do_projeto():
+    """Pastas de STATICFILES_DIRS (aceita as entradas com prefixo, no formato (prefixo, pasta))."""
+    return {
+        os.path.abspath(pasta[1] if isinstance(pasta, (list, tuple)) else pasta)
+        for pasta in settings.STATICFILES_DIRS
+    }
+
+
+class ArmazenamentoEstaticos(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage que minifica o CSS e o JS do projeto antes de calcular o hash e
+    grava as versões comprimidas (ver o docstring do módulo).
+    Enquanto o 'collectstatic' não foi executado (ou em DEBUG), {% static %} usa os nomes originais.
+    """
+
+    def stored_name(self, name):
+        if settings.DEBUG or not self.hashed_files: # Arquivos servidos direto do frontend/, sem hash
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        yield from self._minificar(paths)
+        # O hash é calculado sobre as cópias já minificadas em STATIC_ROOT
+        copias = {nome: (self, nome) for nome in paths}
+        gravados = set()
+        for original, processado, resultado in super().post_process(copias, dry_run, **options):
+            yield original, processado, resultado
+            if processado and not isinstance(resultado, Exception):
+                gravados.update((original, processado))
+        yield from self._comprimir(sorted(gravados))
+
+    def _minificar(self, paths):
+        pastas = _pastas_do_projeto()
+        for nome, (origem, caminho) in paths.items():
+            minificar = MINIFICADORES.get(os.path.splitext(nome)[1])
+            if minificar is None or '.min.' in nome:
+                continue
+            if os.path.abspath(getattr(origem, 'location', '')) not in pastas:
+                continue # CSS e JS de terceiros (admin...) já vêm prontos
+            with origem.open(caminho) as arquivo:
+                conteudo = arquivo.read().decode('utf-8')
+            self.delete(nome)
+            self._save(nome, ContentFile(minificar(conteudo).encode('utf-8')))
+            yield nome, nome, True
+
+    def _comprimir(self, nomes):
+        for nome in nomes:
+            if not nome.endswith(EXTENSOES_COMPRIMIDAS):
+                continue
+            with self.open(nome) as arquivo:
+                conteudo = arquivo.read()
+            if len(conteudo) < TAMANHO_MINIMO_COMPRESSAO:
+                continue
+            versoes = {'.gz': gzip.compress(conteudo, compresslevel=9, mtime=0)} # mtime fixo: mesmo arquivo a cada build
+            if brotli is not None:
+                versoes['.br'] = brotli.compress(conteudo, quality=11)
+            for extensao, comprimido in versoes.items():
+                if len(comprimido) >= len(conteudo):
+                    continue # Não compensou: o navegador recebe o original
+                if self.exists(nome + extensao):
+                    self.delete(nome + extensao)
+                self._save(nome + extensao, ContentFile(comprimido))
+                yield nome, nome + extensao, True
+
+
+def codificacoes_aceitas(cabecalho):
+    """Codificações do cabeçalho Accept-Encoding, sem as recusadas com q=0."""
+    aceitas = set()
+    for item in cabecalho.split(','):
+        nome, _, parametros = item.strip().partition(';')
+        if re.fullmatch(r'\s*q\s*=\s*0(\.0*)?\s*', parametros):
+            continue
+        aceitas.add(nome.strip().lower())
+    return aceitas
+
+
+class EstaticosMiddleware:
+    """
+    Serve os arquivos de STATIC_ROOT (gerados pelo 'collectstatic') com as versões comprimidas e os
+    cabeçalhos de cache do docstring do módulo. Fica logo depois do SecurityMiddleware.
+    Desligado em DEBUG, sem o manifesto do 'collectstatic' ou com AUTO_FROTA_SERVIR_ESTATICOS = False
+    (quando um servidor web na frente da aplicação entrega os estáticos).
+    """
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not getattr(settings, 'AUTO_FROTA_SERVIR_ESTATICOS', True) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        armazenamento = ArmazenamentoEstaticos()
+        if not armazenamento.hashed_files:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.raiz = os.path.abspath(settings.STATIC_ROOT)
+        self.prefixo = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else f'/{settings.STATIC_URL}'
+        # Índice montado uma vez: {nome: (caminho, cache, {codificação: (caminho, tamanho)})}
+        self.arquivos = {}
+        imutaveis = set(armazenamento.hashed_files.values())
+        for nome in set(armazenamento.hashed_files) | imutaveis:
+            caminho = os.path.join(self.raiz, nome)
+            if not os.path.isfile(caminho):
+                continue
+            comprimidos = {
+                codificacao: caminho + extensao
+                for codificacao, extensao in CODIFICACOES
+                if os.path.isfile(caminho + extensao)
+            }
+            self.arquivos[nome] = (caminho, CACHE_IMUTAVEL if nome in imutaveis else CACHE_SEM_HASH, comprimidos)
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefixo):
+            arquivo = self.arquivos.get(request.path[len(self.prefixo):])
+            if arquivo is not None:
+                return self.servir(request, *arquivo)
+        return self.get_response(request)
+
+    def servir(self, request, caminho, cache, comprimidos):
+        aceitas = codificacoes_aceitas(request.headers.get('Accept-Encoding', ''))
+        codificacao = next((nome for nome, _ in CODIFICACOES if nome in aceitas and nome in comprimidos), None)
+        with open(comprimidos[codificacao] if codificacao else caminho, 'rb') as arquivo:
+            conteudo = arquivo.read()
+        tipo, _ = mimetypes.guess_type(caminho)
+        tipo = tipo or 'application/octet-stream'
+        if tipo.startswith('text/') or tipo in ('application/json', 'image/svg+xml'):
+            tipo = f'{tipo}; charset=utf-8'
+        response = HttpResponse(conteudo, content_type=tipo)
+        response['Cache-Control'] = cache
+        if comprimidos:
+            response['Vary'] = 'Accept-Encoding'
+        if codificacao:
+            response['Content-Encoding'] = codificacao
+        return response
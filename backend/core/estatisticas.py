@@ -0,0 +1,168 @@
+# backend/core/estatisticas.py
+
+"""
+Manutenção e leitura das estatísticas materializadas da frota (modelo EstatisticaFrota).
+
+Cada veículo ativo "contribui" com +1 em três contadores: o total, o da sua empresa e o da
+sua seguradora. Quando um veículo é salvo, desativado ou excluído, removemos a contribuição
+antiga e aplicamos a nova.
+Os vencimentos de seguro do dashboard vêm da tabela de alertas pré-calculados (core/alertas.py).
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from veiculos.models import Empresa, Veiculo
+
+from .models import (
+    DIMENSAO_EMPRESA,
+    DIMENSAO_SEGURADORA,
+    DIMENSAO_TOTAL,
+    EstatisticaFrota,
+)
+
+# Campos do veículo que influenciam as estatísticas (e, com a data de vencimento, os alertas de vencimento)
+CAMPOS_ESTATISTICAS = ('ativo', 'empresa_id', 'seguradora', 'data_vencimento_seguro')
+
+
+def contribuicoes(estado):
+    """
+    Lista os contadores (dimensao, chave) afetados por um veículo, dado o seu estado
+    (dicionário com os campos de CAMPOS_ESTATISTICAS). Veículos inativos não contribuem.
+    """
+    if not estado or not estado['ativo']:
+        return []
+    return [
+        (DIMENSAO_TOTAL, ''),
+        (DIMENSAO_EMPRESA, str(estado['empresa_id'])),
+        (DIMENSAO_SEGURADORA, estado['seguradora']),
+    ]
+
+
+def estado_do_veiculo(veiculo):
+    """Extrai de uma instância de Veiculo o estado usado pelas estatísticas."""
+    return {campo: getattr(veiculo, campo) for campo in CAMPOS_ESTATISTICAS}
+
+
+def _somar(dimensao, chave, delta):
+    """Soma 'delta' a um contador, criando-o se ainda não existir."""
+    atualizados = EstatisticaFrota.objects.filter(dimensao=dimensao, chave=chave).update(
+        contagem=F('contagem') + delta
+    )
+    if not atualizados:
+        try:
+            with transaction.atomic():
+                EstatisticaFrota.objects.create(dimensao=dimensao, chave=chave, contagem=delta)
+        except IntegrityError: # Outro processo criou o contador ao mesmo tempo
+            EstatisticaFrota.objects.filter(dimensao=dimensao, chave=chave).update(
+                contagem=F('contagem') + delta
+            )
+
+
+def aplicar_mudancas(transicoes):
+    """
+    Atualiza os contadores para refletir uma lista de transições (estado_anterior, estado_novo)
+    de veículos. Qualquer um dos estados pode ser None (criação ou exclusão).
+    As diferenças são somadas antes de gravar: uma importação de milhares de veículos
+    resulta em poucas atualizações, uma por contador afetado.
+    """
+    deltas = Counter()
+    for estado_anterior, estado_novo in transicoes:
+        for contador in contribuicoes(estado_anterior):
+            deltas[contador] -= 1
+        for contador in contribuicoes(estado_novo):
+            deltas[contador] += 1
+
+    with transaction.atomic():
+        for (dimensao, chave), delta in deltas.items():
+            if delta:
+                _somar(dimensao, chave, delta)
+        # Remove contadores zerados (por exemplo, empresas que ficaram sem veículos ativos)
+        if any(delta < 0 for delta in deltas.values()):
+            EstatisticaFrota.objects.filter(contagem=0).delete()
+
+
+def aplicar_mudanca(estado_anterior, estado_novo):
+    """Atualiza os contadores para a transição de um único veículo (ver aplicar_mudancas)."""
+    aplicar_mudancas([(estado_anterior, estado_novo)])
+
+
+def recontar():
+    """
+    Calcula todos os contadores diretamente da tabela de veículos.
+    Retorna um dicionário {(dimensao, chave): contagem}.
+    """
+    ativos = Veiculo.ativos.order_by()
+    contagens = {(DIMENSAO_TOTAL, ''): ativos.count()}
+    agrupamentos = (
+        (DIMENSAO_EMPRESA, 'empresa_id'),
+        (DIMENSAO_SEGURADORA, 'seguradora'),
+    )
+    for dimensao, campo in agrupamentos:
+        for linha in ativos.values(campo).annotate(n=Count('id')):
+            contagens[(dimensao, str(linha[campo]))] = linha['n']
+    return {contador: n for contador, n in contagens.items() if n}
+
+
+def reconstruir():
+    """Apaga e recria todos os contadores a partir de uma recontagem completa."""
+    contagens = recontar()
+    with transaction.atomic():
+        EstatisticaFrota.objects.all().delete()
+        EstatisticaFrota.objects.bulk_create(
+            [EstatisticaFrota(dimensao=d, chave=c, contagem=n) for (d, c), n in contagens.items()],
+            batch_size=1000,
+        )
+    return len(contagens)
+
+
+def verificar():
+    """
+    Compara os contadores materializados com uma recontagem ao vivo.
+    Retorna a lista de divergências no formato (dimensao, chave, materializado, real).
+    """
+    reais = recontar()
+    materializados = {
+        (e.dimensao, e.chave): e.contagem
+        for e in EstatisticaFrota.objects.exclude(contagem=0)
+    }
+    divergencias = []
+    for contador in sorted(set(reais) | set(materializados)):
+        if reais.get(contador, 0) != materializados.get(contador, 0):
+            divergencias.append((*contador, materializados.get(contador, 0), reais.get(contador, 0)))
+    return divergencias
+
+
+def resumo_dashboard(limite_empresas=10):
+    """
+    Lê as estatísticas usadas pelo dashboard apenas da tabela materializada.
+    Retorna um dicionário com o total de ativos e as contagens por seguradora e por empresa
+    (as maiores 'limite_empresas').
+    """
+    total = EstatisticaFrota.objects.filter(dimensao=DIMENSAO_TOTAL, chave='').values_list('contagem', flat=True).first()
+
+    # Seguradoras com o nome de exibição do campo choices
+    nomes_seguradoras = dict(Veiculo._meta.get_field('seguradora').choices)
+    por_seguradora = [
+        (nomes_seguradoras.get(chave, chave), n)
+        for chave, n in EstatisticaFrota.objects.filter(dimensao=DIMENSAO_SEGURADORA, contagem__gt=0)
+        .order_by('-contagem').values_list('chave', 'contagem')
+    ]
+
+    # Maiores empresas: busca os nomes apenas das empresas exibidas
+    maiores = list(
+        EstatisticaFrota.objects.filter(dimensao=DIMENSAO_EMPRESA, contagem__gt=0)
+        .order_by('-contagem').values_list('chave', 'contagem')[:limite_empresas]
+    )
+    nomes_empresas = dict(
+        Empresa.objects.filter(pk__in=[int(chave) for chave, _ in maiores]).values_list('pk', 'razao_social')
+    )
+    por_empresa = [(nomes_empresas.get(int(chave), chave), n) for chave, n in maiores]
+
+    return {
+        'quantidade_carros': total or 0,
+        'por_seguradora': por_seguradora,
+        'por_empresa': por_empresa,
+    }
@@ -0,0 +1,123 @@
+# backend/core/exportacao.py
+
+"""
+Exportação em streaming (CSV ou NDJSON) reutilizável pelos apps.
+
+A queryset é percorrida com .values_list(...).iterator(chunk_size=...): apenas as colunas
+exportadas são buscadas, nenhum objeto de modelo é instanciado e só um bloco de linhas
+fica em memória por vez. O conteúdo é produzido por um gerador, consumido tanto pelo
+StreamingHttpResponse (endpoints) quanto pelos comandos de gerenciamento (arquivo/stdout).
+"""
+
+import csv # Escrita no formato CSV
+import datetime # Datas são exportadas no formato ISO 8601
+import io # Buffer de texto usado para montar cada bloco de saída
+
+from django.core.serializers.json import DjangoJSONEncoder # Suporta date, datetime, Decimal e UUID
+from django.http import StreamingHttpResponse
+
+# Formatos suportados: extensão do arquivo e content type da resposta
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# Linhas buscadas do banco por vez
+TAMANHO_BLOCO_BANCO = 2000
+# Tamanho aproximado (em caracteres) de cada bloco enviado ao cliente
+TAMANHO_BLOCO_SAIDA = 64 * 1024
+
+
+def linhas_exportadas(queryset, colunas, chunk_size=TAMANHO_BLOCO_BANCO):
+    """
+    Percorre a queryset trazendo apenas os campos das colunas.
+    - colunas: lista de tuplas (nome_da_coluna, caminho_do_campo), ex: ('empresa', 'empresa__razao_social').
+    Gera uma tupla de valores por registro.
+    """
+    caminhos = [caminho for _, caminho in colunas]
+    return queryset.values_list(*caminhos).iterator(chunk_size=chunk_size)
+
+
+def _valor_csv(valor):
+    """Datas e horários em ISO 8601 (como no NDJSON); os demais valores seguem o padrão do módulo csv."""
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()
+    return valor
+
+
+def gerar_csv(linhas, colunas):
+    """Gera o conteúdo CSV em blocos de texto: o cabeçalho sai imediatamente, depois as linhas."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow([nome for nome, _ in colunas])
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for linha in linhas:
+        escritor.writerow([_valor_csv(valor) for valor in linha])
+        if buffer.tell() >= TAMANHO_BLOCO_SAIDA:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gerar_ndjson(linhas, colunas):
+    """Gera o conteúdo NDJSON em blocos de texto: um objeto JSON por registro, um por linha."""
+    nomes = [nome for nome, _ in colunas]
+    codificador = DjangoJSONEncoder(ensure_ascii=False)
+    bloco = []
+    tamanho = 0
+    for linha in linhas:
+        texto = codificador.encode(dict(zip(nomes, linha)))
+        bloco.append(texto)
+        tamanho += len(texto) + 1
+        if tamanho >= TAMANHO_BLOCO_SAIDA:
+            yield '\n'.join(bloco) + '\n'
+            bloco, tamanho = [], 0
+    if bloco:
+        yield '\n'.join(bloco) + '\n'
+
+
+def gerar_exportacao(queryset, colunas, formato):
+    """Escolhe o gerador do formato pedido ('csv' ou 'ndjson')."""
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato de exportação não suportado: {formato}')
+    gerador = gerar_csv if formato == 'csv' else gerar_ndjson
+    return gerador(linhas_exportadas(queryset, colunas), colunas)
+
+
+def formato_solicitado(parametros, padrao='csv'):
+    """
+    Lê o parâmetro 'formato' (csv ou ndjson; o padrão quando ausente ou vazio).
+    Levanta ValueError para um formato desconhecido: o cliente não recebe um arquivo diferente do pedido.
+    """
+    formato = parametros.get('formato') or padrao
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato de exportação não suportado: {formato}. Use {" ou ".join(FORMATOS)}.')
+    return formato
+
+
+def resposta_exportacao(queryset, colunas, formato, nome_arquivo):
+    """
+    Monta um StreamingHttpResponse com o download da exportação.
+    Os bytes começam a ser enviados assim que o primeiro bloco fica pronto.
+    """
+    conteudo = (bloco.encode('utf-8') for bloco in gerar_exportacao(queryset, colunas, formato))
+    resposta = StreamingHttpResponse(conteudo, content_type=FORMATOS[formato])
+    resposta['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.{formato}"'
+    return resposta
+
+
+def gravar_exportacao(queryset, colunas, formato, saida):
+    """
+    Grava a exportação em um arquivo de texto já aberto (ou stdout), bloco a bloco.
+    Retorna a quantidade de caracteres escritos.
+    """
+    escritos = 0
+    for bloco in gerar_exportacao(queryset, colunas, formato):
+        saida.write(bloco)
+        escritos += len(bloco)
+    return escritos
@@ -0,0 +1,107 @@
+# backend/core/fragmentos.py
+
+"""
+Cache de fragmentos de template por linha de tabela (listas de veículos e de sinistros).
+
+Cada linha é renderizada por um template próprio (ex: veiculos/_linha_veiculo.html) e guardada
+no cache 'fragmentos' (settings.CACHES) com uma chave formada por:
+- o nome do template e um hash do seu conteúdo (alterar o template invalida todas as linhas);
+- o id do objeto e as versões dos registros exibidos na linha (core/versionamento.py),
+  ex: a versão do veículo e a da sua empresa.
+As chaves de uma página inteira são buscadas com um único get_many e apenas as linhas ausentes
+são renderizadas (e gravadas com set_many): uma lista repetida vira a concatenação dos fragmentos.
+
+O template da linha é renderizado sem a requisição: não pode depender do usuário, da sessão ou
+do token CSRF (formulários POST devem usar um <form> fora da tabela, via atributo 'form').
+
+Os acertos e falhas são somados no próprio cache e podem ser consultados (ou zerados)
+com o comando 'fragmentos_cache'.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+# Alias do cache de fragmentos; sem ele em settings.CACHES, o cache 'default' é usado
+ALIAS_CACHE_FRAGMENTOS = 'fragmentos'
+
+# Contadores de acertos e falhas
+CHAVE_ACERTOS = 'fragmentos:contador:acertos'
+CHAVE_FALHAS = 'fragmentos:contador:falhas'
+
+
+def cache_fragmentos():
+    alias = ALIAS_CACHE_FRAGMENTOS if ALIAS_CACHE_FRAGMENTOS in settings.CACHES else 'default'
+    return caches[alias]
+
+
+def _versao_do_template(template):
+    """Hash curto do código-fonte do template da linha."""
+    return hashlib.sha1(template.template.source.encode('utf-8')).hexdigest()[:12]
+
+
+def _resolver(objeto, caminho):
+    """Lê um atributo com caminho pontuado (ex: 'empresa.versao')."""
+    for parte in caminho.split('.'):
+        objeto = getattr(objeto, parte)
+    return objeto
+
+
+def _somar(chave, quantidade):
+    if not quantidade:
+        return
+    cache = cache_fragmentos()
+    cache.add(chave, 0, timeout=None) # Cria o contador se ainda não existir
+    try:
+        cache.incr(chave, quantidade)
+    except ValueError: # Removido entre o add e o incr (ex: contadores zerados)
+        cache.add(chave, quantidade, timeout=None)
+
+
+def renderizar_linhas(objetos, template_name, nome, versoes=()):
+    """
+    Renderiza um template por objeto, reaproveitando as linhas em cache.
+    - nome: nome da variável do objeto no template da linha (ex: 'veiculo').
+    - versoes: caminhos dos atributos de versão que entram na chave (ex: ['versao', 'empresa.versao']).
+    Retorna o HTML concatenado (seguro) das linhas, na ordem dos objetos.
+    """
+    objetos = list(objetos)
+    if not objetos:
+        return ''
+    template = get_template(template_name)
+    prefixo = f'fragmento:{template_name}:{_versao_do_template(template)}'
+    chaves = [
+        ':'.join([prefixo, str(objeto.pk), *(str(_resolver(objeto, caminho)) for caminho in versoes)])
+        for objeto in objetos
+    ]
+
+    cache = cache_fragmentos()
+    prontos = cache.get_many(chaves)
+    novos = {}
+    linhas = []
+    for objeto, chave in zip(objetos, chaves):
+        html = prontos.get(chave)
+        if html is None:
+            html = novos[chave] = template.render({nome: objeto})
+        linhas.append(html)
+
+    if novos:
+        cache.set_many(novos, timeout=getattr(settings, 'AUTO_FROTA_TIMEOUT_FRAGMENTOS', 24 * 60 * 60))
+    _somar(CHAVE_ACERTOS, len(objetos) - len(novos))
+    _somar(CHAVE_FALHAS, len(novos))
+    return mark_safe(''.join(linhas))
+
+
+def contadores():
+    """Acertos, falhas e taxa de acerto (0 a 1, ou None sem renderizações) do cache de linhas."""
+    valores = cache_fragmentos().get_many([CHAVE_ACERTOS, CHAVE_FALHAS])
+    acertos, falhas = valores.get(CHAVE_ACERTOS, 0), valores.get(CHAVE_FALHAS, 0)
+    total = acertos + falhas
+    return {'acertos': acertos, 'falhas': falhas, 'taxa_acerto': acertos / total if total else None}
+
+
+def zerar_contadores():
+    cache_fragmentos().delete_many([CHAVE_ACERTOS, CHAVE_FALHAS])
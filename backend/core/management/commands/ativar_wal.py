@@ -0,0 +1,34 @@
+# backend/core/management/commands/ativar_wal.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.banco import MODO_JOURNAL_SQLITE, ativar_wal
+
+
+class Command(BaseCommand):
+    """
+    Coloca o banco SQLite em modo WAL (leitores não bloqueiam o escritor). O modo fica gravado no
+    arquivo do banco: basta executar o comando uma vez por banco, por exemplo na implantação, logo
+    depois do 'migrate' (e de novo se o arquivo for recriado ou restaurado de um backup antigo).
+    Os PRAGMAs de cada conexão (AUTO_FROTA_SQLITE_PRAGMAS) continuam aplicados por core/banco.py.
+    Uso: python manage.py ativar_wal [--database default]
+    """
+    help = 'Grava o modo WAL no arquivo do banco SQLite (uma vez por banco).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Banco a ajustar (padrão: "default").',
+        )
+
+    def handle(self, *args, **options):
+        conexao = connections[options['database']]
+        if conexao.vendor != 'sqlite':
+            raise CommandError('O modo WAL só se aplica ao SQLite.')
+        with conexao.cursor() as cursor:
+            modo = ativar_wal(cursor)
+        if modo != MODO_JOURNAL_SQLITE:
+            raise CommandError(f'O banco continua no modo "{modo}" (um banco em memória não usa WAL).')
+        self.stdout.write(self.style.SUCCESS(f'Banco "{conexao.settings_dict["NAME"]}" em modo WAL.'))
@@ -0,0 +1,56 @@
+# backend/core/management/commands/atualizar_alertas.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.alertas import atualizar_alertas, reconstruir_alertas, verificar_alertas
+
+
+class Command(BaseCommand):
+    """
+    Atualiza a tabela de alertas de vencimento (core/alertas.py), reprocessando apenas os veículos
+    alterados desde a última execução e os vencimentos que entraram na janela de alerta.
+    Deve ser agendado no cron, por exemplo, todos os dias à meia-noite e cinco:
+        5 0 * * * cd /caminho/do/backend && python manage.py atualizar_alertas
+    Uso: python manage.py atualizar_alertas [--reconstruir] [--verificar] [--data AAAA-MM-DD]
+    """
+    help = 'Atualiza de forma incremental os alertas de vencimento de seguro.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reconstruir',
+            action='store_true',
+            help='Recalcula todos os alertas a partir da tabela de veículos.',
+        )
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Após a atualização, confere os alertas com o cálculo direto a partir dos veículos.',
+        )
+        parser.add_argument(
+            '--data',
+            type=date.fromisoformat,
+            help='Data de referência (padrão: hoje), no formato AAAA-MM-DD.',
+        )
+
+    def handle(self, *args, **options):
+        hoje = options['data'] or date.today()
+        if options['reconstruir']:
+            execucao = reconstruir_alertas(hoje)
+        else:
+            execucao = atualizar_alertas(hoje)
+
+        tipo = 'Reconstrução completa' if execucao.reconstrucao else 'Atualização incremental'
+        self.stdout.write(self.style.SUCCESS(
+            f'{tipo} em {hoje:%d/%m/%Y}: {execucao.veiculos_processados} veículo(s) processado(s), '
+            f'{execucao.total_alertas} alerta(s) ativo(s).'
+        ))
+
+        if options['verificar']:
+            divergencias = verificar_alertas(hoje)
+            for veiculo_id, materializado, esperado in divergencias:
+                self.stderr.write(f'Veículo {veiculo_id}: alerta={materializado}, esperado={esperado}')
+            if divergencias:
+                raise CommandError(f'{len(divergencias)} divergência(s) encontrada(s) nos alertas.')
+            self.stdout.write(self.style.SUCCESS('Alertas conferidos: nenhuma divergência.'))
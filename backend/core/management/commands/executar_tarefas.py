@@ -0,0 +1,82 @@
+# backend/core/management/commands/executar_tarefas.py
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core.tarefas import expurgar_tarefas, processar_tarefas
+
+
+class Command(BaseCommand):
+    """
+    Executa as tarefas em segundo plano pendentes e retoma as interrompidas (core/tarefas.py).
+    Necessário quando AUTO_FROTA_TAREFAS_EM_SEGUNDO_PLANO = False e, em qualquer caso, para retomar
+    tarefas cujo processo foi encerrado no meio (reinício do servidor, por exemplo).
+    Pode ser agendado no cron, por exemplo, a cada minuto:
+        * * * * * cd /caminho/do/backend && python manage.py executar_tarefas
+    ou mantido em execução como um worker (systemd, supervisor...):
+        python manage.py executar_tarefas --continuo --threads 4
+    Uso: python manage.py executar_tarefas [--threads N] [--continuo [--intervalo S]] [--expurgar-dias N]
+    """
+    help = 'Executa as tarefas em segundo plano pendentes e retoma as interrompidas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=settings.AUTO_FROTA_TAREFAS_THREADS,
+            help=f'Tarefas executadas ao mesmo tempo (padrão: {settings.AUTO_FROTA_TAREFAS_THREADS}).',
+        )
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Continua aguardando novas tarefas em vez de terminar quando a fila esvazia.',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5,
+            help='Com --continuo, segundos de espera quando não há tarefas (padrão: 5).',
+        )
+        parser.add_argument(
+            '--expurgar-dias',
+            type=int,
+            help='Em vez de executar, remove as tarefas encerradas há mais de N dias.',
+        )
+
+    def handle(self, *args, **options):
+        if options['expurgar_dias'] is not None:
+            removidas = expurgar_tarefas(timezone.now() - timedelta(days=options['expurgar_dias']))
+            self.stdout.write(self.style.SUCCESS(f'{removidas} tarefa(s) removida(s).'))
+            return
+
+        try:
+            while True:
+                tarefas = processar_tarefas(threads=options['threads'])
+                for tarefa in tarefas:
+                    self._relatar(tarefa)
+                if not options['continuo']:
+                    if not tarefas:
+                        self.stdout.write('Nenhuma tarefa pendente.')
+                    return
+                if not tarefas:
+                    close_old_connections() # Não mantém a conexão parada durante a espera
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt: # Encerramento do worker: as tarefas já reivindicadas serão retomadas
+            self.stdout.write('Executor de tarefas encerrado.')
+
+    def _relatar(self, tarefa):
+        resumo = f'Tarefa #{tarefa.pk} ({tarefa.rotulo})'
+        if tarefa.status == 'concluida':
+            self.stdout.write(self.style.SUCCESS(f'{resumo}: concluída.'))
+        elif tarefa.status == 'pendente':
+            self.stderr.write(
+                f'{resumo}: falhou na tentativa {tarefa.tentativas} ({tarefa.erro}); '
+                f'nova tentativa a partir de {timezone.localtime(tarefa.executar_apos):%d/%m/%Y %H:%M:%S}.'
+            )
+        else:
+            self.stderr.write(f'{resumo}: falhou ({tarefa.erro}).')
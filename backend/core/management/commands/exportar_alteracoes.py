@@ -0,0 +1,96 @@
+# backend/core/management/commands/exportar_alteracoes.py
+
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from core.alteracoes import LIMITE_ALTERACOES, cursor_atual, expurgar_alteracoes, ler_alteracoes
+from core.models import MODELO_ALTERACAO_CHOICES
+from core.paginacao import CursorInvalido
+
+
+class Command(BaseCommand):
+    """
+    Exporta em NDJSON (uma alteração por linha) as alterações registradas depois de um cursor
+    (core/alteracoes.py), para a sincronização incremental dos sistemas externos.
+    Com --arquivo-cursor, o cursor é lido do arquivo e o novo cursor é gravado nele ao final,
+    o que permite agendar a sincronização no cron sem guardar o estado em outro lugar:
+        */15 * * * * cd /caminho/do/backend && python manage.py exportar_alteracoes --arquivo-cursor feed.cursor --saida delta.ndjson
+    Uso: python manage.py exportar_alteracoes [--cursor C | --arquivo-cursor ARQ] [--modelos veiculo sinistro]
+         [--saida delta.ndjson] [--cursor-atual] [--expurgar-dias N]
+    """
+    help = 'Exporta as alterações de empresas, veículos e sinistros desde um cursor (feed incremental).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cursor', help='Cursor da exportação anterior (padrão: desde a primeira alteração).')
+        parser.add_argument('--arquivo-cursor', help='Arquivo de onde o cursor é lido e onde o novo cursor é gravado.')
+        parser.add_argument(
+            '--modelos',
+            nargs='+',
+            choices=[nome for nome, _ in MODELO_ALTERACAO_CHOICES],
+            help='Exporta apenas as alterações destes modelos.',
+        )
+        parser.add_argument('--saida', help='Arquivo de destino (padrão: saída padrão).')
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=LIMITE_ALTERACOES,
+            help=f'Alterações lidas por consulta (padrão: {LIMITE_ALTERACOES}).',
+        )
+        parser.add_argument(
+            '--cursor-atual',
+            action='store_true',
+            help='Apenas mostra o cursor da última alteração (ponto de partida após uma cópia completa).',
+        )
+        parser.add_argument(
+            '--expurgar-dias',
+            type=int,
+            help='Em vez de exportar, remove as alterações registradas há mais de N dias.',
+        )
+
+    def handle(self, *args, **options):
+        if options['cursor_atual']:
+            self.stdout.write(cursor_atual())
+            return
+        if options['expurgar_dias'] is not None:
+            removidas = expurgar_alteracoes(timezone.now() - timedelta(days=options['expurgar_dias']))
+            self.stdout.write(self.style.SUCCESS(f'{removidas} alteração(ões) removida(s).'))
+            return
+
+        cursor = options['cursor']
+        if options['arquivo_cursor'] and cursor is None:
+            try:
+                with open(options['arquivo_cursor'], encoding='utf-8') as arquivo:
+                    cursor = arquivo.read().strip() or None
+            except FileNotFoundError: # Primeira execução: exporta desde o início
+                pass
+
+        try:
+            if options['saida']:
+                with open(options['saida'], 'w', encoding='utf-8') as saida:
+                    cursor, total = self._exportar(cursor, options['modelos'], options['lote'], saida)
+            else:
+                cursor, total = self._exportar(cursor, options['modelos'], options['lote'], self.stdout)
+            if options['arquivo_cursor']: # Só depois de tudo gravado: uma falha repete a exportação
+                with open(options['arquivo_cursor'], 'w', encoding='utf-8') as arquivo:
+                    arquivo.write(cursor)
+        except CursorInvalido as erro:
+            raise CommandError(str(erro))
+        except OSError as erro:
+            raise CommandError(f'Não foi possível gravar o arquivo: {erro}')
+        self.stderr.write(self.style.SUCCESS(f'{total} alteração(ões) exportada(s). Próximo cursor: {cursor}'))
+
+    def _exportar(self, cursor, modelos, lote, saida):
+        """Lê o feed em lotes até alcançar o fim. Retorna (próximo cursor, total exportado)."""
+        total = 0
+        while True:
+            feed = ler_alteracoes(cursor, modelos, lote)
+            for alteracao in feed['alteracoes']:
+                saida.write(json.dumps(alteracao, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+            total += len(feed['alteracoes'])
+            cursor = feed['proximo_cursor']
+            if not feed['tem_mais'] or not feed['alteracoes']: # Sem avanço (atraso): o restante fica para a próxima
+                return cursor, total
@@ -0,0 +1,38 @@
+# backend/core/management/commands/fragmentos_cache.py
+
+from django.core.management.base import BaseCommand
+
+from core.fragmentos import cache_fragmentos, contadores, zerar_contadores
+
+
+class Command(BaseCommand):
+    """
+    Exibe os acertos e falhas do cache de linhas das listas (core/fragmentos.py), para ajuste
+    do backend e do tamanho do cache. Os contadores ficam no próprio cache: com o backend
+    'memoria' (AUTO_FROTA_CACHE) cada processo tem os seus e este comando não os enxerga;
+    use 'arquivo' ou 'redis' para acompanhar os servidores.
+    Uso: python manage.py fragmentos_cache [--zerar] [--limpar]
+    """
+    help = 'Exibe (ou zera) os contadores de acertos e falhas do cache de fragmentos das listas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zerar', action='store_true', help='Zera os contadores após exibi-los.')
+        parser.add_argument(
+            '--limpar',
+            action='store_true',
+            help='Remove todas as linhas do cache de fragmentos (e os contadores).',
+        )
+
+    def handle(self, *args, **options):
+        valores = contadores()
+        taxa = valores['taxa_acerto']
+        self.stdout.write(
+            f"Acertos: {valores['acertos']} | Falhas: {valores['falhas']} | "
+            f"Taxa de acerto: {'-' if taxa is None else f'{taxa:.1%}'}"
+        )
+        if options['limpar']:
+            cache_fragmentos().clear()
+            self.stdout.write(self.style.SUCCESS('Cache de fragmentos limpo.'))
+        elif options['zerar']:
+            zerar_contadores()
+            self.stdout.write(self.style.SUCCESS('Contadores zerados.'))
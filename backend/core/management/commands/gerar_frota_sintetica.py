@@ -0,0 +1,62 @@
+# backend/core/management/commands/gerar_frota_sintetica.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sinteticos import TAMANHO_LOTE_SINTETICOS, gerar_frota_sintetica, limpar_frota
+
+
+class Command(BaseCommand):
+    """
+    Gera uma frota sintética determinística (core/sinteticos.py): a mesma semente e a mesma
+    data de referência geram sempre os mesmos dados.
+    Uso: python manage.py gerar_frota_sintetica --empresas 200 --veiculos 10000 --sinistros 3000
+         [--semente 42] [--data-referencia 2026-01-01] [--lote 1000] [--limpar]
+    """
+    help = 'Gera empresas, veículos e sinistros sintéticos para testes de desempenho.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empresas', type=int, default=100, help='Quantidade de empresas.')
+        parser.add_argument('--veiculos', type=int, default=4000, help='Quantidade de veículos.')
+        parser.add_argument('--sinistros', type=int, default=1200, help='Quantidade de sinistros.')
+        parser.add_argument('--semente', type=int, default=0, help='Semente do gerador (mesma semente, mesmos dados).')
+        parser.add_argument(
+            '--data-referencia',
+            type=date.fromisoformat,
+            help='Data (AAAA-MM-DD) usada como "hoje" para vencimentos e sinistros (padrão: hoje).',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE_SINTETICOS,
+            help='Registros gravados por transação.',
+        )
+        parser.add_argument(
+            '--limpar',
+            action='store_true',
+            help='Remove TODAS as empresas, veículos e sinistros antes de gerar (apenas em bancos de teste).',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['empresas'], options['veiculos'], options['sinistros']) < 0 or options['lote'] < 1:
+            raise CommandError('As quantidades não podem ser negativas e o lote deve ser maior que zero.')
+        if options['veiculos'] and not options['empresas']:
+            raise CommandError('Informe ao menos uma empresa para receber os veículos.')
+
+        if options['limpar']:
+            limpar_frota()
+            self.stdout.write('Frota atual removida.')
+
+        gerados = gerar_frota_sintetica(
+            options['empresas'],
+            options['veiculos'],
+            options['sinistros'],
+            semente=options['semente'],
+            hoje=options['data_referencia'],
+            tamanho_lote=options['lote'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{gerados['empresas']} empresa(s), {gerados['veiculos']} veículo(s) e "
+            f"{gerados['sinistros']} sinistro(s) gerado(s)."
+        ))
@@ -0,0 +1,107 @@
+# backend/core/management/commands/medir_concorrencia.py
+
+import copy
+import json
+import logging
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from core.concorrencia import medir_carga, perfis_para_comparar, preparar_frota
+
+
+class Command(BaseCommand):
+    """
+    Mede a vazão de escritas e leituras concorrentes (core/concorrencia.py) para o perfil de banco
+    configurado em settings.py e para o perfil de comparação (no SQLite, os padrões do Django; no
+    PostgreSQL com pool, conexões sem pool). Cada perfil roda em um banco de teste próprio, criado e
+    destruído pelo comando: o banco de desenvolvimento não é alterado.
+    Uso: python manage.py medir_concorrencia [--escritores 4] [--leitores 4] [--duracao 5]
+         [--perfil configurado] [--saida resultado.json]
+    """
+    help = 'Mede escritas e leituras por segundo sob carga concorrente para cada perfil de banco.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escritores', type=int, default=4, help='Threads que gravam.')
+        parser.add_argument('--leitores', type=int, default=4, help='Threads que consultam.')
+        parser.add_argument('--duracao', type=float, default=5.0, help='Segundos de carga por perfil.')
+        parser.add_argument('--semente', type=int, default=0, help='Semente da frota sintética.')
+        parser.add_argument(
+            '--perfil',
+            action='append',
+            help='Mede apenas este perfil (pode ser repetido); padrão: todos.',
+        )
+        parser.add_argument('--saida', help='Grava o resultado (JSON) neste arquivo.')
+
+    def handle(self, *args, **options):
+        if options['duracao'] <= 0 or options['escritores'] < 0 or options['leitores'] < 0:
+            raise CommandError('A duração deve ser positiva e a quantidade de threads não pode ser negativa.')
+
+        configuracao = connections.settings['default']
+        original = copy.deepcopy(configuracao)
+        perfis = perfis_para_comparar(original)
+        escolhidos = options['perfil'] or list(perfis)
+        desconhecidos = sorted(set(escolhidos) - set(perfis))
+        if desconhecidos:
+            raise CommandError(f"Perfil desconhecido: {', '.join(desconhecidos)}. Disponíveis: {', '.join(perfis)}.")
+
+        logging.getLogger('auto_frota.consultas').setLevel(logging.WARNING)
+        resultados = {}
+        setup_test_environment()
+        try:
+            for nome in escolhidos:
+                perfil, pragmas = perfis[nome]
+                resultados[nome] = self._medir_perfil(configuracao, perfil, pragmas, options)
+                self._exibir(nome, resultados[nome])
+        finally:
+            connections['default'].close()
+            configuracao.clear()
+            configuracao.update(original)
+            teardown_test_environment()
+
+        if options['saida']:
+            relatorio = {
+                'banco': original['ENGINE'],
+                'escritores': options['escritores'],
+                'leitores': options['leitores'],
+                'duracao': options['duracao'],
+                'perfis': resultados,
+            }
+            Path(options['saida']).write_text(json.dumps(relatorio, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}."))
+
+    def _medir_perfil(self, configuracao, perfil, pragmas, options):
+        # A configuração é trocada no próprio dicionário de conexões: as threads abrem conexões com ela
+        connections['default'].close()
+        configuracao.clear()
+        configuracao.update(copy.deepcopy(perfil))
+        with tempfile.TemporaryDirectory() as pasta, override_settings(AUTO_FROTA_SQLITE_PRAGMAS=pragmas):
+            if configuracao['ENGINE'] == 'django.db.backends.sqlite3':
+                configuracao['TEST']['NAME'] = str(Path(pasta) / 'concorrencia.sqlite3')
+            bancos = setup_databases(verbosity=0, interactive=False)
+            try:
+                preparar_frota(options['semente'])
+                return medir_carga(
+                    options['escritores'], options['leitores'], options['duracao'], options['semente']
+                )
+            finally:
+                connections['default'].close()
+                teardown_databases(bancos, verbosity=0)
+
+    def _exibir(self, nome, resultado):
+        for tipo in ('escritas', 'leituras'):
+            dados = resultado[tipo]
+            self.stdout.write(
+                f"{nome:>12} {tipo:<9} {dados['por_segundo']:>9.1f}/s  "
+                f"mediana {dados['latencia_mediana_ms'] or 0:.1f} ms  "
+                f"p95 {dados['latencia_p95_ms'] or 0:.1f} ms  erros {dados['erros']}"
+            )
@@ -0,0 +1,113 @@
+# backend/core/management/commands/medir_desempenho.py
+
+import json
+import logging
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from core.desempenho import (
+    REPETICOES_PADRAO,
+    TAMANHOS_PADRAO,
+    VARIACAO_SIGNIFICATIVA,
+    comparar_resultados,
+    medir_desempenho,
+)
+
+
+class Command(BaseCommand):
+    """
+    Mede o tempo das telas e das consultas principais em vários tamanhos de frota (core/desempenho.py)
+    e grava o resultado em JSON, para comparar versões do código.
+    A medição roda em um banco de teste criado e destruído pelo próprio comando (como o 'test'):
+    o banco de desenvolvimento não é alterado. No SQLite, o banco de teste é um arquivo temporário
+    (e não o banco em memória do 'test'), para medir com acesso a disco.
+    Uso: python manage.py medir_desempenho [--tamanhos 1000 10000] [--repeticoes 5] [--semente 0]
+         [--saida resultado.json] [--comparar anterior.json]
+    """
+    help = 'Mede o desempenho das telas e consultas com frotas sintéticas e grava o resultado em JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamanhos',
+            type=int,
+            nargs='+',
+            default=list(TAMANHOS_PADRAO),
+            help='Tamanhos de frota (quantidade de veículos) medidos.',
+        )
+        parser.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO, help='Execuções de cada alvo.')
+        parser.add_argument('--semente', type=int, default=0, help='Semente da frota sintética.')
+        parser.add_argument('--saida', help='Grava o resultado (JSON) neste arquivo; sem ele, vai para a saída padrão.')
+        parser.add_argument('--comparar', help='Resultado anterior (JSON) para comparar com esta medição.')
+        parser.add_argument(
+            '--limite-variacao',
+            type=float,
+            default=VARIACAO_SIGNIFICATIVA,
+            help='Variação relativa da mediana considerada regressão ou melhora (ex: 0.15 = 15%%).',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeticoes'] < 1 or min(options['tamanhos']) < 1:
+            raise CommandError('Os tamanhos e a quantidade de repetições devem ser maiores que zero.')
+        anterior = None
+        if options['comparar']:
+            try:
+                anterior = json.loads(Path(options['comparar']).read_text(encoding='utf-8'))
+            except (OSError, ValueError) as erro:
+                raise CommandError(f'Não foi possível ler o resultado anterior: {erro}')
+
+        relatorio = self._medir(options)
+
+        saida = json.dumps(relatorio, ensure_ascii=False, indent=2)
+        if options['saida']:
+            Path(options['saida']).write_text(saida + '\n', encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}."))
+        else:
+            self.stdout.write(saida)
+
+        if anterior is not None:
+            self._exibir_comparacao(comparar_resultados(anterior, relatorio, options['limite_variacao']))
+
+    def _medir(self, options):
+        # Uma linha de log por requisição atrapalharia a leitura: apenas os avisos de N+1
+        logger = logging.getLogger('auto_frota.consultas')
+        nivel = logger.level
+        logger.setLevel(logging.WARNING)
+        with tempfile.TemporaryDirectory() as pasta:
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = str(Path(pasta) / 'medicao.sqlite3')
+            setup_test_environment()
+            bancos = setup_databases(verbosity=0, interactive=False)
+            try:
+                return medir_desempenho(
+                    options['tamanhos'],
+                    options['repeticoes'],
+                    options['semente'],
+                    progresso=lambda mensagem: self.stderr.write(mensagem),
+                )
+            finally:
+                teardown_databases(bancos, verbosity=0)
+                teardown_test_environment()
+                logger.setLevel(nivel)
+
+    def _exibir_comparacao(self, comparacao):
+        estilos = {'regressao': self.style.ERROR, 'melhora': self.style.SUCCESS, 'estavel': str}
+        for item in comparacao:
+            cache = f" [{item['cache']}]" if item['cache'] else ''
+            linha = (
+                f"{item['tamanho']:>8} {item['alvo']}{cache}: {item['mediana_anterior_ms']:.1f} -> "
+                f"{item['mediana_ms']:.1f} ms ({item['variacao']:+.1%}), "
+                f"{item['consultas_anteriores']} -> {item['consultas']} consulta(s)"
+            )
+            self.stderr.write(estilos[item['situacao']](linha))
+        regressoes = sum(1 for item in comparacao if item['situacao'] == 'regressao')
+        if regressoes:
+            raise CommandError(f'{regressoes} regressão(ões) de desempenho em relação à medição anterior.')
@@ -0,0 +1,45 @@
+# backend/core/management/commands/reconstruir_estatisticas.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import sinistros_mensais
+from core.estatisticas import reconstruir, verificar
+
+
+class Command(BaseCommand):
+    """
+    Reconstrói do zero as estatísticas materializadas do dashboard (contadores da frota e resumo
+    mensal dos sinistros) e confere o resultado com uma recontagem ao vivo das tabelas de veículos
+    e de sinistros.
+    Uso: python manage.py reconstruir_estatisticas [--somente-verificar]
+    """
+    help = 'Reconstrói as estatísticas da frota e o resumo mensal dos sinistros e verifica contra uma recontagem ao vivo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--somente-verificar',
+            action='store_true',
+            help='Apenas compara os contadores atuais com a recontagem, sem reconstruí-los.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['somente_verificar']:
+            total = reconstruir()
+            self.stdout.write(f'{total} contador(es) reconstruído(s).')
+            total = sinistros_mensais.reconstruir()
+            self.stdout.write(f'{total} linha(s) do resumo mensal dos sinistros reconstruída(s).')
+
+        divergencias = verificar()
+        for dimensao, chave, materializado, real in divergencias:
+            self.stderr.write(f'{dimensao} [{chave}]: materializado={materializado}, real={real}')
+        divergencias_sinistros = sinistros_mensais.verificar()
+        for mes, empresa_id, tipo, status, materializado, real in divergencias_sinistros:
+            self.stderr.write(
+                f'sinistros {mes:%m/%Y} empresa {empresa_id} {tipo}/{status}: materializado={materializado}, real={real}'
+            )
+        if divergencias or divergencias_sinistros:
+            raise CommandError(
+                f'{len(divergencias) + len(divergencias_sinistros)} divergência(s) encontrada(s) nas estatísticas.'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Estatísticas conferidas: nenhuma divergência.'))
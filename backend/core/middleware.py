@@ -0,0 +1,142 @@
+# backend/core/middleware.py
+
+"""
+Medição das consultas SQL de cada requisição.
+
+Para cada requisição são registrados a quantidade de consultas, o tempo total gasto no banco
+e as consultas repetidas (o mesmo SQL executado mais de uma vez, mudando apenas os parâmetros:
+o sinal típico de um N+1, como uma consulta por linha de uma lista). Os números são expostos:
+- nos cabeçalhos da resposta X-Consultas-SQL, X-Tempo-SQL-ms e X-Consultas-Repetidas;
+- em uma linha de log do logger 'auto_frota.consultas' (nível INFO, exibido só com
+  AUTO_FROTA_LOG_CONSULTAS=INFO; WARNING, sempre exibido, quando algum SQL se repete
+  AUTO_FROTA_REPETICOES_ALERTA vezes ou mais, com o trecho do SQL mais repetido).
+
+A contagem é feita com connection.execute_wrapper() e funciona também nas views assíncronas:
+o ORM assíncrono executa as consultas na thread síncrona da requisição, onde o wrapper é instalado.
+Em respostas em streaming (exportações), só entram as consultas feitas antes do envio do corpo.
+Desligado com AUTO_FROTA_MEDIR_CONSULTAS = False.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('auto_frota.consultas')
+
+# Tamanho máximo do trecho de SQL incluído no log
+TAMANHO_TRECHO_SQL = 200
+
+
+class MedicaoConsultas:
+    """
+    Wrapper de execução (connection.execute_wrapper) que conta e cronometra as consultas.
+    - quantidade: consultas executadas;
+    - tempo: segundos gastos no banco;
+    - por_sql: Counter com quantas vezes cada SQL (sem os parâmetros) foi executado.
+    """
+
+    def __init__(self):
+        self.quantidade = 0
+        self.tempo = 0.0
+        self.por_sql = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo += time.perf_counter() - inicio
+            self.quantidade += 1
+            self.por_sql[sql] += 1
+
+    @property
+    def repetidas(self):
+        """Execuções além da primeira de cada SQL (0 quando nenhuma consulta se repete)."""
+        return sum(vezes - 1 for vezes in self.por_sql.values() if vezes > 1)
+
+    def mais_repetida(self):
+        """(sql, vezes) do SQL mais executado, ou None se não houve consultas."""
+        mais_comuns = self.por_sql.most_common(1)
+        return mais_comuns[0] if mais_comuns else None
+
+    def iniciar(self):
+        """Instala o wrapper nas conexões da thread atual."""
+        for conexao in connections.all():
+            conexao.execute_wrappers.append(self)
+
+    def encerrar(self):
+        """Remove o wrapper instalado por iniciar()."""
+        for conexao in connections.all():
+            if self in conexao.execute_wrappers:
+                conexao.execute_wrappers.remove(self)
+
+    @contextmanager
+    def medir(self):
+        self.iniciar()
+        try:
+            yield self
+        finally:
+            self.encerrar()
+
+
+class MedicaoConsultasMiddleware:
+    """
+    Registra as consultas SQL de cada requisição (ver o docstring do módulo).
+    Deve ser o primeiro da lista MIDDLEWARE, para incluir as consultas da sessão e da autenticação.
+    Compatível com WSGI e ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'AUTO_FROTA_MEDIR_CONSULTAS', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        medicao = MedicaoConsultas()
+        with medicao.medir():
+            response = self.get_response(request)
+        return self.registrar(request, response, medicao)
+
+    async def __acall__(self, request):
+        medicao = MedicaoConsultas()
+        # O wrapper é instalado na thread síncrona da requisição, onde o ORM executa as consultas
+        await sync_to_async(medicao.iniciar)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(medicao.encerrar)()
+        return self.registrar(request, response, medicao)
+
+    def registrar(self, request, response, medicao):
+        """Grava os cabeçalhos e a linha de log da requisição."""
+        tempo_ms = medicao.tempo * 1000
+        response['X-Consultas-SQL'] = str(medicao.quantidade)
+        response['X-Tempo-SQL-ms'] = f'{tempo_ms:.1f}'
+        response['X-Consultas-Repetidas'] = str(medicao.repetidas)
+
+        mensagem = '%s %s: %d consulta(s) SQL em %.1f ms, %d repetida(s)'
+        argumentos = [request.method, request.path, medicao.quantidade, tempo_ms, medicao.repetidas]
+        mais_repetida = medicao.mais_repetida()
+        limite = getattr(settings, 'AUTO_FROTA_REPETICOES_ALERTA', 5)
+        if mais_repetida and mais_repetida[1] >= limite:
+            sql, vezes = mais_repetida
+            logger.warning(
+                mensagem + '; possível N+1, executado %d vezes: %s',
+                *argumentos, vezes, sql[:TAMANHO_TRECHO_SQL],
+            )
+        else:
+            logger.info(mensagem, *argumentos)
+        return response
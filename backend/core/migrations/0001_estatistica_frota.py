@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:28
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def calcular_estatisticas_iniciais(apps, schema_editor):
+    # Materializa os contadores para os veículos cadastrados antes desta migração
+    Veiculo = apps.get_model('veiculos', 'Veiculo')
+    EstatisticaFrota = apps.get_model('core', 'EstatisticaFrota')
+    ativos = Veiculo.objects.filter(ativo=True).order_by()
+    total = ativos.count()
+    estatisticas = [EstatisticaFrota(dimensao='total', chave='', contagem=total)] if total else []
+    for dimensao, campo in (('empresa', 'empresa_id'), ('seguradora', 'seguradora'), ('vencimento', 'data_vencimento_seguro')):
+        for linha in ativos.values(campo).annotate(n=Count('id')):
+            valor = linha[campo]
+            chave = valor.isoformat() if hasattr(valor, 'isoformat') else str(valor)
+            estatisticas.append(EstatisticaFrota(dimensao=dimensao, chave=chave, contagem=linha['n']))
+    EstatisticaFrota.objects.bulk_create(estatisticas)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('veiculos', '0003_termo_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstatisticaFrota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimensao', models.CharField(choices=[('total', 'Total de Veículos Ativos'), ('empresa', 'Veículos Ativos por Empresa'), ('seguradora', 'Veículos Ativos por Seguradora'), ('vencimento', 'Veículos Ativos por Data de Vencimento')], max_length=20, verbose_name='Dimensão')),
+                ('chave', models.CharField(blank=True, default='', max_length=100, verbose_name='Chave')),
+                ('contagem', models.IntegerField(default=0, verbose_name='Contagem')),
+            ],
+            options={
+                'verbose_name': 'Estatística da Frota',
+                'verbose_name_plural': 'Estatísticas da Frota',
+                'constraints': [models.UniqueConstraint(fields=('dimensao', 'chave'), name='estatistica_frota_unica')],
+            },
+        ),
+        migrations.RunPython(calcular_estatisticas_iniciais, migrations.RunPython.noop),
+    ]
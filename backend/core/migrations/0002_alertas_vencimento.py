@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_estatistica_frota'),
+        ('veiculos', '0004_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecucaoAlertas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_referencia', models.DateField(verbose_name='Data de Referência')),
+                ('executado_em', models.DateTimeField(auto_now_add=True, verbose_name='Executado em')),
+                ('reconstrucao', models.BooleanField(default=False, verbose_name='Reconstrução Completa')),
+                ('veiculos_processados', models.IntegerField(default=0, verbose_name='Veículos Processados')),
+                ('total_alertas', models.IntegerField(default=0, verbose_name='Total de Alertas')),
+            ],
+            options={
+                'verbose_name': 'Execução dos Alertas',
+                'verbose_name_plural': 'Execuções dos Alertas',
+                'ordering': ['-executado_em', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertaPendente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marcado_em', models.DateTimeField(auto_now=True, verbose_name='Marcado em')),
+                ('veiculo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='alerta_pendente', to='veiculos.veiculo', verbose_name='Veículo')),
+            ],
+            options={
+                'verbose_name': 'Alerta Pendente',
+                'verbose_name_plural': 'Alertas Pendentes',
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertaVencimento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seguradora', models.CharField(max_length=100, verbose_name='Seguradora')),
+                ('data_vencimento_seguro', models.DateField(verbose_name='Data de Vencimento do Seguro')),
+                ('horizonte', models.PositiveSmallIntegerField(choices=[(30, 'Até 30 dias'), (60, 'De 31 a 60 dias'), (90, 'De 61 a 90 dias')], verbose_name='Horizonte do Alerta')),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas_vencimento', to='veiculos.empresa', verbose_name='Empresa')),
+                ('veiculo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='alerta_vencimento', to='veiculos.veiculo', verbose_name='Veículo')),
+            ],
+            options={
+                'verbose_name': 'Alerta de Vencimento',
+                'verbose_name_plural': 'Alertas de Vencimento',
+                'ordering': ['data_vencimento_seguro', 'id'],
+                'indexes': [models.Index(fields=['data_vencimento_seguro', 'id'], name='alerta_vencimento_data_idx'), models.Index(fields=['empresa', 'horizonte'], name='alerta_vencimento_empresa_idx'), models.Index(fields=['seguradora', 'horizonte'], name='alerta_vencimento_segur_idx')],
+            },
+        ),
+    ]
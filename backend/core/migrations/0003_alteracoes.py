@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alertas_vencimento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alteracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('empresa', 'Empresa'), ('veiculo', 'Veículo'), ('sinistro', 'Sinistro')], max_length=10, verbose_name='Modelo')),
+                ('objeto_id', models.BigIntegerField(verbose_name='Id do Registro')),
+                ('operacao', models.CharField(choices=[('criacao', 'Criação'), ('alteracao', 'Alteração'), ('desativacao', 'Desativação'), ('reativacao', 'Reativação'), ('exclusao', 'Exclusão')], max_length=12, verbose_name='Operação')),
+                ('campos', models.JSONField(blank=True, default=list, help_text='Campos gravados, quando conhecidos (save com update_fields ou operação em massa); vazio = todos.', verbose_name='Campos Alterados')),
+                ('registrado_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Registrado em')),
+            ],
+            options={
+                'verbose_name': 'Alteração',
+                'verbose_name_plural': 'Alterações',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['modelo', 'id'], name='alteracao_modelo_idx'), models.Index(fields=['registrado_em'], name='alteracao_registrado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+
+
+def calcular_resumo_existente(apps, schema_editor):
+    # Mesma recontagem de core/sinistros_mensais.reconstruir(), com os modelos históricos
+    Sinistro = apps.get_model('sinistros', 'Sinistro')
+    ResumoMensalSinistros = apps.get_model('core', 'ResumoMensalSinistros')
+    grupos = (
+        Sinistro.objects.order_by()
+        .values('tipo_sinistro', 'status_sinistro', mes=TruncMonth('data_sinistro'), empresa_id=F('veiculo__empresa_id'))
+        .annotate(n=Count('id'))
+    )
+    ResumoMensalSinistros.objects.bulk_create(
+        [
+            ResumoMensalSinistros(
+                mes=grupo['mes'], empresa_id=grupo['empresa_id'], tipo_sinistro=grupo['tipo_sinistro'],
+                status_sinistro=grupo['status_sinistro'], quantidade=grupo['n'],
+            )
+            for grupo in grupos
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alteracoes'),
+        ('veiculos', '0010_cnpj_chave'),
+        ('sinistros', '0004_versao_registro'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoMensalSinistros',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primeiro dia do mês da data do sinistro.', verbose_name='Mês')),
+                ('tipo_sinistro', models.CharField(max_length=50, verbose_name='Tipo de Sinistro')),
+                ('status_sinistro', models.CharField(max_length=50, verbose_name='Status do Sinistro')),
+                ('quantidade', models.IntegerField(default=0, verbose_name='Quantidade')),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos_mensais_sinistros', to='veiculos.empresa', verbose_name='Empresa')),
+            ],
+            options={
+                'verbose_name': 'Resumo Mensal de Sinistros',
+                'verbose_name_plural': 'Resumos Mensais de Sinistros',
+                'indexes': [models.Index(fields=['empresa', 'mes'], name='resumo_mensal_empresa_idx')],
+                'constraints': [models.UniqueConstraint(fields=('mes', 'empresa', 'tipo_sinistro', 'status_sinistro'), name='resumo_mensal_sinistros_unico')],
+            },
+        ),
+        migrations.RunPython(calcular_resumo_existente, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_resumo_mensal_sinistros'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(help_text="Nome com que a operação foi registrada em core/tarefas.py (ex: 'importar_frota').", max_length=50, verbose_name='Tipo')),
+                ('parametros', models.JSONField(blank=True, default=dict, verbose_name='Parâmetros')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('em_andamento', 'Em andamento'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Situação')),
+                ('progresso_atual', models.PositiveIntegerField(default=0, verbose_name='Progresso')),
+                ('progresso_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total')),
+                ('mensagem', models.CharField(blank=True, max_length=200, verbose_name='Mensagem')),
+                ('resultado', models.JSONField(blank=True, null=True, verbose_name='Resultado')),
+                ('tentativas', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('maximo_tentativas', models.PositiveIntegerField(default=1, verbose_name='Máximo de Tentativas')),
+                ('erro', models.TextField(blank=True, verbose_name='Último Erro')),
+                ('data_solicitacao', models.DateTimeField(auto_now_add=True, verbose_name='Data da Solicitação')),
+                ('executar_apos', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Executar Após')),
+                ('data_inicio', models.DateTimeField(blank=True, null=True, verbose_name='Início da Execução')),
+                ('data_atualizacao', models.DateTimeField(blank=True, null=True, verbose_name='Última Atualização')),
+                ('data_conclusao', models.DateTimeField(blank=True, null=True, verbose_name='Data da Conclusão')),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Tarefa',
+                'verbose_name_plural': 'Tarefas',
+                'ordering': ['-data_solicitacao', '-id'],
+                'indexes': [models.Index(fields=['status', 'executar_apos'], name='tarefa_fila_idx'), models.Index(fields=['-data_solicitacao', '-id'], name='tarefa_recentes_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+
+def remover_contadores_vencimento(apps, schema_editor):
+    # Os vencimentos do dashboard vêm da tabela de alertas: os contadores por data não têm mais leitor
+    EstatisticaFrota = apps.get_model('core', 'EstatisticaFrota')
+    EstatisticaFrota.objects.filter(dimensao='vencimento').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_tarefas'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='estatisticafrota',
+            name='dimensao',
+            field=models.CharField(choices=[('total', 'Total de Veículos Ativos'), ('empresa', 'Veículos Ativos por Empresa'), ('seguradora', 'Veículos Ativos por Seguradora')], max_length=20, verbose_name='Dimensão'),
+        ),
+        migrations.RunPython(remover_contadores_vencimento, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,384 @@
+# backend/core/models.py
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+# --- Estatísticas Materializadas da Frota ---
+# Dimensões mantidas em EstatisticaFrota
+DIMENSAO_TOTAL = 'total' # Total de veículos ativos (chave vazia)
+DIMENSAO_EMPRESA = 'empresa' # Veículos ativos por empresa (chave = id da empresa)
+DIMENSAO_SEGURADORA = 'seguradora' # Veículos ativos por seguradora (chave = código da seguradora)
+
+DIMENSAO_CHOICES = [
+    (DIMENSAO_TOTAL, 'Total de Veículos Ativos'),
+    (DIMENSAO_EMPRESA, 'Veículos Ativos por Empresa'),
+    (DIMENSAO_SEGURADORA, 'Veículos Ativos por Seguradora'),
+]
+
+
+class EstatisticaFrota(models.Model):
+    """
+    Contadores pré-calculados da frota, lidos pelo dashboard no lugar de consultas à tabela de veículos.
+    São atualizados de forma incremental pelos signals de Veiculo (core/signals.py) e podem ser
+    reconstruídos e conferidos com o comando 'reconstruir_estatisticas'.
+    """
+    dimensao = models.CharField(
+        max_length=20,
+        choices=DIMENSAO_CHOICES,
+        verbose_name="Dimensão"
+    )
+    chave = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        verbose_name="Chave"
+    )
+    contagem = models.IntegerField(
+        default=0,
+        verbose_name="Contagem"
+    )
+
+    class Meta:
+        verbose_name = "Estatística da Frota"
+        verbose_name_plural = "Estatísticas da Frota"
+        constraints = [
+            models.UniqueConstraint(fields=['dimensao', 'chave'], name='estatistica_frota_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_dimensao_display()} [{self.chave}]: {self.contagem}"
+
+
+# --- Resumo Mensal dos Sinistros ---
+class ResumoMensalSinistros(models.Model):
+    """
+    Quantidade de sinistros por mês da data do sinistro, empresa (a atual do veículo), tipo e status.
+    Lida pela tendência mensal do dashboard no lugar de agregações sobre a tabela de sinistros:
+    alguns anos de histórico cabem em poucas centenas de linhas, qualquer que seja a quantidade de sinistros.
+    É atualizada de forma incremental pelos signals de Sinistro e Veiculo (core/signals.py) e pode ser
+    reconstruída e conferida com o comando 'reconstruir_estatisticas' (core/sinistros_mensais.py).
+    """
+    mes = models.DateField(
+        verbose_name="Mês",
+        help_text="Primeiro dia do mês da data do sinistro."
+    )
+    empresa = models.ForeignKey(
+        'veiculos.Empresa',
+        on_delete=models.CASCADE, # Ao excluir a empresa, os seus resumos também são removidos
+        related_name='resumos_mensais_sinistros',
+        verbose_name="Empresa"
+    )
+    tipo_sinistro = models.CharField(
+        max_length=50,
+        verbose_name="Tipo de Sinistro"
+    )
+    status_sinistro = models.CharField(
+        max_length=50,
+        verbose_name="Status do Sinistro"
+    )
+    quantidade = models.IntegerField(
+        default=0,
+        verbose_name="Quantidade"
+    )
+
+    class Meta:
+        verbose_name = "Resumo Mensal de Sinistros"
+        verbose_name_plural = "Resumos Mensais de Sinistros"
+        constraints = [
+            # Também serve à leitura da tendência, um intervalo de meses
+            models.UniqueConstraint(
+                fields=['mes', 'empresa', 'tipo_sinistro', 'status_sinistro'], name='resumo_mensal_sinistros_unico'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['empresa', 'mes'], name='resumo_mensal_empresa_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.mes:%m/%Y} empresa {self.empresa_id} {self.tipo_sinistro}/{self.status_sinistro}: {self.quantidade}"
+
+
+# --- Alertas de Vencimento Pré-calculados ---
+# Horizontes (em dias) em que os alertas são agrupados: cada alerta fica no menor horizonte que contém o vencimento
+HORIZONTE_CHOICES = [
+    (30, 'Até 30 dias'),
+    (60, 'De 31 a 60 dias'),
+    (90, 'De 61 a 90 dias'),
+]
+
+
+class AlertaVencimento(models.Model):
+    """
+    Veículo ativo cujo seguro vence dentro do maior horizonte de alerta (90 dias).
+    A tabela contém apenas os veículos em alerta e é lida pelo dashboard e pela lista de alertas,
+    no lugar de uma consulta por intervalo de datas na tabela de veículos.
+    É atualizada de forma incremental pelo comando 'atualizar_alertas' (core/alertas.py),
+    que deve ser agendado no cron (uma vez por dia, no mínimo).
+    """
+    veiculo = models.OneToOneField(
+        'veiculos.Veiculo',
+        on_delete=models.CASCADE, # Ao excluir o veículo, o alerta também é removido
+        related_name='alerta_vencimento',
+        verbose_name="Veículo"
+    )
+    # Cópia dos campos do veículo usados nos agrupamentos, para que a tabela seja lida sem JOIN
+    empresa = models.ForeignKey(
+        'veiculos.Empresa',
+        on_delete=models.CASCADE,
+        related_name='alertas_vencimento',
+        verbose_name="Empresa"
+    )
+    seguradora = models.CharField(
+        max_length=100,
+        verbose_name="Seguradora"
+    )
+    data_vencimento_seguro = models.DateField(
+        verbose_name="Data de Vencimento do Seguro"
+    )
+    horizonte = models.PositiveSmallIntegerField(
+        choices=HORIZONTE_CHOICES,
+        verbose_name="Horizonte do Alerta"
+    )
+
+    class Meta:
+        verbose_name = "Alerta de Vencimento"
+        verbose_name_plural = "Alertas de Vencimento"
+        ordering = ['data_vencimento_seguro', 'id']
+        indexes = [
+            models.Index(fields=['data_vencimento_seguro', 'id'], name='alerta_vencimento_data_idx'),
+            models.Index(fields=['empresa', 'horizonte'], name='alerta_vencimento_empresa_idx'),
+            models.Index(fields=['seguradora', 'horizonte'], name='alerta_vencimento_segur_idx'),
+        ]
+
+    def __str__(self):
+        return f"Veículo {self.veiculo_id}: vence em {self.data_vencimento_seguro:%d/%m/%Y}"
+
+
+class AlertaPendente(models.Model):
+    """
+    Veículo cujo vencimento, status (ativo), empresa ou seguradora mudou desde a última
+    atualização dos alertas. Preenchida pelos signals de Veiculo (core/signals.py) e
+    consumida pelo comando 'atualizar_alertas', que só reprocessa esses veículos.
+    """
+    veiculo = models.OneToOneField(
+        'veiculos.Veiculo',
+        on_delete=models.CASCADE,
+        related_name='alerta_pendente',
+        verbose_name="Veículo"
+    )
+    marcado_em = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Marcado em"
+    )
+
+    class Meta:
+        verbose_name = "Alerta Pendente"
+        verbose_name_plural = "Alertas Pendentes"
+
+    def __str__(self):
+        return f"Veículo {self.veiculo_id} (marcado em {self.marcado_em:%d/%m/%Y %H:%M})"
+
+
+class ExecucaoAlertas(models.Model):
+    """
+    Registro de cada atualização dos alertas. A data de referência da última execução
+    define quais vencimentos entraram na janela de alerta desde então.
+    """
+    data_referencia = models.DateField(
+        verbose_name="Data de Referência"
+    )
+    executado_em = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Executado em"
+    )
+    reconstrucao = models.BooleanField(
+        default=False,
+        verbose_name="Reconstrução Completa"
+    )
+    veiculos_processados = models.IntegerField(
+        default=0,
+        verbose_name="Veículos Processados"
+    )
+    total_alertas = models.IntegerField(
+        default=0,
+        verbose_name="Total de Alertas"
+    )
+
+    class Meta:
+        verbose_name = "Execução dos Alertas"
+        verbose_name_plural = "Execuções dos Alertas"
+        ordering = ['-executado_em', '-id']
+
+    def __str__(self):
+        return f"Alertas de {self.data_referencia:%d/%m/%Y} ({self.total_alertas} alerta(s))"
+
+
+# --- Registro de Alterações (feed incremental) ---
+# Modelos acompanhados e operações registradas em Alteracao
+MODELO_EMPRESA = 'empresa'
+MODELO_VEICULO = 'veiculo'
+MODELO_SINISTRO = 'sinistro'
+
+MODELO_ALTERACAO_CHOICES = [
+    (MODELO_EMPRESA, 'Empresa'),
+    (MODELO_VEICULO, 'Veículo'),
+    (MODELO_SINISTRO, 'Sinistro'),
+]
+
+OPERACAO_CRIACAO = 'criacao'
+OPERACAO_ALTERACAO = 'alteracao'
+OPERACAO_DESATIVACAO = 'desativacao' # Exclusão lógica de veículo (ativo=False)
+OPERACAO_REATIVACAO = 'reativacao'
+OPERACAO_EXCLUSAO = 'exclusao' # Exclusão definitiva (o registro não existe mais)
+
+OPERACAO_CHOICES = [
+    (OPERACAO_CRIACAO, 'Criação'),
+    (OPERACAO_ALTERACAO, 'Alteração'),
+    (OPERACAO_DESATIVACAO, 'Desativação'),
+    (OPERACAO_REATIVACAO, 'Reativação'),
+    (OPERACAO_EXCLUSAO, 'Exclusão'),
+]
+
+
+class Alteracao(models.Model):
+    """
+    Registro (somente inclusão) de cada criação, alteração, desativação ou exclusão de empresa,
+    veículo ou sinistro, gravado pelos signals (core/signals.py) na mesma transação da alteração.
+    O id crescente é a posição no feed: os sistemas externos guardam o cursor da última leitura e
+    pedem apenas o que mudou desde então (core/alteracoes.py, /api/v1/alteracoes/ e o comando
+    'exportar_alteracoes').
+    """
+    modelo = models.CharField(
+        max_length=10,
+        choices=MODELO_ALTERACAO_CHOICES,
+        verbose_name="Modelo"
+    )
+    objeto_id = models.BigIntegerField(
+        verbose_name="Id do Registro"
+    )
+    operacao = models.CharField(
+        max_length=12,
+        choices=OPERACAO_CHOICES,
+        verbose_name="Operação"
+    )
+    campos = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Campos Alterados",
+        help_text="Campos gravados, quando conhecidos (save com update_fields ou operação em massa); vazio = todos."
+    )
+    registrado_em = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Registrado em"
+    )
+
+    class Meta:
+        verbose_name = "Alteração"
+        verbose_name_plural = "Alterações"
+        ordering = ['id']
+        indexes = [
+            # Feed filtrado por modelo: intervalo de ids de um modelo, já na ordem do cursor
+            models.Index(fields=['modelo', 'id'], name='alteracao_modelo_idx'),
+            # Expurgo dos registros antigos
+            models.Index(fields=['registrado_em'], name='alteracao_registrado_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_operacao_display()} de {self.get_modelo_display()} {self.objeto_id}"
+
+
+# --- Tarefas em Segundo Plano ---
+STATUS_TAREFA_CHOICES = [
+    ('pendente', 'Pendente'), # Aguardando execução (ou uma nova tentativa, a partir de 'executar_apos')
+    ('em_andamento', 'Em andamento'),
+    ('concluida', 'Concluída'),
+    ('falhou', 'Falhou'), # Esgotou as tentativas
+]
+# Situações de uma tarefa que ainda pode ser executada
+STATUS_TAREFA_ABERTA = ('pendente', 'em_andamento')
+
+
+class Tarefa(models.Model):
+    """
+    Operação demorada (importação de frota, exclusão de empresa...) executada fora da requisição
+    pelo executor de tarefas (core/tarefas.py): em threads do próprio processo, logo após o pedido,
+    ou pelo comando 'executar_tarefas'. A tabela é a própria fila: não há broker externo.
+    O progresso é gravado durante a execução; a página de acompanhamento o exibe e uma tarefa
+    sem progresso por muito tempo é considerada interrompida e volta a ser executada.
+    """
+    tipo = models.CharField(
+        max_length=50,
+        verbose_name="Tipo",
+        help_text="Nome com que a operação foi registrada em core/tarefas.py (ex: 'importar_frota')."
+    )
+    parametros = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Parâmetros"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_TAREFA_CHOICES,
+        default='pendente',
+        verbose_name="Situação"
+    )
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Solicitado por"
+    )
+
+    # Progresso informado pela própria operação (o total pode ser desconhecido)
+    progresso_atual = models.PositiveIntegerField(default=0, verbose_name="Progresso")
+    progresso_total = models.PositiveIntegerField(null=True, blank=True, verbose_name="Total")
+    mensagem = models.CharField(max_length=200, blank=True, verbose_name="Mensagem")
+    resultado = models.JSONField(null=True, blank=True, verbose_name="Resultado")
+
+    tentativas = models.PositiveIntegerField(default=0, verbose_name="Tentativas")
+    maximo_tentativas = models.PositiveIntegerField(default=1, verbose_name="Máximo de Tentativas")
+    erro = models.TextField(blank=True, verbose_name="Último Erro")
+
+    data_solicitacao = models.DateTimeField(auto_now_add=True, verbose_name="Data da Solicitação")
+    # Uma nova tentativa só é feita depois desta data (espera crescente entre as tentativas)
+    executar_apos = models.DateTimeField(default=timezone.now, verbose_name="Executar Após")
+    data_inicio = models.DateTimeField(null=True, blank=True, verbose_name="Início da Execução")
+    # Atualizada a cada progresso: sem atualização por muito tempo, a execução é considerada interrompida
+    data_atualizacao = models.DateTimeField(null=True, blank=True, verbose_name="Última Atualização")
+    data_conclusao = models.DateTimeField(null=True, blank=True, verbose_name="Data da Conclusão")
+
+    class Meta:
+        verbose_name = "Tarefa"
+        verbose_name_plural = "Tarefas"
+        ordering = ['-data_solicitacao', '-id']
+        indexes = [
+            # Fila: próximas tarefas disponíveis, na ordem em que podem ser executadas
+            models.Index(fields=['status', 'executar_apos'], name='tarefa_fila_idx'),
+            # Página de acompanhamento: tarefas mais recentes primeiro
+            models.Index(fields=['-data_solicitacao', '-id'], name='tarefa_recentes_idx'),
+        ]
+
+    def __str__(self):
+        return f"Tarefa #{self.pk} {self.tipo} ({self.get_status_display()})"
+
+    @property
+    def rotulo(self):
+        from .tarefas import rotulo_da_tarefa # Importado aqui: core/tarefas.py importa este módulo
+        return rotulo_da_tarefa(self.tipo)
+
+    @property
+    def aberta(self):
+        return self.status in STATUS_TAREFA_ABERTA
 
-# Create your models here.
+    @property
+    def percentual(self):
+        """Percentual concluído, ou None enquanto o total não é conhecido."""
+        if self.status == 'concluida':
+            return 100
+        if not self.progresso_total:
+            return None
+        return min(100, int(100 * self.progresso_atual / self.progresso_total))
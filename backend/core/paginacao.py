@@ -0,0 +1,251 @@
+# backend/core/paginacao.py
+
+"""
+Paginação por chave (keyset / cursor) reutilizável pelas listagens do sistema.
+
+Diferente da paginação por OFFSET, o custo de cada página é constante: a consulta
+sempre começa do último registro visto (WHERE (placa, id) > (...)) e usa o índice
+da ordenação, não importa quão "fundo" o usuário esteja na lista.
+"""
+
+import base64 # Codifica o cursor de forma opaca para a URL
+import json # Serializa os valores da chave de ordenação dentro do cursor
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder # Suporta date, Decimal e UUID
+from django.db.models import Q
+
+# Valores padrão (podem ser sobrescritos em settings.py)
+TAMANHO_PAGINA_PADRAO = 50
+TAMANHO_PAGINA_MAXIMO = 200
+LIMITE_CONTAGEM = 1000
+
+# Direções gravadas dentro do cursor
+PROXIMA = 'p'
+ANTERIOR = 'a'
+
+# Tipos aceitos nos valores de um cursor (os campos da ordenação nunca são nulos)
+TIPOS_VALOR_CURSOR = (str, int, float)
+
+# Erros de conversão dos valores do cursor para os tipos dos campos da ordenação
+# (ex: texto em um campo numérico ou uma data inválida)
+ERROS_VALOR_CURSOR = (ValueError, TypeError, ValidationError)
+
+
+class CursorInvalido(ValueError):
+    """Erro levantado quando o cursor recebido na URL não pode ser decodificado."""
+
+
+def codificar_cursor(valores, direcao=PROXIMA):
+    """
+    Transforma os valores da chave de ordenação em um texto opaco e seguro para URL.
+    """
+    dados = json.dumps({'v': valores, 'd': direcao}, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Operação inversa de codificar_cursor. Retorna a tupla (valores, direcao).
+    Levanta CursorInvalido se o texto tiver sido adulterado ou estiver corrompido.
+    """
+    try:
+        preenchimento = '=' * (-len(cursor) % 4) # Recoloca o padding removido na codificação
+        dados = json.loads(base64.urlsafe_b64decode(cursor + preenchimento).decode('utf-8'))
+        valores, direcao = dados['v'], dados['d']
+    except (ValueError, TypeError, KeyError) as erro:
+        raise CursorInvalido('Cursor de paginação inválido.') from erro
+
+    if not isinstance(valores, list) or direcao not in (PROXIMA, ANTERIOR):
+        raise CursorInvalido('Cursor de paginação inválido.')
+    if not all(isinstance(valor, TIPOS_VALOR_CURSOR) and not isinstance(valor, bool) for valor in valores):
+        raise CursorInvalido('Cursor de paginação inválido.')
+    return valores, direcao
+
+
+def tamanho_pagina(request, padrao=None, maximo=None):
+    """
+    Lê o parâmetro 'por_pagina' da URL, respeitando o limite máximo configurado.
+    Valores ausentes ou inválidos resultam no tamanho padrão.
+    """
+    padrao = padrao or getattr(settings, 'AUTO_FROTA_TAMANHO_PAGINA', TAMANHO_PAGINA_PADRAO)
+    maximo = maximo or getattr(settings, 'AUTO_FROTA_TAMANHO_PAGINA_MAXIMO', TAMANHO_PAGINA_MAXIMO)
+    try:
+        tamanho = int(request.GET.get('por_pagina', padrao))
+    except (TypeError, ValueError):
+        return padrao
+    return max(1, min(tamanho, maximo))
+
+
+def contar_limitado(queryset, limite=None):
+    """
+    Conta os registros de uma queryset parando no limite informado.
+    Retorna a tupla (total, exato). Quando 'exato' é False, o total real é maior que o limite.
+    O custo fica limitado a 'limite' linhas, ao contrário de um COUNT(*) sobre a tabela toda.
+    """
+    limite = limite or getattr(settings, 'AUTO_FROTA_LIMITE_CONTAGEM', LIMITE_CONTAGEM)
+    total = queryset.order_by()[:limite + 1].count() # COUNT sobre uma subconsulta com LIMIT
+    if total > limite:
+        return limite, False
+    return total, True
+
+
+async def acontar_limitado(queryset, limite=None):
+    """Versão assíncrona de contar_limitado (usa o ORM assíncrono: acount)."""
+    limite = limite or getattr(settings, 'AUTO_FROTA_LIMITE_CONTAGEM', LIMITE_CONTAGEM)
+    total = await queryset.order_by()[:limite + 1].acount()
+    if total > limite:
+        return limite, False
+    return total, True
+
+
+def _valor_do_campo(item, campo):
+    """Obtém o valor de um campo (inclusive 'relacao__campo') de um objeto ou dicionário."""
+    if isinstance(item, dict): # Resultados de .values()
+        return item[campo]
+    valor = item
+    for parte in campo.split('__'):
+        valor = getattr(valor, parte)
+    return valor
+
+
+def _filtro_apos(ordenacao, valores, inverter):
+    """
+    Monta o filtro equivalente a "(c1, c2, ...) > (v1, v2, ...)" respeitando a direção
+    (ascendente/descendente) de cada campo. Com inverter=True monta a comparação oposta,
+    usada para navegar para a página anterior.
+    """
+    filtro = Q()
+    iguais = {}
+    for campo, valor in zip(ordenacao, valores):
+        descendente = campo.startswith('-')
+        nome = campo.lstrip('-')
+        operador = 'lt' if descendente != inverter else 'gt'
+        filtro |= Q(**iguais, **{f'{nome}__{operador}': valor})
+        iguais[nome] = valor
+    return filtro
+
+
+class PaginaKeyset:
+    """
+    Uma página de resultados paginada por chave.
+    - itens: lista de objetos da página, já na ordem de exibição.
+    - proximo_cursor / cursor_anterior: textos opacos (ou None) para navegar entre páginas.
+    """
+
+    def __init__(self, itens, proximo_cursor, cursor_anterior, tamanho):
+        self.itens = itens
+        self.proximo_cursor = proximo_cursor
+        self.cursor_anterior = cursor_anterior
+        self.tamanho = tamanho
+
+    @property
+    def tem_proxima(self):
+        return self.proximo_cursor is not None
+
+    @property
+    def tem_anterior(self):
+        return self.cursor_anterior is not None
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
+
+    def __bool__(self):
+        return bool(self.itens)
+
+
+def _consulta_da_pagina(queryset, ordenacao, cursor, tamanho):
+    """
+    Monta a consulta de uma página (ainda não executada).
+    Retorna a tupla (consulta, direcao); a consulta busca um item a mais que o tamanho.
+    Levanta CursorInvalido se o cursor não corresponder à ordenação (quantidade ou tipo dos valores).
+    """
+    direcao = PROXIMA
+    if cursor:
+        valores, direcao = decodificar_cursor(cursor)
+        if len(valores) != len(ordenacao):
+            raise CursorInvalido('Cursor de paginação inválido.')
+        try:
+            queryset = queryset.filter(_filtro_apos(ordenacao, valores, inverter=direcao == ANTERIOR))
+        except ERROS_VALOR_CURSOR as erro:
+            raise CursorInvalido('Cursor de paginação inválido.') from erro
+
+    if direcao == ANTERIOR:
+        # Para voltar, percorremos a ordenação invertida e depois desfazemos a inversão
+        ordem_consulta = [campo[1:] if campo.startswith('-') else f'-{campo}' for campo in ordenacao]
+    else:
+        ordem_consulta = ordenacao
+
+    # Busca um item a mais apenas para saber se existe outra página naquela direção
+    return queryset.order_by(*ordem_consulta)[:tamanho + 1], direcao
+
+
+def _montar_pagina(itens, ordenacao, cursor, tamanho, direcao):
+    """Monta a PaginaKeyset a partir dos itens buscados por _consulta_da_pagina."""
+    ha_mais = len(itens) > tamanho
+    itens = itens[:tamanho]
+
+    def cursor_de(item, nova_direcao):
+        return codificar_cursor([_valor_do_campo(item, campo.lstrip('-')) for campo in ordenacao], nova_direcao)
+
+    if direcao == ANTERIOR:
+        itens.reverse()
+        proximo = cursor_de(itens[-1], PROXIMA) if itens else None
+        anterior = cursor_de(itens[0], ANTERIOR) if itens and ha_mais else None
+    else:
+        proximo = cursor_de(itens[-1], PROXIMA) if itens and ha_mais else None
+        anterior = cursor_de(itens[0], ANTERIOR) if itens and cursor else None
+
+    return PaginaKeyset(itens, proximo, anterior, tamanho)
+
+
+def paginar(queryset, ordenacao, cursor=None, tamanho=None):
+    """
+    Pagina uma queryset por chave.
+    - ordenacao: campos de ordenação (aceita '-campo' e 'relacao__campo'). O último campo
+      precisa ser único (normalmente 'id') para servir de desempate, e nenhum pode ser nulo.
+    - cursor: texto recebido da página anterior (None para a primeira página).
+    - tamanho: quantidade de itens por página.
+    Levanta CursorInvalido se o cursor não puder ser decodificado.
+    """
+    ordenacao = list(ordenacao)
+    tamanho = tamanho or getattr(settings, 'AUTO_FROTA_TAMANHO_PAGINA', TAMANHO_PAGINA_PADRAO)
+    consulta, direcao = _consulta_da_pagina(queryset, ordenacao, cursor, tamanho)
+    try:
+        itens = list(consulta)
+    except ERROS_VALOR_CURSOR as erro:
+        if not cursor: # Sem cursor, o erro não vem dele
+            raise
+        raise CursorInvalido('Cursor de paginação inválido.') from erro
+    return _montar_pagina(itens, ordenacao, cursor, tamanho, direcao)
+
+
+async def apaginar(queryset, ordenacao, cursor=None, tamanho=None):
+    """Versão assíncrona de paginar (percorre a página com 'async for', sem bloquear o event loop)."""
+    ordenacao = list(ordenacao)
+    tamanho = tamanho or getattr(settings, 'AUTO_FROTA_TAMANHO_PAGINA', TAMANHO_PAGINA_PADRAO)
+    consulta, direcao = _consulta_da_pagina(queryset, ordenacao, cursor, tamanho)
+    try:
+        itens = [item async for item in consulta]
+    except ERROS_VALOR_CURSOR as erro:
+        if not cursor: # Sem cursor, o erro não vem dele
+            raise
+        raise CursorInvalido('Cursor de paginação inválido.') from erro
+    return _montar_pagina(itens, ordenacao, cursor, tamanho, direcao)
+
+
+async def apagina_da_requisicao(request, queryset, ordenacao):
+    """
+    Página pedida na requisição ('cursor' e 'por_pagina'), para as views assíncronas.
+    Um cursor adulterado ou de uma versão antiga resulta em um aviso e na primeira página.
+    """
+    try:
+        return await apaginar(queryset, ordenacao, cursor=request.GET.get('cursor'), tamanho=tamanho_pagina(request))
+    except CursorInvalido:
+        messages.warning(request, 'Link de paginação inválido. Exibindo a primeira página.')
+        return await apaginar(queryset, ordenacao, tamanho=tamanho_pagina(request))
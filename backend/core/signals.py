@@ -0,0 +1,257 @@
+# backend/core/signals.py
+
+"""
+Signals do app 'core'.
+Mantêm as estatísticas materializadas do dashboard (core/estatisticas.py) em dia
+a cada criação, alteração, desativação ou exclusão de veículo, e marcam os veículos
+cujos alertas de vencimento precisam ser recalculados (core/alertas.py).
+Também descartam os indicadores de sinistralidade em cache (core/sinistralidade.py)
+quando veículos ou sinistros mudam e registram cada alteração de empresa, veículo ou
+sinistro no feed incremental (core/alteracoes.py). O resumo mensal dos sinistros
+(core/sinistros_mensais.py) acompanha cada sinistro registrado, alterado ou excluído.
+Conectados em CoreConfig.ready().
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from sinistros.models import Sinistro
+from veiculos.models import Empresa, Veiculo
+from veiculos.signals import (
+    empresas_criadas_em_lote, veiculos_alterados_em_lote, veiculos_criados_em_lote, veiculos_excluidos_em_lote,
+)
+
+from .alertas import marcar_pendentes
+from .alteracoes import registrar_alteracoes, registrar_criacoes
+from .estatisticas import CAMPOS_ESTATISTICAS, aplicar_mudanca, aplicar_mudancas, estado_do_veiculo
+from .models import (
+    MODELO_EMPRESA, MODELO_SINISTRO, MODELO_VEICULO, OPERACAO_ALTERACAO, OPERACAO_CRIACAO,
+    OPERACAO_DESATIVACAO, OPERACAO_EXCLUSAO, OPERACAO_REATIVACAO,
+)
+from .sinistralidade import invalidar_sinistralidade
+from . import sinistros_mensais
+
+
+# Nomes aceitos em save(update_fields=...) para os campos que entram nas estatísticas
+CAMPOS_MONITORADOS = set(CAMPOS_ESTATISTICAS) | {'empresa'}
+
+
+def _afeta_estatisticas(update_fields):
+    """Salvar apenas campos que não entram nas estatísticas dispensa a atualização."""
+    return update_fields is None or bool(CAMPOS_MONITORADOS.intersection(update_fields))
+
+
+@receiver(pre_save, sender=Veiculo)
+def guardar_estado_anterior(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda na instância o estado gravado no banco antes da alteração."""
+    if raw or not _afeta_estatisticas(update_fields):
+        return
+    instance._estado_estatisticas = None
+    if instance.pk:
+        instance._estado_estatisticas = (
+            Veiculo.objects.filter(pk=instance.pk).values(*CAMPOS_ESTATISTICAS).first()
+        )
+
+
+def _operacao_do_veiculo(ativo_anterior, ativo):
+    """Operação registrada no feed para um veículo já existente que foi salvo."""
+    if ativo_anterior is None or ativo_anterior == ativo:
+        return OPERACAO_ALTERACAO
+    return OPERACAO_REATIVACAO if ativo else OPERACAO_DESATIVACAO
+
+
+# Registrado antes de atualizar_estatisticas_ao_salvar, que troca o estado anterior guardado pelo novo
+@receiver(post_save, sender=Veiculo)
+def registrar_alteracao_de_veiculo(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Registra no feed a criação, alteração, desativação ou reativação do veículo."""
+    if raw:
+        return
+    if created:
+        operacao = OPERACAO_CRIACAO
+    else:
+        # Sem 'ativo' entre os campos salvos, o estado guardado pode ser de um save anterior
+        anterior = getattr(instance, '_estado_estatisticas', None) if _afeta_estatisticas(update_fields) else None
+        operacao = _operacao_do_veiculo(anterior and anterior['ativo'], instance.ativo)
+    registrar_alteracoes(MODELO_VEICULO, [(instance.pk, operacao)], update_fields)
+
+
+# Também antes de atualizar_estatisticas_ao_salvar (estado anterior guardado)
+@receiver(post_save, sender=Veiculo)
+def transferir_resumo_de_sinistros(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Veículo transferido para outra empresa: os seus sinistros passam a contar para a nova empresa."""
+    if raw or created or not _afeta_estatisticas(update_fields):
+        return
+    anterior = getattr(instance, '_estado_estatisticas', None)
+    if anterior and anterior['empresa_id'] != instance.empresa_id:
+        sinistros_mensais.transferir_sinistros({instance.pk: (anterior['empresa_id'], instance.empresa_id)})
+
+
+@receiver(post_save, sender=Veiculo)
+def atualizar_estatisticas_ao_salvar(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Aplica a diferença entre o estado anterior e o novo estado do veículo.
+    Se algum desses campos mudou, o veículo também fica pendente para a atualização dos alertas.
+    """
+    if raw or not _afeta_estatisticas(update_fields):
+        return
+    anterior = getattr(instance, '_estado_estatisticas', None)
+    novo = estado_do_veiculo(instance)
+    aplicar_mudanca(anterior, novo)
+    if anterior != novo:
+        marcar_pendentes([instance.pk])
+    instance._estado_estatisticas = novo # Saves seguidos partem do novo estado
+
+
+@receiver(post_delete, sender=Veiculo)
+def atualizar_estatisticas_ao_excluir(sender, instance, **kwargs):
+    """Remove a contribuição do veículo excluído (inclusive na exclusão em cascata da empresa)."""
+    aplicar_mudanca(estado_do_veiculo(instance), None)
+
+
+@receiver(veiculos_criados_em_lote, sender=Veiculo)
+def atualizar_estatisticas_criados_em_lote(sender, veiculos, **kwargs):
+    """Soma de uma só vez a contribuição dos veículos criados por uma importação em massa."""
+    aplicar_mudancas([(None, estado_do_veiculo(veiculo)) for veiculo in veiculos])
+    marcar_pendentes(veiculo.pk for veiculo in veiculos)
+
+
+@receiver(veiculos_excluidos_em_lote, sender=Veiculo)
+def atualizar_estatisticas_excluidos_em_lote(sender, veiculos, **kwargs):
+    """Remove de uma só vez a contribuição dos veículos excluídos em lote (exclusão de empresa)."""
+    aplicar_mudancas([(estado_do_veiculo(veiculo), None) for veiculo in veiculos])
+
+
+@receiver(veiculos_alterados_em_lote, sender=Veiculo)
+def atualizar_estatisticas_alterados_em_lote(sender, anteriores, atualizados, campos, **kwargs):
+    """
+    Aplica de uma só vez as transições dos veículos de uma operação em massa e marca para
+    a atualização dos alertas os que mudaram algum campo das estatísticas.
+    """
+    if not _afeta_estatisticas(campos):
+        return
+    transicoes = [
+        (estado_do_veiculo(anterior), estado_do_veiculo(atualizado))
+        for anterior, atualizado in zip(anteriores, atualizados)
+    ]
+    aplicar_mudancas(transicoes)
+    marcar_pendentes(
+        atualizado.pk for atualizado, (estado_anterior, estado_novo) in zip(atualizados, transicoes)
+        if estado_anterior != estado_novo
+    )
+
+
+@receiver(post_save, sender=Veiculo)
+@receiver(post_delete, sender=Veiculo)
+@receiver(post_save, sender=Sinistro)
+@receiver(post_delete, sender=Sinistro)
+@receiver(veiculos_criados_em_lote, sender=Veiculo)
+@receiver(veiculos_excluidos_em_lote, sender=Veiculo)
+@receiver(veiculos_alterados_em_lote, sender=Veiculo)
+def invalidar_sinistralidade_ao_alterar(sender, raw=False, **kwargs):
+    """Qualquer alteração de veículo ou sinistro torna os indicadores de sinistralidade desatualizados."""
+    if not raw:
+        invalidar_sinistralidade()
+
+
+# --- Registro de alterações (core/alteracoes.py) ---
+MODELOS_DO_FEED = {Empresa: MODELO_EMPRESA, Veiculo: MODELO_VEICULO, Sinistro: MODELO_SINISTRO}
+
+
+@receiver(post_save, sender=Empresa)
+@receiver(post_save, sender=Sinistro)
+def registrar_alteracao_ao_salvar(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Registra no feed a criação ou alteração de uma empresa ou sinistro (veículos: registrar_alteracao_de_veiculo)."""
+    if not raw:
+        operacao = OPERACAO_CRIACAO if created else OPERACAO_ALTERACAO
+        registrar_alteracoes(MODELOS_DO_FEED[sender], [(instance.pk, operacao)], update_fields)
+
+
+@receiver(post_delete, sender=Empresa)
+@receiver(post_delete, sender=Veiculo)
+@receiver(post_delete, sender=Sinistro)
+def registrar_exclusao(sender, instance, **kwargs):
+    """Registra a exclusão definitiva (inclusive em cascata), que de outra forma não deixaria rastro."""
+    registrar_alteracoes(MODELOS_DO_FEED[sender], [(instance.pk, OPERACAO_EXCLUSAO)])
+
+
+@receiver(veiculos_criados_em_lote, sender=Veiculo)
+def registrar_veiculos_criados_em_lote(sender, veiculos, **kwargs):
+    registrar_criacoes(MODELO_VEICULO, veiculos)
+
+
+@receiver(empresas_criadas_em_lote, sender=Empresa)
+def registrar_empresas_criadas_em_lote(sender, empresas, **kwargs):
+    registrar_criacoes(MODELO_EMPRESA, empresas)
+
+
+@receiver(veiculos_alterados_em_lote, sender=Veiculo)
+def registrar_veiculos_alterados_em_lote(sender, anteriores, atualizados, campos, **kwargs):
+    """Uma alteração por veículo da operação em massa (desativação/reativação quando 'ativo' mudou)."""
+    registrar_alteracoes(MODELO_VEICULO, [
+        (atualizado.pk, _operacao_do_veiculo(anterior.ativo, atualizado.ativo))
+        for anterior, atualizado in zip(anteriores, atualizados)
+    ], campos)
+
+
+@receiver(veiculos_excluidos_em_lote, sender=Veiculo)
+def registrar_veiculos_excluidos_em_lote(sender, veiculos, sinistros=(), **kwargs):
+    """Exclusão de empresa em lotes: os sinistros removidos em cascata e os próprios veículos."""
+    registrar_alteracoes(MODELO_SINISTRO, [(sinistro['pk'], OPERACAO_EXCLUSAO) for sinistro in sinistros])
+    registrar_alteracoes(MODELO_VEICULO, [(veiculo.pk, OPERACAO_EXCLUSAO) for veiculo in veiculos])
+
+
+# --- Resumo mensal dos sinistros (core/sinistros_mensais.py) ---
+# Campos do sinistro (nomes aceitos em update_fields) que mudam a sua linha do resumo
+CAMPOS_RESUMO_SINISTRO = {'data_sinistro', 'tipo_sinistro', 'status_sinistro', 'veiculo'}
+
+
+def _afeta_resumo(update_fields):
+    return update_fields is None or bool(CAMPOS_RESUMO_SINISTRO.intersection(update_fields))
+
+
+@receiver(pre_save, sender=Sinistro)
+def guardar_estado_do_sinistro(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda na instância a linha do resumo em que o sinistro está antes da alteração."""
+    if raw or not _afeta_resumo(update_fields):
+        return
+    instance._estado_resumo = sinistros_mensais.estado_gravado(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Sinistro)
+def atualizar_resumo_ao_salvar(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Move a contribuição do sinistro para a sua linha atual do resumo (mês, empresa, tipo e status)."""
+    if raw or not _afeta_resumo(update_fields):
+        return
+    novo = sinistros_mensais.estado_do_sinistro(instance)
+    sinistros_mensais.aplicar_mudanca(getattr(instance, '_estado_resumo', None), novo)
+    instance._estado_resumo = novo # Saves seguidos partem do novo estado
+
+
+@receiver(post_delete, sender=Sinistro)
+def atualizar_resumo_ao_excluir(sender, instance, **kwargs):
+    """
+    Remove a contribuição do sinistro excluído. Na exclusão em cascata, o veículo ainda existe
+    quando o sinistro é removido (dependentes primeiro).
+    """
+    empresa_id = Veiculo._base_manager.filter(pk=instance.veiculo_id).values_list('empresa_id', flat=True).first()
+    if empresa_id is not None:
+        sinistros_mensais.aplicar_mudanca(sinistros_mensais.estado_do_sinistro(instance, empresa_id), None)
+
+
+@receiver(veiculos_alterados_em_lote, sender=Veiculo)
+def transferir_resumo_alterados_em_lote(sender, anteriores, atualizados, campos, **kwargs):
+    """Transferência em massa de veículos: os seus sinistros vão junto para a nova empresa."""
+    if {'empresa', 'empresa_id'}.intersection(campos):
+        sinistros_mensais.transferir_sinistros({
+            atualizado.pk: (anterior.empresa_id, atualizado.empresa_id)
+            for anterior, atualizado in zip(anteriores, atualizados)
+        })
+
+
+@receiver(veiculos_excluidos_em_lote, sender=Veiculo)
+def atualizar_resumo_excluidos_em_lote(sender, veiculos, sinistros=(), **kwargs):
+    """Remove de uma só vez a contribuição dos sinistros excluídos com os veículos (exclusão de empresa)."""
+    empresas = {veiculo.pk: veiculo.empresa_id for veiculo in veiculos}
+    sinistros_mensais.aplicar_mudancas([
+        ({**sinistro, 'empresa_id': empresas[sinistro['veiculo_id']]}, None) for sinistro in sinistros
+    ])
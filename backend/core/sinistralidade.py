@@ -0,0 +1,336 @@
+# backend/core/sinistralidade.py
+
+"""
+Indicadores de sinistralidade da frota: frequência de sinistros, distribuição por tipo e
+evolução mensal, por empresa, seguradora, faixa de classe de bônus e idade do veículo.
+
+Os dados são lidos em colunas compactas (values_list de poucos campos, sem instanciar modelos)
+e agrupados em uma passada por coluna: cada dimensão vira uma lista de códigos inteiros e cada
+contagem é uma soma por código, sem consultas por empresa, seguradora ou faixa.
+
+Frequência = sinistros / veículos-ano expostos no período. A exposição de um veículo vai da data
+de cadastro (ou do primeiro sinistro do período, se anterior: frotas importadas trazem o histórico),
+limitada ao início do período, até a data de referência ou a data de desativação do veículo.
+Veículos desativados continuam no cálculo, pois os seus sinistros fazem parte do histórico.
+
+O resultado fica no cache do Django. Qualquer alteração de veículo ou sinistro troca a versão
+das chaves (invalidar_sinistralidade, chamada pelos signals em core/signals.py).
+"""
+
+import uuid
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+
+from sinistros.models import Sinistro
+from veiculos.models import SEGURADORA_CHOICES, Empresa, Veiculo
+
+# Períodos (em meses, incluindo o mês atual) aceitos pela página de análise
+PERIODOS_MESES = (3, 6, 12, 24)
+PERIODO_PADRAO = 12
+
+# Faixas de classe de bônus e de idade do veículo: (mínimo, máximo, rótulo); máximo None = sem limite
+FAIXAS_BONUS = (
+    (0, 0, 'Classe 0 (sem bônus)'),
+    (1, 3, 'Classes 1 a 3'),
+    (4, 6, 'Classes 4 a 6'),
+    (7, 10, 'Classes 7 a 10'),
+)
+FAIXAS_IDADE = (
+    (0, 2, 'Até 2 anos'),
+    (3, 5, 'De 3 a 5 anos'),
+    (6, 10, 'De 6 a 10 anos'),
+    (11, None, 'Mais de 10 anos'),
+)
+
+DIAS_POR_ANO = 365.25
+
+# Versão das chaves de cache: trocada a cada alteração de veículos ou sinistros
+CHAVE_VERSAO_CACHE = 'sinistralidade:versao'
+
+
+# --- Operações sobre colunas (listas de inteiros) ---
+
+def _vetor(valores):
+    """Cria uma coluna de inteiros a partir de um iterável."""
+    return list(valores)
+
+
+def _constante(valor, tamanho):
+    """Coluna com o mesmo valor em todas as posições."""
+    return [valor] * tamanho
+
+
+def _tomar(coluna, posicoes):
+    """Valores da coluna nas posições informadas (coluna[posicoes])."""
+    return [coluna[posicao] for posicao in posicoes]
+
+
+def _limitar(coluna, minimo, maximo):
+    """Restringe os valores da coluna ao intervalo [minimo, maximo]."""
+    return [min(max(valor, minimo), maximo) for valor in coluna]
+
+
+def _combinar(codigos, tamanho, outros):
+    """Código único para o par (codigo, outro), usado para agrupar por duas dimensões de uma vez."""
+    return [codigo * tamanho + outro for codigo, outro in zip(codigos, outros)]
+
+
+def _contar(codigos, tamanho, pesos=None):
+    """O "GROUP BY" do módulo: quantidade (ou soma dos pesos) de cada código de 0 a tamanho - 1."""
+    totais = [0] * tamanho
+    if pesos is None:
+        for codigo in codigos:
+            totais[codigo] += 1
+    else:
+        for codigo, peso in zip(codigos, pesos):
+            totais[codigo] += peso
+    return totais
+
+
+def _exposicao_em_anos(inicio_veiculo, fim_veiculo, posicoes, dias_sinistros, inicio_periodo):
+    """
+    Veículos-ano de cada veículo no período, entre 'inicio_veiculo' e 'fim_veiculo' (ordinais, inclusive).
+    O início (data de cadastro) é antecipado para o primeiro sinistro do veículo, quando anterior ao cadastro.
+    """
+    inicio = list(inicio_veiculo) # Cópia: o mínimo é aplicado no lugar
+    for posicao, dia in zip(posicoes, dias_sinistros):
+        if dia < inicio[posicao]:
+            inicio[posicao] = dia
+    return [
+        max((fim + 1) - max(dia, inicio_periodo), 0) / DIAS_POR_ANO
+        for dia, fim in zip(inicio, fim_veiculo)
+    ]
+
+
+def _posicoes(chaves_ordenadas, chaves):
+    """Posição de cada chave em 'chaves_ordenadas' (ids de veículos em ordem crescente)."""
+    indice = {chave: posicao for posicao, chave in enumerate(chaves_ordenadas)}
+    return [indice[chave] for chave in chaves]
+
+
+# --- Cálculo ---
+
+def inicio_do_periodo(hoje, meses):
+    """Primeiro dia do período de 'meses' meses que termina no mês de 'hoje'."""
+    indice = hoje.year * 12 + (hoje.month - 1) - (meses - 1)
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _meses_do_periodo(inicio, meses):
+    """Primeiro dia de cada mês do período."""
+    indice = inicio.year * 12 + (inicio.month - 1)
+    return [date((indice + i) // 12, (indice + i) % 12 + 1, 1) for i in range(meses)]
+
+
+def _tabela_de_faixas(faixas, maximo):
+    """Tabela valor -> índice da faixa, para valores de 0 a 'maximo'."""
+    tabela = []
+    for valor in range(maximo + 1):
+        for indice, (minimo, limite, _) in enumerate(faixas):
+            if valor >= minimo and (limite is None or valor <= limite):
+                tabela.append(indice)
+                break
+    return tabela
+
+
+def _agrupar(codigos_veiculos, codigos_sinistros, tamanho, exposicao, tipos, meses, qtd_tipos, qtd_meses):
+    """
+    Indicadores de uma dimensão, um dicionário por código:
+    veículos, veículos-ano, sinistros, frequência, sinistros por tipo e por mês.
+    """
+    veiculos = _contar(codigos_veiculos, tamanho)
+    veiculos_ano = _contar(codigos_veiculos, tamanho, pesos=exposicao)
+    sinistros = _contar(codigos_sinistros, tamanho)
+    por_tipo = _contar(_combinar(codigos_sinistros, qtd_tipos, tipos), tamanho * qtd_tipos)
+    por_mes = _contar(_combinar(codigos_sinistros, qtd_meses, meses), tamanho * qtd_meses)
+    return [
+        {
+            'veiculos': veiculos[codigo],
+            'veiculos_ano': veiculos_ano[codigo],
+            'sinistros': sinistros[codigo],
+            'frequencia': sinistros[codigo] / veiculos_ano[codigo] if veiculos_ano[codigo] else None,
+            'por_tipo': por_tipo[codigo * qtd_tipos:(codigo + 1) * qtd_tipos],
+            'tendencia': por_mes[codigo * qtd_meses:(codigo + 1) * qtd_meses],
+        }
+        for codigo in range(tamanho)
+    ]
+
+
+def _rotular(linhas, chaves_rotulos, rotulos_tipos):
+    """Acrescenta chave, rótulo e a distribuição por tipo (maiores primeiro) às linhas com dados."""
+    resultado = []
+    for (chave, rotulo), linha in zip(chaves_rotulos, linhas):
+        if not linha['veiculos'] and not linha['sinistros']:
+            continue
+        linha['chave'], linha['rotulo'] = chave, rotulo
+        linha['mix'] = sorted(
+            (
+                (rotulo_tipo, n, 100 * n / linha['sinistros'])
+                for rotulo_tipo, n in zip(rotulos_tipos, linha['por_tipo']) if n
+            ),
+            key=lambda item: -item[1],
+        )
+        resultado.append(linha)
+    return resultado
+
+
+def calcular_sinistralidade(hoje=None, meses=PERIODO_PADRAO):
+    """
+    Calcula os indicadores de sinistralidade do período (sem cache; ver analisar_sinistralidade).
+    Retorna um dicionário com:
+    - referencia, inicio, meses (primeiro dia de cada mês), tipos [(chave, rotulo)];
+    - total: indicadores da frota inteira;
+    - por_empresa, por_seguradora: linhas ordenadas pela quantidade de sinistros;
+    - por_faixa_bonus, por_idade: linhas na ordem das faixas;
+    - por_tipo: [(chave, rotulo, n, percentual)].
+    Cada linha: chave, rotulo, veiculos, veiculos_ano, sinistros, frequencia (por veículo-ano),
+    por_tipo (na ordem de 'tipos'), mix [(rotulo, n, percentual)] e tendencia (por mês).
+    """
+    hoje = hoje or date.today()
+    inicio = inicio_do_periodo(hoje, meses)
+    lista_meses = _meses_do_periodo(inicio, meses)
+    inicio_ord, fim_ord = inicio.toordinal(), hoje.toordinal()
+
+    # Colunas dos veículos, em ordem de id (a posição de cada veículo localiza o veículo de cada sinistro)
+    linhas_veiculos = list(
+        Veiculo.objects.order_by('pk')
+        .values_list(
+            'pk', 'empresa_id', 'seguradora', 'classe_bonus', 'ano_fabricacao', 'data_cadastro', 'data_desativacao',
+        )
+    )
+    ids, empresas, seguradoras, bonus, anos, cadastros, desativacoes = (
+        zip(*linhas_veiculos) if linhas_veiculos else ((),) * 7
+    )
+    qtd_veiculos = len(ids)
+
+    # Colunas dos sinistros do período
+    linhas_sinistros = list(
+        Sinistro.objects.filter(data_sinistro__gte=inicio, data_sinistro__lte=hoje)
+        .order_by().values_list('veiculo_id', 'tipo_sinistro', 'data_sinistro')
+    )
+    veiculos_sinistros, tipos_sinistros, datas_sinistros = (
+        zip(*linhas_sinistros) if linhas_sinistros else ((),) * 3
+    )
+
+    # Dimensões categóricas -> códigos inteiros
+    tipos = list(Sinistro.TIPO_SINISTRO_CHOICES)
+    codigo_tipo = {chave: indice for indice, (chave, _) in enumerate(tipos)}
+    outros = codigo_tipo['outros'] # Tipos fora das opções atuais
+    codigos_tipo = _vetor(codigo_tipo.get(tipo, outros) for tipo in tipos_sinistros)
+
+    empresas_ids = sorted(set(empresas))
+    codigo_empresa = {pk: indice for indice, pk in enumerate(empresas_ids)}
+    codigos_empresa = _vetor(codigo_empresa[pk] for pk in empresas)
+
+    nomes_seguradoras = dict(SEGURADORA_CHOICES)
+    seguradoras_chaves = sorted(set(seguradoras) | set(nomes_seguradoras), key=str)
+    codigo_seguradora = {chave: indice for indice, chave in enumerate(seguradoras_chaves)}
+    codigos_seguradora = _vetor(codigo_seguradora[chave] for chave in seguradoras)
+
+    maximo_bonus = FAIXAS_BONUS[-1][1]
+    codigos_bonus = _tomar(_tabela_de_faixas(FAIXAS_BONUS, maximo_bonus), _limitar(_vetor(bonus), 0, maximo_bonus))
+    maximo_idade = FAIXAS_IDADE[-1][0]
+    idades = _limitar(_vetor(hoje.year - ano for ano in anos), 0, maximo_idade)
+    codigos_idade = _tomar(_tabela_de_faixas(FAIXAS_IDADE, maximo_idade), idades)
+
+    # Mês de cada sinistro: tabela "dia do período -> mês" em vez de calcular data a data
+    dias_sinistros = _vetor(data.toordinal() for data in datas_sinistros)
+    mes_do_dia = [
+        (dia.year - inicio.year) * 12 + dia.month - inicio.month
+        for dia in (date.fromordinal(ordinal) for ordinal in range(inicio_ord, fim_ord + 1))
+    ]
+    codigos_mes = _tomar(mes_do_dia, _vetor(dia - inicio_ord for dia in dias_sinistros))
+
+    # Veículo de cada sinistro e exposição de cada veículo
+    posicoes = _posicoes(_vetor(ids), _vetor(veiculos_sinistros))
+    exposicao = _exposicao_em_anos(
+        _vetor(cadastro.date().toordinal() for cadastro in cadastros),
+        _vetor(
+            min(desativacao.date().toordinal(), fim_ord) if desativacao else fim_ord
+            for desativacao in desativacoes
+        ),
+        posicoes, dias_sinistros, inicio_ord,
+    )
+
+    def dimensao(codigos_veiculos, tamanho):
+        """Agrupa por uma dimensão do veículo (o código do sinistro é o do seu veículo)."""
+        return _agrupar(
+            codigos_veiculos, _tomar(codigos_veiculos, posicoes), tamanho,
+            exposicao, codigos_tipo, codigos_mes, len(tipos), meses,
+        )
+
+    rotulos_tipos = [rotulo for _, rotulo in tipos]
+    nomes_empresas = dict(Empresa.objects.filter(pk__in=empresas_ids).values_list('pk', 'razao_social'))
+
+    total = _rotular(dimensao(_constante(0, qtd_veiculos), 1), [(None, 'Frota')], rotulos_tipos)
+    total = total[0] if total else None
+    por_empresa = _rotular(
+        dimensao(codigos_empresa, len(empresas_ids)),
+        [(pk, nomes_empresas.get(pk, pk)) for pk in empresas_ids],
+        rotulos_tipos,
+    )
+    por_seguradora = _rotular(
+        dimensao(codigos_seguradora, len(seguradoras_chaves)),
+        [(chave, nomes_seguradoras.get(chave, chave)) for chave in seguradoras_chaves],
+        rotulos_tipos,
+    )
+    por_faixa_bonus = _rotular(
+        dimensao(codigos_bonus, len(FAIXAS_BONUS)),
+        [(indice, rotulo) for indice, (_, _, rotulo) in enumerate(FAIXAS_BONUS)],
+        rotulos_tipos,
+    )
+    por_idade = _rotular(
+        dimensao(codigos_idade, len(FAIXAS_IDADE)),
+        [(indice, rotulo) for indice, (_, _, rotulo) in enumerate(FAIXAS_IDADE)],
+        rotulos_tipos,
+    )
+
+    total_sinistros = total['sinistros'] if total else 0
+    por_tipo = [
+        (chave, rotulo, n, 100 * n / total_sinistros if total_sinistros else 0)
+        for (chave, rotulo), n in zip(tipos, total['por_tipo'] if total else [0] * len(tipos))
+    ]
+
+    def mais_sinistros(linha):
+        return (-linha['sinistros'], str(linha['rotulo']))
+
+    return {
+        'referencia': hoje,
+        'inicio': inicio,
+        'meses': lista_meses,
+        'tipos': tipos,
+        'total': total,
+        'por_empresa': sorted(por_empresa, key=mais_sinistros),
+        'por_seguradora': sorted(por_seguradora, key=mais_sinistros),
+        'por_faixa_bonus': por_faixa_bonus,
+        'por_idade': por_idade,
+        'por_tipo': por_tipo,
+    }
+
+
+# --- Cache ---
+
+def _versao_cache():
+    return cache.get_or_set(CHAVE_VERSAO_CACHE, uuid.uuid4().hex, timeout=None)
+
+
+def invalidar_sinistralidade():
+    """Descarta os indicadores em cache (chamada quando veículos ou sinistros mudam)."""
+    cache.set(CHAVE_VERSAO_CACHE, uuid.uuid4().hex, timeout=None)
+
+
+def analisar_sinistralidade(hoje=None, meses=PERIODO_PADRAO):
+    """
+    Indicadores de sinistralidade (ver calcular_sinistralidade), lidos do cache quando possível.
+    A versão é lida antes do cálculo: se os dados mudarem durante o cálculo, o resultado fica
+    gravado na versão antiga e não é servido.
+    """
+    hoje = hoje or date.today()
+    chave = f'sinistralidade:{_versao_cache()}:{hoje.isoformat()}:{meses}'
+    resultado = cache.get(chave)
+    if resultado is None:
+        resultado = calcular_sinistralidade(hoje, meses)
+        cache.set(chave, resultado, getattr(settings, 'AUTO_FROTA_CACHE_SINISTRALIDADE', 3600))
+    return resultado
@@ -0,0 +1,213 @@
+# backend/core/sinistros_mensais.py
+
+"""
+Manutenção e leitura do resumo mensal dos sinistros (modelo ResumoMensalSinistros).
+
+Cada sinistro "contribui" com +1 na linha (mês da data do sinistro, empresa do veículo, tipo, status).
+Quando um sinistro é registrado, muda de data, tipo, status ou veículo, ou é excluído, removemos a
+contribuição antiga e aplicamos a nova, como nas estatísticas da frota (core/estatisticas.py).
+A transferência de um veículo para outra empresa leva junto a contribuição dos seus sinistros.
+As diferenças de uma operação são somadas antes de gravar: uma exclusão em lote de milhares de
+sinistros resulta em poucas atualizações, uma por linha do resumo afetada.
+"""
+
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from sinistros.models import Sinistro
+
+from .models import ResumoMensalSinistros
+from .sinistralidade import inicio_do_periodo
+
+# Meses exibidos na tendência do dashboard (incluindo o mês atual)
+MESES_TENDENCIA = 12
+
+
+def chave_do_resumo(estado):
+    """Linha do resumo (mes, empresa_id, tipo, status) de um sinistro, dado o seu estado (ou None)."""
+    if not estado:
+        return None
+    return (
+        estado['data_sinistro'].replace(day=1),
+        estado['empresa_id'],
+        estado['tipo_sinistro'],
+        estado['status_sinistro'],
+    )
+
+
+def estado_do_sinistro(sinistro, empresa_id=None):
+    """
+    Extrai de uma instância de Sinistro o estado usado pelo resumo.
+    Sem 'empresa_id', a empresa é lida do veículo (já carregado nos formulários e na geração em lote).
+    """
+    return {
+        'data_sinistro': sinistro.data_sinistro,
+        'tipo_sinistro': sinistro.tipo_sinistro,
+        'status_sinistro': sinistro.status_sinistro,
+        'empresa_id': sinistro.veiculo.empresa_id if empresa_id is None else empresa_id,
+    }
+
+
+def estado_gravado(pk):
+    """Estado do sinistro como está gravado no banco (None se ainda não existe)."""
+    return (
+        Sinistro.objects.filter(pk=pk)
+        .values('data_sinistro', 'tipo_sinistro', 'status_sinistro', empresa_id=F('veiculo__empresa_id'))
+        .first()
+    )
+
+
+def _somar(chave, delta):
+    """Soma 'delta' a uma linha do resumo, criando-a se ainda não existir."""
+    mes, empresa_id, tipo, status = chave
+    linha = ResumoMensalSinistros.objects.filter(
+        mes=mes, empresa_id=empresa_id, tipo_sinistro=tipo, status_sinistro=status
+    )
+    if not linha.update(quantidade=F('quantidade') + delta):
+        if delta < 0: # Linha já removida (ex: em cascata, junto com a empresa): não há o que descontar
+            return
+        try:
+            with transaction.atomic():
+                ResumoMensalSinistros.objects.create(
+                    mes=mes, empresa_id=empresa_id, tipo_sinistro=tipo, status_sinistro=status, quantidade=delta
+                )
+        except IntegrityError: # Outro processo criou a linha ao mesmo tempo
+            linha.update(quantidade=F('quantidade') + delta)
+
+
+def _aplicar_deltas(deltas):
+    with transaction.atomic():
+        for chave, delta in deltas.items():
+            if delta:
+                _somar(chave, delta)
+        # Remove as linhas zeradas (por exemplo, o status antigo de um sinistro que mudou de status)
+        if any(delta < 0 for delta in deltas.values()):
+            ResumoMensalSinistros.objects.filter(quantidade=0).delete()
+
+
+def aplicar_mudancas(transicoes):
+    """
+    Atualiza o resumo para uma lista de transições (estado_anterior, estado_novo) de sinistros.
+    Qualquer um dos estados pode ser None (registro ou exclusão).
+    """
+    deltas = Counter()
+    for estado_anterior, estado_novo in transicoes:
+        anterior, nova = chave_do_resumo(estado_anterior), chave_do_resumo(estado_novo)
+        if anterior != nova:
+            if anterior:
+                deltas[anterior] -= 1
+            if nova:
+                deltas[nova] += 1
+    _aplicar_deltas(deltas)
+
+
+def aplicar_mudanca(estado_anterior, estado_novo):
+    """Atualiza o resumo para a transição de um único sinistro (ver aplicar_mudancas)."""
+    aplicar_mudancas([(estado_anterior, estado_novo)])
+
+
+def transferir_sinistros(transferencias):
+    """
+    Move a contribuição dos sinistros de veículos que mudaram de empresa.
+    'transferencias' é um dicionário {veiculo_id: (empresa_anterior_id, empresa_nova_id)}.
+    Uma consulta agrupada para todos os veículos, sem carregar os sinistros.
+    """
+    transferencias = {pk: empresas for pk, empresas in transferencias.items() if empresas[0] != empresas[1]}
+    if not transferencias:
+        return
+    deltas = Counter()
+    grupos = (
+        Sinistro.objects.filter(veiculo_id__in=list(transferencias)).order_by()
+        .values('veiculo_id', 'tipo_sinistro', 'status_sinistro', mes=TruncMonth('data_sinistro'))
+        .annotate(n=Count('id'))
+    )
+    for grupo in grupos:
+        anterior, nova = transferencias[grupo['veiculo_id']]
+        deltas[(grupo['mes'], anterior, grupo['tipo_sinistro'], grupo['status_sinistro'])] -= grupo['n']
+        deltas[(grupo['mes'], nova, grupo['tipo_sinistro'], grupo['status_sinistro'])] += grupo['n']
+    _aplicar_deltas(deltas)
+
+
+def recontar():
+    """
+    Calcula todas as linhas do resumo diretamente da tabela de sinistros.
+    Retorna um dicionário {(mes, empresa_id, tipo, status): quantidade}.
+    """
+    grupos = (
+        Sinistro.objects.order_by()
+        .values('tipo_sinistro', 'status_sinistro', mes=TruncMonth('data_sinistro'), empresa_id=F('veiculo__empresa_id'))
+        .annotate(n=Count('id'))
+    )
+    return {
+        (grupo['mes'], grupo['empresa_id'], grupo['tipo_sinistro'], grupo['status_sinistro']): grupo['n']
+        for grupo in grupos
+    }
+
+
+def reconstruir():
+    """Apaga e recria todo o resumo a partir de uma recontagem completa."""
+    contagens = recontar()
+    with transaction.atomic():
+        ResumoMensalSinistros.objects.all().delete()
+        ResumoMensalSinistros.objects.bulk_create(
+            [
+                ResumoMensalSinistros(mes=mes, empresa_id=empresa_id, tipo_sinistro=tipo, status_sinistro=status, quantidade=n)
+                for (mes, empresa_id, tipo, status), n in contagens.items()
+            ],
+            batch_size=1000,
+        )
+    return len(contagens)
+
+
+def verificar():
+    """
+    Compara o resumo materializado com uma recontagem ao vivo.
+    Retorna a lista de divergências no formato (mes, empresa_id, tipo, status, materializado, real).
+    """
+    reais = recontar()
+    materializados = {
+        (linha.mes, linha.empresa_id, linha.tipo_sinistro, linha.status_sinistro): linha.quantidade
+        for linha in ResumoMensalSinistros.objects.exclude(quantidade=0)
+    }
+    divergencias = []
+    for chave in sorted(set(reais) | set(materializados)):
+        if reais.get(chave, 0) != materializados.get(chave, 0):
+            divergencias.append((*chave, materializados.get(chave, 0), reais.get(chave, 0)))
+    return divergencias
+
+
+def tendencia_mensal(meses=MESES_TENDENCIA, hoje=None, empresa_id=None):
+    """
+    Sinistros por mês (data do sinistro) dos últimos 'meses' meses, lidos apenas do resumo.
+    Retorna a lista de dicionários, do mês mais antigo ao atual (meses sem sinistros inclusive):
+    {'mes': date, 'total': n, 'por_tipo': [(rótulo, n), ...], 'percentual': total em relação ao maior mês}.
+    """
+    hoje = hoje or date.today()
+    inicio = inicio_do_periodo(hoje, meses)
+    linhas = ResumoMensalSinistros.objects.filter(mes__gte=inicio, mes__lte=hoje)
+    if empresa_id is not None:
+        linhas = linhas.filter(empresa_id=empresa_id)
+
+    por_mes = defaultdict(Counter)
+    for linha in linhas.order_by().values('mes', 'tipo_sinistro').annotate(total=Sum('quantidade')):
+        por_mes[linha['mes']][linha['tipo_sinistro']] += linha['total']
+
+    rotulos = dict(Sinistro.TIPO_SINISTRO_CHOICES)
+    indice = inicio.year * 12 + (inicio.month - 1)
+    tendencia = []
+    for i in range(meses):
+        mes = date((indice + i) // 12, (indice + i) % 12 + 1, 1)
+        tipos = por_mes.get(mes, Counter())
+        tendencia.append({
+            'mes': mes,
+            'total': sum(tipos.values()),
+            'por_tipo': [(rotulos.get(tipo, tipo), n) for tipo, n in tipos.most_common()],
+        })
+    maximo = max((item['total'] for item in tendencia), default=0)
+    for item in tendencia:
+        item['percentual'] = round(100 * item['total'] / maximo) if maximo else 0
+    return tendencia
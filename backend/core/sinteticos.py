@@ -0,0 +1,355 @@
+# backend/core/sinteticos.py
+
+"""
+Geração de frotas sintéticas, para testes de desempenho e para medir as telas na escala real.
+
+Os dados são determinísticos: a mesma semente e a mesma data de referência geram exatamente as
+mesmas empresas, veículos e sinistros, o que permite comparar medições entre versões do código.
+- empresas com CNPJ válido (dígitos verificadores calculados) e poucas frotas grandes, muitas pequenas;
+- veículos com placas Mercosul (maioria dos mais novos) e no padrão antigo, chassi no formato VIN
+  (fabricante, ano do modelo e série) e renavam com dígito verificador;
+- sinistros com distribuição realista de tipo e status (os recentes ainda abertos ou em análise),
+  mais frequentes nas classes de bônus baixas.
+
+A gravação usa bulk_create em lotes, como a importação em massa, e avisa os signals de lote para
+manter índice de busca, estatísticas, alertas, sinistralidade, resumo mensal dos sinistros e registro
+de alterações em dia.
+"""
+
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from sinistros.models import Sinistro
+from veiculos.models import (
+    SEGURADORA_CHOICES, Empresa, ExclusaoEmpresa, TermoBusca, Veiculo, chave_cnpj, chave_placa, chave_texto,
+    digitos_verificadores_cnpj,
+)
+from veiculos.signals import empresas_criadas_em_lote, veiculos_criados_em_lote
+
+from .alertas import reconstruir_alertas
+from .alteracoes import registrar_criacoes
+from .estatisticas import reconstruir
+from .models import MODELO_SINISTRO, AlertaPendente, AlertaVencimento, Alteracao, ResumoMensalSinistros
+from .sinistralidade import invalidar_sinistralidade
+from .sinistros_mensais import aplicar_mudancas, estado_do_sinistro
+
+# Registros gravados por transação
+TAMANHO_LOTE_SINTETICOS = 1000
+
+# Razão social: "<ramo> <nome> <natureza jurídica>"
+RAMOS_EMPRESA = (
+    'Transportadora', 'Logística', 'Distribuidora', 'Comercial', 'Construtora', 'Locadora',
+    'Serviços', 'Agropecuária', 'Indústria', 'Expresso', 'Atacadista', 'Engenharia',
+)
+NOMES_EMPRESA = (
+    'Horizonte', 'Boa Vista', 'Rio Claro', 'Santa Luzia', 'Vale Verde', 'Planalto', 'Aurora',
+    'Litoral', 'Serra Azul', 'Três Rios', 'Ipê Amarelo', 'São Jorge', 'Bandeirante', 'Cerrado',
+    'Pantanal', 'Paraná', 'Nova Era', 'Estrela do Sul', 'Monte Alegre', 'Vitória',
+)
+NATUREZAS_EMPRESA = ('Ltda', 'Ltda', 'Ltda', 'S.A.', 'Eireli', 'ME')
+
+# Modelos e prefixo do chassi (identificação do fabricante) de cada marca
+MODELOS_POR_MARCA = {
+    'chevrolet': ('Onix', 'S10', 'Spin', 'Montana', 'Tracker'),
+    'fiat': ('Strada', 'Toro', 'Mobi', 'Argo', 'Fiorino', 'Ducato'),
+    'ford': ('Ranger', 'Ka', 'Transit', 'Territory'),
+    'honda': ('Civic', 'City', 'HR-V', 'Fit'),
+    'hyundai': ('HB20', 'Creta', 'HR'),
+    'jeep': ('Renegade', 'Compass', 'Commander'),
+    'mercedes-benz': ('Sprinter', 'Accelo', 'Atego'),
+    'mitsubishi': ('L200', 'Pajero', 'Eclipse Cross'),
+    'nissan': ('Frontier', 'Kicks', 'Versa'),
+    'peugeot': ('208', '2008', 'Partner', 'Expert'),
+    'renault': ('Kwid', 'Duster', 'Oroch', 'Master', 'Kangoo'),
+    'toyota': ('Hilux', 'Corolla', 'Yaris', 'SW4'),
+    'volkswagen': ('Gol', 'Saveiro', 'Amarok', 'Polo', 'Delivery'),
+    'volvo': ('FH', 'VM', 'XC60'),
+    'bmw': ('320i', 'X1'),
+    'audi': ('A3', 'Q3'),
+}
+PREFIXO_CHASSI_POR_MARCA = {
+    'chevrolet': '9BG', 'fiat': '9BD', 'ford': '9BF', 'honda': '93H', 'hyundai': '95P',
+    'jeep': '988', 'mercedes-benz': '9BM', 'mitsubishi': '93X', 'nissan': '94D', 'peugeot': '936',
+    'renault': '93Y', 'toyota': '9BR', 'volkswagen': '9BW', 'volvo': '9BV', 'bmw': 'WBA', 'audi': 'WAU',
+}
+# Participação de cada marca na frota (peso relativo)
+PESOS_MARCA = {
+    'fiat': 20, 'volkswagen': 18, 'chevrolet': 17, 'ford': 8, 'toyota': 8, 'renault': 7, 'hyundai': 6,
+    'honda': 4, 'jeep': 3, 'mercedes-benz': 3, 'nissan': 2, 'peugeot': 2, 'mitsubishi': 1, 'volvo': 1,
+    'bmw': 0.5, 'audi': 0.5,
+}
+
+# Letras válidas no chassi (VIN: sem I, O e Q) e código do ano do modelo (posição 10) a partir de 2001
+CARACTERES_CHASSI = 'ABCDEFGHJKLMNPRSTUVWXYZ0123456789'
+CODIGOS_ANO_CHASSI = '123456789ABCDEFGHJKLMNPRSTVWXY'
+# Ano em que as placas Mercosul passaram a ser emitidas para veículos novos
+ANO_PLACA_MERCOSUL = 2019
+# Parte dos veículos mais antigos que já trocou a placa para o padrão Mercosul
+TROCA_PARA_MERCOSUL = 0.35
+
+# Distribuições dos sinistros (pesos relativos)
+PESOS_TIPO_SINISTRO = {
+    'colisao': 45, 'danos_terceiros': 15, 'furto': 11, 'roubo': 10,
+    'fenomeno_natureza': 5, 'incendio': 2, 'outros': 12,
+}
+# Sinistros dos últimos DIAS_SINISTRO_RECENTE dias ainda estão em andamento na maioria dos casos
+DIAS_SINISTRO_RECENTE = 45
+PESOS_STATUS_RECENTE = {'aberto': 45, 'em_analise': 40, 'cancelado': 5, 'negado': 5, 'concluido_com_indenizacao': 5}
+PESOS_STATUS_ANTIGO = {
+    'concluido_com_indenizacao': 50, 'concluido_sem_indenizacao': 20, 'negado': 12,
+    'cancelado': 8, 'em_analise': 6, 'aberto': 4,
+}
+DESCRICOES_SINISTRO = {
+    'colisao': ('Colisão traseira em via urbana.', 'Colisão lateral em cruzamento.', 'Colisão com poste.'),
+    'danos_terceiros': ('Danos ao veículo de terceiro em manobra.', 'Avaria em muro de terceiro.'),
+    'furto': ('Veículo furtado em estacionamento.', 'Furto de peças e acessórios.'),
+    'roubo': ('Roubo do veículo mediante ameaça.', 'Roubo de carga com o veículo.'),
+    'fenomeno_natureza': ('Alagamento durante chuva forte.', 'Queda de árvore sobre o veículo.'),
+    'incendio': ('Incêndio no compartimento do motor.',),
+    'outros': ('Quebra de vidro.', 'Danos por vandalismo.', 'Pane elétrica com avarias.'),
+}
+# Período coberto pelo histórico de sinistros
+DIAS_HISTORICO_SINISTROS = 730
+
+
+def digito_verificador_renavam(base):
+    """Dígito verificador de um renavam, dados os 10 primeiros dígitos."""
+    soma = sum(int(digito) * peso for digito, peso in zip(base, (3, 2, 9, 8, 7, 6, 5, 4, 3, 2)))
+    return str(soma * 10 % 11 % 10)
+
+
+def gerar_cnpj(rng):
+    """CNPJ válido, formatado (00.000.000/0001-00); a maioria das empresas é a matriz (0001)."""
+    raiz = f'{rng.randrange(10 ** 8):08d}'
+    filial = '0001' if rng.random() < 0.9 else f'{rng.randrange(2, 30):04d}'
+    dv = digitos_verificadores_cnpj(raiz + filial)
+    return f'{raiz[:2]}.{raiz[2:5]}.{raiz[5:]}/{filial}-{dv}'
+
+
+def gerar_placa(rng, mercosul):
+    """Placa Mercosul (AAA0A00, sem hífen) ou no padrão antigo (AAA-0000), como normalizar_placa grava."""
+    letras = ''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))
+    if mercosul:
+        return f'{letras}{rng.randrange(10)}{rng.choice("ABCDEFGHIJ")}{rng.randrange(100):02d}'
+    return f'{letras}-{rng.randrange(10000):04d}'
+
+
+def gerar_chassi(rng, marca, ano_modelo):
+    """Chassi de 17 caracteres: fabricante, descrição do veículo, ano do modelo, fábrica e série."""
+    descricao = ''.join(rng.choices(CARACTERES_CHASSI, k=6))
+    ano = CODIGOS_ANO_CHASSI[(ano_modelo - 2001) % len(CODIGOS_ANO_CHASSI)]
+    fabrica = rng.choice(CARACTERES_CHASSI)
+    return f'{PREFIXO_CHASSI_POR_MARCA[marca]}{descricao}{ano}{fabrica}{rng.randrange(10 ** 6):06d}'
+
+
+def gerar_renavam(rng):
+    """Renavam de 11 dígitos com dígito verificador."""
+    base = f'{rng.randrange(10 ** 10):010d}'
+    return base + digito_verificador_renavam(base)
+
+
+def _unico(gerar, usados, chave=None):
+    """
+    Repete a geração até obter um valor ainda não usado (e o registra como usado).
+    'chave' (opcional) transforma o valor antes da comparação (ex: a chave canônica da placa).
+    """
+    while True:
+        valor = gerar()
+        comparado = chave(valor) if chave else valor
+        if comparado not in usados:
+            usados.add(comparado)
+            return valor
+
+
+def _escolher(rng, pesos):
+    """Sorteia uma chave do dicionário {chave: peso}."""
+    return rng.choices(list(pesos), weights=list(pesos.values()))[0]
+
+
+def _momento(dia, rng):
+    """Data e hora (no fuso do projeto) em um horário comercial do dia informado."""
+    return timezone.make_aware(datetime.combine(dia, time(rng.randrange(8, 18), rng.randrange(60))))
+
+
+def _em_lotes(itens, tamanho):
+    for inicio in range(0, len(itens), tamanho):
+        yield itens[inicio:inicio + tamanho]
+
+
+class GeradorFrota:
+    """
+    Gera empresas, veículos e sinistros sintéticos (ver o docstring do módulo).
+    Os valores únicos (CNPJ, razão social, placa, chassi, renavam) nunca repetem os já cadastrados.
+    """
+
+    def __init__(self, semente=0, hoje=None, tamanho_lote=TAMANHO_LOTE_SINTETICOS):
+        self.rng = random.Random(semente)
+        self.hoje = hoje or date.today()
+        self.tamanho_lote = tamanho_lote
+        self.usados = {
+            'cnpj': set(Empresa.objects.values_list('cnpj', flat=True)),
+            'razao_social': set(Empresa.objects.values_list('razao_social', flat=True)),
+            'placa': {chave_placa(placa) for placa in Veiculo.objects.values_list('placa', flat=True)},
+            'chassi': set(Veiculo.objects.values_list('chassi', flat=True)),
+            'renavam': set(Veiculo.objects.values_list('renavam', flat=True)),
+        }
+
+    def _razao_social(self):
+        rng = self.rng
+        nome = f'{rng.choice(RAMOS_EMPRESA)} {rng.choice(NOMES_EMPRESA)}'
+        natureza = rng.choice(NATUREZAS_EMPRESA)
+        razao_social = f'{nome} {natureza}'
+        numero = 2
+        while razao_social in self.usados['razao_social']: # Homônimas ganham um número, como "Filial 2"
+            razao_social = f'{nome} {numero} {natureza}'
+            numero += 1
+        self.usados['razao_social'].add(razao_social)
+        return razao_social
+
+    def empresas(self, quantidade):
+        """Cria as empresas e retorna a lista (com pk)."""
+        novas = [
+            Empresa(
+                razao_social=self._razao_social(),
+                cnpj=_unico(lambda: gerar_cnpj(self.rng), self.usados['cnpj']),
+            )
+            for _ in range(quantidade)
+        ]
+        for empresa in novas: # bulk_create não passa por Empresa.save()
+            empresa.cnpj_chave = chave_cnpj(empresa.cnpj)
+            empresa.razao_social_chave = chave_texto(empresa.razao_social)
+        criadas = []
+        for lote in _em_lotes(novas, self.tamanho_lote):
+            criadas.extend(Empresa.objects.bulk_create(lote))
+        empresas_criadas_em_lote.send(sender=Empresa, empresas=criadas)
+        return criadas
+
+    def _veiculo(self, empresa):
+        rng = self.rng
+        marca = _escolher(rng, PESOS_MARCA)
+        # Frotas renovam a cada poucos anos: mais veículos novos do que antigos
+        idade = min(int(rng.expovariate(1 / 4)), 15)
+        ano_fabricacao = self.hoje.year - idade
+        ano_modelo = ano_fabricacao + (1 if rng.random() < 0.4 else 0)
+        mercosul = ano_fabricacao >= ANO_PLACA_MERCOSUL or rng.random() < TROCA_PARA_MERCOSUL
+        cadastro = self.hoje - timedelta(days=rng.randrange(min(idade + 1, 5) * 365))
+        ativo = rng.random() < 0.95
+        # 'ABC-1234' e 'ABC1C34' são a mesma placa: a unicidade é verificada pela chave canônica
+        placa = _unico(lambda: gerar_placa(rng, mercosul), self.usados['placa'], chave=chave_placa)
+        numero_registro = uuid.UUID(int=rng.getrandbits(128), version=4)
+        modelo = rng.choice(MODELOS_POR_MARCA[marca])
+        return Veiculo(
+            empresa=empresa,
+            numero_registro=numero_registro,
+            marca=marca,
+            modelo=modelo,
+            modelo_chave=chave_texto(modelo),
+            placa=placa,
+            placa_chave=chave_placa(placa), # As chaves também ficam fora de Veiculo.save() no bulk_create
+            chassi=_unico(lambda: gerar_chassi(rng, marca, ano_modelo), self.usados['chassi']),
+            renavam=_unico(lambda: gerar_renavam(rng), self.usados['renavam']),
+            ano_fabricacao=ano_fabricacao,
+            ano_modelo=ano_modelo,
+            zero_kilometro=idade == 0 and rng.random() < 0.5,
+            nome_condutor=f'Condutor {rng.randrange(1, 10 ** 5):05d}' if rng.random() < 0.6 else None,
+            classe_bonus=min(int(rng.expovariate(1 / 3)), 10),
+            seguradora=rng.choice(SEGURADORA_CHOICES)[0],
+            franquia=Decimal(rng.randrange(15, 90) * 100),
+            # Apólices anuais: o vencimento cai em qualquer dia dos próximos 12 meses (alguns já vencidos)
+            data_vencimento_seguro=self.hoje + timedelta(days=rng.randrange(-30, 366)),
+            data_cadastro=_momento(cadastro, rng),
+            ativo=ativo,
+            # bulk_create não passa por Veiculo.save(): a data de desativação é preenchida aqui
+            data_desativacao=None if ativo else _momento(self.hoje - timedelta(days=rng.randrange(365)), rng),
+        )
+
+    def veiculos(self, quantidade, empresas):
+        """Cria os veículos, distribuídos entre as empresas: poucas frotas grandes e muitas pequenas."""
+        pesos = [self.rng.paretovariate(1.2) for _ in empresas]
+        donas = self.rng.choices(empresas, weights=pesos, k=quantidade)
+        novos = [self._veiculo(empresa) for empresa in donas]
+        banco = router.db_for_write(Veiculo)
+        for lote in _em_lotes(novos, self.tamanho_lote):
+            with transaction.atomic(using=banco):
+                cadastros = [veiculo.data_cadastro for veiculo in lote]
+                Veiculo.objects.bulk_create(lote)
+                # auto_now_add sobrescreve a data de cadastro no bulk_create: grava a data gerada
+                for veiculo, cadastro in zip(lote, cadastros):
+                    veiculo.data_cadastro = cadastro
+                Veiculo.objects.bulk_update(lote, ['data_cadastro'])
+                # bulk_create não dispara post_save: avisa quem mantém índices e estatísticas
+                veiculos_criados_em_lote.send(sender=Veiculo, veiculos=lote)
+        return novos
+
+    def _sinistro(self, veiculo):
+        rng = self.rng
+        inicio = max(self.hoje - timedelta(days=DIAS_HISTORICO_SINISTROS), date(veiculo.ano_fabricacao, 1, 1))
+        data_sinistro = inicio + timedelta(days=rng.randrange(max((self.hoje - inicio).days, 1)))
+        recente = (self.hoje - data_sinistro).days <= DIAS_SINISTRO_RECENTE
+        tipo = _escolher(rng, PESOS_TIPO_SINISTRO)
+        return Sinistro(
+            veiculo=veiculo,
+            data_sinistro=data_sinistro,
+            tipo_sinistro=tipo,
+            descricao=rng.choice(DESCRICOES_SINISTRO[tipo]),
+            status_sinistro=_escolher(rng, PESOS_STATUS_RECENTE if recente else PESOS_STATUS_ANTIGO),
+        )
+
+    def sinistros(self, quantidade, veiculos):
+        """Cria os sinistros; veículos de classe de bônus baixa (mais sinistros no histórico) são mais sorteados."""
+        if not veiculos:
+            return []
+        pesos = [11 - veiculo.classe_bonus for veiculo in veiculos]
+        novos = [
+            self._sinistro(veiculo)
+            for veiculo in self.rng.choices(veiculos, weights=pesos, k=quantidade)
+        ]
+        for lote in _em_lotes(novos, self.tamanho_lote):
+            Sinistro.objects.bulk_create(lote)
+        # bulk_create não dispara post_save: descarta os indicadores em cache uma vez, registra as criações
+        # e soma os sinistros ao resumo mensal
+        invalidar_sinistralidade()
+        registrar_criacoes(MODELO_SINISTRO, novos)
+        aplicar_mudancas([(None, estado_do_sinistro(sinistro)) for sinistro in novos])
+        return novos
+
+
+def gerar_frota_sintetica(empresas, veiculos, sinistros, semente=0, hoje=None, tamanho_lote=TAMANHO_LOTE_SINTETICOS):
+    """
+    Gera 'empresas' empresas, 'veiculos' veículos e 'sinistros' sinistros e recalcula os alertas.
+    Retorna o dicionário {'empresas': n, 'veiculos': n, 'sinistros': n}.
+    """
+    gerador = GeradorFrota(semente, hoje, tamanho_lote)
+    novas_empresas = gerador.empresas(empresas)
+    novos_veiculos = gerador.veiculos(veiculos, novas_empresas) if novas_empresas else []
+    novos_sinistros = gerador.sinistros(sinistros, novos_veiculos)
+    reconstruir_alertas(gerador.hoje)
+    return {
+        'empresas': len(novas_empresas),
+        'veiculos': len(novos_veiculos),
+        'sinistros': len(novos_sinistros),
+    }
+
+
+def limpar_frota():
+    """
+    Remove todas as empresas, veículos e sinistros (com o índice de busca, os alertas, os pedidos
+    de exclusão, o resumo mensal dos sinistros e o registro de alterações) com DELETE direto, sem
+    carregar as linhas, e zera as estatísticas.
+    """
+    banco = router.db_for_write(Veiculo)
+    with transaction.atomic(using=banco):
+        # Dependentes primeiro: as chaves estrangeiras continuam válidas a cada passo
+        modelos = (
+            Sinistro, TermoBusca, AlertaVencimento, AlertaPendente, ExclusaoEmpresa, ResumoMensalSinistros,
+            Veiculo, Empresa, Alteracao,
+        )
+        for modelo in modelos:
+            modelo._base_manager.all()._raw_delete(banco)
+        reconstruir()
+    invalidar_sinistralidade()
@@ -0,0 +1,242 @@
+# backend/core/tarefas.py
+
+"""
+Executor de tarefas em segundo plano (modelo Tarefa), sem broker externo: a tabela é a fila.
+
+Operações demoradas (importação de frota, exclusão de empresa...) não rodam mais dentro da requisição,
+que só registra a tarefa e redireciona para a página de acompanhamento:
+- cada operação é uma função registrada com @registrar_tarefa('nome', 'Rótulo') no módulo 'tarefas.py'
+  do app (carregado por CoreConfig.ready); ela recebe o Progresso e os parâmetros da tarefa e retorna
+  o resultado (gravado como JSON);
+- com AUTO_FROTA_TAREFAS_EM_SEGUNDO_PLANO, a tarefa começa logo após o commit, em um pool de
+  AUTO_FROTA_TAREFAS_THREADS threads do próprio processo; o comando 'executar_tarefas' executa as
+  pendentes (com o seu próprio pool) e retoma as interrompidas;
+- um UPDATE condicional reivindica a tarefa: dois executores nunca executam a mesma tarefa;
+- uma falha agenda uma nova tentativa (até o máximo da tarefa), com espera que dobra a cada falha;
+- o progresso informado pela operação renova 'data_atualizacao': uma tarefa em andamento sem progresso
+  há mais de AUTO_FROTA_TAREFAS_INATIVIDADE segundos (processo encerrado no meio) volta a ser executada.
+As operações precisam tolerar uma nova execução depois de uma falha (como a exclusão de empresa, que
+continua a partir do que ainda existe); as que não toleram são registradas com tentativas=1.
+"""
+
+import logging
+import threading
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Tarefa
+
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo da mensagem de progresso (Tarefa.mensagem)
+TAMANHO_MENSAGEM = 200
+
+# Operações registradas: nome -> Definicao
+Definicao = namedtuple('Definicao', 'funcao rotulo tentativas modelo_resultado')
+TAREFAS = {}
+
+
+class ErroDefinitivo(Exception):
+    """Erro que encerra a tarefa sem novas tentativas (arquivo inválido, registro inexistente...)."""
+
+
+def registrar_tarefa(nome, rotulo, tentativas=None, modelo_resultado=None):
+    """
+    Decorador que registra uma operação executável em segundo plano.
+    - tentativas: máximo de execuções (padrão: AUTO_FROTA_TAREFAS_TENTATIVAS);
+    - modelo_resultado: template que exibe o resultado na página de acompanhamento (recebe 'resultado').
+    A função é chamada como funcao(progresso, **parametros).
+    """
+    def registrar(funcao):
+        TAREFAS[nome] = Definicao(funcao, rotulo, tentativas, modelo_resultado)
+        return funcao
+    return registrar
+
+
+def rotulo_da_tarefa(tipo):
+    definicao = TAREFAS.get(tipo)
+    return definicao.rotulo if definicao else tipo
+
+
+class Progresso:
+    """Entregue à operação em execução: grava o progresso na tarefa (e mostra que ela continua ativa)."""
+
+    def __init__(self, tarefa):
+        self.tarefa = tarefa
+
+    def atualizar(self, atual, total=None, mensagem=None):
+        campos = {'progresso_atual': atual, 'data_atualizacao': timezone.now()}
+        if total is not None:
+            campos['progresso_total'] = total
+        if mensagem is not None:
+            campos['mensagem'] = mensagem[:TAMANHO_MENSAGEM]
+        Tarefa.objects.filter(pk=self.tarefa.pk).update(**campos)
+        for campo, valor in campos.items():
+            setattr(self.tarefa, campo, valor)
+
+
+def armazenamento_de_tarefas():
+    """Pasta dos arquivos enviados para as tarefas (ex: a planilha de uma importação)."""
+    return FileSystemStorage(location=settings.AUTO_FROTA_PASTA_TAREFAS)
+
+
+def guardar_arquivo(arquivo):
+    """Grava um arquivo enviado na pasta das tarefas e retorna o nome com que foi gravado."""
+    extensao = Path(arquivo.name).suffix.lower()
+    return armazenamento_de_tarefas().save(f'{uuid.uuid4().hex}{extensao}', arquivo)
+
+
+def enfileirar(tipo, parametros=None, usuario=None):
+    """
+    Registra uma tarefa do tipo informado e, com AUTO_FROTA_TAREFAS_EM_SEGUNDO_PLANO, inicia a
+    execução após o commit. Os parâmetros precisam ser serializáveis em JSON.
+    """
+    if tipo not in TAREFAS:
+        raise ValueError(f'Tarefa desconhecida: {tipo}')
+    tarefa = Tarefa.objects.create(
+        tipo=tipo,
+        parametros=parametros or {},
+        solicitado_por=usuario,
+        maximo_tentativas=TAREFAS[tipo].tentativas or settings.AUTO_FROTA_TAREFAS_TENTATIVAS,
+    )
+    if settings.AUTO_FROTA_TAREFAS_EM_SEGUNDO_PLANO:
+        pk = tarefa.pk
+        transaction.on_commit(lambda: iniciar_em_segundo_plano(pk))
+    return tarefa
+
+
+# Pool de threads do processo (criado no primeiro uso)
+_pool = None
+_trava_pool = threading.Lock()
+
+
+def _pool_do_processo():
+    global _pool
+    with _trava_pool:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.AUTO_FROTA_TAREFAS_THREADS,
+                thread_name_prefix='tarefa',
+            )
+    return _pool
+
+
+def iniciar_em_segundo_plano(pk, espera=0):
+    """Executa a tarefa no pool de threads do processo (depois de 'espera' segundos), sem prender a requisição."""
+    if espera > 0:
+        temporizador = threading.Timer(espera, iniciar_em_segundo_plano, args=(pk,))
+        temporizador.daemon = True
+        temporizador.start()
+        return
+    _pool_do_processo().submit(_executar_na_thread, pk)
+
+
+def _executar_e_fechar(pk):
+    try:
+        return executar_tarefa(pk)
+    finally:
+        connection.close() # A conexão com o banco é da thread: fecha ao terminar
+
+
+def _executar_na_thread(pk):
+    try:
+        tarefa = _executar_e_fechar(pk)
+    except Exception: # Erro do próprio executor (ex: banco indisponível): o comando retoma a tarefa
+        logger.exception('Falha ao executar a tarefa %s.', pk)
+        return
+    if tarefa is not None and tarefa.status == 'pendente': # Falhou: agenda a nova tentativa
+        iniciar_em_segundo_plano(pk, (tarefa.executar_apos - timezone.now()).total_seconds())
+
+
+def _disponiveis(agora):
+    """Tarefas que podem ser executadas agora: pendentes no prazo ou em andamento e interrompidas."""
+    interrompida = agora - timedelta(seconds=settings.AUTO_FROTA_TAREFAS_INATIVIDADE)
+    return Q(status='pendente', executar_apos__lte=agora) | Q(status='em_andamento', data_atualizacao__lt=interrompida)
+
+
+def _reivindicar(pk):
+    """Marca a tarefa como em andamento para este executor, se ela estiver disponível (UPDATE condicional)."""
+    agora = timezone.now()
+    return Tarefa.objects.filter(_disponiveis(agora), pk=pk).update(
+        status='em_andamento',
+        tentativas=F('tentativas') + 1,
+        data_inicio=Coalesce('data_inicio', Value(agora)),
+        data_atualizacao=agora,
+    ) == 1
+
+
+def _encerrar(tarefa, status, **campos):
+    """Grava a situação final da execução e retorna a tarefa atualizada."""
+    Tarefa.objects.filter(pk=tarefa.pk).update(status=status, data_atualizacao=timezone.now(), **campos)
+    tarefa.refresh_from_db()
+    return tarefa
+
+
+def executar_tarefa(pk):
+    """
+    Executa (ou retoma) a tarefa informada.
+    Retorna a tarefa atualizada, ou None se ela não estava disponível (concluída, aguardando a próxima
+    tentativa ou em execução por outro executor). Os erros da operação ficam registrados na tarefa.
+    """
+    if not _reivindicar(pk):
+        return None
+    tarefa = Tarefa.objects.get(pk=pk)
+    definicao = TAREFAS.get(tarefa.tipo)
+    if definicao is None:
+        return _encerrar(tarefa, 'falhou', erro=f'Tarefa desconhecida: {tarefa.tipo}')
+    if tarefa.tentativas > tarefa.maximo_tentativas: # Interrompida na última tentativa
+        return _encerrar(tarefa, 'falhou', erro=tarefa.erro or 'Execução interrompida; as tentativas se esgotaram.')
+
+    try:
+        resultado = definicao.funcao(Progresso(tarefa), **tarefa.parametros)
+    except ErroDefinitivo as erro:
+        logger.warning('Tarefa %s (%s) encerrada: %s', pk, tarefa.tipo, erro)
+        return _encerrar(tarefa, 'falhou', erro=str(erro))
+    except Exception as erro:
+        logger.exception('Falha na tarefa %s (%s), tentativa %s.', pk, tarefa.tipo, tarefa.tentativas)
+        mensagem = f'{type(erro).__name__}: {erro}'
+        if tarefa.tentativas >= tarefa.maximo_tentativas:
+            return _encerrar(tarefa, 'falhou', erro=mensagem)
+        espera = settings.AUTO_FROTA_TAREFAS_ESPERA * 2 ** (tarefa.tentativas - 1)
+        return _encerrar(tarefa, 'pendente', erro=mensagem, executar_apos=timezone.now() + timedelta(seconds=espera))
+
+    agora = timezone.now()
+    return _encerrar(tarefa, 'concluida', erro='', resultado=resultado, data_conclusao=agora)
+
+
+def proximas_tarefas(limite=None):
+    """Ids das tarefas disponíveis, na ordem em que devem ser executadas."""
+    ids = Tarefa.objects.filter(_disponiveis(timezone.now())).order_by('executar_apos', 'id').values_list('pk', flat=True)
+    return list(ids[:limite] if limite else ids)
+
+
+def processar_tarefas(threads=1, limite=None):
+    """
+    Executa as tarefas disponíveis (comando 'executar_tarefas'), com 'threads' execuções simultâneas.
+    Retorna a lista das tarefas executadas (as reivindicadas antes por outro executor ficam de fora).
+    """
+    ids = proximas_tarefas(limite)
+    if threads <= 1:
+        executadas = [executar_tarefa(pk) for pk in ids]
+    else:
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='tarefa') as pool:
+            executadas = list(pool.map(_executar_e_fechar, ids))
+    return [tarefa for tarefa in executadas if tarefa is not None]
+
+
+def expurgar_tarefas(antes_de):
+    """Remove as tarefas encerradas (concluídas ou que falharam) antes de 'antes_de'. Retorna a quantidade."""
+    removidas, _ = Tarefa.objects.filter(
+        status__in=['concluida', 'falhou'], data_atualizacao__lt=antes_de
+    ).delete()
+    return removidas
@@ -0,0 +1,17 @@
+# backend/core/templatetags/fragmentos.py
+
+from django import template
+
+from core.fragmentos import renderizar_linhas
+
+register = template.Library()
+
+
+@register.simple_tag
+def linhas_em_cache(objetos, template_name, nome, versoes=''):
+    """
+    Renderiza as linhas de uma tabela com cache por linha (core/fragmentos.py).
+    Uso: {% linhas_em_cache veiculos 'veiculos/_linha_veiculo.html' 'veiculo' 'versao empresa.versao' %}
+    'versoes' lista, separados por espaço, os atributos de versão que compõem a chave de cada linha.
+    """
+    return renderizar_linhas(objetos, template_name, nome, versoes.split())
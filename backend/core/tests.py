@@ -1,3 +1,1048 @@
-from django.test import TestCase
+# backend/core/tests.py
 
-# Create your tests here.
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from importlib import import_module
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import F, Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from sinistros.models import Sinistro
+from veiculos.consultas import veiculos_a_vencer
+from veiculos.exclusao import executar_exclusao, solicitar_exclusao
+from veiculos.models import Empresa, ExclusaoEmpresa, Veiculo
+from veiculos.operacoes import aplicar_operacao
+
+from veiculos.forms import normalizar_placa
+
+from .alertas import HORIZONTE_MAXIMO, alertas_ate, atualizar_alertas, verificar_alertas
+from .alteracoes import cursor_atual, ler_alteracoes
+from .banco import ativar_wal
+from .desempenho import comparar_resultados
+from .estaticos import CACHE_IMUTAVEL, codificacoes_aceitas, minificar_css, minificar_js
+from .estatisticas import reconstruir, resumo_dashboard, verificar
+from .fragmentos import cache_fragmentos, contadores, renderizar_linhas, zerar_contadores
+from . import sinistros_mensais
+from .models import Alteracao, EstatisticaFrota, ResumoMensalSinistros, Tarefa
+from .paginacao import ANTERIOR, CursorInvalido, codificar_cursor, decodificar_cursor, paginar
+from .sinistralidade import analisar_sinistralidade, calcular_sinistralidade
+from .sinteticos import (
+    digito_verificador_renavam,
+    digitos_verificadores_cnpj,
+    gerar_frota_sintetica,
+    limpar_frota,
+)
+from .tarefas import ErroDefinitivo, enfileirar, executar_tarefa, processar_tarefas, proximas_tarefas, registrar_tarefa
+
+# Linha do EXPLAIN QUERY PLAN do SQLite: "<id> <pai> <livre> <detalhe>"
+PADRAO_LINHA_PLANO = re.compile(r'^\d+ \d+ \d+ (?P<detalhe>.*)$')
+# Leitura da tabela inteira, sem índice (ex: "SCAN veiculos_veiculo")
+PADRAO_VARREDURA_COMPLETA = re.compile(r'^SCAN (?P<tabela>\w+)$')
+
+
+def plano_de_consulta(queryset):
+    """Retorna as linhas do EXPLAIN QUERY PLAN da queryset, sem a numeração dos nós."""
+    linhas = []
+    for linha in queryset.explain().splitlines():
+        encontrado = PADRAO_LINHA_PLANO.match(linha.strip())
+        linhas.append(encontrado.group('detalhe') if encontrado else linha.strip())
+    return linhas
+
+
+class PlanoDeConsultaMixin:
+    """
+    Asserções sobre o plano de execução das consultas das telas.
+    Servem para detectar regressões: uma mudança na consulta (ou a remoção de um índice)
+    que faça o banco voltar a ler a tabela inteira ou a ordenar todos os registros.
+    """
+
+    def assertSemVarreduraCompleta(self, queryset, permitir_ordenacao=False):
+        """
+        Falha se alguma tabela for lida por completo sem índice.
+        Sem 'permitir_ordenacao', também falha se o banco precisar ordenar o resultado inteiro
+        (USE TEMP B-TREE FOR ORDER BY) em vez de percorrer um índice já ordenado.
+        """
+        plano = plano_de_consulta(queryset)
+        for linha in plano:
+            varredura = PADRAO_VARREDURA_COMPLETA.match(linha)
+            if varredura:
+                self.fail(f'Varredura completa da tabela {varredura.group("tabela")}:\n' + '\n'.join(plano))
+            if not permitir_ordenacao and linha == 'USE TEMP B-TREE FOR ORDER BY':
+                self.fail('Ordenação de todo o resultado sem índice:\n' + '\n'.join(plano))
+        return plano
+
+    def assertUsaIndice(self, queryset, indice):
+        """Falha se a consulta não usar o índice informado (ou se ler alguma tabela inteira)."""
+        plano = self.assertSemVarreduraCompleta(queryset)
+        if not any(re.search(rf'\bINDEX {re.escape(indice)}\b', linha) for linha in plano):
+            self.fail(f'O índice {indice} não foi usado:\n' + '\n'.join(plano))
+        return plano
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Os planos esperados são os do SQLite.')
+class PlanoConsultasDashboardTests(PlanoDeConsultaMixin, TestCase):
+    """Planos de execução das consultas do dashboard, dos alertas de vencimento e do feed de alterações."""
+
+    def test_alertas_do_dashboard_usam_indice_por_data(self):
+        # A mesma consulta de dashboard_view, sobre a tabela de alertas pré-calculados
+        alertas = alertas_ate(60).select_related('veiculo', 'empresa')[:20]
+        self.assertUsaIndice(alertas, 'alerta_vencimento_data_idx')
+
+    def test_calculo_dos_alertas_usa_indice_parcial(self):
+        # Veículos dentro da janela de alerta, lidos por atualizar_alertas/reconstruir_alertas
+        veiculos = veiculos_a_vencer(date(2026, 1, 1), dias=HORIZONTE_MAXIMO).values_list('pk', flat=True)
+        plano = self.assertUsaIndice(veiculos, 'veiculo_ativo_vencimento_idx')
+        # O intervalo de datas precisa ser uma busca no índice, não um percurso do índice inteiro
+        self.assertTrue(any(l.startswith('SEARCH veiculos_veiculo USING') for l in plano), plano)
+
+    def test_feed_de_alteracoes_por_modelo_usa_indice(self):
+        # Uma das consultas de ler_alteracoes com 'modelos': intervalo de ids de um modelo, já ordenado
+        alteracoes = Alteracao.objects.filter(id__gt=10, modelo='veiculo').order_by('id')[:501]
+        self.assertUsaIndice(alteracoes, 'alteracao_modelo_idx')
+
+
+def criar_frota(quantidade, prefixo='A'):
+    """
+    Cria 'quantidade' empresas, cada uma com dois veículos ativos (um deles com o seguro a vencer
+    e um sinistro) e um desativado, e atualiza os alertas de vencimento.
+    O 'prefixo' (uma letra) diferencia as frotas criadas em chamadas diferentes.
+    Retorna a lista das empresas criadas.
+    """
+    hoje = date.today()
+    empresas = []
+    for i in range(quantidade):
+        empresa = Empresa.objects.create(
+            razao_social=f'Empresa {prefixo}{i:03d} Ltda',
+            cnpj=f'{ord(prefixo):02d}.{i:03d}.000/0001-00',
+        )
+        for j, (ativo, vencimento) in enumerate([(True, 20), (True, 200), (False, 20)]):
+            veiculo = Veiculo.objects.create(
+                empresa=empresa,
+                marca='fiat',
+                modelo='Strada',
+                placa=f'{prefixo}{i:03d}-{j:04d}',
+                chassi=f'9BD{prefixo}{i:06d}{j:07d}',
+                renavam=f'{ord(prefixo):02d}{i:05d}{j:04d}',
+                ano_fabricacao=2020,
+                ano_modelo=2021,
+                classe_bonus=j,
+                seguradora='porto_seguro',
+                franquia=1500,
+                data_vencimento_seguro=hoje + timedelta(days=vencimento),
+                ativo=ativo,
+            )
+            if j == 0:
+                Sinistro.objects.create(
+                    veiculo=veiculo,
+                    data_sinistro=hoje - timedelta(days=i + 1),
+                    tipo_sinistro='colisao',
+                    descricao='Colisão traseira.',
+                    status_sinistro='aberto',
+                )
+        empresas.append(empresa)
+    atualizar_alertas()
+    return empresas
+
+
+class OrcamentoConsultasMixin:
+    """
+    Orçamento de consultas SQL por rota: cada URL de 'modulo_urls' tem um número máximo de consultas
+    (ORCAMENTOS = {nome da rota: consultas}) para um GET autenticado, com os caches vazios.
+    Detecta regressões de N+1 antes de chegarem à produção:
+    - a rota passa a executar mais consultas do que o orçamento;
+    - a quantidade de consultas cresce com a quantidade de registros na tela;
+    - uma rota nova é criada sem orçamento.
+    As rotas com parâmetros recebem os argumentos de argumentos_url().
+    """
+    modulo_urls = None
+    ORCAMENTOS = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('orcamento', password='senha-de-teste')
+        cls.empresas = criar_frota(3)
+        cls.veiculo = Veiculo.objects.filter(empresa=cls.empresas[0]).order_by('placa').first()
+        cls.sinistro = Sinistro.objects.filter(veiculo=cls.veiculo).first()
+        # Empresa com a exclusão pedida, mas ainda não executada
+        cls.exclusao = ExclusaoEmpresa.objects.create(
+            empresa=cls.empresas[-1], razao_social=cls.empresas[-1].razao_social, solicitado_por=cls.usuario,
+        )
+
+    def argumentos_url(self, nome):
+        """Argumentos de reverse() para a rota informada (as rotas sem parâmetros não precisam)."""
+        return {}
+
+    def rotas(self):
+        """(namespace, nomes das rotas) do módulo de URLs."""
+        modulo = import_module(self.modulo_urls)
+        nomes = [padrao.name for padrao in modulo.urlpatterns if isinstance(padrao, URLPattern)]
+        return modulo.app_name, nomes
+
+    def consultas_da_rota(self, nome):
+        """Faz o GET da rota e retorna (resposta, lista das consultas SQL executadas)."""
+        namespace, _ = self.rotas()
+        url = reverse(f'{namespace}:{nome}', kwargs=self.argumentos_url(nome))
+        self.client.force_login(self.usuario)
+        caches['default'].clear()
+        caches['fragmentos'].clear()
+        # O log da medição também é verificado: cada requisição gera uma linha
+        with self.assertLogs('auto_frota.consultas', 'INFO'), CaptureQueriesContext(connection) as capturadas:
+            resposta = self.client.get(url)
+            if resposta.streaming: # Exportações: as consultas acontecem durante o envio do corpo
+                b''.join(resposta.streaming_content)
+        self.assertLess(resposta.status_code, 400, f'{url} respondeu {resposta.status_code}.')
+        return resposta, [consulta['sql'] for consulta in capturadas.captured_queries]
+
+    def test_todas_as_rotas_tem_orcamento(self):
+        _, nomes = self.rotas()
+        self.assertEqual(sorted(set(nomes) - set(self.ORCAMENTOS)), [], 'Rotas sem orçamento de consultas.')
+
+    def test_consultas_dentro_do_orcamento(self):
+        for nome, orcamento in self.ORCAMENTOS.items():
+            with self.subTest(rota=nome):
+                _, consultas = self.consultas_da_rota(nome)
+                if len(consultas) > orcamento:
+                    self.fail(
+                        f'{nome}: {len(consultas)} consultas, orçamento de {orcamento}:\n'
+                        + '\n'.join(consultas)
+                    )
+
+    def test_consultas_nao_crescem_com_os_dados(self):
+        antes = {nome: len(self.consultas_da_rota(nome)[1]) for nome in self.ORCAMENTOS}
+        criar_frota(5, prefixo='B')
+        for nome in self.ORCAMENTOS:
+            with self.subTest(rota=nome):
+                _, consultas = self.consultas_da_rota(nome)
+                self.assertEqual(len(consultas), antes[nome], '\n'.join(consultas))
+
+
+class OrcamentoConsultasCoreTests(OrcamentoConsultasMixin, TestCase):
+    """Consultas do login, do dashboard, dos alertas, da sinistralidade e das tarefas em segundo plano."""
+    modulo_urls = 'core.urls'
+    ORCAMENTOS = {
+        'login': 2,
+        'dashboard': 13,
+        'listar_alertas': 12,
+        'analise_sinistralidade': 5,
+        'listar_tarefas': 3,
+        'acompanhar_tarefa': 3,
+        'logout': 4,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tarefa = Tarefa.objects.create(tipo='excluir_empresa', parametros={'exclusao': cls.exclusao.pk})
+
+    def argumentos_url(self, nome):
+        return {'pk': self.tarefa.pk} if nome == 'acompanhar_tarefa' else {}
+
+
+class OrcamentoConsultasApiTests(OrcamentoConsultasMixin, TestCase):
+    """Consultas da API JSON (v1)."""
+    modulo_urls = 'core.urls_api'
+    ORCAMENTOS = {
+        'veiculos': 3,
+        'veiculo': 3,
+        'empresas': 3,
+        'empresa': 3,
+        'sinistros': 3,
+        'sinistro': 3,
+        'sugestoes_veiculos': 2,
+        'sugestoes_empresas': 2,
+        'alteracoes': 3,
+    }
+
+    def argumentos_url(self, nome):
+        registros = {'veiculo': self.veiculo, 'empresa': self.empresas[0], 'sinistro': self.sinistro}
+        return {'pk': registros[nome].pk} if nome in registros else {}
+
+
+class PaginacaoPorChaveTests(TestCase):
+    """Paginação por chave (core/paginacao.py): navegação pelos cursores e cursores adulterados."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('paginacao', password='senha-de-teste')
+        criar_frota(4)
+
+    def test_cursor_ida_e_volta(self):
+        cursor = codificar_cursor(['ABC-1234', 10, date(2026, 1, 31)], ANTERIOR)
+        self.assertEqual(decodificar_cursor(cursor), (['ABC-1234', 10, '2026-01-31'], ANTERIOR))
+
+    def test_percorre_todas_as_paginas_nos_dois_sentidos(self):
+        ordenacao = ('placa', 'id')
+        esperados = list(Veiculo.objects.order_by(*ordenacao))
+        paginas, cursor = [], None
+        while True:
+            pagina = paginar(Veiculo.objects.all(), ordenacao, cursor=cursor, tamanho=5)
+            paginas.append(pagina)
+            if not pagina.tem_proxima:
+                break
+            cursor = pagina.proximo_cursor
+        self.assertEqual([veiculo for pagina in paginas for veiculo in pagina], esperados)
+        # Voltando a partir da última página, as páginas anteriores se repetem
+        anterior = paginar(Veiculo.objects.all(), ordenacao, cursor=paginas[-1].cursor_anterior, tamanho=5)
+        self.assertEqual(anterior.itens, paginas[-2].itens)
+
+    def test_cursores_adulterados(self):
+        for cursor in (
+            'nao-e-base64!',
+            codificar_cursor(['ABC']), # Quantidade de valores diferente da ordenação
+            codificar_cursor(['ABC', 'x']), # Texto no lugar do id
+            codificar_cursor(['ABC', {'id': 1}]), # Valor que não é simples
+            codificar_cursor(['ABC', None]),
+        ):
+            with self.subTest(cursor=cursor), self.assertRaises(CursorInvalido):
+                paginar(Veiculo.objects.all(), ('placa', 'id'), cursor=cursor)
+        with self.assertRaises(CursorInvalido): # Data inválida
+            paginar(Sinistro.objects.all(), ('-data_sinistro', 'veiculo__placa', 'id'), cursor=codificar_cursor(['ABC', 1, 2]))
+
+    def test_rotas_recomecam_ou_recusam_o_cursor_adulterado(self):
+        self.client.force_login(self.usuario)
+        for rota, valores in (
+            ('veiculos:listar_carros', ['ABC', 'x']),
+            ('sinistros:listar_sinistros', ['ABC', 1, 2]),
+            ('core:listar_alertas', ['ABC', 'x']),
+        ):
+            with self.subTest(rota=rota):
+                resposta = self.client.get(reverse(rota), {'cursor': codificar_cursor(valores)})
+                self.assertContains(resposta, 'Link de paginação inválido')
+        for rota, valores in (('api_v1:veiculos', ['ABC', 'x']), ('api_v1:sinistros', ['ABC', 1, 2])):
+            with self.subTest(rota=rota):
+                resposta = self.client.get(reverse(rota), {'cursor': codificar_cursor(valores)})
+                self.assertEqual(resposta.status_code, 400)
+
+
+class MedicaoConsultasMiddlewareTests(TestCase):
+    """Cabeçalhos e log do middleware de medição de consultas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('medicao', password='senha-de-teste')
+        criar_frota(2)
+
+    def test_cabecalhos_com_as_consultas_da_requisicao(self):
+        self.client.force_login(self.usuario)
+        with self.assertLogs('auto_frota.consultas', 'INFO') as log:
+            with CaptureQueriesContext(connection) as capturadas:
+                resposta = self.client.get(reverse('veiculos:listar_carros'))
+        self.assertEqual(resposta['X-Consultas-SQL'], str(len(capturadas.captured_queries)))
+        self.assertIn('X-Tempo-SQL-ms', resposta)
+        self.assertEqual(resposta['X-Consultas-Repetidas'], '0')
+        self.assertIn('/veiculos/lista/', log.output[0])
+
+    def test_alerta_de_consultas_repetidas(self):
+        self.client.force_login(self.usuario)
+        with self.settings(AUTO_FROTA_REPETICOES_ALERTA=1):
+            with self.assertLogs('auto_frota.consultas', 'WARNING') as log:
+                self.client.get(reverse('veiculos:listar_carros'))
+        self.assertIn('possível N+1', log.output[0])
+
+
+class FrotaSinteticaTests(TestCase):
+    """Gerador de frotas sintéticas (core/sinteticos.py) e comparação de medições de desempenho."""
+
+    def gerar(self, semente=7):
+        return gerar_frota_sintetica(empresas=4, veiculos=120, sinistros=40, semente=semente, hoje=date(2026, 3, 1))
+
+    def test_digitos_verificadores(self):
+        self.assertEqual(digitos_verificadores_cnpj('112223330001'), '81') # 11.222.333/0001-81
+        # Renavam: soma ponderada 202 -> 202 * 10 % 11 = 7
+        self.assertEqual(digito_verificador_renavam('0123456789'), '7')
+
+    def test_dados_validos_e_derivados_em_dia(self):
+        self.assertEqual(self.gerar(), {'empresas': 4, 'veiculos': 120, 'sinistros': 40})
+        for cnpj in Empresa.objects.values_list('cnpj', flat=True):
+            digitos = re.sub(r'\D', '', cnpj)
+            self.assertEqual(digitos_verificadores_cnpj(digitos[:12]), digitos[12:], cnpj)
+        for placa, chassi, renavam in Veiculo.objects.values_list('placa', 'chassi', 'renavam'):
+            self.assertEqual(normalizar_placa(placa), placa)
+            self.assertEqual(len(chassi), 17)
+            self.assertEqual(digito_verificador_renavam(renavam[:10]), renavam[10], renavam)
+        self.assertEqual(verificar(), [])
+        self.assertEqual(sinistros_mensais.verificar(), [])
+        self.assertEqual(verificar_alertas(date(2026, 3, 1)), [])
+
+    def test_mesma_semente_gera_os_mesmos_dados(self):
+        def retrato():
+            return (
+                list(Empresa.objects.order_by('pk').values_list('razao_social', 'cnpj')),
+                list(Veiculo.objects.order_by('pk').values_list('placa', 'chassi', 'data_cadastro', 'ativo')),
+                list(Sinistro.objects.order_by('pk').values_list('veiculo__placa', 'data_sinistro', 'status_sinistro')),
+            )
+
+        self.gerar()
+        primeiro = retrato()
+        limpar_frota()
+        self.gerar()
+        self.assertEqual(retrato(), primeiro)
+        limpar_frota()
+        self.gerar(semente=8)
+        self.assertNotEqual(retrato()[1], primeiro[1])
+
+    def test_comparacao_de_resultados(self):
+        def relatorio(mediana, consultas):
+            return {'resultados': [{
+                'tamanho': 1000, 'tipo': 'tela', 'alvo': 'core:dashboard', 'cache': 'vazio',
+                'mediana_ms': mediana, 'consultas': consultas,
+            }]}
+
+        anterior = relatorio(40.0, 10)
+        self.assertEqual(comparar_resultados(anterior, relatorio(41.0, 10))[0]['situacao'], 'estavel')
+        self.assertEqual(comparar_resultados(anterior, relatorio(60.0, 10))[0]['situacao'], 'regressao')
+        self.assertEqual(comparar_resultados(anterior, relatorio(40.0, 11))[0]['situacao'], 'regressao')
+        self.assertEqual(comparar_resultados(anterior, relatorio(20.0, 10))[0]['situacao'], 'melhora')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'PRAGMAs específicos do SQLite.')
+class PerfilBancoSqliteTests(TestCase):
+    """Ajustes aplicados a cada conexão SQLite (core/banco.py e o perfil de settings.py)."""
+
+    def pragma(self, nome):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {nome}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_aplicados_a_conexao(self):
+        self.assertEqual(self.pragma('synchronous'), 1) # NORMAL
+        self.assertEqual(self.pragma('cache_size'), settings.AUTO_FROTA_SQLITE_PRAGMAS['cache_size'])
+        self.assertEqual(self.pragma('temp_store'), 2) # MEMORY
+        # O modo WAL é gravado no arquivo pelo comando 'ativar_wal', não a cada conexão
+        self.assertNotIn('journal_mode', settings.AUTO_FROTA_SQLITE_PRAGMAS)
+
+    def test_ativar_wal_grava_o_modo_no_arquivo(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'banco.sqlite3')
+            conexao = sqlite3.connect(caminho)
+            try:
+                self.assertEqual(ativar_wal(conexao.cursor()), 'wal')
+            finally:
+                conexao.close()
+            conexao = sqlite3.connect(caminho) # Uma nova conexão já abre o arquivo em modo WAL
+            try:
+                self.assertEqual(conexao.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            finally:
+                conexao.close()
+
+    def test_espera_por_lock_e_transacoes_imediatas(self):
+        self.assertEqual(self.pragma('busy_timeout'), settings.AUTO_FROTA_BANCO_TIMEOUT * 1000)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+class EstaticosTests(TestCase):
+    """Minificação, hash no nome e entrega dos arquivos estáticos (core/estaticos.py)."""
+
+    def test_minificacao_preserva_textos_e_expressoes_regulares(self):
+        css = minificar_css('/* tema */\n.a  {\n  content: "/* x */";\n  margin: 0 ;\n}\n')
+        self.assertEqual(css, '.a{content:"/* x */";margin:0}')
+        js = minificar_js("// máscara\nvar  url = 'http://a' ; /* fim */\nv = v.replace(/\\D/g, '');\n")
+        self.assertEqual(js, "var url = 'http://a' ;\nv = v.replace(/\\D/g, '');\n")
+
+    def test_codificacoes_aceitas(self):
+        self.assertEqual(codificacoes_aceitas('gzip, deflate, br;q=0'), {'gzip', 'deflate'})
+
+    def test_collectstatic_e_entrega_com_cache_imutavel(self):
+        self.assertEqual(staticfiles_storage.url('css/main.css'), '/static/css/main.css') # Ainda sem manifesto
+        raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, raiz)
+        with self.settings(STATIC_ROOT=raiz):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            with self.settings(DEBUG=False):
+                url = staticfiles_storage.url('css/main.css')
+                self.assertRegex(url, r'^/static/css/main\.[0-9a-f]{12}\.css$')
+                resposta = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(resposta['Cache-Control'], CACHE_IMUTAVEL)
+        self.assertEqual(resposta['Content-Encoding'], 'gzip')
+        self.assertEqual(resposta['Vary'], 'Accept-Encoding')
+        conteudo = gzip.decompress(resposta.content).decode('utf-8')
+        self.assertNotIn('/*', conteudo)
+        with open(os.path.join(settings.STATICFILES_DIRS[0], 'css', 'main.css'), encoding='utf-8') as original:
+            self.assertLess(len(conteudo), len(original.read()))
+
+
+class EstatisticasFrotaTests(TestCase):
+    """
+    Contadores materializados da frota (core/estatisticas.py): mantidos pelos signals a cada criação,
+    edição, desativação e exclusão de veículo, reconstruídos do zero e lidos pelo dashboard.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('estatisticas', password='senha-de-teste')
+        cls.empresas = criar_frota(2)
+
+    def test_resumo_do_dashboard(self):
+        self.assertEqual(
+            set(EstatisticaFrota.objects.values_list('dimensao', flat=True)), {'total', 'empresa', 'seguradora'}
+        )
+        resumo = resumo_dashboard()
+        self.assertEqual(resumo['quantidade_carros'], 4)
+        self.assertEqual(resumo['por_seguradora'], [('Porto Seguro', 4)])
+        self.assertEqual(sorted(resumo['por_empresa']), [('Empresa A000 Ltda', 2), ('Empresa A001 Ltda', 2)])
+
+    def contagem(self, dimensao, chave=''):
+        return EstatisticaFrota.objects.filter(dimensao=dimensao, chave=chave).values_list('contagem', flat=True).first() or 0
+
+    def assertContadoresConferem(self):
+        self.assertEqual(verificar(), [])
+        # Contadores zerados não ficam gravados
+        self.assertFalse(EstatisticaFrota.objects.filter(contagem=0).exists())
+
+    def test_criacao_edicao_desativacao_e_exclusao(self):
+        empresa, outra = self.empresas
+        veiculo = Veiculo.objects.create(
+            empresa=empresa, marca='fiat', modelo='Toro', placa='EST-0001', chassi='9BDEST00000000001',
+            renavam='90000000001', ano_fabricacao=2022, ano_modelo=2022, classe_bonus=0,
+            seguradora='tokio_marine', franquia=2000, data_vencimento_seguro=date.today() + timedelta(days=300),
+        )
+        self.assertEqual(self.contagem('total'), 5)
+        self.assertEqual(self.contagem('seguradora', 'tokio_marine'), 1)
+        self.assertContadoresConferem()
+
+        veiculo.empresa, veiculo.seguradora = outra, 'sulamerica' # Edição dos campos das estatísticas
+        veiculo.save()
+        self.assertEqual(self.contagem('empresa', str(outra.pk)), 3)
+        self.assertEqual(self.contagem('seguradora', 'tokio_marine'), 0)
+        self.assertContadoresConferem()
+
+        veiculo.modelo = 'Toro Volcano' # Campo fora das estatísticas
+        veiculo.save(update_fields=['modelo'])
+        self.assertContadoresConferem()
+
+        veiculo.desativar()
+        self.assertEqual(self.contagem('total'), 4)
+        self.assertContadoresConferem()
+        veiculo.reativar()
+        self.assertEqual(self.contagem('total'), 5)
+        self.assertContadoresConferem()
+
+        veiculo.delete()
+        self.assertEqual(self.contagem('seguradora', 'sulamerica'), 0)
+        self.assertContadoresConferem()
+        # Veículo inativo excluído: não contribuía e nada muda
+        Veiculo.objects.filter(empresa=empresa, ativo=False).get().delete()
+        self.assertEqual(self.contagem('total'), 4)
+        self.assertContadoresConferem()
+
+    def test_reconstruir(self):
+        empresa, outra = self.empresas
+        EstatisticaFrota.objects.filter(dimensao='total').update(contagem=99)
+        EstatisticaFrota.objects.filter(dimensao='empresa', chave=str(empresa.pk)).delete()
+        EstatisticaFrota.objects.create(dimensao='seguradora', chave='allianz', contagem=3)
+        self.assertEqual(
+            verificar(),
+            [('empresa', str(empresa.pk), 0, 2), ('seguradora', 'allianz', 3, 0), ('total', '', 99, 4)],
+        )
+        with self.assertRaises(CommandError):
+            call_command('reconstruir_estatisticas', somente_verificar=True, stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(reconstruir(), 4) # total, duas empresas e uma seguradora
+        self.assertContadoresConferem()
+        self.assertEqual(self.contagem('empresa', str(outra.pk)), 2)
+        saida = StringIO()
+        call_command('reconstruir_estatisticas', stdout=saida)
+        self.assertIn('nenhuma divergência', saida.getvalue())
+
+    def test_vencimentos_do_dashboard_vem_dos_alertas(self):
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(reverse('core:dashboard'))
+        # Um veículo ativo por empresa vence em 20 dias; o outro, em 200
+        self.assertEqual(resposta.context['vencimentos'], [(30, 2), (60, 2), (90, 2)])
+        self.assertEqual(resposta.context['quantidade_carros'], 4)
+
+
+class SinistralidadeTests(TestCase):
+    """
+    Indicadores de sinistralidade (core/sinistralidade.py): exposição em veículos-ano, frequência,
+    faixas de bônus e de idade, cache invalidado pelos signals e a página de análise.
+    Período de 12 meses terminando em 30/06/2026: de 01/07/2025 a 30/06/2026 (365 dias).
+    """
+    REFERENCIA = date(2026, 6, 30)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('sinistralidade', password='senha-de-teste')
+        cls.empresa = Empresa.objects.create(razao_social='Sinistralidade Ltda', cnpj='11.222.333/0001-81')
+        # Cadastrado antes do período: exposto nos 365 dias
+        cls.antigo = cls.criar_veiculo('SIN-0001', classe_bonus=0, ano_fabricacao=2025, cadastro=date(2020, 1, 1))
+        # Cadastrado em 01/01/2026 e desativado em 31/03/2026: 90 dias
+        cls.desativado = cls.criar_veiculo('SIN-0002', classe_bonus=5, ano_fabricacao=2015, cadastro=date(2026, 1, 1))
+        Veiculo.objects.filter(pk=cls.desativado.pk).update(
+            ativo=False, data_desativacao=datetime(2026, 3, 31, 12, tzinfo=dt_timezone.utc)
+        )
+        # Cadastrado em 01/04/2026 com um sinistro de 01/02/2026 (histórico importado): 150 dias
+        cls.importado = cls.criar_veiculo('SIN-0003', classe_bonus=10, ano_fabricacao=2022, cadastro=date(2026, 4, 1))
+        for veiculo, data_sinistro, tipo in [
+            (cls.antigo, date(2025, 6, 30), 'colisao'), # Antes do período: fora do cálculo
+            (cls.antigo, date(2025, 8, 10), 'colisao'),
+            (cls.antigo, date(2026, 6, 1), 'roubo'),
+            (cls.desativado, date(2026, 2, 15), 'colisao'),
+            (cls.importado, date(2026, 2, 1), 'incendio'),
+        ]:
+            Sinistro.objects.create(
+                veiculo=veiculo, data_sinistro=data_sinistro, tipo_sinistro=tipo,
+                descricao='Sinistro de teste.', status_sinistro='aberto',
+            )
+
+    @classmethod
+    def criar_veiculo(cls, placa, classe_bonus, ano_fabricacao, cadastro):
+        veiculo = Veiculo.objects.create(
+            empresa=cls.empresa, marca='fiat', modelo='Strada', placa=placa, chassi=f'9BD{placa}000000',
+            renavam=f'{classe_bonus:02d}{ano_fabricacao:09d}', ano_fabricacao=ano_fabricacao,
+            ano_modelo=ano_fabricacao, classe_bonus=classe_bonus, seguradora='porto_seguro', franquia=1500,
+            data_vencimento_seguro=date(2030, 1, 1),
+        )
+        data_cadastro = datetime.combine(cadastro, datetime.min.time(), tzinfo=dt_timezone.utc)
+        Veiculo.objects.filter(pk=veiculo.pk).update(data_cadastro=data_cadastro)
+        return veiculo
+
+    def setUp(self):
+        cache.clear()
+
+    def linhas(self, analise, dimensao):
+        return {linha['rotulo']: (linha['veiculos'], linha['sinistros']) for linha in analise[dimensao]}
+
+    def test_exposicao_e_frequencia(self):
+        analise = calcular_sinistralidade(self.REFERENCIA, 12)
+        self.assertEqual(analise['inicio'], date(2025, 7, 1))
+        total = analise['total']
+        self.assertEqual((total['veiculos'], total['sinistros']), (3, 4))
+        self.assertAlmostEqual(total['veiculos_ano'], (365 + 90 + 150) / 365.25)
+        self.assertAlmostEqual(total['frequencia'], 4 / ((365 + 90 + 150) / 365.25))
+        [empresa] = analise['por_empresa']
+        self.assertEqual((empresa['rotulo'], empresa['sinistros']), ('Sinistralidade Ltda', 4))
+        self.assertEqual(
+            [(chave, n) for chave, _, n, _ in analise['por_tipo'] if n], [('colisao', 2), ('roubo', 1), ('incendio', 1)]
+        )
+        # Evolução mensal: agosto/2025, fevereiro/2026 (dois) e junho/2026
+        self.assertEqual(total['tendencia'], [0, 1, 0, 0, 0, 0, 0, 2, 0, 0, 0, 1])
+
+    def test_faixas_de_bonus_e_idade(self):
+        analise = calcular_sinistralidade(self.REFERENCIA, 12)
+        self.assertEqual(
+            self.linhas(analise, 'por_faixa_bonus'),
+            {'Classe 0 (sem bônus)': (1, 2), 'Classes 4 a 6': (1, 1), 'Classes 7 a 10': (1, 1)},
+        )
+        self.assertEqual(
+            self.linhas(analise, 'por_idade'),
+            {'Até 2 anos': (1, 2), 'De 3 a 5 anos': (1, 1), 'Mais de 10 anos': (1, 1)},
+        )
+        exposicao = {linha['rotulo']: linha['veiculos_ano'] for linha in analise['por_idade']}
+        self.assertAlmostEqual(exposicao['Mais de 10 anos'], 90 / 365.25) # Desativado no meio do período
+        self.assertAlmostEqual(exposicao['De 3 a 5 anos'], 150 / 365.25) # Desde o sinistro anterior ao cadastro
+
+    def test_cache_invalidado_pelas_alteracoes(self):
+        analise = analisar_sinistralidade(self.REFERENCIA, 12)
+        with self.assertNumQueries(0):
+            self.assertEqual(analisar_sinistralidade(self.REFERENCIA, 12), analise)
+
+        self.importado.classe_bonus = 0 # Alteração de veículo
+        self.importado.save()
+        analise = analisar_sinistralidade(self.REFERENCIA, 12)
+        self.assertEqual(self.linhas(analise, 'por_faixa_bonus')['Classe 0 (sem bônus)'], (2, 3))
+
+        Sinistro.objects.create( # Novo sinistro
+            veiculo=self.antigo, data_sinistro=date(2026, 6, 15), tipo_sinistro='furto',
+            descricao='Furto de peças.', status_sinistro='aberto',
+        )
+        self.assertEqual(analisar_sinistralidade(self.REFERENCIA, 12)['total']['sinistros'], 5)
+
+    def test_pagina(self):
+        url = reverse('core:analise_sinistralidade')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(url, {'meses': 6})
+        self.assertContains(resposta, 'Análise de Sinistralidade')
+        self.assertContains(resposta, 'Sinistralidade Ltda')
+        self.assertEqual(resposta.context['meses'], 6)
+        self.assertEqual(len(resposta.context['analise']['meses']), 6)
+        # Período fora das opções: volta ao padrão
+        self.assertEqual(self.client.get(url, {'meses': 'muitos'}).context['meses'], 12)
+        self.assertEqual(self.client.get(url, {'meses': 7}).context['meses'], 12)
+
+
+class FragmentosCacheTests(TestCase):
+    """Cache de fragmentos por linha (core/fragmentos.py) e versão de registro (core/versionamento.py)."""
+
+    VERSOES_VEICULO = ['versao', 'empresa.versao']
+    VERSOES_SINISTRO = ['versao', 'veiculo.versao', 'veiculo.empresa.versao']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa, cls.outra = criar_frota(2)
+
+    def setUp(self):
+        cache_fragmentos().clear()
+
+    def renderizar_veiculos(self, template_name='veiculos/_linha_veiculo.html'):
+        veiculos = Veiculo.ativos.select_related('empresa').order_by('placa')
+        return renderizar_linhas(veiculos, template_name, 'veiculo', self.VERSOES_VEICULO)
+
+    def renderizar_sinistros(self):
+        sinistros = Sinistro.objects.select_related('veiculo__empresa').order_by('pk')
+        return renderizar_linhas(sinistros, 'sinistros/_linha_sinistro.html', 'sinistro', self.VERSOES_SINISTRO)
+
+    def falhas(self, renderizar):
+        """Linhas renderizadas (ausentes do cache) por uma chamada de 'renderizar'."""
+        zerar_contadores()
+        html = renderizar()
+        return contadores()['falhas'], html
+
+    def test_segunda_renderizacao_vem_do_cache(self):
+        falhas, html = self.falhas(self.renderizar_veiculos)
+        self.assertEqual(falhas, 4)
+        self.assertEqual(html.count('<tr>'), 4)
+        self.assertEqual(self.falhas(self.renderizar_veiculos), (0, html))
+        self.assertEqual(contadores(), {'acertos': 4, 'falhas': 0, 'taxa_acerto': 1.0})
+        self.assertEqual(renderizar_linhas([], 'veiculos/_linha_veiculo.html', 'veiculo'), '')
+
+    def test_gravacoes_trocam_a_chave(self):
+        self.renderizar_veiculos()
+        veiculo = Veiculo.ativos.filter(empresa=self.empresa).order_by('placa').first()
+        versao = veiculo.versao
+        veiculo.modelo = 'Toro'
+        veiculo.save(update_fields=['modelo']) # A versão entra nos update_fields
+        self.assertEqual(Veiculo.objects.get(pk=veiculo.pk).versao, versao + 1)
+        falhas, html = self.falhas(self.renderizar_veiculos)
+        self.assertEqual(falhas, 1)
+        self.assertIn('<td>Toro</td>', html)
+
+        # A empresa faz parte da linha: renovar a empresa renova as linhas dos seus veículos
+        self.outra.razao_social = 'Outra Razao Ltda'
+        self.outra.save()
+        falhas, html = self.falhas(self.renderizar_veiculos)
+        self.assertEqual(falhas, 2)
+        self.assertEqual(html.count('Outra Razao Ltda'), 2)
+
+    def test_gravacoes_concorrentes_geram_versoes_distintas(self):
+        veiculo = Veiculo.ativos.filter(empresa=self.empresa).order_by('placa').first()
+        versao = veiculo.versao
+        desatualizado = Veiculo.objects.get(pk=veiculo.pk) # Outra requisição leu a mesma versão
+        veiculo.modelo = 'Toro'
+        veiculo.save()
+        self.assertEqual(veiculo.versao, versao + 1)
+        desatualizado.modelo = 'Strada'
+        desatualizado.save()
+        self.assertEqual(desatualizado.versao, versao + 2) # E não versao + 1, já usada pela outra edição
+        self.assertEqual(Veiculo.objects.get(pk=veiculo.pk).versao, versao + 2)
+
+    def test_veiculo_do_sinistro_troca_a_chave(self):
+        self.assertEqual(self.falhas(self.renderizar_sinistros)[0], 2)
+        sinistro = Sinistro.objects.select_related('veiculo').get(veiculo__empresa=self.empresa)
+        sinistro.veiculo.modelo = 'Toro'
+        sinistro.veiculo.save()
+        falhas, html = self.falhas(self.renderizar_sinistros)
+        self.assertEqual(falhas, 1)
+        self.assertIn('<td>Toro</td>', html)
+        self.empresa.save()
+        self.assertEqual(self.falhas(self.renderizar_sinistros)[0], 1)
+
+    def test_update_em_massa_com_versao(self):
+        self.renderizar_veiculos()
+        veiculos = Veiculo.ativos.filter(empresa=self.empresa)
+        veiculos.update(franquia=1800) # Sem a versão, as linhas em cache continuam valendo
+        falhas, html = self.falhas(self.renderizar_veiculos)
+        self.assertEqual(falhas, 0)
+        self.assertNotIn('R$ 1800', html)
+        veiculos.update(versao=F('versao') + 1)
+        falhas, html = self.falhas(self.renderizar_veiculos)
+        self.assertEqual(falhas, 2)
+        self.assertEqual(html.count('R$ 1800'), 2)
+
+    def test_alterar_o_template_troca_a_chave(self):
+        def templates(fonte):
+            return override_settings(TEMPLATES=[{
+                'BACKEND': 'django.template.backends.django.DjangoTemplates',
+                'OPTIONS': {'loaders': [('django.template.loaders.locmem.Loader', {'linha.html': fonte})]},
+            }])
+
+        with templates('<tr><td>{{ veiculo.placa }}</td></tr>'):
+            self.assertEqual(self.falhas(lambda: self.renderizar_veiculos('linha.html'))[0], 4)
+            self.assertEqual(self.falhas(lambda: self.renderizar_veiculos('linha.html'))[0], 0)
+        with templates('<tr><td>{{ veiculo.placa }}</td><td>{{ veiculo.modelo }}</td></tr>'):
+            falhas, html = self.falhas(lambda: self.renderizar_veiculos('linha.html'))
+        self.assertEqual(falhas, 4)
+        self.assertIn('<td>Strada</td>', html)
+
+
+class DashboardAssincronoTests(TestCase):
+    """View assíncrona do dashboard (core/assincrono.py), pelo AsyncClient."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('assincrono', password='senha-de-teste')
+        criar_frota(3)
+
+    async def test_anonimo_vai_para_o_login(self):
+        resposta = await self.async_client.get(reverse('core:dashboard'))
+        self.assertRedirects(resposta, reverse('core:login'), fetch_redirect_response=False)
+
+    async def test_contexto(self):
+        await self.async_client.aforce_login(self.usuario)
+        resposta = await self.async_client.get(reverse('core:dashboard'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.context['quantidade_carros'], 6)
+        self.assertEqual(resposta.context['por_seguradora'], [('Porto Seguro', 6)])
+        self.assertEqual(resposta.context['vencimentos'], [(30, 3), (60, 3), (90, 3)])
+        self.assertEqual(len(resposta.context['alertas_vencimento']), 3)
+        tendencia = resposta.context['tendencia_sinistros']
+        self.assertEqual(len(tendencia), sinistros_mensais.MESES_TENDENCIA)
+        self.assertEqual(sum(mes['total'] for mes in tendencia), 3)
+
+
+class AlteracoesTests(TestCase):
+    """Feed incremental de alterações (core/alteracoes.py): registro, leitura por cursor, API e comando."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('feed', password='senha-de-teste')
+        cls.empresa = criar_frota(1)[0]
+
+    def feed(self, cursor=None, **kwargs):
+        return [
+            (alteracao['modelo'], alteracao['objeto_id'], alteracao['operacao'])
+            for alteracao in ler_alteracoes(cursor, **kwargs)['alteracoes']
+        ]
+
+    def test_criacoes_alteracoes_e_exclusoes(self):
+        cursor = cursor_atual()
+        veiculo = Veiculo.ativos.filter(empresa=self.empresa).first()
+        sinistro = Sinistro.objects.get(veiculo=veiculo)
+        sinistro_id = sinistro.pk
+        veiculo.desativar()
+        veiculo.reativar()
+        veiculo.franquia = 2000
+        veiculo.save()
+        sinistro.delete()
+        self.assertEqual(self.feed(cursor), [
+            ('veiculo', veiculo.pk, 'desativacao'),
+            ('veiculo', veiculo.pk, 'reativacao'),
+            ('veiculo', veiculo.pk, 'alteracao'),
+            ('sinistro', sinistro_id, 'exclusao'),
+        ])
+
+    @override_settings(AUTO_FROTA_EXCLUSAO_EM_SEGUNDO_PLANO=False)
+    def test_exclusao_da_empresa_em_lotes_deixa_rastro(self):
+        cursor = cursor_atual()
+        veiculos = set(Veiculo.objects.filter(empresa=self.empresa).values_list('pk', flat=True))
+        sinistros = set(Sinistro.objects.filter(veiculo__empresa=self.empresa).values_list('pk', flat=True))
+        exclusao, _ = solicitar_exclusao(self.empresa)
+        executar_exclusao(exclusao.pk, tamanho_lote=1)
+        feed = self.feed(cursor)
+        self.assertEqual({pk for modelo, pk, _ in feed if modelo == 'veiculo'}, veiculos)
+        self.assertEqual({pk for modelo, pk, _ in feed if modelo == 'sinistro'}, sinistros)
+        self.assertEqual(feed[-1], ('empresa', self.empresa.pk, 'exclusao'))
+        self.assertEqual({operacao for _, _, operacao in feed}, {'exclusao'})
+
+    def test_leitura_por_cursor(self):
+        total = Alteracao.objects.count()
+        lidas, cursor = [], None
+        while True:
+            feed = ler_alteracoes(cursor, limite=2)
+            lidas.extend(alteracao['id'] for alteracao in feed['alteracoes'])
+            cursor = feed['proximo_cursor']
+            if not feed['tem_mais']:
+                break
+        self.assertEqual(lidas, list(Alteracao.objects.order_by('id').values_list('id', flat=True)))
+        self.assertEqual(len(lidas), total)
+        # Sem novidades: nada a ler e o cursor continua o mesmo
+        self.assertEqual(ler_alteracoes(cursor)['alteracoes'], [])
+        self.assertEqual(ler_alteracoes(cursor)['proximo_cursor'], cursor)
+        self.assertEqual({modelo for modelo, _, _ in self.feed(modelos=['empresa'])}, {'empresa'})
+
+    @override_settings(AUTO_FROTA_ATRASO_ALTERACOES=60)
+    def test_atraso_segura_as_alteracoes_recentes(self):
+        feed = ler_alteracoes()
+        self.assertEqual(feed['alteracoes'], [])
+        self.assertTrue(feed['tem_mais'])
+
+    def test_api(self):
+        url = reverse('api_v1:alteracoes')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(url, {'modelos': 'empresa'}).json()
+        self.assertEqual([(r['objeto_id'], r['operacao']) for r in resposta['resultados']], [(self.empresa.pk, 'criacao')])
+        resposta = self.client.get(url, {'cursor': 'agora'}).json()
+        self.assertEqual(resposta['quantidade'], 0)
+        self.assertEqual(resposta['proximo_cursor'], cursor_atual())
+        self.assertEqual(self.client.get(url, {'modelos': 'apolice'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'cursor': 'invalido'}).status_code, 400)
+
+    def test_comando_grava_o_cursor(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_cursor = os.path.join(pasta, 'feed.cursor')
+            saida = os.path.join(pasta, 'delta.ndjson')
+            call_command('exportar_alteracoes', arquivo_cursor=arquivo_cursor, saida=saida, lote=2, stderr=StringIO())
+            with open(saida, encoding='utf-8') as arquivo:
+                self.assertEqual(len(arquivo.readlines()), Alteracao.objects.count())
+            Empresa.objects.create(razao_social='Nova Ltda', cnpj='11.222.333/0001-81')
+            call_command('exportar_alteracoes', arquivo_cursor=arquivo_cursor, saida=saida, stderr=StringIO())
+            with open(saida, encoding='utf-8') as arquivo:
+                self.assertEqual(len(arquivo.readlines()), 1) # Só a nova empresa
+
+
+class ResumoMensalSinistrosTests(TestCase):
+    """Resumo mensal dos sinistros (core/sinistros_mensais.py) mantido pelos signals e tendência do dashboard."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa, cls.outra = criar_frota(2)
+        cls.veiculo = Veiculo.ativos.filter(empresa=cls.empresa).order_by('placa').first()
+        cls.mes = date.today().replace(day=1)
+
+    def quantidade(self, empresa, status='aberto', mes=None):
+        return ResumoMensalSinistros.objects.filter(
+            mes=mes or self.mes, empresa=empresa, tipo_sinistro='colisao', status_sinistro=status
+        ).values_list('quantidade', flat=True).first() or 0
+
+    def assertResumoConfere(self):
+        self.assertEqual(sinistros_mensais.verificar(), [])
+
+    def test_registro_alteracao_e_exclusao(self):
+        sinistro = Sinistro.objects.create(
+            veiculo=self.veiculo, data_sinistro=self.mes, tipo_sinistro='colisao',
+            descricao='Batida no estacionamento.', status_sinistro='aberto',
+        )
+        self.assertResumoConfere()
+        sinistro.status_sinistro = 'finalizado'
+        sinistro.save()
+        self.assertEqual(self.quantidade(self.empresa, 'finalizado'), 1)
+        self.assertResumoConfere()
+        sinistro.data_sinistro = self.mes - timedelta(days=1) # Mês anterior
+        sinistro.save()
+        self.assertEqual(self.quantidade(self.empresa, 'finalizado'), 0)
+        self.assertResumoConfere()
+        sinistro.delete()
+        self.assertResumoConfere()
+        # Linhas zeradas não ficam gravadas
+        self.assertFalse(ResumoMensalSinistros.objects.filter(quantidade=0).exists())
+
+    def test_transferencia_leva_os_sinistros(self):
+        total = Sinistro.objects.filter(veiculo=self.veiculo).count()
+        self.veiculo.empresa = self.outra
+        self.veiculo.save()
+        self.assertResumoConfere()
+        aplicar_operacao('transferir', Veiculo.objects.filter(pk=self.veiculo.pk), {'empresa': self.empresa})
+        self.assertResumoConfere()
+        self.assertEqual(
+            ResumoMensalSinistros.objects.filter(empresa=self.empresa).aggregate(n=Sum('quantidade'))['n'], total
+        )
+
+    @override_settings(AUTO_FROTA_EXCLUSAO_EM_SEGUNDO_PLANO=False)
+    def test_exclusao_da_empresa_em_lotes(self):
+        exclusao, _ = solicitar_exclusao(self.empresa)
+        executar_exclusao(exclusao.pk, tamanho_lote=1)
+        self.assertFalse(ResumoMensalSinistros.objects.filter(empresa_id=self.empresa.pk).exists())
+        self.assertResumoConfere()
+
+    def test_tendencia_mensal(self):
+        hoje = date.today()
+        tendencia = sinistros_mensais.tendencia_mensal(meses=3, hoje=hoje)
+        self.assertEqual(len(tendencia), 3)
+        self.assertEqual(tendencia[-1]['mes'], hoje.replace(day=1))
+        self.assertEqual(sum(item['total'] for item in tendencia), Sinistro.objects.filter(data_sinistro__gte=tendencia[0]['mes']).count())
+        self.assertEqual(max(item['percentual'] for item in tendencia), 100)
+        por_empresa = sinistros_mensais.tendencia_mensal(meses=3, hoje=hoje, empresa_id=self.outra.pk)
+        self.assertEqual(sum(item['total'] for item in por_empresa), 1)
+        self.assertEqual([tipo for item in por_empresa for tipo, _ in item['por_tipo']], ['Colisão'])
+
+    def test_reconstrucao_pelo_comando(self):
+        ResumoMensalSinistros.objects.update(quantidade=F('quantidade') + 5)
+        with self.assertRaises(CommandError):
+            call_command('reconstruir_estatisticas', somente_verificar=True, stdout=StringIO(), stderr=StringIO())
+        call_command('reconstruir_estatisticas', stdout=StringIO())
+        self.assertResumoConfere()
+
+
+@registrar_tarefa('teste_instavel', 'Tarefa instável (testes)', tentativas=2)
+def tarefa_instavel(progresso, falhas, definitiva=False):
+    """Falha nas primeiras 'falhas' tentativas; informa o progresso antes de terminar."""
+    progresso.atualizar(1, 2, 'Metade')
+    if progresso.tarefa.tentativas <= falhas:
+        raise (ErroDefinitivo if definitiva else RuntimeError)('Falha simulada.')
+    return {'tentativas': progresso.tarefa.tentativas}
+
+
+@override_settings(AUTO_FROTA_TAREFAS_EM_SEGUNDO_PLANO=False, AUTO_FROTA_TAREFAS_ESPERA=60)
+class TarefasTests(TestCase):
+    """Executor de tarefas em segundo plano (core/tarefas.py): fila, novas tentativas, retomada e páginas."""
+
+    def test_execucao_e_resultado(self):
+        tarefa = enfileirar('teste_instavel', {'falhas': 0})
+        self.assertEqual(proximas_tarefas(), [tarefa.pk])
+        tarefa = executar_tarefa(tarefa.pk)
+        self.assertEqual(tarefa.status, 'concluida')
+        self.assertEqual(tarefa.resultado, {'tentativas': 1})
+        self.assertEqual((tarefa.progresso_atual, tarefa.progresso_total, tarefa.mensagem), (1, 2, 'Metade'))
+        # Já concluída: não é reivindicada de novo
+        self.assertIsNone(executar_tarefa(tarefa.pk))
+        self.assertEqual(proximas_tarefas(), [])
+
+    def test_novas_tentativas_com_espera(self):
+        tarefa = executar_tarefa(enfileirar('teste_instavel', {'falhas': 1}).pk)
+        self.assertEqual(tarefa.status, 'pendente')
+        self.assertIn('Falha simulada.', tarefa.erro)
+        self.assertGreater(tarefa.executar_apos, timezone.now() + timedelta(seconds=50))
+        self.assertIsNone(executar_tarefa(tarefa.pk)) # Ainda esperando a próxima tentativa
+        Tarefa.objects.filter(pk=tarefa.pk).update(executar_apos=timezone.now())
+        tarefa = executar_tarefa(tarefa.pk)
+        self.assertEqual((tarefa.status, tarefa.tentativas, tarefa.erro), ('concluida', 2, ''))
+
+    def test_falha_apos_esgotar_as_tentativas(self):
+        tarefa = enfileirar('teste_instavel', {'falhas': 5})
+        executar_tarefa(tarefa.pk)
+        Tarefa.objects.filter(pk=tarefa.pk).update(executar_apos=timezone.now())
+        self.assertEqual(executar_tarefa(tarefa.pk).status, 'falhou')
+        # Erro definitivo: sem novas tentativas
+        tarefa = executar_tarefa(enfileirar('teste_instavel', {'falhas': 5, 'definitiva': True}).pk)
+        self.assertEqual((tarefa.status, tarefa.tentativas, tarefa.erro), ('falhou', 1, 'Falha simulada.'))
+
+    @override_settings(AUTO_FROTA_TAREFAS_INATIVIDADE=60)
+    def test_tarefa_interrompida_e_retomada(self):
+        tarefa = enfileirar('teste_instavel', {'falhas': 0})
+        Tarefa.objects.filter(pk=tarefa.pk).update(status='em_andamento', tentativas=1, data_atualizacao=timezone.now())
+        self.assertEqual(proximas_tarefas(), []) # Em execução por outro executor
+        Tarefa.objects.filter(pk=tarefa.pk).update(data_atualizacao=timezone.now() - timedelta(minutes=5))
+        self.assertEqual([t.resultado for t in processar_tarefas()], [{'tentativas': 2}])
+
+    def test_exclusao_de_empresa_pela_fila(self):
+        empresa = criar_frota(1)[0]
+        exclusao, _ = solicitar_exclusao(empresa)
+        tarefa = Tarefa.objects.get(tipo='excluir_empresa')
+        self.assertEqual(tarefa.parametros, {'exclusao': exclusao.pk})
+        saida = StringIO()
+        call_command('executar_tarefas', threads=1, stdout=saida)
+        self.assertIn('concluída', saida.getvalue())
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.progresso_atual, tarefa.progresso_total), (3, 3))
+        self.assertEqual(tarefa.resultado['veiculos_excluidos'], 3)
+        self.assertFalse(Empresa.objects.filter(pk=empresa.pk).exists())
+
+    def test_paginas_de_acompanhamento(self):
+        self.client.force_login(get_user_model().objects.create_user('tarefas', password='senha-de-teste'))
+        tarefa = enfileirar('teste_instavel', {'falhas': 0})
+        resposta = self.client.get(reverse('core:acompanhar_tarefa', kwargs={'pk': tarefa.pk}))
+        self.assertContains(resposta, 'http-equiv="refresh"') # Recarrega enquanto não termina
+        executar_tarefa(tarefa.pk)
+        resposta = self.client.get(reverse('core:acompanhar_tarefa', kwargs={'pk': tarefa.pk}))
+        self.assertNotContains(resposta, 'http-equiv="refresh"')
+        resposta = self.client.get(reverse('core:listar_tarefas'), {'status': 'concluida'})
+        self.assertContains(resposta, 'Tarefa instável (testes)')
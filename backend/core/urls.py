@@ -10,6 +10,13 @@ urlpatterns = [
     path('', views.login_view, name='login'),
     # Página do dashboard
     path('dashboard/', views.dashboard_view, name='dashboard'),
+    # Lista de alertas de vencimento de seguro (tabela pré-calculada)
+    path('alertas/', views.listar_alertas, name='listar_alertas'),
+    # Análise de sinistralidade por empresa, seguradora, classe de bônus e idade do veículo
+    path('sinistralidade/', views.analise_sinistralidade, name='analise_sinistralidade'),
+    # Tarefas em segundo plano (importações, exclusões de empresas...) e acompanhamento de cada uma
+    path('tarefas/', views.listar_tarefas, name='listar_tarefas'),
+    path('tarefas/<int:pk>/', views.acompanhar_tarefa, name='acompanhar_tarefa'),
     # Nova URL para a função de logout
     path('logout/', views.logout_view, name='logout'), # Nova URL para logout
 ]
\ No newline at end of file
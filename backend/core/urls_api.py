@@ -0,0 +1,29 @@
+# backend/core/urls_api.py
+
+"""
+Rotas da API JSON somente leitura, versão 1 (incluídas em /api/v1/ por auto_frota/urls.py).
+Uma futura versão incompatível ganha o seu próprio arquivo de rotas, sem afetar os clientes da v1.
+"""
+
+from django.urls import path
+
+from sinistros import api as sinistros_api
+from veiculos import api as veiculos_api
+
+from . import api as core_api
+
+app_name = 'api_v1'
+
+urlpatterns = [
+    path('veiculos/', veiculos_api.listar_veiculos_api, name='veiculos'),
+    path('veiculos/<int:pk>/', veiculos_api.detalhar_veiculo_api, name='veiculo'),
+    path('empresas/', veiculos_api.listar_empresas_api, name='empresas'),
+    path('empresas/<int:pk>/', veiculos_api.detalhar_empresa_api, name='empresa'),
+    # Sugestões por prefixo dos campos com autocompletar (veiculos/sugestoes.py)
+    path('sugestoes/veiculos/', veiculos_api.sugerir_veiculos_api, name='sugestoes_veiculos'),
+    path('sugestoes/empresas/', veiculos_api.sugerir_empresas_api, name='sugestoes_empresas'),
+    path('sinistros/', sinistros_api.listar_sinistros_api, name='sinistros'),
+    path('sinistros/<int:pk>/', sinistros_api.detalhar_sinistro_api, name='sinistro'),
+    # Feed incremental de alterações (core/alteracoes.py)
+    path('alteracoes/', core_api.listar_alteracoes_api, name='alteracoes'),
+]
@@ -0,0 +1,46 @@
+# backend/core/versionamento.py
+
+"""
+Versão de registro para os modelos exibidos em listas com cache de fragmentos (core/fragmentos.py).
+
+A versão começa em 1 e aumenta a cada save(); as chaves de cache das linhas incluem a versão,
+por isso uma linha alterada nunca é servida do cache. O save() grava versao = versao + 1 no próprio
+UPDATE (e não o valor da instância, que pode estar desatualizado): duas edições simultâneas da mesma
+linha geram duas versões distintas. Atualizações em massa (queryset.update)
+não passam pelo save() e devem incrementar a versão explicitamente: update(..., versao=F('versao') + 1).
+
+Este módulo não importa modelos de nenhum app, para poder ser usado pelos modelos de todos eles.
+"""
+
+from django.db import models
+from django.db.models import F
+
+
+class ModeloVersionado(models.Model):
+    """Modelo abstrato com o campo 'versao', incrementado a cada gravação."""
+
+    versao = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name="Versão do Registro"
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        # Nova versão: os fragmentos em cache da versão anterior deixam de ser usados
+        versao_anterior = self.versao
+        self.versao = F('versao') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'versao'}
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            self.versao = versao_anterior
+            raise
+        self.refresh_from_db(fields=['versao']) # Lê a versão gravada
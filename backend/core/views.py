@@ -1,12 +1,28 @@
 # backend/core/views.py
 
-from django.shortcuts import render, redirect # Importa render e redirect
+import asyncio # Consultas independentes em paralelo nas views assíncronas
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404 # Importa render, redirect e get_object_or_404
 from django.contrib.auth import authenticate, login, logout # Importa funções de autenticação (authenticate, login, e logout)
 from django.contrib import messages # Importa o módulo de mensagens para feedback ao usuário
+from django.contrib.auth.decorators import login_required # Decorador para exigir login
+from django.conf import settings
 from django.urls import reverse
-from datetime import date, timedelta # Importa date (data atual) e timedelta (para cálculo de datas)
 
-from veiculos.models import Veiculo # Importa o modelo Veiculo para poder contar carros e buscar alertas
+from core.assincrono import alistar, renderizar # Utilitários das views assíncronas
+from core.paginacao import CursorInvalido, paginar, tamanho_pagina # Paginação por chave
+from veiculos.models import Empresa, SEGURADORA_CHOICES
+
+from .alertas import HORIZONTE_MAXIMO, HORIZONTES_ALERTA, alertas_ate, aultima_execucao, resumo_alertas, ultima_execucao # Alertas pré-calculados
+from .estatisticas import resumo_dashboard # Estatísticas materializadas da frota
+from .models import STATUS_TAREFA_ABERTA, STATUS_TAREFA_CHOICES, AlertaVencimento, Tarefa
+from .sinistralidade import PERIODO_PADRAO, PERIODOS_MESES, analisar_sinistralidade # Indicadores de sinistralidade
+from .sinistros_mensais import tendencia_mensal # Resumo mensal dos sinistros
+from .tarefas import TAREFAS # Operações executadas em segundo plano
+
+# Intervalo (segundos) de recarga da página de acompanhamento enquanto a tarefa não termina
+INTERVALO_ATUALIZACAO_TAREFA = 3
 
 
 def login_view(request):
@@ -39,39 +55,185 @@ def login_view(request):
     # Se a requisição for GET (apenas para exibir a página), renderiza o template de login
     return render(request, 'core/login.html')
 
-def dashboard_view(request):
+async def dashboard_view(request):
     """
     Esta view será responsável por exibir a página do dashboard.
     - Verifica se o usuário está autenticado.
-    - Busca e exibe a quantidade de carros ativos.
-    - Busca e exibe alertas de seguros próximos ao vencimento (próximos 60 dias).
+    - Exibe a quantidade de carros ativos, a distribuição da frota por seguradora e as maiores empresas,
+      lidas das estatísticas materializadas (core/estatisticas.py), sem varrer a tabela de veículos.
+    - Exibe a quantidade de sinistros por mês (últimos 12 meses), lida do resumo mensal dos sinistros
+      (core/sinistros_mensais.py), sem agregar a tabela de sinistros.
+    - Exibe os alertas de seguros próximos ao vencimento (horizonte configurável, 60 dias por padrão)
+      e os vencimentos em 30/60/90 dias, lidos da tabela de alertas pré-calculados (core/alertas.py).
+    - View assíncrona (core/assincrono.py): as consultas independentes são feitas ao mesmo tempo.
     """
-    if not request.user.is_authenticated:
+    user = await request.auser() # request.user consultaria o banco de forma síncrona
+    if not user.is_authenticated:
         return redirect(reverse('core:login'))
 
-    # Contagem de carros ativos
-    quantidade_carros = Veiculo.objects.filter(ativo=True).count()
+    # Alertas de vencimento: lidos apenas da tabela pré-calculada (core/alertas.py),
+    # atualizada pelo comando 'atualizar_alertas' agendado no cron
+    horizonte = getattr(settings, 'AUTO_FROTA_HORIZONTE_ALERTAS_DASHBOARD', 60)
+    limite_alertas = getattr(settings, 'AUTO_FROTA_LIMITE_ALERTAS_DASHBOARD', 20)
+    # Os mais próximos primeiro; .select_related evita uma consulta por alerta no template
+    alertas_vencimento = alertas_ate(horizonte).select_related('veiculo', 'empresa')[:limite_alertas]
 
-    # Lógica para Alertas de Vencimento
-    today = date.today() # Obtém a data de hoje
-    # Calcula a data limite para o alerta (hoje + 60 dias)
-    alert_date_limit = today + timedelta(days=60) 
-
-    # Busca veículos ativos cujo vencimento do seguro está entre hoje e a data limite de alerta
-    # .select_related('empresa') para otimizar o acesso à razão social no template
-    alertas_vencimento = Veiculo.objects.filter(
-        ativo=True, # Apenas veículos ativos
-        data_vencimento_seguro__gte=today, # Vencimento maior ou igual a hoje
-        data_vencimento_seguro__lte=alert_date_limit # Vencimento menor ou igual à data limite
-    ).order_by('data_vencimento_seguro') # Ordena pela data de vencimento (mais próximos primeiro)
+    # Contadores pré-calculados (total de ativos, por seguradora e por empresa),
+    # resumo dos alertas, lista de alertas e data da última atualização
+    # e tendência mensal dos sinistros
+    resumo, resumo_vencimentos, alertas_vencimento, atualizacao_alertas, tendencia_sinistros = await asyncio.gather(
+        sync_to_async(resumo_dashboard)(),
+        sync_to_async(resumo_alertas)(limite_empresas=5),
+        alistar(alertas_vencimento),
+        aultima_execucao(),
+        sync_to_async(tendencia_mensal)(),
+    )
 
     context = {
-        'quantidade_carros': quantidade_carros,
+        'quantidade_carros': resumo['quantidade_carros'],
         'alertas_vencimento': alertas_vencimento, # Passa a lista de veículos com alertas
-        'total_alertas': alertas_vencimento.count(), # Passa a quantidade de alertas
+        'horizonte_alertas': horizonte,
+        'total_alertas': resumo_vencimentos['por_horizonte'].get(horizonte, 0), # Sem COUNT na tabela de veículos
+        'vencimentos': sorted(resumo_vencimentos['por_horizonte'].items()), # [(30, n), (60, n), (90, n)]
+        'alertas_por_empresa': resumo_vencimentos['por_empresa'],
+        'atualizacao_alertas': atualizacao_alertas,
+        'por_seguradora': resumo['por_seguradora'],
+        'por_empresa': resumo['por_empresa'],
+        'tendencia_sinistros': tendencia_sinistros, # [{'mes', 'total', 'por_tipo', 'percentual'}, ...]
+    }
+
+    return await renderizar(request, 'core/dashboard.html', context)
+
+@login_required
+def listar_alertas(request):
+    """
+    Lista os alertas de vencimento de seguro, lidos apenas da tabela pré-calculada.
+    Filtros: 'horizonte' (30, 60 ou 90 dias), 'empresa' (id) e 'seguradora' (código).
+    Exibe também as contagens por horizonte, empresa e seguradora dos alertas filtrados.
+    """
+    alertas = AlertaVencimento.objects.all()
+
+    # Horizonte: valores fora das opções resultam no maior horizonte (todos os alertas)
+    try:
+        horizonte = int(request.GET.get('horizonte', HORIZONTE_MAXIMO))
+    except (TypeError, ValueError):
+        horizonte = HORIZONTE_MAXIMO
+    if horizonte not in HORIZONTES_ALERTA:
+        horizonte = HORIZONTE_MAXIMO
+
+    empresa = None
+    if request.GET.get('empresa', '').isdigit():
+        empresa = Empresa.objects.filter(pk=request.GET['empresa']).first()
+    if empresa:
+        alertas = alertas.filter(empresa=empresa)
+    seguradora = request.GET.get('seguradora')
+    if seguradora:
+        alertas = alertas.filter(seguradora=seguradora)
+
+    # As contagens por horizonte consideram todos os horizontes; as demais, o horizonte escolhido
+    contagens = resumo_alertas(alertas)
+    alertas = alertas_ate(horizonte, alertas)
+    agrupamentos = resumo_alertas(alertas)
+
+    # Pagina por chave, do vencimento mais próximo ao mais distante
+    alertas = alertas.select_related('veiculo', 'empresa')
+    ordenacao = ('data_vencimento_seguro', 'id')
+    try:
+        pagina = paginar(alertas, ordenacao, cursor=request.GET.get('cursor'), tamanho=tamanho_pagina(request))
+    except CursorInvalido:
+        messages.warning(request, 'Link de paginação inválido. Exibindo a primeira página.')
+        pagina = paginar(alertas, ordenacao, tamanho=tamanho_pagina(request))
+
+    context = {
+        'alertas': pagina,
+        'pagina': pagina,
+        'horizonte': horizonte,
+        'empresa': empresa,
+        'seguradora': seguradora,
+        'nome_seguradora': dict(SEGURADORA_CHOICES).get(seguradora, seguradora),
+        'por_horizonte': sorted(contagens['por_horizonte'].items()),
+        'total_alertas': contagens['por_horizonte'].get(horizonte, 0),
+        'por_empresa': agrupamentos['por_empresa'],
+        'por_seguradora': agrupamentos['por_seguradora'],
+        'atualizacao_alertas': ultima_execucao(),
+    }
+    return render(request, 'core/listar_alertas.html', context)
+
+
+@login_required
+def analise_sinistralidade(request):
+    """
+    Página de análise de sinistralidade da frota (core/sinistralidade.py):
+    frequência de sinistros por veículo-ano, distribuição por tipo e evolução mensal,
+    por empresa, seguradora, faixa de classe de bônus e idade do veículo.
+    - 'meses' define o período analisado (3, 6, 12 ou 24 meses, incluindo o mês atual).
+    Os indicadores vêm do cache e são recalculados apenas quando veículos ou sinistros mudam.
+    """
+    try:
+        meses = int(request.GET.get('meses', PERIODO_PADRAO))
+    except (TypeError, ValueError):
+        meses = PERIODO_PADRAO
+    if meses not in PERIODOS_MESES:
+        meses = PERIODO_PADRAO
+
+    analise = analisar_sinistralidade(meses=meses)
+    limite_empresas = getattr(settings, 'AUTO_FROTA_LIMITE_EMPRESAS_SINISTRALIDADE', 50)
+
+    context = {
+        'analise': analise,
+        'meses': meses,
+        'periodos': PERIODOS_MESES,
+        'por_empresa': analise['por_empresa'][:limite_empresas], # As empresas com mais sinistros
+        'total_empresas': len(analise['por_empresa']),
+    }
+    return render(request, 'core/sinistralidade.html', context)
+
+
+@login_required
+def listar_tarefas(request):
+    """
+    Lista as tarefas em segundo plano (importações, exclusões de empresas...), das mais recentes para as
+    mais antigas, paginadas por chave. Filtro: 'status' (pendente, em_andamento, concluida ou falhou).
+    """
+    tarefas = Tarefa.objects.select_related('solicitado_por')
+    status = request.GET.get('status')
+    if status in dict(STATUS_TAREFA_CHOICES):
+        tarefas = tarefas.filter(status=status)
+    else:
+        status = None
+
+    ordenacao = ('-data_solicitacao', '-id')
+    try:
+        pagina = paginar(tarefas, ordenacao, cursor=request.GET.get('cursor'), tamanho=tamanho_pagina(request))
+    except CursorInvalido:
+        messages.warning(request, 'Link de paginação inválido. Exibindo a primeira página.')
+        pagina = paginar(tarefas, ordenacao, tamanho=tamanho_pagina(request))
+
+    context = {
+        'tarefas': pagina,
+        'pagina': pagina,
+        'status': status,
+        'opcoes_status': STATUS_TAREFA_CHOICES,
+    }
+    return render(request, 'core/listar_tarefas.html', context)
+
+
+@login_required
+def acompanhar_tarefa(request, pk):
+    """
+    Página de acompanhamento de uma tarefa em segundo plano: situação, progresso, tentativas e, ao final,
+    o resultado (exibido pelo template registrado com a operação) ou o erro.
+    Recarrega sozinha enquanto a tarefa está pendente ou em andamento.
+    """
+    tarefa = get_object_or_404(Tarefa.objects.select_related('solicitado_por'), pk=pk)
+    definicao = TAREFAS.get(tarefa.tipo)
+    context = {
+        'tarefa': tarefa,
+        'modelo_resultado': definicao.modelo_resultado if definicao else None,
+        'intervalo_atualizacao': INTERVALO_ATUALIZACAO_TAREFA if tarefa.status in STATUS_TAREFA_ABERTA else None,
     }
+    return render(request, 'core/acompanhar_tarefa.html', context)
 
-    return render(request, 'core/dashboard.html', context)
 
 def logout_view(request):
     """
@@ -24,6 +24,8 @@ class SinistroAdmin(admin.ModelAdmin):
     )
     # Permite filtrar sinistros por campos específicos
     list_filter = ('tipo_sinistro', 'status_sinistro', 'data_sinistro', 'veiculo__empresa')
+    # A coluna 'veiculo_placa' lê o veículo de cada linha: carregado junto, na mesma consulta
+    list_select_related = ('veiculo',)
     # Campo para seleção de FK que vira um dropdown de busca
     raw_id_fields = ('veiculo',) # Útil para muitos veículos
     # Agrupamento de campos no formulário de edição
@@ -0,0 +1,32 @@
+# backend/sinistros/api.py
+
+"""
+Recurso 'sinistros' da API JSON somente leitura (core/api.py).
+Aceita os mesmos filtros de listar_sinistros: q, tipo, status, seguradora, empresa,
+data_inicio e data_fim (tipo, status e seguradora podem ser repetidos).
+"""
+
+from core.api import detalhar_recurso, listar_recurso, login_obrigatorio_api
+
+from .consultas import COLUNAS_EXPORTACAO_SINISTROS, filtrar_sinistros
+from .models import Sinistro
+
+# Campos expostos: nome na API -> caminho no ORM (os mesmos nomes da exportação, mais os ids)
+CAMPOS_API_SINISTROS = {
+    **dict(COLUNAS_EXPORTACAO_SINISTROS),
+    'veiculo_id': 'veiculo_id',
+    'empresa_id': 'veiculo__empresa_id',
+}
+
+
+@login_obrigatorio_api
+def listar_sinistros_api(request):
+    """GET /api/v1/sinistros/?<filtros>&fields=&cursor=&por_pagina="""
+    sinistros, ordenacao = filtrar_sinistros(request.GET)
+    return listar_recurso(request, 'sinistros', sinistros, CAMPOS_API_SINISTROS, ordenacao)
+
+
+@login_obrigatorio_api
+def detalhar_sinistro_api(request, pk):
+    """GET /api/v1/sinistros/<id>/?fields="""
+    return detalhar_recurso(request, 'sinistros', Sinistro.objects.all(), CAMPOS_API_SINISTROS, pk)
@@ -0,0 +1,174 @@
+# backend/sinistros/consultas.py
+
+"""
+Consultas de sinistros compartilhadas pelas listagens HTML, exportações e comandos.
+Mantém em um só lugar os filtros aceitos por 'listar_sinistros'.
+
+Os filtros são facetas (tipo, status, seguradora, empresa) e um período de 'data_sinistro',
+sempre resolvidos para comparações exatas. A busca livre ('q') converte rótulos de exibição
+("Colisão", "Em Análise") nas chaves dos choices e procura placa, modelo, chassi, renavam e
+empresa pelo índice de trigramas dos veículos, sem icontains sobre a tabela de sinistros.
+"""
+
+from django.db.models import Count, Q
+
+from veiculos.busca import normalizar, buscar_veiculos
+from veiculos.models import SEGURADORA_CHOICES, Veiculo
+
+from .forms import FiltroSinistrosForm
+from .models import Sinistro
+
+# Ordenação padrão (a mesma do Meta do modelo, com o id como desempate)
+ORDENACAO_SINISTROS = ('-data_sinistro', 'veiculo__placa', 'id')
+
+# Facetas com contagem: nome do parâmetro -> (campo consultado, choices)
+FACETAS_SINISTROS = {
+    'tipo': ('tipo_sinistro', Sinistro.TIPO_SINISTRO_CHOICES),
+    'status': ('status_sinistro', Sinistro.STATUS_SINISTRO_CHOICES),
+    'seguradora': ('veiculo__seguradora', SEGURADORA_CHOICES),
+}
+
+
+def chaves_por_rotulo(texto, choices):
+    """
+    Chaves dos choices cujo rótulo (ou a própria chave) contém o texto, sem diferenciar
+    acentos e maiúsculas. Ex: 'colisao' e 'Colis' -> ['colisao']; 'concluído' -> as duas conclusões.
+    """
+    termo = normalizar(texto).strip()
+    if not termo:
+        return []
+    return [
+        chave for chave, rotulo in choices
+        if termo in normalizar(rotulo) or termo in normalizar(chave.replace('_', ' '))
+    ]
+
+
+def _filtro_busca(texto):
+    """Condição da busca livre: rótulos de tipo/status ou dados do veículo (via índice de trigramas)."""
+    filtro = Q(veiculo__in=buscar_veiculos(texto, Veiculo.objects.all()).values('pk'))
+    tipos = chaves_por_rotulo(texto, Sinistro.TIPO_SINISTRO_CHOICES)
+    if tipos:
+        filtro |= Q(tipo_sinistro__in=tipos)
+    status = chaves_por_rotulo(texto, Sinistro.STATUS_SINISTRO_CHOICES)
+    if status:
+        filtro |= Q(status_sinistro__in=status)
+    return filtro
+
+
+def condicoes_sinistros(parametros):
+    """
+    Interpreta os parâmetros da lista de sinistros (valores inválidos são ignorados).
+    'parametros' pode ser o request.GET (ou outro dicionário) ou um FiltroSinistrosForm já
+    preenchido, o que evita validar o mesmo formulário mais de uma vez por requisição.
+    Retorna a tupla (form, filtro_base, filtros_facetas):
+    - filtro_base: Q com a busca, a empresa e o período;
+    - filtros_facetas: {nome_da_faceta: Q} para as facetas com valores selecionados.
+    """
+    form = parametros if isinstance(parametros, FiltroSinistrosForm) else FiltroSinistrosForm(parametros)
+    form.is_valid() # Popula cleaned_data apenas com os campos válidos
+    dados = form.cleaned_data
+
+    filtro_base = Q()
+    if dados.get('q'):
+        filtro_base &= _filtro_busca(dados['q'])
+    if dados.get('empresa'):
+        filtro_base &= Q(veiculo__empresa=dados['empresa'])
+    if dados.get('data_inicio'):
+        filtro_base &= Q(data_sinistro__gte=dados['data_inicio'])
+    if dados.get('data_fim'):
+        filtro_base &= Q(data_sinistro__lte=dados['data_fim'])
+
+    filtros_facetas = {}
+    for nome, (campo, _) in FACETAS_SINISTROS.items():
+        valores = dados.get(nome)
+        if valores:
+            filtros_facetas[nome] = Q(**{f'{campo}__in': valores})
+    return form, filtro_base, filtros_facetas
+
+
+def filtrar_sinistros(parametros, queryset=None):
+    """
+    Aplica os filtros de 'listar_sinistros' (busca, facetas e período).
+    Retorna a tupla (queryset, ordenacao).
+    """
+    if queryset is None:
+        queryset = Sinistro.objects.all()
+
+    _, filtro_base, filtros_facetas = condicoes_sinistros(parametros)
+    queryset = queryset.filter(filtro_base)
+    for filtro in filtros_facetas.values():
+        queryset = queryset.filter(filtro)
+    return queryset, ORDENACAO_SINISTROS
+
+
+def _consulta_facetas(parametros, queryset):
+    """
+    Prepara a agregação condicional das facetas (ver contar_facetas).
+    Retorna a tupla (queryset_filtrada, agregacoes, selecionados).
+    """
+    if queryset is None:
+        queryset = Sinistro.objects.all()
+
+    form, filtro_base, filtros_facetas = condicoes_sinistros(parametros)
+    selecionados = {nome: set(form.cleaned_data.get(nome) or ()) for nome in FACETAS_SINISTROS}
+
+    def filtro_sem(faceta):
+        """Filtros das facetas selecionadas, exceto a informada."""
+        filtro = Q()
+        for nome, condicao in filtros_facetas.items():
+            if nome != faceta:
+                filtro &= condicao
+        return filtro
+
+    agregacoes = {'total': Count('pk', filter=filtro_sem(None) or None)}
+    for nome, (campo, choices) in FACETAS_SINISTROS.items():
+        outras = filtro_sem(nome)
+        for indice, (chave, _) in enumerate(choices):
+            agregacoes[f'{nome}_{indice}'] = Count('pk', filter=Q(**{campo: chave}) & outras)
+
+    return queryset.filter(filtro_base).order_by(), agregacoes, selecionados
+
+
+def _montar_facetas(contagens, selecionados):
+    """Organiza o resultado da agregação no formato retornado por contar_facetas."""
+    facetas = {'total': contagens['total']}
+    for nome, (_, choices) in FACETAS_SINISTROS.items():
+        facetas[nome] = [
+            (chave, rotulo, contagens[f'{nome}_{indice}'], chave in selecionados[nome])
+            for indice, (chave, rotulo) in enumerate(choices)
+        ]
+    return facetas
+
+
+def contar_facetas(parametros, queryset=None):
+    """
+    Conta os sinistros de cada valor de faceta em uma única consulta (agregação condicional).
+    A contagem de um valor considera a busca, a empresa, o período e as demais facetas
+    selecionadas, mas não a própria faceta: marcar "Roubo" não zera a contagem de "Furto".
+    Retorna um dicionário {'total': n, 'tipo': [(chave, rotulo, n, selecionado)], ...}.
+    """
+    consulta, agregacoes, selecionados = _consulta_facetas(parametros, queryset)
+    return _montar_facetas(consulta.aggregate(**agregacoes), selecionados)
+
+
+async def acontar_facetas(parametros, queryset=None):
+    """
+    Versão assíncrona de contar_facetas (aaggregate).
+    'parametros' deve ser um FiltroSinistrosForm já validado, pois a validação consulta o banco.
+    """
+    consulta, agregacoes, selecionados = _consulta_facetas(parametros, queryset)
+    return _montar_facetas(await consulta.aaggregate(**agregacoes), selecionados)
+
+
+# Colunas da exportação (nome da coluna, caminho do campo a partir de Sinistro)
+COLUNAS_EXPORTACAO_SINISTROS = (
+    ('id', 'id'),
+    ('data_sinistro', 'data_sinistro'),
+    ('tipo_sinistro', 'tipo_sinistro'),
+    ('status_sinistro', 'status_sinistro'),
+    ('placa', 'veiculo__placa'),
+    ('modelo', 'veiculo__modelo'),
+    ('empresa', 'veiculo__empresa__razao_social'),
+    ('descricao', 'descricao'),
+    ('data_registro_sistema', 'data_registro_sistema'),
+)
@@ -2,7 +2,8 @@
 
 from django import forms
 from .models import Sinistro
-from veiculos.models import Veiculo # Importa Veiculo para o campo 'veiculo'
+from veiculos.forms import SelectAutocompletar # Veículos e empresas sugeridos conforme a digitação
+from veiculos.models import Empresa, Veiculo, SEGURADORA_CHOICES # Veiculo para o campo 'veiculo'; Empresa e seguradoras para os filtros
 
 class SinistroForm(forms.ModelForm):
     """
@@ -28,9 +29,11 @@ class SinistroForm(forms.ModelForm):
         widgets = {
             'data_sinistro': forms.DateInput(attrs={'type': 'date'}), # Seletor de data HTML5
             'descricao': forms.Textarea(attrs={'rows': 4}), # Aumenta a altura do campo de texto
+            # Só o veículo selecionado vai na página; os demais são sugeridos conforme a digitação
+            'veiculo': SelectAutocompletar('api_v1:sugestoes_veiculos', placeholder='Digite a placa, o modelo ou a empresa...'),
         }
         help_texts = {
-            'veiculo': 'Selecione o veículo envolvido no sinistro.',
+            'veiculo': 'Busque pela placa, modelo ou empresa e selecione o veículo envolvido no sinistro.',
             'descricao': 'Descreva o ocorrido (local, danos, etc.).',
         }
     
@@ -39,4 +42,57 @@ class SinistroForm(forms.ModelForm):
         # Adiciona a opção padrão para o dropdown de veículos
         # Filtra apenas veículos ativos para seleção, se desejar
         self.fields['veiculo'].empty_label = "--- Selecione o Veículo ---"
-        self.fields['veiculo'].queryset = Veiculo.objects.filter(ativo=True).order_by('placa')
\ No newline at end of file
+        # O rótulo de cada opção (Veiculo.__str__) inclui a razão social: a empresa vem na mesma consulta
+        self.fields['veiculo'].queryset = Veiculo.ativos.select_related('empresa').order_by('placa')
+
+class FiltroSinistrosForm(forms.Form):
+    """
+    Filtros da lista de sinistros (facetas e período).
+    Os valores são chaves exatas dos choices (ou o id da empresa), para que cada filtro
+    vire uma comparação de igualdade indexada em vez de um icontains.
+    """
+    q = forms.CharField(required=False, label='Busca')
+    tipo = forms.MultipleChoiceField(
+        required=False,
+        choices=Sinistro.TIPO_SINISTRO_CHOICES,
+        widget=forms.CheckboxSelectMultiple,
+        label='Tipo de Sinistro',
+    )
+    status = forms.MultipleChoiceField(
+        required=False,
+        choices=Sinistro.STATUS_SINISTRO_CHOICES,
+        widget=forms.CheckboxSelectMultiple,
+        label='Status do Sinistro',
+    )
+    seguradora = forms.MultipleChoiceField(
+        required=False,
+        choices=SEGURADORA_CHOICES,
+        widget=forms.CheckboxSelectMultiple,
+        label='Seguradora',
+    )
+    empresa = forms.ModelChoiceField(
+        required=False,
+        queryset=Empresa.objects.order_by('razao_social'),
+        empty_label='--- Todas as Empresas ---',
+        label='Empresa',
+        widget=SelectAutocompletar('api_v1:sugestoes_empresas', placeholder='Digite a razão social...'),
+    )
+    data_inicio = forms.DateField(
+        required=False,
+        input_formats=['%Y-%m-%d', '%d/%m/%Y'],
+        widget=forms.DateInput(attrs={'type': 'date'}), # Seletor de data HTML5
+        label='De',
+    )
+    data_fim = forms.DateField(
+        required=False,
+        input_formats=['%Y-%m-%d', '%d/%m/%Y'],
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        label='Até',
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        inicio, fim = cleaned_data.get('data_inicio'), cleaned_data.get('data_fim')
+        if inicio and fim and inicio > fim:
+            self.add_error('data_fim', 'A data final deve ser igual ou posterior à data inicial.')
+        return cleaned_data
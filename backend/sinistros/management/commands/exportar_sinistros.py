@@ -0,0 +1,33 @@
+# backend/sinistros/management/commands/exportar_sinistros.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exportacao import FORMATOS, gravar_exportacao
+from sinistros.consultas import COLUNAS_EXPORTACAO_SINISTROS, filtrar_sinistros
+
+
+class Command(BaseCommand):
+    """
+    Exporta os sinistros em CSV ou NDJSON, com o mesmo filtro da lista de sinistros.
+    Uso: python manage.py exportar_sinistros [--formato ndjson] [--q termo] [--saida sinistros.csv]
+    """
+    help = 'Exporta os sinistros em CSV ou NDJSON (streaming, memória constante).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=sorted(FORMATOS), default='csv', help='Formato do arquivo.')
+        parser.add_argument('--q', help='Termo de busca (o mesmo da lista de sinistros).')
+        parser.add_argument('--saida', help='Arquivo de destino (padrão: saída padrão).')
+
+    def handle(self, *args, **options):
+        sinistros, ordenacao = filtrar_sinistros({'q': options['q']})
+        sinistros = sinistros.order_by(*ordenacao)
+
+        if not options['saida']:
+            gravar_exportacao(sinistros, COLUNAS_EXPORTACAO_SINISTROS, options['formato'], self.stdout)
+            return
+        try:
+            with open(options['saida'], 'w', newline='', encoding='utf-8') as saida:
+                gravar_exportacao(sinistros, COLUNAS_EXPORTACAO_SINISTROS, options['formato'], saida)
+        except OSError as erro:
+            raise CommandError(f'Não foi possível gravar o arquivo: {erro}')
+        self.stderr.write(self.style.SUCCESS(f'Exportação gravada em {options["saida"]}.'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sinistros', '0001_initial'),
+        ('veiculos', '0004_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sinistro',
+            index=models.Index(fields=['-data_sinistro', 'veiculo', 'id'], name='sinistro_data_idx'),
+        ),
+    ]
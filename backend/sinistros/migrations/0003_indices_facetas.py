@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sinistros', '0002_indices_consultas'),
+        ('veiculos', '0004_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sinistro',
+            index=models.Index(fields=['tipo_sinistro', '-data_sinistro', 'id'], name='sinistro_tipo_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sinistro',
+            index=models.Index(fields=['status_sinistro', '-data_sinistro', 'id'], name='sinistro_status_data_idx'),
+        ),
+    ]
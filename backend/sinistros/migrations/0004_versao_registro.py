@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sinistros', '0003_indices_facetas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sinistro',
+            name='versao',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Versão do Registro'),
+        ),
+    ]
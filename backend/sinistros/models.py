@@ -1,9 +1,10 @@
 # backend/sinistros/models.py
 
 from django.db import models
+from core.versionamento import ModeloVersionado # Campo 'versao' (cache de fragmentos das listas)
 from veiculos.models import Veiculo # Importa o modelo Veiculo do app 'veiculos' (necessário para ForeignKey)
 
-class Sinistro(models.Model):
+class Sinistro(ModeloVersionado):
     """
     Modelo para registrar e detalhar eventos de sinistro.
     Cada sinistro é associado a um veículo específico.
@@ -71,6 +72,14 @@ class Sinistro(models.Model):
         verbose_name_plural = "Sinistros"
         # Ordena por data do sinistro (mais recente primeiro) e depois pela placa do veículo
         ordering = ['-data_sinistro', 'veiculo__placa']
+        indexes = [
+            # Lista de sinistros (listar_sinistros e exportação): mais recentes primeiro.
+            # O veículo entra no índice para que o JOIN com a placa não precise ler a tabela de sinistros.
+            models.Index(fields=['-data_sinistro', 'veiculo', 'id'], name='sinistro_data_idx'),
+            # Facetas de tipo e status (igualdade exata), já na ordem da lista
+            models.Index(fields=['tipo_sinistro', '-data_sinistro', 'id'], name='sinistro_tipo_data_idx'),
+            models.Index(fields=['status_sinistro', '-data_sinistro', 'id'], name='sinistro_status_data_idx'),
+        ]
 
     def __str__(self):
         return f"{self.tipo_sinistro} - {self.veiculo.placa} ({self.data_sinistro.strftime('%d/%m/%Y')})"
\ No newline at end of file
@@ -1,3 +1,156 @@
+# backend/sinistros/tests.py
+
+import csv
+import io
+import json
+import unittest
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import QueryDict
 from django.test import TestCase
+from django.urls import reverse
+
+from core.tests import OrcamentoConsultasMixin, PlanoDeConsultaMixin, criar_frota
+from veiculos.models import Veiculo
+
+from .consultas import COLUNAS_EXPORTACAO_SINISTROS, filtrar_sinistros
+from .models import Sinistro
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Os planos esperados são os do SQLite.')
+class PlanoConsultasSinistrosTests(PlanoDeConsultaMixin, TestCase):
+    """Planos de execução das consultas de listar_sinistros (com filtros) e da exportação."""
+
+    def lista(self, parametros=''):
+        # Reproduz a primeira página de listar_sinistros para os parâmetros informados
+        sinistros, ordenacao = filtrar_sinistros(QueryDict(parametros))
+        return sinistros.select_related('veiculo', 'veiculo__empresa').order_by(*ordenacao)[:51]
+
+    def test_lista_usa_indice_por_data(self):
+        plano = self.assertUsaIndice(self.lista(), 'sinistro_data_idx')
+        # Apenas os empates na mesma data são ordenados pela placa, nunca a lista inteira
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plano)
+
+    def test_faceta_de_tipo_usa_indice(self):
+        self.assertUsaIndice(self.lista('tipo=roubo'), 'sinistro_tipo_data_idx')
+
+    def test_faceta_de_status_usa_indice(self):
+        self.assertUsaIndice(self.lista('status=aberto'), 'sinistro_status_data_idx')
+
+    def test_periodo_usa_busca_no_indice_por_data(self):
+        plano = self.assertUsaIndice(self.lista('data_inicio=2026-01-01&data_fim=2026-01-31'), 'sinistro_data_idx')
+        self.assertTrue(any(l.startswith('SEARCH sinistros_sinistro USING INDEX sinistro_data_idx') for l in plano), plano)
+
+    def test_busca_por_rotulo_e_veiculo_nao_varre_tabelas(self):
+        # "Colisão" vira tipo_sinistro = 'colisao'; o restante passa pelo índice de trigramas dos veículos
+        self.assertSemVarreduraCompleta(self.lista('q=Colisão'), permitir_ordenacao=True)
+        self.assertSemVarreduraCompleta(self.lista('q=ABC-1234'), permitir_ordenacao=True)
+
+
+class OrcamentoConsultasSinistrosTests(OrcamentoConsultasMixin, TestCase):
+    """Consultas das telas de sinistros."""
+    modulo_urls = 'sinistros.urls'
+    ORCAMENTOS = {
+        'registrar_sinistro': 2,
+        'listar_sinistros': 4,
+        'exportar_sinistros': 3,
+        'excluir_sinistro': 3,
+    }
+
+    def argumentos_url(self, nome):
+        return {'pk': self.sinistro.pk} if nome == 'excluir_sinistro' else {}
+
+
+class ExportacaoSinistrosTests(TestCase):
+    """Exportação em streaming dos sinistros (exportar_sinistros): mesmos filtros e ordem da lista."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('exportacao', password='senha-de-teste')
+        cls.empresas = criar_frota(3)
+        veiculo = Veiculo.ativos.filter(empresa=cls.empresas[0]).order_by('placa').last()
+        Sinistro.objects.create(
+            veiculo=veiculo, data_sinistro=date.today(), tipo_sinistro='roubo',
+            descricao='Roubo, com "aspas"; e ponto e vírgula.', status_sinistro='em_analise',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def exportar(self, **parametros):
+        resposta = self.client.get(reverse('sinistros:exportar_sinistros'), parametros)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta, b''.join(resposta.streaming_content).decode('utf-8')
+
+    def ids_da_lista(self, **parametros):
+        resposta = self.client.get(reverse('sinistros:listar_sinistros'), parametros)
+        return [sinistro.pk for sinistro in resposta.context['sinistros']]
+
+    def test_csv_segue_a_lista(self):
+        for parametros in ({}, {'tipo': 'colisao'}, {'empresa': self.empresas[0].pk}, {'q': 'A001'}):
+            with self.subTest(**parametros):
+                resposta, conteudo = self.exportar(**parametros)
+                self.assertEqual(resposta['Content-Type'], 'text/csv; charset=utf-8')
+                self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="sinistros.csv"')
+                cabecalho, *linhas = csv.reader(io.StringIO(conteudo))
+                self.assertEqual(cabecalho, [nome for nome, _ in COLUNAS_EXPORTACAO_SINISTROS])
+                ids = [int(linha[0]) for linha in linhas]
+                self.assertTrue(ids)
+                self.assertEqual(ids, self.ids_da_lista(**parametros))
+        # Campos com separadores e aspas voltam intactos
+        _, conteudo = self.exportar(tipo='roubo')
+        [linha] = list(csv.DictReader(io.StringIO(conteudo)))
+        self.assertEqual(linha['descricao'], 'Roubo, com "aspas"; e ponto e vírgula.')
+        self.assertEqual(linha['data_sinistro'], date.today().isoformat())
+
+    def test_ndjson(self):
+        resposta, conteudo = self.exportar(formato='ndjson', status='aberto')
+        self.assertEqual(resposta['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="sinistros.ndjson"')
+        registros = [json.loads(linha) for linha in conteudo.splitlines()]
+        self.assertEqual([registro['id'] for registro in registros], self.ids_da_lista(status='aberto'))
+        self.assertEqual({registro['tipo_sinistro'] for registro in registros}, {'colisao'})
+
+    def test_formato_desconhecido_recusado(self):
+        resposta = self.client.get(reverse('sinistros:exportar_sinistros'), {'formato': 'json'})
+        self.assertEqual(resposta.status_code, 400)
+
+
+class ListaAssincronaSinistrosTests(TestCase):
+    """View assíncrona da lista de sinistros (core/assincrono.py), pelo AsyncClient."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('assincrono', password='senha-de-teste')
+        cls.empresas = criar_frota(3)
+
+    async def test_anonimo_vai_para_o_login(self):
+        url = reverse('sinistros:listar_sinistros')
+        resposta = await self.async_client.get(url)
+        self.assertRedirects(resposta, f'{settings.LOGIN_URL}?next={url}', fetch_redirect_response=False)
+
+    async def test_pagina_por_cursor_e_facetas(self):
+        await self.async_client.aforce_login(self.usuario)
+        url = reverse('sinistros:listar_sinistros')
+        # Mais recentes primeiro: o da primeira empresa (ontem) até o da terceira
+        ordenados = Sinistro.objects.order_by('-data_sinistro', 'veiculo__placa', 'id').values_list('pk', flat=True)
+        esperados = [pk async for pk in ordenados]
+        resposta = await self.async_client.get(url, {'por_pagina': 2})
+        pagina = resposta.context['sinistros']
+        self.assertEqual([sinistro.pk for sinistro in pagina], esperados[:2])
+        self.assertEqual(resposta.context['total_sinistros'], 3)
+        facetas_tipo = {chave: n for chave, _, n, _ in resposta.context['facetas_tipo']}
+        self.assertEqual(facetas_tipo['colisao'], 3)
+
+        resposta = await self.async_client.get(url, {'por_pagina': 2, 'cursor': pagina.proximo_cursor})
+        self.assertEqual([sinistro.pk for sinistro in resposta.context['sinistros']], esperados[2:])
+        self.assertFalse(resposta.context['sinistros'].tem_proxima)
 
-# Create your tests here.
+        resposta = await self.async_client.get(url, {'empresa': self.empresas[1].pk})
+        self.assertEqual(
+            [sinistro.veiculo.empresa_id for sinistro in resposta.context['sinistros']], [self.empresas[1].pk]
+        )
+        self.assertEqual(resposta.context['total_sinistros'], 1)
@@ -8,6 +8,7 @@ app_name = 'sinistros'
 urlpatterns = [
     path('registrar/', views.registrar_sinistro, name='registrar_sinistro'),
     path('lista/', views.listar_sinistros, name='listar_sinistros'),
+    path('exportar/', views.exportar_sinistros, name='exportar_sinistros'), # Exportação em streaming (CSV/NDJSON)
     # NOVA URL para excluir um sinistro
     path('excluir/<int:pk>/', views.excluir_sinistro, name='excluir_sinistro'),
 ]
\ No newline at end of file
@@ -1,13 +1,21 @@
 # backend/sinistros/views.py
 
+import asyncio # Consultas independentes em paralelo nas views assíncronas
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required # Decorador para exigir login
 from django.contrib import messages # Para exibir mensagens de sucesso/erro
+from django.http import HttpResponseBadRequest
 from django.urls import reverse
 from django.db.models import Q # Para busca
 
 from .models import Sinistro # Importa o modelo Sinistro
-from .forms import SinistroForm # Importa o formulário que acabamos de criar
+from .forms import SinistroForm, FiltroSinistrosForm # Importa os formulários do app
+from .consultas import COLUNAS_EXPORTACAO_SINISTROS, acontar_facetas, filtrar_sinistros # Filtros compartilhados com a exportação
+from core.assincrono import renderizar # Utilitários das views assíncronas
+from core.exportacao import formato_solicitado, resposta_exportacao # Exportação em streaming (CSV/NDJSON)
+from core.paginacao import apagina_da_requisicao # Paginação por chave
 
 
 @login_required
@@ -34,34 +42,63 @@ def registrar_sinistro(request):
 
 
 @login_required
-def listar_sinistros(request):
+async def listar_sinistros(request):
     """
-    View para listar todos os sinistros.
-    Permite busca por tipo de sinistro, placa do veículo ou status.
+    View para listar os sinistros, com busca e filtros por faceta (sinistros/consultas.py).
+    - Facetas: tipo, status, seguradora (com contagens) e empresa; período por data do sinistro.
+    - A busca livre aceita rótulos ("Colisão", "Em Análise") e dados do veículo (placa, modelo, etc.).
+    - As contagens de todas as facetas vêm de uma única consulta de agregação condicional.
+    - A lista é paginada por chave (data do sinistro, placa, id).
+    - View assíncrona (core/assincrono.py): a página e as facetas são consultadas ao mesmo tempo.
     """
-    # Inicializa a queryset com todos os sinistros, ordenados por data de sinistro mais recente
     # select_related('veiculo', 'veiculo__empresa') otimiza a consulta para buscar dados relacionados
-    sinistros = Sinistro.objects.all().select_related('veiculo', 'veiculo__empresa').order_by('-data_sinistro')
-    
+    sinistros = Sinistro.objects.all().select_related('veiculo', 'veiculo__empresa')
+
     query = request.GET.get('q') # Termo de busca
 
-    if query:
-        # Filtra sinistros usando Q objects para buscar em múltiplos campos
-        sinistros = sinistros.filter(
-            Q(tipo_sinistro__icontains=query) | # Busca por tipo de sinistro
-            Q(status_sinistro__icontains=query) | # Busca por status
-            Q(veiculo__placa__icontains=query) | # Busca por placa do veículo
-            Q(veiculo__modelo__icontains=query) # Busca por modelo do veículo
-        ).distinct() # distinct() para evitar duplicatas em casos de OR em campos relacionados
+    # Aplica os filtros (sinistros/consultas.py), os mesmos usados pela exportação da lista
+    filtros = FiltroSinistrosForm(request.GET) # Validado uma vez; reexibe os filtros escolhidos no template
+    await sync_to_async(filtros.is_valid)() # A validação da empresa consulta o banco
+    sinistros, ordenacao = filtrar_sinistros(filtros, sinistros)
 
+    if query:
         messages.info(request, f"Exibindo resultados para a busca por sinistro: '{query}'")
 
+    # Pagina a lista (mais recentes primeiro) enquanto as facetas são contadas;
+    # as facetas também fornecem o total, sem um COUNT separado
+    pagina, facetas = await asyncio.gather(
+        apagina_da_requisicao(request, sinistros, ordenacao),
+        acontar_facetas(filtros),
+    )
+
     context = {
-        'sinistros': sinistros,
+        'sinistros': pagina,
+        'pagina': pagina,
         'query': query,
-        'total_sinistros': sinistros.count(),
+        'filtros': filtros,
+        'facetas_tipo': facetas['tipo'],
+        'facetas_status': facetas['status'],
+        'facetas_seguradora': facetas['seguradora'],
+        'total_sinistros': facetas['total'],
     }
-    return render(request, 'sinistros/listar_sinistros.html', context)
+    return await renderizar(request, 'sinistros/listar_sinistros.html', context)
+
+
+@login_required
+def exportar_sinistros(request):
+    """
+    Exporta os sinistros em CSV (padrão) ou NDJSON ('formato=ndjson').
+    Aceita a mesma busca e os mesmos filtros de listar_sinistros e mantém a mesma ordenação.
+    O arquivo é enviado em streaming, sem carregar todos os sinistros na memória.
+    Um formato desconhecido é recusado (400).
+    """
+    try:
+        formato = formato_solicitado(request.GET)
+    except ValueError as erro:
+        return HttpResponseBadRequest(str(erro))
+    sinistros, ordenacao = filtrar_sinistros(request.GET)
+    sinistros = sinistros.order_by(*ordenacao)
+    return resposta_exportacao(sinistros, COLUNAS_EXPORTACAO_SINISTROS, formato, 'sinistros')
 
 # backend/sinistros/views.py
 
@@ -85,7 +122,8 @@ def excluir_sinistro(request, pk): # Recebe o PK (Primary Key) do sinistro a ser
     É recomendável adicionar uma confirmação extra no template.
     """
     # Tenta obter o objeto Sinistro pelo ID (pk). Se não encontrar, retorna um erro 404.
-    sinistro = get_object_or_404(Sinistro, pk=pk)
+    # O veículo vem na mesma consulta: a confirmação e a mensagem exibem a placa
+    sinistro = get_object_or_404(Sinistro.objects.select_related('veiculo'), pk=pk)
 
     if request.method == 'POST': # Garante que a ação seja via POST para segurança
         sinistro.delete() # Exclui o sinistro do banco de dados
@@ -1,7 +1,7 @@
 # backend/veiculos/admin.py
 
 from django.contrib import admin # Importa o módulo admin do Django
-from .models import Empresa, Veiculo # Importa os modelos Empresa e Veiculo do mesmo diretório ('.')
+from .models import Empresa, ExclusaoEmpresa, Veiculo # Importa os modelos do mesmo diretório ('.')
 
 # Registra o modelo Empresa no painel de administração
 @admin.register(Empresa) # Decorador que registra o modelo Empresa no admin
@@ -58,9 +58,29 @@ class VeiculoAdmin(admin.ModelAdmin):
             'description': 'Informações relativas ao seguro do veículo.'
         }),
         ('Status do Sistema', {
-            'fields': (('data_cadastro', 'ativo'),),
+            'fields': (('data_cadastro', 'ativo', 'data_desativacao'),),
             'classes': ('collapse',), # Faz o grupo ser retrátil
         }),
     )
     # Torna certos campos somente leitura
-    readonly_fields = ('numero_registro', 'data_cadastro',)
\ No newline at end of file
+    readonly_fields = ('numero_registro', 'data_cadastro', 'data_desativacao',)
+
+# Registra o modelo ExclusaoEmpresa no painel de administração (somente consulta)
+@admin.register(ExclusaoEmpresa)
+class ExclusaoEmpresaAdmin(admin.ModelAdmin):
+    """
+    Exclusões de empresas em segundo plano (veiculos/exclusao.py).
+    São criadas pela tela de empresas e executadas pelo próprio sistema: aqui apenas são consultadas.
+    """
+    list_display = (
+        'razao_social', 'status', 'veiculos_excluidos', 'sinistros_excluidos',
+        'tentativas', 'data_solicitacao', 'data_conclusao'
+    )
+    list_filter = ('status',)
+    search_fields = ('razao_social',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,87 @@
+# backend/veiculos/api.py
+
+"""
+Recursos 'veiculos' e 'empresas' da API JSON somente leitura (core/api.py).
+Os filtros são os mesmos de listar_carros ('empresa' e 'q') e listar_empresas ('q').
+Também as sugestões por prefixo dos campos com autocompletar (veiculos/sugestoes.py).
+"""
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+
+from core.api import VERSAO_API, detalhar_recurso, listar_recurso, login_obrigatorio_api, resposta_erro
+
+from .consultas import COLUNAS_EXPORTACAO_VEICULOS, filtrar_empresas, filtrar_veiculos
+from .models import Empresa, Veiculo
+from .sugestoes import LIMITE_SUGESTOES, sugerir
+
+# Campos expostos: nome na API -> caminho no ORM (os mesmos nomes da exportação, mais os ids)
+CAMPOS_API_VEICULOS = {
+    'id': 'id',
+    **dict(COLUNAS_EXPORTACAO_VEICULOS),
+    'empresa_id': 'empresa_id',
+}
+CAMPOS_API_EMPRESAS = {
+    'id': 'id',
+    'razao_social': 'razao_social',
+    'cnpj': 'cnpj',
+    'data_cadastro': 'data_cadastro',
+}
+
+
+@login_obrigatorio_api
+def listar_veiculos_api(request):
+    """GET /api/v1/veiculos/?empresa=&q=&fields=&cursor=&por_pagina= — veículos ativos."""
+    veiculos, ordenacao = filtrar_veiculos(request.GET)
+    return listar_recurso(request, 'veiculos', veiculos, CAMPOS_API_VEICULOS, ordenacao)
+
+
+@login_obrigatorio_api
+def detalhar_veiculo_api(request, pk):
+    """GET /api/v1/veiculos/<id>/?fields= — um veículo (inclusive inativo)."""
+    return detalhar_recurso(request, 'veiculos', Veiculo.objects.all(), CAMPOS_API_VEICULOS, pk)
+
+
+@login_obrigatorio_api
+def listar_empresas_api(request):
+    """GET /api/v1/empresas/?q=&fields=&cursor=&por_pagina="""
+    empresas, ordenacao = filtrar_empresas(request.GET)
+    return listar_recurso(request, 'empresas', empresas, CAMPOS_API_EMPRESAS, ordenacao)
+
+
+@login_obrigatorio_api
+def detalhar_empresa_api(request, pk):
+    """GET /api/v1/empresas/<id>/?fields="""
+    return detalhar_recurso(request, 'empresas', Empresa.objects.all(), CAMPOS_API_EMPRESAS, pk)
+
+
+def _resposta_sugestoes(request, recurso):
+    """Sugestões de 'recurso' para ?q= (no máximo ?limite=), com cache curto também no navegador."""
+    try:
+        limite = int(request.GET.get('limite') or LIMITE_SUGESTOES)
+    except ValueError:
+        return resposta_erro("O parâmetro 'limite' deve ser um número inteiro.")
+    termo = request.GET.get('q', '')
+    response = JsonResponse({
+        'versao': VERSAO_API,
+        'recurso': recurso,
+        'termo': termo,
+        'resultados': sugerir(recurso, termo, limite),
+    })
+    # Repetir um prefixo (apagar e redigitar) não volta ao servidor
+    patch_cache_control(response, private=True, max_age=getattr(settings, 'AUTO_FROTA_CACHE_SUGESTOES', 60))
+    return response
+
+
+@login_obrigatorio_api
+def sugerir_veiculos_api(request):
+    """GET /api/v1/sugestoes/veiculos/?q=&limite= — veículos ativos por prefixo de placa, modelo ou empresa."""
+    return _resposta_sugestoes(request, 'veiculos')
+
+
+@login_obrigatorio_api
+def sugerir_empresas_api(request):
+    """GET /api/v1/sugestoes/empresas/?q=&limite= — empresas por prefixo da razão social."""
+    return _resposta_sugestoes(request, 'empresas')
+
@@ -0,0 +1,292 @@
+# backend/veiculos/busca.py
+
+"""
+Busca textual de veículos por trigramas.
+
+Em vez de aplicar LIKE '%termo%' (que obriga o banco a varrer a tabela inteira), cada
+campo pesquisável é quebrado em trigramas e gravado na tabela TermoBusca, que possui
+índice por trigrama. Uma busca vira então uma consulta indexada: "quais veículos possuem
+todos os trigramas do termo digitado no mesmo campo?".
+
+Exemplo: 'ONIX' gera os trigramas '  O', ' ON', 'ONI' e 'NIX'. Os dois primeiros
+(com espaços à esquerda) marcam o início de uma palavra e permitem buscas por prefixo
+mesmo com termos de 1 ou 2 caracteres.
+
+Um termo que é uma placa completa, em qualquer grafia ('ABC-1234', 'abc 1234' ou a versão Mercosul
+'ABC1C34'), não passa pelos trigramas: vira uma comparação exata com a chave canônica da placa
+(Veiculo.placa_chave: na frota ativa, índice único parcial 'veiculo_ativo_placa_chave_unica';
+com os desativados, índice 'veiculo_placa_chave_idx').
+"""
+
+import re # Separa os textos em palavras
+import unicodedata # Remove acentos para que 'Colisão' e 'COLISAO' sejam equivalentes
+
+from django.db import connections, router, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import Replace, Upper
+
+from .models import TermoBusca, Veiculo, chave_placa, chave_placa_completa
+
+# Peso de cada campo na relevância do resultado (quanto maior, mais relevante)
+PESOS_CAMPOS = {
+    'placa': 50,
+    'renavam': 40,
+    'chassi': 40,
+    'modelo': 20,
+    'razao_social': 10,
+}
+# Bônus quando o termo aparece no início de uma palavra do campo (busca por prefixo)
+BONUS_PREFIXO = 5
+
+# Caminho de cada campo indexado a partir do modelo Veiculo
+CAMINHOS_CAMPOS = {
+    'placa': 'placa',
+    'renavam': 'renavam',
+    'chassi': 'chassi',
+    'modelo': 'modelo',
+    'razao_social': 'empresa__razao_social',
+}
+
+# Campos de código (placa, chassi, renavam) são indexados sem separadores: 'ABC-1234' vira 'ABC1234'
+CAMPOS_CODIGO = ('placa', 'chassi', 'renavam')
+
+# Quantidade de veículos processados por vez na reindexação completa
+TAMANHO_LOTE_REINDEXACAO = 500
+# Quantidade de veículos lidos por transação no preenchimento da chave da placa
+TAMANHO_LOTE_CHAVE_PLACA = 2000
+
+
+def normalizar(texto):
+    """Converte o texto para maiúsculas e sem acentos."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return texto.upper()
+
+
+def palavras(texto, codigo=False):
+    """
+    Quebra o texto normalizado em palavras alfanuméricas.
+    Para campos de código, junta tudo em uma única palavra (remove hífens e espaços).
+    """
+    partes = re.findall(r'[A-Z0-9]+', normalizar(texto))
+    if codigo:
+        return [''.join(partes)] if partes else []
+    return partes
+
+
+def trigramas(palavra):
+    """Todos os trigramas de uma palavra, incluindo os dois que marcam o início ('  A', ' AB')."""
+    preenchida = '  ' + palavra
+    return {preenchida[i:i + 3] for i in range(len(preenchida) - 2)}
+
+
+def _trigramas_de_prefixo(palavra):
+    """Trigramas que só existem quando a palavra começa com o termo buscado."""
+    preenchida = '  ' + palavra
+    return {preenchida[i:i + 3] for i in range(min(2, len(palavra)))}
+
+
+def _trigramas_internos(palavra):
+    """Trigramas da própria palavra, sem marcação de início (casam em qualquer posição)."""
+    return {palavra[i:i + 3] for i in range(len(palavra) - 2)}
+
+
+def textos_indexaveis(veiculo):
+    """Retorna um dicionário {campo: texto} com os valores pesquisáveis de um veículo."""
+    textos = {}
+    for campo, caminho in CAMINHOS_CAMPOS.items():
+        valor = veiculo
+        for parte in caminho.split('__'):
+            valor = getattr(valor, parte)
+        textos[campo] = valor
+    return textos
+
+
+def termos_do_veiculo(veiculo):
+    """Gera as linhas (veiculo_id, campo, trigrama) do índice correspondentes a um veículo."""
+    termos = []
+    for campo, texto in textos_indexaveis(veiculo).items():
+        gramas = set()
+        for palavra in palavras(texto, codigo=campo in CAMPOS_CODIGO):
+            gramas |= trigramas(palavra)
+        termos.extend((veiculo.pk, campo, g) for g in gramas)
+    return termos
+
+
+def _gravar_termos(termos):
+    """
+    Insere as linhas do índice com executemany.
+    O índice tem dezenas de linhas por veículo; montar uma instância de TermoBusca para cada uma
+    (como faria o bulk_create) custa muito mais do que a própria escrita no banco.
+    """
+    if not termos:
+        return
+    conexao = connections[router.db_for_write(TermoBusca)]
+    tabela = conexao.ops.quote_name(TermoBusca._meta.db_table)
+    colunas = ', '.join(conexao.ops.quote_name(c) for c in ('veiculo_id', 'campo', 'trigrama'))
+    with conexao.cursor() as cursor:
+        cursor.executemany(f'INSERT INTO {tabela} ({colunas}) VALUES (%s, %s, %s)', termos)
+
+
+def indexar_veiculos(veiculos):
+    """
+    (Re)indexa os veículos informados: remove os termos antigos e grava os novos em lote.
+    Os veículos devem vir com a empresa carregada (select_related('empresa')) para evitar N+1.
+    """
+    veiculos = list(veiculos)
+    if not veiculos:
+        return 0
+    novos = []
+    for veiculo in veiculos:
+        novos.extend(termos_do_veiculo(veiculo))
+    with transaction.atomic(using=router.db_for_write(TermoBusca)):
+        TermoBusca.objects.filter(veiculo_id__in=[v.pk for v in veiculos])._raw_delete(
+            router.db_for_write(TermoBusca)
+        )
+        _gravar_termos(novos)
+    return len(novos)
+
+
+def reindexar_todos(lote=TAMANHO_LOTE_REINDEXACAO):
+    """
+    Reconstrói o índice de busca de todos os veículos, em lotes de tamanho fixo.
+    Retorna a quantidade de veículos indexados.
+    """
+    total = 0
+    TermoBusca.objects.all()._raw_delete(router.db_for_write(TermoBusca)) # DELETE direto, sem carregar as linhas
+    ultimo_id = 0
+    while True:
+        # Percorre a tabela pela chave primária para manter o custo de cada lote constante
+        veiculos = list(
+            Veiculo.objects.select_related('empresa').filter(pk__gt=ultimo_id).order_by('pk')[:lote]
+        )
+        if not veiculos:
+            break
+        # O índice já foi esvaziado acima: basta inserir os termos, sem apagar por veículo
+        novos = []
+        for veiculo in veiculos:
+            novos.extend(termos_do_veiculo(veiculo))
+        _gravar_termos(novos)
+        total += len(veiculos)
+        ultimo_id = veiculos[-1].pk
+    return total
+
+
+def preencher_chaves_placa(lote=TAMANHO_LOTE_CHAVE_PLACA, progresso=None):
+    """
+    Recalcula a chave canônica da placa (Veiculo.placa_chave) de todos os veículos, em lotes
+    percorridos pela chave primária, cada lote na sua transação. Só as chaves diferentes são gravadas:
+    pode ser interrompido e executado de novo a qualquer momento.
+    'progresso' (opcional) é chamado com (percorridos, atualizados) ao fim de cada lote.
+    Retorna a tupla (percorridos, atualizados).
+    """
+    percorridos = atualizados = 0
+    ultimo_id = 0
+    while True:
+        veiculos = list(
+            Veiculo.objects.filter(pk__gt=ultimo_id).order_by('pk').only('pk', 'placa', 'placa_chave')[:lote]
+        )
+        if not veiculos:
+            break
+        alterados = []
+        for veiculo in veiculos:
+            chave = chave_placa(veiculo.placa)
+            if veiculo.placa_chave != chave:
+                veiculo.placa_chave = chave
+                alterados.append(veiculo)
+        with transaction.atomic():
+            # A chave não aparece nas telas: a versão (cache das linhas) não muda
+            Veiculo.objects.bulk_update(alterados, ['placa_chave'])
+        percorridos += len(veiculos)
+        atualizados += len(alterados)
+        ultimo_id = veiculos[-1].pk
+        if progresso:
+            progresso(percorridos, atualizados)
+    return percorridos, atualizados
+
+
+def _relevancia_do_campo(apelido, termo, peso, codigo):
+    """
+    Expressão de relevância de um campo: correspondência exata vale mais que prefixo,
+    que vale mais que uma ocorrência no meio do texto.
+    """
+    exato, prefixo, contem = ('exact', 'startswith', 'contains') if codigo else ('iexact', 'istartswith', 'icontains')
+    return Case(
+        When(**{f'{apelido}__{exato}': termo}, then=Value(peso + 2 * BONUS_PREFIXO)),
+        When(**{f'{apelido}__{prefixo}': termo}, then=Value(peso + BONUS_PREFIXO)),
+        When(**{f'{apelido}__{contem}': termo}, then=Value(peso)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def buscar_veiculos(termo, queryset=None):
+    """
+    Filtra a queryset de veículos pelo termo de busca usando o índice de trigramas.
+    Um veículo é retornado quando todos os trigramas do termo aparecem em um mesmo campo
+    (placa, renavam, chassi, modelo ou razão social da empresa).
+    O resultado vem anotado com 'relevancia' (soma dos pesos dos campos encontrados,
+    com bônus para correspondência exata ou no início do campo) e deve ser ordenado por ela.
+    Uma placa completa é procurada pela chave canônica (ver o docstring do módulo).
+    """
+    if queryset is None:
+        queryset = Veiculo.objects.all()
+
+    chave = chave_placa_completa(termo)
+    if chave:
+        # Placa completa: uma consulta exata no índice da chave, com a relevância máxima da placa
+        return queryset.filter(placa_chave=chave).annotate(
+            relevancia=Value(PESOS_CAMPOS['placa'] + 2 * BONUS_PREFIXO, output_field=IntegerField())
+        )
+
+    termos_texto = palavras(termo)
+    if not termos_texto:
+        # Termo só com pontuação: nenhum resultado, mas ainda anotado (a ordenação usa 'relevancia')
+        return queryset.none().annotate(relevancia=Value(0, output_field=IntegerField()))
+
+    # Trigramas obrigatórios: palavras curtas (< 3 letras) só podem ser buscadas como prefixo
+    gramas_texto = set()
+    for palavra in termos_texto:
+        gramas_texto |= _trigramas_internos(palavra) if len(palavra) >= 3 else _trigramas_de_prefixo(palavra)
+
+    # Para campos de código, o termo também é comparado sem separadores ('ABC 1234' == 'ABC1234')
+    codigo = palavras(termo, codigo=True)[0]
+    gramas_codigo = _trigramas_internos(codigo) if len(codigo) >= 3 else _trigramas_de_prefixo(codigo)
+
+    # Candidatos: veículos que possuem, em um mesmo campo, todos os trigramas procurados.
+    # A agregação roda apenas sobre o índice (trigrama, campo, veiculo), sem tocar na tabela de veículos.
+    candidatos = (
+        TermoBusca.objects
+        .filter(
+            Q(campo__in=CAMPOS_CODIGO, trigrama__in=gramas_codigo)
+            | (~Q(campo__in=CAMPOS_CODIGO) & Q(trigrama__in=gramas_texto))
+        )
+        .values('veiculo', 'campo')
+        .annotate(encontrados=Count('id'))
+        .filter(encontrados=Case(
+            When(campo__in=CAMPOS_CODIGO, then=Value(len(gramas_codigo))),
+            default=Value(len(gramas_texto)),
+        ))
+        .values('veiculo')
+    )
+
+    # A relevância é calculada apenas sobre os candidatos, direto nas colunas do veículo
+    apelidos = {}
+    relevancia = Value(0)
+    for campo, peso in PESOS_CAMPOS.items():
+        apelido = f'busca_{campo}'
+        caminho = CAMINHOS_CAMPOS[campo]
+        if campo in CAMPOS_CODIGO:
+            # Compara sem hífen e em maiúsculas, do mesmo jeito que o campo foi indexado
+            apelidos[apelido] = Replace(Upper(caminho), Value('-'), Value(''))
+            relevancia += _relevancia_do_campo(apelido, codigo, peso, codigo=True)
+        else:
+            apelidos[apelido] = F(caminho)
+            relevancia += _relevancia_do_campo(apelido, termo.strip(), peso, codigo=False)
+
+    return (
+        queryset
+        .filter(pk__in=candidatos) # Usa o índice por trigrama
+        .alias(**apelidos)
+        .annotate(relevancia=relevancia)
+    )
@@ -0,0 +1,108 @@
+# backend/veiculos/consultas.py
+
+"""
+Consultas de veículos compartilhadas pelas listagens HTML, exportações e comandos.
+Mantém em um só lugar os filtros aceitos por 'listar_carros', para que a exportação
+de uma lista traga exatamente os mesmos veículos exibidos na tela.
+"""
+
+from datetime import timedelta # Cálculo da data limite dos alertas de vencimento
+
+import re
+
+from .busca import buscar_veiculos
+from .models import Empresa, Veiculo, chave_cnpj, chave_texto
+from .sugestoes import intervalo_de_prefixo
+
+# Ordenação padrão da lista de veículos (o id desempata para a paginação por chave)
+ORDENACAO_VEICULOS = ('placa', 'id')
+# Com busca textual, os resultados mais relevantes vêm primeiro
+ORDENACAO_BUSCA_VEICULOS = ('-relevancia', 'placa', 'id')
+# Ordenação da lista de empresas
+ORDENACAO_EMPRESAS = ('razao_social', 'id')
+# Com busca, a ordenação segue o índice consultado (CNPJ ou chave da razão social)
+ORDENACAO_BUSCA_CNPJ = ('cnpj_chave', 'id')
+ORDENACAO_BUSCA_RAZAO_SOCIAL = ('razao_social_chave', 'id')
+# Termo formado só por dígitos e pontuação de CNPJ: a busca é pelo CNPJ
+PADRAO_BUSCA_CNPJ = re.compile(r'[\d./\-\s]*\d[\d./\-\s]*')
+
+
+def filtrar_veiculos(parametros, queryset=None):
+    """
+    Aplica os filtros de 'listar_carros' sobre os veículos ativos:
+    'empresa' (id da empresa proprietária) e 'q' (busca textual).
+    Retorna a tupla (queryset, ordenacao).
+    """
+    if queryset is None:
+        queryset = Veiculo.ativos.all()
+
+    empresa = str(parametros.get('empresa') or '')
+    if empresa.isdigit(): # Frota de uma empresa (ex: operações em massa sobre a frota de um cliente)
+        queryset = queryset.filter(empresa_id=int(empresa))
+
+    query = parametros.get('q')
+    if query:
+        # Busca indexada por trigramas (placa, modelo, chassi, renavam e razão social da empresa)
+        return buscar_veiculos(query, queryset), ORDENACAO_BUSCA_VEICULOS
+    return queryset, ORDENACAO_VEICULOS
+
+
+
+def filtrar_empresas(parametros, queryset=None):
+    """
+    Aplica os filtros de 'listar_empresas' (parâmetro 'q': início da razão social ou do CNPJ).
+    Retorna a tupla (queryset, ordenacao).
+    - CNPJ (só dígitos e pontuação, em qualquer formatação): busca exata, com os 14 dígitos, ou por
+      prefixo em Empresa.cnpj_chave (índice 'empresa_cnpj_chave_idx');
+    - demais termos: prefixo da razão social, sem distinção de maiúsculas nem acentos, em
+      Empresa.razao_social_chave (índice 'empresa_razao_social_chave_idx').
+    As duas buscas são intervalos de um índice ordenado: o custo não cresce com a quantidade de empresas.
+    """
+    if queryset is None:
+        queryset = Empresa.objects.all()
+
+    query = (parametros.get('q') or '').strip()
+    if not query:
+        return queryset, ORDENACAO_EMPRESAS
+    if PADRAO_BUSCA_CNPJ.fullmatch(query):
+        chave = chave_cnpj(query)
+        if len(chave) == 14:
+            return queryset.filter(cnpj_chave=chave), ORDENACAO_BUSCA_CNPJ
+        return queryset.filter(**intervalo_de_prefixo('cnpj_chave', chave)), ORDENACAO_BUSCA_CNPJ
+    return (
+        queryset.filter(**intervalo_de_prefixo('razao_social_chave', chave_texto(query))),
+        ORDENACAO_BUSCA_RAZAO_SOCIAL,
+    )
+
+
+def veiculos_a_vencer(hoje, dias):
+    """
+    Veículos ativos cujo seguro vence entre hoje e hoje + 'dias', do vencimento mais próximo ao mais distante.
+    Usada no cálculo dos alertas de vencimento (core/alertas.py), com o índice parcial 'veiculo_ativo_vencimento_idx'.
+    """
+    return Veiculo.ativos.filter(
+        data_vencimento_seguro__gte=hoje, # Vencimento maior ou igual a hoje
+        data_vencimento_seguro__lte=hoje + timedelta(days=dias), # Vencimento menor ou igual à data limite
+    ).order_by('data_vencimento_seguro', 'id')
+
+
+# Colunas da exportação (nome da coluna, caminho do campo a partir de Veiculo)
+COLUNAS_EXPORTACAO_VEICULOS = (
+    ('numero_registro', 'numero_registro'),
+    ('placa', 'placa'),
+    ('marca', 'marca'),
+    ('modelo', 'modelo'),
+    ('chassi', 'chassi'),
+    ('renavam', 'renavam'),
+    ('ano_fabricacao', 'ano_fabricacao'),
+    ('ano_modelo', 'ano_modelo'),
+    ('zero_kilometro', 'zero_kilometro'),
+    ('nome_condutor', 'nome_condutor'),
+    ('classe_bonus', 'classe_bonus'),
+    ('seguradora', 'seguradora'),
+    ('franquia', 'franquia'),
+    ('data_vencimento_seguro', 'data_vencimento_seguro'),
+    ('empresa', 'empresa__razao_social'),
+    ('cnpj_empresa', 'empresa__cnpj'),
+    ('data_cadastro', 'data_cadastro'),
+)
@@ -0,0 +1,203 @@
+# backend/veiculos/exclusao.py
+
+"""
+Exclusão de empresas em segundo plano (modelo ExclusaoEmpresa).
+
+Excluir a empresa com empresa.delete() dentro da requisição faz o coletor de exclusão em cascata
+do Django carregar na memória todos os veículos e sinistros da empresa (para disparar os signals
+de cada um) e manter uma única transação aberta enquanto apaga tudo, bloqueando o banco.
+Aqui a exclusão vira um registro acompanhado, executado fora da requisição:
+- os veículos são excluídos em lotes de tamanho fixo (AUTO_FROTA_TAMANHO_LOTE_EXCLUSAO), cada lote em
+  uma transação curta: primeiro os dependentes em CASCADE (sinistros, termos de busca, alertas) e depois
+  os próprios veículos, com DELETE direto;
+- as estruturas derivadas (estatísticas, sinistralidade) são atualizadas uma vez por lote, pelo signal
+  veiculos_excluidos_em_lote;
+- os contadores de progresso são gravados na mesma transação do lote: se o processo for interrompido,
+  nenhum lote fica pela metade e a execução seguinte continua a partir do que ainda existe;
+- a empresa só é excluída no final, quando já não tem veículos.
+A execução logo após o pedido é uma tarefa do executor em segundo plano (core/tarefas.py, veiculos/tarefas.py).
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import F, Q, Value
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.tarefas import enfileirar
+from sinistros.models import Sinistro
+
+from .models import STATUS_EXCLUSAO_ABERTA, Empresa, ExclusaoEmpresa, Veiculo
+from .signals import veiculos_excluidos_em_lote
+
+logger = logging.getLogger(__name__)
+
+# Campos dos sinistros excluídos em cascata enviados no signal veiculos_excluidos_em_lote
+CAMPOS_SINISTROS_EXCLUIDOS = ('pk', 'veiculo_id', 'data_sinistro', 'tipo_sinistro', 'status_sinistro')
+
+
+def solicitar_exclusao(empresa, usuario=None):
+    """
+    Registra a exclusão da empresa (ou reaproveita a que já está em aberto; uma que falhou volta a
+    ficar pendente) e, com AUTO_FROTA_EXCLUSAO_EM_SEGUNDO_PLANO, registra a tarefa que a executa
+    (iniciada após o commit pelo executor de tarefas).
+    Retorna (exclusao, criada).
+    """
+    with transaction.atomic():
+        exclusao = ExclusaoEmpresa.objects.filter(empresa=empresa, status__in=STATUS_EXCLUSAO_ABERTA).first()
+        criada = exclusao is None
+        if criada:
+            exclusao = ExclusaoEmpresa.objects.create(
+                empresa=empresa,
+                razao_social=empresa.razao_social,
+                solicitado_por=usuario,
+            )
+        elif exclusao.status == 'falhou':
+            ExclusaoEmpresa.objects.filter(pk=exclusao.pk).update(status='pendente')
+            exclusao.status = 'pendente'
+
+        if settings.AUTO_FROTA_EXCLUSAO_EM_SEGUNDO_PLANO:
+            enfileirar('excluir_empresa', {'exclusao': exclusao.pk}, usuario)
+    return exclusao, criada
+
+
+def _reivindicar(pk, repetir_falhas=False):
+    """
+    Marca a exclusão como em andamento para este executor, se ela estiver disponível: pendente,
+    em andamento sem progresso há mais de AUTO_FROTA_EXCLUSAO_INATIVIDADE segundos (processo
+    interrompido) ou, com repetir_falhas, que falhou.
+    O UPDATE condicional garante que dois executores nunca processem a mesma exclusão.
+    """
+    agora = timezone.now()
+    interrompida = agora - timedelta(seconds=settings.AUTO_FROTA_EXCLUSAO_INATIVIDADE)
+    disponivel = Q(status='pendente') | Q(status='em_andamento', data_atualizacao__lt=interrompida)
+    if repetir_falhas:
+        disponivel |= Q(status='falhou')
+    return ExclusaoEmpresa.objects.filter(disponivel, pk=pk).update(
+        status='em_andamento',
+        erro='',
+        tentativas=F('tentativas') + 1,
+        data_inicio=Coalesce('data_inicio', Value(agora)),
+        data_atualizacao=agora,
+    ) == 1
+
+
+def _contar_totais(exclusao):
+    """Conta, uma única vez, os registros a excluir (base do percentual de progresso)."""
+    if exclusao.veiculos_total is not None:
+        return # Execução retomada: os totais são os da primeira contagem
+    exclusao.veiculos_total = Veiculo.objects.filter(empresa_id=exclusao.empresa_id).count()
+    exclusao.sinistros_total = Sinistro.objects.filter(veiculo__empresa_id=exclusao.empresa_id).count()
+    ExclusaoEmpresa.objects.filter(pk=exclusao.pk).update(
+        veiculos_total=exclusao.veiculos_total,
+        sinistros_total=exclusao.sinistros_total,
+    )
+
+
+def _dependentes_em_cascata():
+    """
+    Relações que apontam para Veiculo com on_delete=CASCADE (sinistros, termos de busca, alertas).
+    Nenhum desses modelos tem dependentes próprios, então cada um é apagado com um DELETE direto
+    (se um dia tiver, a chave estrangeira no banco impede a exclusão e o erro fica registrado).
+    """
+    return [
+        relacao for relacao in get_candidate_relations_to_delete(Veiculo._meta)
+        if relacao.on_delete is models.CASCADE
+    ]
+
+
+def _excluir_lote(exclusao, tamanho_lote):
+    """
+    Exclui o próximo lote de veículos da empresa com seus dependentes, em uma transação.
+    Retorna a quantidade de veículos excluídos (0 quando a empresa não tem mais veículos).
+    """
+    banco = router.db_for_write(Veiculo)
+    with transaction.atomic(using=banco):
+        veiculos = list(Veiculo.objects.filter(empresa_id=exclusao.empresa_id).order_by('pk')[:tamanho_lote])
+        if not veiculos:
+            return 0
+        ids = [veiculo.pk for veiculo in veiculos]
+
+        sinistros = []
+        for relacao in _dependentes_em_cascata():
+            dependentes = relacao.related_model._base_manager.filter(**{f'{relacao.field.name}__in': ids})
+            if relacao.related_model is Sinistro:
+                # Só as colunas usadas pelo registro de alterações e pelo resumo mensal (core/signals.py)
+                sinistros = list(dependentes.values(*CAMPOS_SINISTROS_EXCLUIDOS))
+            dependentes._raw_delete(banco) # DELETE direto, sem carregar as linhas
+        Veiculo.objects.filter(pk__in=ids)._raw_delete(banco)
+
+        ExclusaoEmpresa.objects.filter(pk=exclusao.pk).update(
+            veiculos_excluidos=F('veiculos_excluidos') + len(ids),
+            sinistros_excluidos=F('sinistros_excluidos') + len(sinistros),
+            data_atualizacao=timezone.now(),
+        )
+        # Estatísticas, sinistralidade e registro de alterações, na mesma transação da exclusão
+        veiculos_excluidos_em_lote.send(sender=Veiculo, veiculos=veiculos, sinistros=sinistros)
+    return len(ids)
+
+
+def executar_exclusao(pk, tamanho_lote=None, repetir_falhas=False, progresso=None):
+    """
+    Executa (ou retoma) a exclusão informada; 'progresso' (core/tarefas.Progresso) recebe os veículos excluídos.
+    Retorna a exclusão atualizada, ou None se ela não estava disponível (já concluída ou em
+    execução por outro processo). Em caso de erro, a exclusão fica como 'falhou' e o erro é relançado.
+    """
+    if not _reivindicar(pk, repetir_falhas):
+        return None
+    tamanho_lote = tamanho_lote or settings.AUTO_FROTA_TAMANHO_LOTE_EXCLUSAO
+    exclusao = ExclusaoEmpresa.objects.get(pk=pk)
+
+    try:
+        if exclusao.empresa_id is not None:
+            _contar_totais(exclusao)
+            excluidos = exclusao.veiculos_excluidos # Execução retomada: parte do que já foi excluído
+            while True:
+                quantidade = _excluir_lote(exclusao, tamanho_lote)
+                if not quantidade:
+                    break
+                excluidos += quantidade
+                if progresso:
+                    progresso.atualizar(excluidos, exclusao.veiculos_total, f'{excluidos} veículo(s) excluído(s)')
+        with transaction.atomic():
+            # Já sem veículos: a cascata da empresa só alcança o que foi cadastrado durante a exclusão
+            Empresa.objects.filter(pk=exclusao.empresa_id).delete()
+            ExclusaoEmpresa.objects.filter(pk=pk).update(
+                status='concluida',
+                data_atualizacao=timezone.now(),
+                data_conclusao=timezone.now(),
+            )
+    except Exception as erro:
+        logger.exception('Falha na exclusão da empresa "%s" (exclusão %s).', exclusao.razao_social, pk)
+        ExclusaoEmpresa.objects.filter(pk=pk).update(
+            status='falhou',
+            erro=f'{type(erro).__name__}: {erro}',
+            data_atualizacao=timezone.now(),
+        )
+        raise
+
+    exclusao.refresh_from_db()
+    return exclusao
+
+
+def processar_exclusoes(tamanho_lote=None, repetir_falhas=False):
+    """
+    Executa as exclusões pendentes e retoma as interrompidas, da mais antiga para a mais nova
+    (comando 'processar_exclusoes'). Uma falha não impede as demais.
+    Retorna a lista das exclusões processadas.
+    """
+    status = ['pendente', 'em_andamento'] + (['falhou'] if repetir_falhas else [])
+    pendentes = ExclusaoEmpresa.objects.filter(status__in=status).order_by('data_solicitacao')
+    processadas = []
+    for pk in list(pendentes.values_list('pk', flat=True)):
+        try:
+            exclusao = executar_exclusao(pk, tamanho_lote, repetir_falhas)
+        except Exception: # Registrada como 'falhou'; segue para a próxima
+            exclusao = ExclusaoEmpresa.objects.get(pk=pk)
+        if exclusao is not None:
+            processadas.append(exclusao)
+    return processadas
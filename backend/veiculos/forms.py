@@ -1,9 +1,109 @@
 # backend/veiculos/forms.py
 
 from django import forms # Importa o módulo forms do Django
-from .models import Veiculo, Empresa # Importa os modelos Veiculo e Empresa
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse_lazy
+from .models import COLUNAS_DUPLICIDADE, MENSAGENS_DUPLICIDADE, SEGURADORA_CHOICES, Veiculo, Empresa, digitos_verificadores_cnpj, valor_de_duplicidade # Importa os modelos Veiculo e Empresa
+from .operacoes import ACOES_EM_MASSA, CAMPOS_RENOVACAO # Operações em massa (veiculos/operacoes.py)
 import re # Importa o módulo de expressões regulares para validação de CNPJ e Placa
 
+# --- Normalização compartilhada ---
+# Usada pelos formulários e pela importação em massa (veiculos/importacao.py),
+# para que os dados cadastrados por qualquer caminho sigam o mesmo padrão.
+
+def normalizar_cnpj(cnpj):
+    """
+    Valida o CNPJ e o padroniza no formato XX.XXX.XXX/YYYY-ZZ.
+    Levanta forms.ValidationError se não houver exatamente 14 dígitos ou se os dígitos
+    verificadores não conferirem.
+    """
+    if cnpj: # Se o CNPJ não estiver vazio
+        # Remove qualquer caracter que não seja dígito para padronizar
+        cnpj_numerico = re.sub(r'[^0-9]', '', cnpj)
+
+        # Valida se o CNPJ numérico tem 14 dígitos
+        if len(cnpj_numerico) != 14:
+            raise forms.ValidationError('O CNPJ deve conter exatamente 14 dígitos.')
+
+        # Valida os dígitos verificadores (sequências repetidas, como 00.000.000/0000-00, passariam no cálculo)
+        if len(set(cnpj_numerico)) == 1 or digitos_verificadores_cnpj(cnpj_numerico[:12]) != cnpj_numerico[12:]:
+            raise forms.ValidationError('CNPJ inválido: os dígitos verificadores não conferem.')
+
+        # Expressão regular para validar o formato XX.XXX.XXX/YYYY-ZZ
+        cnpj_pattern = r'^\d{2}\.\d{3}\.\d{3}\/\d{4}\-\d{2}$'
+
+        # Se o CNPJ original não está no formato, ele o formata
+        if not re.match(cnpj_pattern, cnpj):
+            cnpj_formatado = f"{cnpj_numerico[:2]}.{cnpj_numerico[2:5]}.{cnpj_numerico[5:8]}/{cnpj_numerico[8:12]}-{cnpj_numerico[12:]}"
+            # Retorna o CNPJ formatado
+            return cnpj_formatado
+
+    # Se já estava no formato correto ou vazio, retorna o valor original
+    return cnpj
+
+
+def normalizar_placa(placa):
+    """
+    Valida a placa nos padrões antigo (AAA-1234) ou Mercosul (AAA0A00).
+    Placas antigas são mantidas com hífen; placas Mercosul são gravadas sem hífen e em maiúsculas.
+    Levanta forms.ValidationError se a placa não seguir nenhum dos padrões.
+    """
+    if placa: # Se a placa não estiver vazia
+        placa_limpa = placa.replace('-', '').upper() # Remove hífen e converte para maiúsculas para validação
+
+        # Padrão para placa Mercosul: AAA0A00 (3 letras, 1 número, 1 letra, 2 números)
+        # Ex: ABC1E23
+        mercosul_pattern = r'^[A-Z]{3}\d[A-Z]\d{2}$'
+
+        # Padrão para placa Antiga: AAA-0000 (3 letras, hífen, 4 números)
+        # Ex: ABC-1234
+        antiga_pattern = r'^[A-Z]{3}-\d{4}$'
+
+        # Primeiro, tenta validar o formato com hífen ou sem e padroniza
+        if re.match(antiga_pattern, placa):
+            # Se já está no formato antigo (com hífen), aceita como está
+            return placa
+        elif re.match(mercosul_pattern, placa_limpa): # Verifica o Mercosul sem hífen
+            # Se está no formato Mercosul (sem hífen), aceita o valor limpo
+            return placa_limpa
+        else:
+            # Se não corresponde a nenhum dos padrões válidos
+            raise forms.ValidationError('Formato de placa inválido. Use AAA-1234 ou AAA0A00.')
+
+    return placa # Retorna a placa (se vazia ou já validada)
+
+
+# --- Campo de seleção com autocompletar ---
+class SelectAutocompletar(forms.Select):
+    """
+    <select> de um ModelChoiceField que não lista o queryset inteiro: renderiza apenas a opção vazia
+    e o valor selecionado (uma consulta pela chave primária). As demais opções são sugeridas pelo
+    navegador (frontend/js/autocompletar.js) a partir da rota da API informada em 'rota'
+    (veiculos/sugestoes.py). A validação continua sendo a do campo: o valor enviado precisa
+    existir no queryset.
+    """
+
+    def __init__(self, rota, placeholder='Digite para buscar...', attrs=None):
+        attrs = {
+            'data-autocompletar': reverse_lazy(rota),
+            'data-autocompletar-placeholder': placeholder,
+            **(attrs or {}),
+        }
+        super().__init__(attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        escolhas = self.choices
+        if isinstance(escolhas, ModelChoiceIterator):
+            selecionados = [item for item in value if str(item).isdigit()] # Ignora valores inválidos enviados
+            iterador = ModelChoiceIterator(escolhas.field)
+            iterador.queryset = escolhas.queryset.filter(pk__in=selecionados) if selecionados else escolhas.queryset.none()
+            self.choices = iterador
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = escolhas
+
+
 # --- Formulário para o Modelo Empresa ---
 class EmpresaForm(forms.ModelForm):
     """
@@ -33,26 +133,7 @@ class EmpresaForm(forms.ModelForm):
     # Método para limpar e validar o campo CNPJ
     def clean_cnpj(self):
         cnpj = self.cleaned_data.get('cnpj') # Obtém o valor do CNPJ já limpo pelos validadores básicos
-
-        if cnpj: # Se o CNPJ não estiver vazio
-            # Remove qualquer caracter que não seja dígito para padronizar
-            cnpj_numerico = re.sub(r'[^0-9]', '', cnpj)
-
-            # Valida se o CNPJ numérico tem 14 dígitos
-            if len(cnpj_numerico) != 14:
-                raise forms.ValidationError('O CNPJ deve conter exatamente 14 dígitos.')
-
-            # Expressão regular para validar o formato XX.XXX.XXX/YYYY-ZZ
-            cnpj_pattern = r'^\d{2}\.\d{3}\.\d{3}\/\d{4}\-\d{2}$'
-
-            # Se o CNPJ original não está no formato, ele o formata
-            if not re.match(cnpj_pattern, cnpj):
-                cnpj_formatado = f"{cnpj_numerico[:2]}.{cnpj_numerico[2:5]}.{cnpj_numerico[5:8]}/{cnpj_numerico[8:12]}-{cnpj_numerico[12:]}"
-                # Retorna o CNPJ formatado
-                return cnpj_formatado
-            
-        # Se já estava no formato correto ou vazio, retorna o valor original
-        return cnpj
+        return normalizar_cnpj(cnpj)
 
 # --- Formulário para o Modelo Veiculo ---
 class VeiculoForm(forms.ModelForm):
@@ -105,6 +186,8 @@ class VeiculoForm(forms.ModelForm):
         # Opcional: Widgets para personalizar a apresentação dos campos HTML
         widgets = {
             'data_vencimento_seguro': forms.DateInput(attrs={'type': 'date'}), # Renderiza como um seletor de data HTML5
+            # Empresas sugeridas conforme a digitação, em vez de todas no <select>
+            'empresa': SelectAutocompletar('api_v1:sugestoes_empresas', placeholder='Digite a razão social...'),
         }
 
         # Opcional: Textos de ajuda personalizados para campos
@@ -115,46 +198,25 @@ class VeiculoForm(forms.ModelForm):
             'placa': 'Use o padrão AAA-1234 (antigo) ou AAA0A00 (Mercosul).'
         }
 
-        # Opcional: Mensagens de erro personalizadas para validação
-        error_messages = {
-            'placa': {
-                'unique': 'Já existe um veículo cadastrado com esta placa. Por favor, verifique.',
-            },
-            'chassi': {
-                'unique': 'Já existe um veículo cadastrado com este chassi. Por favor, verifique.',
-            },
-            'renavam': {
-                'unique': 'Já existe um veículo cadastrado com este RENAVAM. Por favor, verifique.',
-            },
-        }
-    
     # Método para limpar e validar o campo Placa
     def clean_placa(self):
         placa = self.cleaned_data.get('placa') # Obtém o valor da placa
+        return normalizar_placa(placa)
 
-        if placa: # Se a placa não estiver vazia
-            placa_limpa = placa.replace('-', '').upper() # Remove hífen e converte para maiúsculas para validação
-
-            # Padrão para placa Mercosul: AAA0A00 (3 letras, 1 número, 1 letra, 2 números)
-            # Ex: ABC1E23
-            mercosul_pattern = r'^[A-Z]{3}\d[A-Z]\d{2}$'
-            
-            # Padrão para placa Antiga: AAA-0000 (3 letras, hífen, 4 números)
-            # Ex: ABC-1234
-            antiga_pattern = r'^[A-Z]{3}-\d{4}$'
-
-            # Primeiro, tenta validar o formato com hífen ou sem e padroniza
-            if re.match(antiga_pattern, placa):
-                # Se já está no formato antigo (com hífen), aceita como está
-                return placa
-            elif re.match(mercosul_pattern, placa_limpa): # Verifica o Mercosul sem hífen
-                # Se está no formato Mercosul (sem hífen), aceita o valor limpo
-                return placa_limpa 
-            else:
-                # Se não corresponde a nenhum dos padrões válidos
-                raise forms.ValidationError('Formato de placa inválido. Use AAA-1234 ou AAA0A00.')
-        
-        return placa # Retorna a placa (se vazia ou já validada)
+    def clean(self):
+        """
+        Placa, chassi e renavam só podem se repetir entre veículos desativados (restrições do modelo).
+        A verificação é feita aqui para que o erro apareça no próprio campo, e não no topo do formulário.
+        A placa é comparada pela chave canônica: 'ABC-1234' colide com a sua versão Mercosul 'ABC1C34'.
+        """
+        cleaned_data = super().clean()
+        if cleaned_data.get('ativo'):
+            for campo, mensagem in MENSAGENS_DUPLICIDADE.items():
+                valor = valor_de_duplicidade(campo, cleaned_data.get(campo))
+                filtro = {COLUNAS_DUPLICIDADE[campo]: valor}
+                if valor and Veiculo.ativos.filter(**filtro).exclude(pk=self.instance.pk).exists():
+                    self.add_error(campo, mensagem)
+        return cleaned_data
 
     # Este método é executado quando o formulário é instanciado.
     # Usamos ele para adicionar a opção vazia (empty_label) aos dropdowns.
@@ -171,4 +233,97 @@ class VeiculoForm(forms.ModelForm):
             
         # Adiciona a opção "Escolha a Empresa" como a primeira no dropdown de empresa
         if 'empresa' in self.fields:
-            self.fields['empresa'].empty_label = "--- Escolha a Empresa ---"
\ No newline at end of file
+            self.fields['empresa'].empty_label = "--- Escolha a Empresa ---"
+
+# --- Formulário de Importação em Massa ---
+class ImportacaoFrotaForm(forms.Form):
+    """
+    Formulário de upload do arquivo de frota (CSV ou XLSX) processado por veiculos/importacao.py.
+    """
+    arquivo = forms.FileField(
+        label='Arquivo da Frota',
+        help_text='Arquivo .csv ou .xlsx com uma linha por veículo (o CNPJ identifica a empresa).',
+    )
+
+    def clean_arquivo(self):
+        arquivo = self.cleaned_data.get('arquivo')
+        if arquivo and not arquivo.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('Envie um arquivo .csv ou .xlsx.')
+        return arquivo
+
+
+# --- Formulário de Operações em Massa ---
+class ListaIdsField(forms.Field):
+    """Lista de ids (valores repetidos do mesmo campo, como checkboxes): retorna os ids sem repetição."""
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return sorted({int(item) for item in value})
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Seleção de veículos inválida.')
+
+
+class OperacaoEmMassaForm(forms.Form):
+    """
+    Parâmetros de uma operação em massa (veiculos/operacoes.py), validados uma vez para todos os veículos.
+    Os veículos são os marcados na lista ('veiculos') ou, com 'todos_da_busca', todos os da busca atual
+    ('empresa' e 'q', os mesmos filtros de listar_carros).
+    """
+    acao = forms.ChoiceField(choices=ACOES_EM_MASSA, label='Operação')
+    veiculos = ListaIdsField(required=False)
+    todos_da_busca = forms.BooleanField(
+        required=False,
+        label='Aplicar a todos os veículos da busca atual',
+        help_text='Em vez de apenas aos veículos marcados na página.',
+    )
+    # Filtros da busca atual (mesmos parâmetros de listar_carros)
+    q = forms.CharField(required=False, widget=forms.HiddenInput)
+    empresa = forms.IntegerField(required=False, widget=forms.HiddenInput)
+
+    # Transferência
+    empresa_destino = forms.ModelChoiceField(
+        queryset=Empresa.objects.all(),
+        required=False,
+        label='Nova Empresa',
+        empty_label='--- Escolha a Empresa ---',
+        widget=SelectAutocompletar('api_v1:sugestoes_empresas', placeholder='Digite a razão social...'),
+    )
+    # Renovação do seguro: os campos não informados são mantidos
+    seguradora = forms.ChoiceField(
+        choices=[('', '--- Manter a Seguradora ---')] + SEGURADORA_CHOICES,
+        required=False,
+        label='Seguradora',
+    )
+    franquia = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False, label='Franquia')
+    data_vencimento_seguro = forms.DateField(
+        required=False,
+        label='Vencimento do Seguro',
+        widget=forms.DateInput(attrs={'type': 'date'}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        acao = cleaned_data.get('acao')
+        if not cleaned_data.get('todos_da_busca') and not cleaned_data.get('veiculos'):
+            raise forms.ValidationError('Marque ao menos um veículo ou aplique a operação a todos os da busca.')
+        if acao == 'transferir' and not cleaned_data.get('empresa_destino'):
+            self.add_error('empresa_destino', 'Escolha a empresa que receberá os veículos.')
+        if acao == 'renovar' and all(cleaned_data.get(campo) in (None, '') for campo in CAMPOS_RENOVACAO):
+            raise forms.ValidationError('Informe a nova seguradora, franquia e/ou data de vencimento do seguro.')
+        return cleaned_data
+
+    def valores(self):
+        """Parâmetros da operação no formato de aplicar_operacao."""
+        dados = self.cleaned_data
+        return {
+            'empresa': dados.get('empresa_destino'),
+            **{campo: dados.get(campo) or None for campo in ('seguradora', 'data_vencimento_seguro')},
+            'franquia': dados.get('franquia'), # 0 é uma franquia válida
+        }
+
+    def filtros(self):
+        """Filtros da busca atual, no formato aceito por filtrar_veiculos."""
+        return {'q': self.cleaned_data.get('q') or '', 'empresa': self.cleaned_data.get('empresa') or ''}
@@ -0,0 +1,366 @@
+# backend/veiculos/importacao.py
+
+"""
+Importação em massa de frotas (Empresa/Veiculo) a partir de arquivos CSV ou XLSX.
+
+O arquivo é lido linha a linha (sem carregar tudo na memória) e processado em lotes:
+- cada linha é normalizada com as mesmas regras dos formulários (normalizar_placa, normalizar_cnpj);
+- as colisões de placa, chassi e renavam com a frota ativa são verificadas com uma consulta por campo e por lote
+  (WHERE placa_chave IN (...)), em vez de três consultas por veículo; a placa é comparada pela chave
+  canônica, em qualquer grafia;
+- os veículos válidos são gravados com bulk_create, um lote por transação.
+Linhas com problema não interrompem a importação: entram no relatório de erros com o número da linha.
+
+Colunas reconhecidas (cabeçalho sem acentos e sem diferenciar maiúsculas):
+cnpj, razao_social, marca, modelo, placa, chassi, renavam, ano_fabricacao, ano_modelo,
+zero_kilometro, nome_condutor, classe_bonus, seguradora, franquia, data_vencimento_seguro.
+A empresa é localizada pelo CNPJ; se não existir e 'razao_social' for informada, ela é criada.
+"""
+
+import csv # Leitura de arquivos CSV em streaming
+import io # Converte o upload binário em texto para o leitor CSV
+import unicodedata # Normaliza os nomes das colunas do cabeçalho
+from datetime import datetime
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .forms import normalizar_cnpj, normalizar_placa
+from .models import (
+    COLUNAS_DUPLICIDADE, MARCA_CHOICES, MENSAGENS_DUPLICIDADE, SEGURADORA_CHOICES, Empresa, Veiculo,
+    chave_cnpj, chave_texto, valor_de_duplicidade,
+)
+from .signals import empresas_criadas_em_lote, veiculos_criados_em_lote
+
+# Quantidade de linhas validadas e gravadas por vez
+TAMANHO_LOTE_IMPORTACAO = 1000
+
+# Campos do veículo preenchidos a partir do arquivo
+CAMPOS_VEICULO = [
+    'marca',
+    'modelo',
+    'placa',
+    'chassi',
+    'renavam',
+    'ano_fabricacao',
+    'ano_modelo',
+    'zero_kilometro',
+    'nome_condutor',
+    'classe_bonus',
+    'seguradora',
+    'franquia',
+    'data_vencimento_seguro',
+]
+
+# Campos com valor único no banco, verificados em lote
+CAMPOS_UNICOS = ('placa', 'chassi', 'renavam')
+
+# Erros das linhas cuja empresa não pôde ser localizada nem criada
+MENSAGEM_EMPRESA_NAO_CADASTRADA = 'Empresa não cadastrada. Informe a razão social para cadastrá-la na importação.'
+MENSAGEM_RAZAO_SOCIAL_EM_USO = 'Razão social já cadastrada para outra empresa (outro CNPJ).'
+
+# Valores aceitos como "verdadeiro" na coluna zero_kilometro
+VALORES_VERDADEIROS = {'1', 'S', 'SIM', 'X', 'TRUE', 'VERDADEIRO', 'YES'}
+
+
+class ErroImportacao(Exception):
+    """Erro que impede a leitura do arquivo como um todo (formato não suportado, cabeçalho inválido...)."""
+
+
+class ResultadoImportacao:
+    """
+    Resumo de uma importação.
+    - importados: quantidade de veículos gravados.
+    - empresas_criadas: quantidade de empresas criadas a partir do arquivo.
+    - erros: lista de tuplas (linha, campo, mensagem), na ordem do arquivo.
+    """
+
+    def __init__(self):
+        self.importados = 0
+        self.empresas_criadas = 0
+        self.erros = []
+
+    @property
+    def linhas_com_erro(self):
+        return len({linha for linha, _, _ in self.erros})
+
+    def adicionar_erro(self, linha, campo, mensagem):
+        self.erros.append((linha, campo, mensagem))
+
+
+def _normalizar_cabecalho(nome):
+    """'Data Vencimento Seguro' -> 'data_vencimento_seguro'; 'Razão Social' -> 'razao_social'."""
+    nome = unicodedata.normalize('NFKD', str(nome or '')).encode('ascii', 'ignore').decode('ascii')
+    return '_'.join(nome.strip().lower().replace('-', ' ').split())
+
+
+def _linhas_csv(arquivo):
+    """Lê um CSV (separado por vírgula ou ponto e vírgula) e gera dicionários por linha."""
+    if isinstance(arquivo, io.TextIOBase):
+        texto = arquivo
+    else:
+        texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    amostra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=',;')
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.reader(texto, dialeto)
+    cabecalho = [_normalizar_cabecalho(coluna) for coluna in next(leitor, [])]
+    for valores in leitor:
+        if any(valor.strip() for valor in valores): # Ignora linhas em branco
+            yield dict(zip(cabecalho, valores))
+        else:
+            yield None
+
+
+def _linhas_xlsx(arquivo):
+    """Lê a primeira planilha de um XLSX em modo somente leitura (streaming) e gera dicionários por linha."""
+    try:
+        import openpyxl # Dependência opcional, necessária apenas para planilhas XLSX
+    except ImportError as erro:
+        raise ErroImportacao('A importação de arquivos XLSX requer o pacote "openpyxl".') from erro
+
+    planilha = openpyxl.load_workbook(arquivo, read_only=True, data_only=True).active
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = [_normalizar_cabecalho(coluna) for coluna in next(linhas, ())]
+    for valores in linhas:
+        if any(valor not in (None, '') for valor in valores):
+            yield dict(zip(cabecalho, valores))
+        else:
+            yield None
+
+
+def ler_linhas(arquivo, nome_arquivo):
+    """
+    Escolhe o leitor pela extensão do arquivo e gera tuplas (numero_da_linha, dados).
+    A numeração segue a do arquivo (a linha 1 é o cabeçalho).
+    """
+    extensao = nome_arquivo.lower().rsplit('.', 1)[-1]
+    if extensao == 'csv':
+        linhas = _linhas_csv(arquivo)
+    elif extensao == 'xlsx':
+        linhas = _linhas_xlsx(arquivo)
+    else:
+        raise ErroImportacao('Formato de arquivo não suportado. Envie um arquivo .csv ou .xlsx.')
+
+    for numero, dados in enumerate(linhas, start=2):
+        if dados is not None:
+            yield numero, dados
+
+
+def _texto(valor):
+    """Converte o valor de uma célula em texto sem espaços nas pontas ('' para vazio)."""
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer(): # Números inteiros lidos do XLSX como float
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _escolha(valor, choices):
+    """Aceita tanto o código ('porto_seguro') quanto o nome exibido ('Porto Seguro')."""
+    texto = _texto(valor)
+    for codigo, rotulo in choices:
+        if texto.lower() in (codigo, rotulo.lower()):
+            return codigo
+    return texto # Valor desconhecido: a validação do campo acusará o erro
+
+
+def _preparar(campo, valor):
+    """Ajusta os formatos comuns em planilhas brasileiras antes da validação do campo."""
+    if campo == 'marca':
+        return _escolha(valor, MARCA_CHOICES)
+    if campo == 'seguradora':
+        return _escolha(valor, SEGURADORA_CHOICES)
+    if campo == 'placa':
+        return normalizar_placa(_texto(valor).upper())
+    if campo == 'zero_kilometro':
+        return _texto(valor).upper() in VALORES_VERDADEIROS
+    if campo == 'franquia':
+        texto = _texto(valor).replace('R$', '').strip()
+        if ',' in texto: # Formato brasileiro: 1.234,56
+            texto = texto.replace('.', '').replace(',', '.')
+        return texto
+    if campo == 'data_vencimento_seguro':
+        if isinstance(valor, datetime):
+            return valor.date()
+        texto = _texto(valor)
+        try:
+            return datetime.strptime(texto, '%d/%m/%Y').date() # Formato brasileiro: 31/12/2025
+        except ValueError:
+            return texto # Outros formatos (ex: ISO) são tratados pelo campo do modelo
+    if campo == 'nome_condutor':
+        return _texto(valor) or None # Campo opcional: vazio vira nulo, como no formulário
+    return _texto(valor)
+
+
+def _validar_linha(numero, dados, resultado):
+    """
+    Valida os campos de uma linha com as regras dos campos do modelo (tamanho, choices, tipos),
+    sem as consultas de unicidade, que são feitas depois para o lote inteiro.
+    Retorna (cnpj, razao_social, valores) ou None se a linha tiver erros.
+    """
+    valido = True
+    try:
+        cnpj = normalizar_cnpj(_texto(dados.get('cnpj')))
+        if not cnpj:
+            raise forms.ValidationError('O CNPJ da empresa é obrigatório.')
+    except forms.ValidationError as erro:
+        resultado.adicionar_erro(numero, 'cnpj', ' '.join(erro.messages))
+        cnpj, valido = None, False
+
+    valores = {}
+    for campo in CAMPOS_VEICULO:
+        campo_modelo = Veiculo._meta.get_field(campo)
+        try:
+            valores[campo] = campo_modelo.clean(_preparar(campo, dados.get(campo)), None)
+        except (ValidationError, forms.ValidationError) as erro:
+            resultado.adicionar_erro(numero, campo, ' '.join(erro.messages))
+            valido = False
+
+    if not valido:
+        return None
+    return cnpj, _texto(dados.get('razao_social')), valores
+
+
+class ImportadorFrota:
+    """
+    Processa as linhas de um arquivo em lotes, mantendo em memória apenas o lote atual
+    e o mapa CNPJ -> empresa (que cresce com o número de empresas, não de veículos).
+    Se informada, a função 'progresso' é chamada ao fim de cada lote com o número da última linha lida.
+    """
+
+    def __init__(self, tamanho_lote=TAMANHO_LOTE_IMPORTACAO, progresso=None):
+        self.tamanho_lote = tamanho_lote
+        self.progresso = progresso
+        self.resultado = ResultadoImportacao()
+        self.empresas = {} # chave do CNPJ (só dígitos) -> Empresa
+        self.empresas_recusadas = {} # chave do CNPJ -> (campo, mensagem): empresa nova que não pôde ser criada
+
+    def importar(self, linhas):
+        """Consome o iterador de (numero, dados) e retorna o ResultadoImportacao."""
+        lote = []
+        for numero, dados in linhas:
+            lote.append((numero, dados))
+            if len(lote) >= self.tamanho_lote:
+                self._concluir_lote(lote)
+                lote = []
+        if lote:
+            self._concluir_lote(lote)
+        return self.resultado
+
+    def _concluir_lote(self, lote):
+        self._processar_lote(lote)
+        if self.progresso:
+            self.progresso(lote[-1][0])
+
+    def _carregar_empresas(self, validas):
+        """Localiza (uma consulta por lote) e, se preciso, cria as empresas referenciadas no lote."""
+        # Pela chave (índice 'empresa_cnpj_chave_idx'): encontra a empresa mesmo se o CNPJ foi gravado sem pontuação
+        faltantes = {chave_cnpj(cnpj) for _, (cnpj, _, _) in validas} - self.empresas.keys()
+        if not faltantes:
+            return
+        for empresa in Empresa.objects.filter(cnpj_chave__in=faltantes):
+            self.empresas[empresa.cnpj_chave] = empresa
+
+        # Empresas ainda não cadastradas: cria as que trouxeram a razão social no arquivo.
+        # A razão social também é única: dois CNPJs novos com a mesma razão social no arquivo criam
+        # apenas a primeira empresa; as linhas do outro CNPJ entram no relatório de erros.
+        novas = {}
+        razoes_sociais = set()
+        for _, (cnpj, razao_social, _) in validas:
+            chave = chave_cnpj(cnpj)
+            if chave in self.empresas or chave in novas or chave in self.empresas_recusadas or not razao_social:
+                continue
+            if razao_social in razoes_sociais:
+                self.empresas_recusadas[chave] = ('razao_social', MENSAGEM_RAZAO_SOCIAL_EM_USO)
+                continue
+            razoes_sociais.add(razao_social)
+            # bulk_create não chama save(): as chaves são preenchidas aqui
+            novas[chave] = Empresa(
+                cnpj=cnpj, cnpj_chave=chave, razao_social=razao_social, razao_social_chave=chave_texto(razao_social),
+            )
+        if novas:
+            existentes = set(
+                Empresa.objects.filter(razao_social__in=razoes_sociais).values_list('razao_social', flat=True)
+            )
+            criar = []
+            for chave, empresa in novas.items():
+                if empresa.razao_social in existentes:
+                    self.empresas_recusadas[chave] = ('razao_social', MENSAGEM_RAZAO_SOCIAL_EM_USO)
+                else:
+                    criar.append(empresa)
+            for empresa in Empresa.objects.bulk_create(criar):
+                self.empresas[empresa.cnpj_chave] = empresa
+            if criar: # bulk_create não dispara post_save: avisa quem acompanha as empresas
+                empresas_criadas_em_lote.send(sender=Empresa, empresas=criar)
+            self.resultado.empresas_criadas += len(criar)
+
+    def _processar_lote(self, lote):
+        resultado = self.resultado
+        validas = []
+        for numero, dados in lote:
+            linha = _validar_linha(numero, dados, resultado)
+            if linha is not None:
+                validas.append((numero, linha))
+        if not validas:
+            return
+
+        with transaction.atomic():
+            self._carregar_empresas(validas)
+
+            # Uma consulta por campo único para o lote inteiro (apenas a frota ativa:
+            # veículos desativados podem ser recadastrados)
+            # (a placa é comparada pela chave canônica: ver COLUNAS_DUPLICIDADE)
+            chaves = [
+                {campo: valor_de_duplicidade(campo, valores[campo]) for campo in CAMPOS_UNICOS}
+                for _, (_, _, valores) in validas
+            ]
+            em_uso = {
+                campo: set(
+                    Veiculo.ativos.filter(**{f'{COLUNAS_DUPLICIDADE[campo]}__in': [chave[campo] for chave in chaves]})
+                    .values_list(COLUNAS_DUPLICIDADE[campo], flat=True)
+                )
+                for campo in CAMPOS_UNICOS
+            }
+
+            novos = []
+            for (numero, (cnpj, razao_social, valores)), chave in zip(validas, chaves):
+                empresa = self.empresas.get(chave_cnpj(cnpj))
+                if empresa is None:
+                    campo, mensagem = self.empresas_recusadas.get(
+                        chave_cnpj(cnpj), ('cnpj', MENSAGEM_EMPRESA_NAO_CADASTRADA)
+                    )
+                    resultado.adicionar_erro(numero, campo, mensagem)
+                    continue
+
+                colisoes = [campo for campo in CAMPOS_UNICOS if chave[campo] in em_uso[campo]]
+                if colisoes:
+                    for campo in colisoes:
+                        resultado.adicionar_erro(numero, campo, MENSAGENS_DUPLICIDADE[campo])
+                    continue
+
+                # Registra os valores para detectar duplicatas dentro do próprio lote
+                for campo in CAMPOS_UNICOS:
+                    em_uso[campo].add(chave[campo])
+                # bulk_create não passa por Veiculo.save(): as chaves da placa e do modelo são preenchidas aqui
+                novos.append(Veiculo(
+                    empresa=empresa, ativo=True, placa_chave=chave['placa'],
+                    modelo_chave=chave_texto(valores['modelo']), **valores,
+                ))
+
+            Veiculo.objects.bulk_create(novos)
+            # bulk_create não dispara post_save: avisa quem mantém índices e estatísticas
+            veiculos_criados_em_lote.send(sender=Veiculo, veiculos=novos)
+            resultado.importados += len(novos)
+
+
+def importar_frota(arquivo, nome_arquivo, tamanho_lote=TAMANHO_LOTE_IMPORTACAO, progresso=None):
+    """
+    Importa veículos (e, se necessário, empresas) de um arquivo CSV ou XLSX.
+    Levanta ErroImportacao se o arquivo não puder ser lido; erros por linha vão para o resultado.
+    """
+    return ImportadorFrota(tamanho_lote, progresso).importar(ler_linhas(arquivo, nome_arquivo))
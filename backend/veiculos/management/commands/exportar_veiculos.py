@@ -0,0 +1,33 @@
+# backend/veiculos/management/commands/exportar_veiculos.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exportacao import FORMATOS, gravar_exportacao
+from veiculos.consultas import COLUNAS_EXPORTACAO_VEICULOS, filtrar_veiculos
+
+
+class Command(BaseCommand):
+    """
+    Exporta os veículos ativos em CSV ou NDJSON, com o mesmo filtro da lista de veículos.
+    Uso: python manage.py exportar_veiculos [--formato ndjson] [--q termo] [--saida frota.csv]
+    """
+    help = 'Exporta os veículos ativos em CSV ou NDJSON (streaming, memória constante).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=sorted(FORMATOS), default='csv', help='Formato do arquivo.')
+        parser.add_argument('--q', help='Termo de busca (o mesmo da lista de veículos).')
+        parser.add_argument('--saida', help='Arquivo de destino (padrão: saída padrão).')
+
+    def handle(self, *args, **options):
+        veiculos, ordenacao = filtrar_veiculos({'q': options['q']})
+        veiculos = veiculos.order_by(*ordenacao)
+
+        if not options['saida']:
+            gravar_exportacao(veiculos, COLUNAS_EXPORTACAO_VEICULOS, options['formato'], self.stdout)
+            return
+        try:
+            with open(options['saida'], 'w', newline='', encoding='utf-8') as saida:
+                gravar_exportacao(veiculos, COLUNAS_EXPORTACAO_VEICULOS, options['formato'], saida)
+        except OSError as erro:
+            raise CommandError(f'Não foi possível gravar o arquivo: {erro}')
+        self.stderr.write(self.style.SUCCESS(f'Exportação gravada em {options["saida"]}.'))
@@ -0,0 +1,53 @@
+# backend/veiculos/management/commands/importar_frota.py
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from veiculos.importacao import TAMANHO_LOTE_IMPORTACAO, ErroImportacao, importar_frota
+
+
+class Command(BaseCommand):
+    """
+    Importa uma frota (veículos e, se necessário, empresas) de um arquivo CSV ou XLSX.
+    Uso: python manage.py importar_frota frota.csv [--lote 1000] [--relatorio erros.csv]
+    """
+    help = 'Importa veículos em massa a partir de um arquivo CSV ou XLSX.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo .csv ou .xlsx.')
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE_IMPORTACAO,
+            help='Quantidade de linhas validadas e gravadas por transação.',
+        )
+        parser.add_argument(
+            '--relatorio',
+            help='Grava o relatório de erros (linha, campo, mensagem) neste arquivo CSV.',
+        )
+
+    def handle(self, *args, **options):
+        caminho = options['arquivo']
+        try:
+            with open(caminho, 'rb') as arquivo:
+                resultado = importar_frota(arquivo, caminho, tamanho_lote=options['lote'])
+        except OSError as erro:
+            raise CommandError(f'Não foi possível abrir o arquivo: {erro}')
+        except ErroImportacao as erro:
+            raise CommandError(str(erro))
+
+        if options['relatorio']:
+            with open(options['relatorio'], 'w', newline='', encoding='utf-8') as saida:
+                escritor = csv.writer(saida)
+                escritor.writerow(['linha', 'campo', 'mensagem'])
+                escritor.writerows(resultado.erros)
+        else:
+            for linha, campo, mensagem in resultado.erros:
+                self.stderr.write(f'Linha {linha} [{campo}]: {mensagem}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.importados} veículo(s) importado(s), '
+            f'{resultado.empresas_criadas} empresa(s) criada(s), '
+            f'{resultado.linhas_com_erro} linha(s) com erro.'
+        ))
@@ -0,0 +1,36 @@
+# backend/veiculos/management/commands/preencher_chave_placa.py
+
+from django.core.management.base import BaseCommand
+
+from veiculos.busca import TAMANHO_LOTE_CHAVE_PLACA, preencher_chaves_placa
+
+
+class Command(BaseCommand):
+    """
+    Recalcula a chave canônica da placa (Veiculo.placa_chave) dos veículos já cadastrados.
+    A migração que cria o campo já preenche a chave, e os veículos gravados depois a recebem no save();
+    o comando corrige as chaves gravadas fora do save() (update() em massa, SQL direto) ou depois de uma
+    mudança na regra de chave_placa.
+    Percorre a tabela em lotes, cada lote na sua transação, e só grava as chaves diferentes:
+    pode ser interrompido e executado de novo.
+    Uso: python manage.py preencher_chave_placa [--lote 2000]
+    """
+    help = 'Preenche a chave canônica da placa de todos os veículos, em lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE_CHAVE_PLACA,
+            help='Quantidade de veículos lidos por transação.',
+        )
+
+    def handle(self, *args, **options):
+        def progresso(percorridos, atualizados):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'{percorridos} veículo(s) percorrido(s), {atualizados} chave(s) gravada(s)...')
+
+        percorridos, atualizados = preencher_chaves_placa(lote=options['lote'], progresso=progresso)
+        self.stdout.write(self.style.SUCCESS(
+            f'{percorridos} veículo(s) percorrido(s), {atualizados} chave(s) de placa gravada(s).'
+        ))
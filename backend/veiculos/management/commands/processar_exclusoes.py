@@ -0,0 +1,51 @@
+# backend/veiculos/management/commands/processar_exclusoes.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from veiculos.exclusao import processar_exclusoes
+
+
+class Command(BaseCommand):
+    """
+    Executa as exclusões de empresas pendentes e retoma as interrompidas (veiculos/exclusao.py).
+    Necessário quando AUTO_FROTA_EXCLUSAO_EM_SEGUNDO_PLANO = False e, em qualquer caso, para retomar
+    exclusões cujo processo foi encerrado no meio (reinício do servidor, por exemplo).
+    Pode ser agendado no cron, por exemplo, a cada cinco minutos:
+        */5 * * * * cd /caminho/do/backend && python manage.py processar_exclusoes
+    Uso: python manage.py processar_exclusoes [--lote 500] [--repetir-falhas]
+    """
+    help = 'Executa as exclusões de empresas pendentes e retoma as interrompidas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=settings.AUTO_FROTA_TAMANHO_LOTE_EXCLUSAO,
+            help='Quantidade de veículos (com seus sinistros) excluídos por transação.',
+        )
+        parser.add_argument(
+            '--repetir-falhas',
+            action='store_true',
+            help='Também repete as exclusões que falharam, a partir do ponto em que pararam.',
+        )
+
+    def handle(self, *args, **options):
+        exclusoes = processar_exclusoes(tamanho_lote=options['lote'], repetir_falhas=options['repetir_falhas'])
+        if not exclusoes:
+            self.stdout.write('Nenhuma exclusão pendente.')
+            return
+
+        falhas = 0
+        for exclusao in exclusoes:
+            resumo = (
+                f'Empresa "{exclusao.razao_social}": {exclusao.veiculos_excluidos} veículo(s) e '
+                f'{exclusao.sinistros_excluidos} sinistro(s) excluído(s)'
+            )
+            if exclusao.status == 'concluida':
+                self.stdout.write(self.style.SUCCESS(f'{resumo}. Exclusão concluída.'))
+            else:
+                falhas += 1
+                self.stderr.write(f'{resumo}. Falhou: {exclusao.erro}')
+        if falhas:
+            raise CommandError(f'{falhas} exclusão(ões) falharam; use --repetir-falhas para tentar novamente.')
@@ -0,0 +1,26 @@
+# backend/veiculos/management/commands/reindexar_busca.py
+
+from django.core.management.base import BaseCommand
+
+from veiculos.busca import TAMANHO_LOTE_REINDEXACAO, reindexar_todos
+
+
+class Command(BaseCommand):
+    """
+    Reconstrói do zero o índice de trigramas usado na busca de veículos.
+    Útil após cargas em massa, restauração de backup ou mudanças nas regras de indexação.
+    Uso: python manage.py reindexar_busca [--lote 500]
+    """
+    help = 'Reconstrói o índice de busca (trigramas) de todos os veículos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE_REINDEXACAO,
+            help='Quantidade de veículos processados por transação.',
+        )
+
+    def handle(self, *args, **options):
+        total = reindexar_todos(lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'{total} veículo(s) indexado(s).'))
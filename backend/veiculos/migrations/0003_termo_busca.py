@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def indexar_veiculos_existentes(apps, schema_editor):
+    # Popula o índice de busca para os veículos cadastrados antes desta migração
+    from veiculos.busca import CAMPOS_CODIGO, palavras, trigramas
+
+    Veiculo = apps.get_model('veiculos', 'Veiculo')
+    TermoBusca = apps.get_model('veiculos', 'TermoBusca')
+    termos = []
+    for veiculo in Veiculo.objects.select_related('empresa').iterator(chunk_size=500):
+        textos = {
+            'placa': veiculo.placa,
+            'renavam': veiculo.renavam,
+            'chassi': veiculo.chassi,
+            'modelo': veiculo.modelo,
+            'razao_social': veiculo.empresa.razao_social,
+        }
+        for campo, texto in textos.items():
+            gramas = set()
+            for palavra in palavras(texto, codigo=campo in CAMPOS_CODIGO):
+                gramas |= trigramas(palavra)
+            termos.extend(TermoBusca(veiculo_id=veiculo.pk, campo=campo, trigrama=g) for g in gramas)
+        if len(termos) >= 5000:
+            TermoBusca.objects.bulk_create(termos)
+            termos = []
+    TermoBusca.objects.bulk_create(termos)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0002_veiculo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='veiculo',
+            name='marca',
+            field=models.CharField(choices=[('chevrolet', 'Chevrolet'), ('fiat', 'Fiat'), ('ford', 'Ford'), ('honda', 'Honda'), ('hyundai', 'Hyundai'), ('jeep', 'Jeep'), ('mercedes-benz', 'Mercedes-Benz'), ('mitsubishi', 'Mitsubishi'), ('nissan', 'Nissan'), ('peugeot', 'Peugeot'), ('renault', 'Renault'), ('toyota', 'Toyota'), ('volkswagen', 'Volkswagen'), ('volvo', 'Volvo'), ('bmw', 'BMW'), ('audi', 'Audi')], help_text='Selecione a marca da montadora.', max_length=50, verbose_name='Marca'),
+        ),
+        migrations.AlterField(
+            model_name='veiculo',
+            name='seguradora',
+            field=models.CharField(choices=[('porto_seguro', 'Porto Seguro'), ('bradesco_seguros', 'Bradesco Seguros'), ('sulamerica', 'SulAmérica'), ('tokio_marine', 'Tokio Marine'), ('allianz', 'Allianz'), ('liberty', 'Liberty'), ('itau_seguros', 'Itaú Seguros'), ('mapfre', 'Mapfre'), ('zurich', 'Zurich'), ('hdi', 'HDI'), ('sompo', 'Sompo'), ('alfa', 'Alfa'), ('axa', 'AXA'), ('azul_seguros', 'Azul Seguros')], help_text='Selecione a seguradora.', max_length=100, verbose_name='Seguradora'),
+        ),
+        migrations.CreateModel(
+            name='TermoBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campo', models.CharField(choices=[('placa', 'Placa'), ('renavam', 'Renavam'), ('chassi', 'Chassi'), ('modelo', 'Modelo'), ('razao_social', 'Razão Social da Empresa')], max_length=20, verbose_name='Campo')),
+                ('trigrama', models.CharField(max_length=3, verbose_name='Trigrama')),
+                ('veiculo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='termos_busca', to='veiculos.veiculo', verbose_name='Veículo')),
+            ],
+            options={
+                'verbose_name': 'Termo de Busca',
+                'verbose_name_plural': 'Termos de Busca',
+                'constraints': [models.UniqueConstraint(fields=('trigrama', 'campo', 'veiculo'), name='termo_busca_unico')],
+            },
+        ),
+        migrations.RunPython(indexar_veiculos_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0003_termo_busca'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='empresa',
+            index=models.Index(fields=['razao_social', 'id'], name='empresa_razao_social_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['placa', 'id'], name='veiculo_ativo_placa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['data_vencimento_seguro', 'id'], name='veiculo_ativo_vencimento_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0004_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empresa',
+            name='versao',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Versão do Registro'),
+        ),
+        migrations.AddField(
+            model_name='veiculo',
+            name='versao',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Versão do Registro'),
+        ),
+    ]
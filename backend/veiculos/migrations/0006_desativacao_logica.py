@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0005_versao_registro'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='veiculo',
+            name='veiculo_ativo_placa_idx',
+        ),
+        migrations.AddField(
+            model_name='veiculo',
+            name='data_desativacao',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Preenchida ao desativar o veículo e limpa ao reativá-lo (vazia em desativações antigas).', null=True, verbose_name='Data de Desativação'),
+        ),
+        migrations.AlterField(
+            model_name='veiculo',
+            name='chassi',
+            field=models.CharField(max_length=17, verbose_name='Chassi'),
+        ),
+        migrations.AlterField(
+            model_name='veiculo',
+            name='placa',
+            field=models.CharField(max_length=10, verbose_name='Placa'),
+        ),
+        migrations.AlterField(
+            model_name='veiculo',
+            name='renavam',
+            field=models.CharField(max_length=11, verbose_name='Renavam'),
+        ),
+        migrations.AddConstraint(
+            model_name='veiculo',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True)), fields=('placa',), name='veiculo_ativo_placa_unica', violation_error_message='Já existe um veículo ativo cadastrado com esta placa. Por favor, verifique.'),
+        ),
+        migrations.AddConstraint(
+            model_name='veiculo',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True)), fields=('chassi',), name='veiculo_ativo_chassi_unico', violation_error_message='Já existe um veículo ativo cadastrado com este chassi. Por favor, verifique.'),
+        ),
+        migrations.AddConstraint(
+            model_name='veiculo',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True)), fields=('renavam',), name='veiculo_ativo_renavam_unico', violation_error_message='Já existe um veículo ativo cadastrado com este RENAVAM. Por favor, verifique.'),
+        ),
+    ]
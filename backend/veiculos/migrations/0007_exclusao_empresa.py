@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0006_desativacao_logica'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExclusaoEmpresa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('razao_social', models.CharField(max_length=200, verbose_name='Razão Social')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('em_andamento', 'Em andamento'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Situação')),
+                ('veiculos_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Veículos a Excluir')),
+                ('sinistros_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Sinistros a Excluir')),
+                ('veiculos_excluidos', models.PositiveIntegerField(default=0, verbose_name='Veículos Excluídos')),
+                ('sinistros_excluidos', models.PositiveIntegerField(default=0, verbose_name='Sinistros Excluídos')),
+                ('tentativas', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('erro', models.TextField(blank=True, verbose_name='Último Erro')),
+                ('data_solicitacao', models.DateTimeField(auto_now_add=True, verbose_name='Data da Solicitação')),
+                ('data_inicio', models.DateTimeField(blank=True, null=True, verbose_name='Início da Execução')),
+                ('data_atualizacao', models.DateTimeField(blank=True, null=True, verbose_name='Última Atualização')),
+                ('data_conclusao', models.DateTimeField(blank=True, null=True, verbose_name='Data da Conclusão')),
+                ('empresa', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exclusoes', to='veiculos.empresa', verbose_name='Empresa')),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Exclusão de Empresa',
+                'verbose_name_plural': 'Exclusões de Empresas',
+                'ordering': ['-data_solicitacao'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ('pendente', 'em_andamento', 'falhou'))), fields=('empresa',), name='exclusao_empresa_aberta_unica')],
+            },
+        ),
+    ]
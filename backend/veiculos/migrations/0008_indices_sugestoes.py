@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:27
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0007_exclusao_empresa'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='empresa',
+            index=models.Index(django.db.models.functions.text.Upper('razao_social'), models.F('id'), name='empresa_razao_social_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(django.db.models.functions.text.Upper('modelo'), models.F('id'), condition=models.Q(('ativo', True)), name='veiculo_ativo_modelo_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+def preencher_chaves_placa(apps, schema_editor):
+    # Os veículos já cadastrados recebem a chave aqui, em lotes percorridos pela chave primária
+    from veiculos.models import chave_placa
+
+    Veiculo = apps.get_model('veiculos', 'Veiculo')
+    ultimo_id = 0
+    while True:
+        veiculos = list(Veiculo.objects.filter(pk__gt=ultimo_id).order_by('pk').only('pk', 'placa')[:2000])
+        if not veiculos:
+            break
+        for veiculo in veiculos:
+            veiculo.placa_chave = chave_placa(veiculo.placa)
+        Veiculo.objects.bulk_update(veiculos, ['placa_chave'])
+        ultimo_id = veiculos[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0008_indices_sugestoes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='veiculo',
+            name='placa_chave',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Placa em maiúsculas, sem separadores e no padrão Mercosul: buscas exatas por qualquer grafia.', max_length=10, verbose_name='Chave da Placa'),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(fields=['placa_chave'], name='veiculo_placa_chave_idx'),
+        ),
+        migrations.RunPython(preencher_chaves_placa, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+def preencher_chaves_cnpj(apps, schema_editor):
+    # As empresas já cadastradas recebem a chave aqui, em lotes (como a placa em 0009_placa_chave)
+    from veiculos.models import chave_cnpj
+
+    Empresa = apps.get_model('veiculos', 'Empresa')
+    alteradas = []
+    for empresa in Empresa.objects.only('pk', 'cnpj').iterator(chunk_size=2000):
+        empresa.cnpj_chave = chave_cnpj(empresa.cnpj)
+        alteradas.append(empresa)
+        if len(alteradas) >= 2000:
+            Empresa.objects.bulk_update(alteradas, ['cnpj_chave'])
+            alteradas = []
+    Empresa.objects.bulk_update(alteradas, ['cnpj_chave'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0009_placa_chave'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empresa',
+            name='cnpj_chave',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Os 14 dígitos do CNPJ, sem pontuação: buscas exatas e por prefixo no índice.', max_length=14, verbose_name='Chave do CNPJ'),
+        ),
+        migrations.AddIndex(
+            model_name='empresa',
+            index=models.Index(fields=['cnpj_chave', 'id'], name='empresa_cnpj_chave_idx'),
+        ),
+        migrations.RunPython(preencher_chaves_cnpj, migrations.RunPython.noop),
+    ]
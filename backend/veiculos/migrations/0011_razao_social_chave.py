@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+def preencher_chaves_razao_social(apps, schema_editor):
+    # As empresas já cadastradas recebem a chave aqui, em lotes (como o CNPJ em 0010_cnpj_chave)
+    from veiculos.models import chave_texto
+
+    Empresa = apps.get_model('veiculos', 'Empresa')
+    alteradas = []
+    for empresa in Empresa.objects.only('pk', 'razao_social').iterator(chunk_size=2000):
+        empresa.razao_social_chave = chave_texto(empresa.razao_social)
+        alteradas.append(empresa)
+        if len(alteradas) >= 2000:
+            Empresa.objects.bulk_update(alteradas, ['razao_social_chave'])
+            alteradas = []
+    Empresa.objects.bulk_update(alteradas, ['razao_social_chave'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0010_cnpj_chave'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empresa',
+            name='razao_social_chave',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Razão social sem acentos e em maiúsculas: buscas por prefixo no índice.', max_length=255, verbose_name='Chave da Razão Social'),
+        ),
+        migrations.AddIndex(
+            model_name='empresa',
+            index=models.Index(fields=['razao_social_chave', 'id'], name='empresa_razao_social_chave_idx'),
+        ),
+        migrations.RunPython(preencher_chaves_razao_social, migrations.RunPython.noop),
+    ]
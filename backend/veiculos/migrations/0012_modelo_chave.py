@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:21
+
+from django.db import migrations, models
+
+
+def preencher_chaves_modelo(apps, schema_editor):
+    # Os veículos já cadastrados recebem a chave aqui, em lotes percorridos pela chave primária (como em 0009_placa_chave)
+    from veiculos.models import chave_texto
+
+    Veiculo = apps.get_model('veiculos', 'Veiculo')
+    ultimo_id = 0
+    while True:
+        veiculos = list(Veiculo.objects.filter(pk__gt=ultimo_id).order_by('pk').only('pk', 'modelo')[:2000])
+        if not veiculos:
+            break
+        for veiculo in veiculos:
+            veiculo.modelo_chave = chave_texto(veiculo.modelo)
+        Veiculo.objects.bulk_update(veiculos, ['modelo_chave'])
+        ultimo_id = veiculos[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0011_razao_social_chave'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='empresa',
+            name='empresa_razao_social_upper_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='veiculo',
+            name='veiculo_ativo_modelo_upper_idx',
+        ),
+        migrations.AddField(
+            model_name='veiculo',
+            name='modelo_chave',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Modelo sem acentos e em maiúsculas: sugestões por prefixo no índice.', max_length=150, verbose_name='Chave do Modelo'),
+        ),
+        migrations.AddIndex(
+            model_name='veiculo',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['modelo_chave', 'id'], name='veiculo_ativo_modelo_chave_idx'),
+        ),
+        migrations.RunPython(preencher_chaves_modelo, migrations.RunPython.noop),
+    ]
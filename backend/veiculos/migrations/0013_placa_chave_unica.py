@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# Quantidade máxima de placas listadas no erro
+LIMITE_RELATORIO = 50
+
+
+def verificar_colisoes(apps, schema_editor):
+    # Veículos ativos com a mesma placa em grafias diferentes (ex: 'ABC-1234' e 'ABC1C34') impedem o
+    # índice único. Eles não são desativados aqui, sem passar pelo Veiculo.save() e pelos signals, que
+    # mantêm as estatísticas, os alertas e o feed de alterações: a migração lista as placas e para,
+    # para que um dos veículos de cada placa seja desativado pelo sistema antes de repeti-la.
+    Veiculo = apps.get_model('veiculos', 'Veiculo')
+    repetidas = list(
+        Veiculo.objects.filter(ativo=True).values('placa_chave')
+        .annotate(quantidade=Count('pk')).filter(quantidade__gt=1)
+        .order_by('placa_chave').values_list('placa_chave', flat=True)
+    )
+    if not repetidas:
+        return
+    linhas = []
+    for chave in repetidas[:LIMITE_RELATORIO]:
+        veiculos = Veiculo.objects.filter(ativo=True, placa_chave=chave).order_by('pk').values_list('pk', 'placa')
+        linhas.append(f'  {chave}: ' + ', '.join(f'#{pk} ({placa})' for pk, placa in veiculos))
+    if len(repetidas) > LIMITE_RELATORIO:
+        linhas.append(f'  ... e mais {len(repetidas) - LIMITE_RELATORIO} placa(s).')
+    raise RuntimeError(
+        f'{len(repetidas)} placa(s) com mais de um veículo ativo (mesma placa em grafias diferentes). '
+        'Desative um dos veículos de cada placa e execute o migrate novamente:\n' + '\n'.join(linhas)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veiculos', '0012_modelo_chave'),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar_colisoes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='veiculo',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativo', True)), fields=('placa_chave',), name='veiculo_ativo_placa_chave_unica', violation_error_message='Já existe um veículo ativo cadastrado com esta placa. Por favor, verifique.'),
+        ),
+    ]
@@ -1,10 +1,86 @@
 # backend/veiculos/models.py
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models # Importa o módulo models do Django
+from django.utils import timezone
+import re # Chave canônica da placa
+import unicodedata # Chaves de busca sem acentos (razão social e modelo)
 import uuid # Importa o módulo UUID para gerar números de registro únicos
 
+from core.versionamento import ModeloVersionado # Campo 'versao' (cache de fragmentos das listas)
+
+# Mensagens de duplicidade de placa, chassi e renavam na frota ativa
+# (restrições do modelo Veiculo, formulário e importação em massa)
+MENSAGENS_DUPLICIDADE = {
+    'placa': 'Já existe um veículo ativo cadastrado com esta placa. Por favor, verifique.',
+    'chassi': 'Já existe um veículo ativo cadastrado com este chassi. Por favor, verifique.',
+    'renavam': 'Já existe um veículo ativo cadastrado com este RENAVAM. Por favor, verifique.',
+}
+
+# Coluna comparada na verificação de duplicidade de cada campo: a placa é comparada pela chave
+# canônica, para que 'ABC-1234' e a sua versão Mercosul 'ABC1C34' sejam a mesma placa
+COLUNAS_DUPLICIDADE = {
+    'placa': 'placa_chave',
+    'chassi': 'chassi',
+    'renavam': 'renavam',
+}
+
+# Conversão de placa antiga para Mercosul: o segundo dígito vira uma letra (0 -> A, 1 -> B, ... 9 -> J)
+LETRAS_MERCOSUL = 'ABCDEFGHIJ'
+PADRAO_PLACA_ANTIGA = re.compile(r'[A-Z]{3}\d{4}')
+PADRAO_PLACA_MERCOSUL = re.compile(r'[A-Z]{3}\d[A-Z]\d{2}')
+
+
+def chave_placa(placa):
+    """
+    Chave canônica da placa: maiúsculas, sem separadores e, para placas antigas, já convertida para
+    o padrão Mercosul ('ABC-1234', 'abc 1234' e 'ABC1C34' têm a mesma chave, 'ABC1C34').
+    Textos fora dos dois padrões ficam apenas em maiúsculas e sem separadores.
+    """
+    compacta = re.sub(r'[^A-Z0-9]', '', (placa or '').upper())
+    if PADRAO_PLACA_ANTIGA.fullmatch(compacta):
+        compacta = compacta[:4] + LETRAS_MERCOSUL[int(compacta[4])] + compacta[5:]
+    return compacta
+
+
+def valor_de_duplicidade(campo, valor):
+    """Valor comparado com COLUNAS_DUPLICIDADE[campo] (para a placa, a chave canônica)."""
+    return chave_placa(valor) if campo == 'placa' else valor
+
+
+def chave_placa_completa(texto):
+    """Chave canônica se o texto for uma placa completa (antiga ou Mercosul); senão, None."""
+    chave = chave_placa(texto)
+    return chave if PADRAO_PLACA_MERCOSUL.fullmatch(chave) else None
+
+
+def chave_cnpj(cnpj):
+    """Chave do CNPJ: apenas os dígitos ('11.222.333/0001-81' -> '11222333000181')."""
+    return re.sub(r'\D', '', cnpj or '')
+
+
+def chave_texto(texto):
+    """
+    Chave de busca de um texto: espaços normalizados, sem acentos e em maiúsculas
+    ('Comércio  São Paulo' -> 'COMERCIO SAO PAULO').
+    Calculada sempre em Python: o UPPER() do SQLite só converte letras ASCII e não serviria às buscas por prefixo.
+    """
+    decomposto = unicodedata.normalize('NFKD', ' '.join((texto or '').split()))
+    return ''.join(caractere for caractere in decomposto if not unicodedata.combining(caractere)).upper()
+
+
+def digitos_verificadores_cnpj(base):
+    """Dígitos verificadores de um CNPJ, dados os 12 primeiros dígitos."""
+    digitos = [int(digito) for digito in base]
+    for pesos in ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)):
+        resto = sum(digito * peso for digito, peso in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return f'{digitos[-2]}{digitos[-1]}'
+
+
 # --- Modelo Empresa ---
-class Empresa(models.Model):
+class Empresa(ModeloVersionado):
     """
     Modelo para representar as empresas/clientes da corretora.
     Cada empresa pode ter uma ou mais frotas de veículos associadas.
@@ -19,6 +95,24 @@ class Empresa(models.Model):
         unique=True,
         verbose_name="CNPJ"
     )
+    cnpj_chave = models.CharField(
+        # Preenchida em save() (e nas gravações em massa) a partir do CNPJ; ver chave_cnpj()
+        max_length=14,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name="Chave do CNPJ",
+        help_text="Os 14 dígitos do CNPJ, sem pontuação: buscas exatas e por prefixo no índice."
+    )
+    razao_social_chave = models.CharField(
+        # Preenchida em save() (e nas gravações em massa) a partir da razão social; ver chave_texto()
+        max_length=255,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name="Chave da Razão Social",
+        help_text="Razão social sem acentos e em maiúsculas: buscas por prefixo no índice."
+    )
     data_cadastro = models.DateTimeField(
         auto_now_add=True,
         verbose_name="Data de Cadastro"
@@ -28,10 +122,29 @@ class Empresa(models.Model):
         verbose_name = "Empresa"
         verbose_name_plural = "Empresas"
         ordering = ['razao_social']
+        indexes = [
+            # Lista de empresas (listar_empresas), sempre ordenada por razão social
+            models.Index(fields=['razao_social', 'id'], name='empresa_razao_social_idx'),
+            # Busca por CNPJ (com ou sem pontuação) e localização da empresa na importação
+            models.Index(fields=['cnpj_chave', 'id'], name='empresa_cnpj_chave_idx'),
+            # Busca e sugestões por prefixo da razão social, sem diferenciar maiúsculas nem acentos
+            # (listar_empresas, API e veiculos/sugestoes.py)
+            models.Index(fields=['razao_social_chave', 'id'], name='empresa_razao_social_chave_idx'),
+        ]
 
     def __str__(self):
         return self.razao_social
 
+    def save(self, *args, **kwargs):
+        self.cnpj_chave = chave_cnpj(self.cnpj)
+        self.razao_social_chave = chave_texto(self.razao_social)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'cnpj' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'cnpj_chave'}
+        if update_fields is not None and 'razao_social' in update_fields:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'razao_social_chave'}
+        super().save(*args, **kwargs)
+
 # --- Opções para o campo 'marca' ---
 # Definindo as opções de marcas aqui no arquivo models.py
 MARCA_CHOICES = [
@@ -75,8 +188,16 @@ SEGURADORA_CHOICES = [
 ]
 
 
+# --- Veículos ativos ---
+class VeiculosAtivosManager(models.Manager):
+    """Apenas os veículos ativos (a frota em uso); desativados ficam de fora."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(ativo=True)
+
+
 # --- Modelo Veiculo ---
-class Veiculo(models.Model):
+class Veiculo(ModeloVersionado):
     """
     Modelo para representar um veículo individual dentro da frota de uma empresa.
     Cada veículo é associado a uma empresa e contém detalhes sobre o veículo e seu seguro.
@@ -109,19 +230,37 @@ class Veiculo(models.Model):
         max_length=100,
         verbose_name="Modelo do Veículo"
     )
+    modelo_chave = models.CharField(
+        # Preenchida em save() (e nas gravações em massa) a partir do modelo; ver chave_texto()
+        max_length=150,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name="Chave do Modelo",
+        help_text="Modelo sem acentos e em maiúsculas: sugestões por prefixo no índice."
+    )
     placa = models.CharField(
+        # Único apenas entre os veículos ativos (ver Meta.constraints)
         max_length=10,
-        unique=True,
         verbose_name="Placa"
     )
+    placa_chave = models.CharField(
+        # Preenchida em save() (e nas gravações em massa) a partir da placa; ver chave_placa()
+        max_length=10,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name="Chave da Placa",
+        help_text="Placa em maiúsculas, sem separadores e no padrão Mercosul: buscas exatas por qualquer grafia."
+    )
     chassi = models.CharField(
+        # Único apenas entre os veículos ativos (ver Meta.constraints)
         max_length=17,
-        unique=True,
         verbose_name="Chassi"
     )
     renavam = models.CharField(
+        # Único apenas entre os veículos ativos (ver Meta.constraints)
         max_length=11,
-        unique=True,
         verbose_name="Renavam"
     )
     ano_fabricacao = models.IntegerField(
@@ -175,11 +314,252 @@ class Veiculo(models.Model):
         default=True,
         verbose_name="Ativo no Sistema"
     )
+    data_desativacao = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name="Data de Desativação",
+        help_text="Preenchida ao desativar o veículo e limpa ao reativá-lo (vazia em desativações antigas)."
+    )
+
+    # Gerenciadores: 'objects' enxerga todos os veículos (admin, sinistros de veículos desativados,
+    # reativação); 'ativos' apenas a frota em uso, e deve ser o ponto de partida das telas e relatórios.
+    objects = models.Manager()
+    ativos = VeiculosAtivosManager()
 
     class Meta:
         verbose_name = "Veículo"
         verbose_name_plural = "Veículos"
         ordering = ['placa']
+        # Placa, chassi e renavam só precisam ser únicos entre os veículos ativos:
+        # um veículo desativado pode ser recadastrado (ou reativado, se não houver conflito).
+        # Os índices únicos parciais também servem às buscas por esses campos na frota ativa.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['placa'],
+                condition=models.Q(ativo=True),
+                name='veiculo_ativo_placa_unica',
+                violation_error_message=MENSAGENS_DUPLICIDADE['placa'],
+            ),
+            # A mesma placa em outra grafia ('ABC-1234' e 'ABC1C34') também é recusada pelo banco,
+            # mesmo que duas gravações simultâneas passem pelas verificações do formulário e da importação
+            models.UniqueConstraint(
+                fields=['placa_chave'],
+                condition=models.Q(ativo=True),
+                name='veiculo_ativo_placa_chave_unica',
+                violation_error_message=MENSAGENS_DUPLICIDADE['placa'],
+            ),
+            models.UniqueConstraint(
+                fields=['chassi'],
+                condition=models.Q(ativo=True),
+                name='veiculo_ativo_chassi_unico',
+                violation_error_message=MENSAGENS_DUPLICIDADE['chassi'],
+            ),
+            models.UniqueConstraint(
+                fields=['renavam'],
+                condition=models.Q(ativo=True),
+                name='veiculo_ativo_renavam_unico',
+                violation_error_message=MENSAGENS_DUPLICIDADE['renavam'],
+            ),
+        ]
+        # Índices parciais: só os veículos ativos entram, pois são os únicos consultados pelas telas.
+        # A lista de veículos (listar_carros), ordenada por (placa, id), usa o índice único parcial de placa
+        # (ver constraints): a placa não se repete entre os ativos e o índice já termina no id (rowid).
+        indexes = [
+            # Alertas do dashboard: ativos com vencimento do seguro dentro de um intervalo de datas
+            models.Index(
+                fields=['data_vencimento_seguro', 'id'],
+                condition=models.Q(ativo=True),
+                name='veiculo_ativo_vencimento_idx',
+            ),
+            # Sugestões por prefixo do modelo, sem diferenciar maiúsculas nem acentos (veiculos/sugestoes.py);
+            # as por prefixo de placa usam o índice único parcial de placa
+            models.Index(
+                fields=['modelo_chave', 'id'],
+                condition=models.Q(ativo=True),
+                name='veiculo_ativo_modelo_chave_idx',
+            ),
+            # Busca exata por placa em qualquer grafia (lista, sinistros, importação e duplicidade);
+            # inclui os desativados, que continuam com sinistros pesquisáveis
+            models.Index(fields=['placa_chave'], name='veiculo_placa_chave_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.placa} - {self.modelo} ({self.empresa.razao_social})"
+
+    def save(self, *args, **kwargs):
+        # Mantém a data de desativação coerente com 'ativo', qualquer que seja a origem da alteração
+        # (exclusão lógica, formulário de edição ou admin)
+        if self.ativo:
+            self.data_desativacao = None
+        elif self.data_desativacao is None:
+            self.data_desativacao = timezone.now()
+        self.placa_chave = chave_placa(self.placa)
+        self.modelo_chave = chave_texto(self.modelo)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'ativo' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'data_desativacao'}
+        if update_fields is not None and 'placa' in update_fields:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'placa_chave'}
+        if update_fields is not None and 'modelo' in update_fields:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'modelo_chave'}
+        super().save(*args, **kwargs)
+
+    def desativar(self):
+        """Exclusão lógica: o veículo sai da frota ativa, mas seus dados e sinistros são mantidos."""
+        self.ativo = False
+        self.save(update_fields=['ativo'])
+
+    def reativar(self):
+        """
+        Devolve o veículo à frota ativa.
+        Levanta ValidationError se outro veículo ativo já usa a mesma placa, chassi ou renavam.
+        """
+        self.ativo = True
+        try:
+            self.validate_constraints()
+        except ValidationError:
+            self.ativo = False
+            raise
+        self.save(update_fields=['ativo'])
+
+# --- Índice de Busca por Trigramas ---
+# Campos do veículo (e da empresa) cobertos pela busca textual, com o peso de cada um na relevância
+CAMPOS_BUSCA_CHOICES = [
+    ('placa', 'Placa'),
+    ('renavam', 'Renavam'),
+    ('chassi', 'Chassi'),
+    ('modelo', 'Modelo'),
+    ('razao_social', 'Razão Social da Empresa'),
+]
+
+
+class TermoBusca(models.Model):
+    """
+    Índice invertido de trigramas usado pela busca de veículos (veiculos/busca.py).
+    Cada linha diz que um trigrama aparece em um campo de um veículo.
+    É mantido automaticamente pelos signals de Veiculo e Empresa (veiculos/signals.py)
+    e pode ser reconstruído com o comando 'reindexar_busca'.
+    """
+    veiculo = models.ForeignKey(
+        Veiculo,
+        on_delete=models.CASCADE, # Ao excluir o veículo, seus termos de busca também são removidos
+        related_name='termos_busca',
+        verbose_name="Veículo"
+    )
+    campo = models.CharField(
+        max_length=20,
+        choices=CAMPOS_BUSCA_CHOICES,
+        verbose_name="Campo"
+    )
+    trigrama = models.CharField(
+        max_length=3,
+        verbose_name="Trigrama"
+    )
+
+    class Meta:
+        verbose_name = "Termo de Busca"
+        verbose_name_plural = "Termos de Busca"
+        constraints = [
+            # A ordem (trigrama, campo, veiculo) permite localizar os veículos de um trigrama pelo índice
+            models.UniqueConstraint(fields=['trigrama', 'campo', 'veiculo'], name='termo_busca_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.trigrama!r} em {self.campo} (veículo {self.veiculo_id})"
+
+
+# --- Exclusão de Empresas em Segundo Plano ---
+# Situações de uma exclusão de empresa (veiculos/exclusao.py)
+STATUS_EXCLUSAO_CHOICES = [
+    ('pendente', 'Pendente'),
+    ('em_andamento', 'Em andamento'),
+    ('concluida', 'Concluída'),
+    ('falhou', 'Falhou'),
+]
+# Situações de uma exclusão ainda não concluída (pode ser iniciada, retomada ou repetida)
+STATUS_EXCLUSAO_ABERTA = ('pendente', 'em_andamento', 'falhou')
+
+
+class ExclusaoEmpresa(models.Model):
+    """
+    Exclusão de uma empresa com todos os seus veículos e sinistros, executada em segundo plano
+    (veiculos/exclusao.py) em lotes de tamanho fixo, cada um em uma transação curta.
+    Os contadores são gravados junto com cada lote: a página de acompanhamento mostra o progresso
+    e uma exclusão interrompida é retomada de onde parou (comando 'processar_exclusoes').
+    """
+    empresa = models.ForeignKey(
+        Empresa,
+        on_delete=models.SET_NULL, # O registro da exclusão sobrevive à empresa excluída
+        null=True,
+        blank=True,
+        related_name='exclusoes',
+        verbose_name="Empresa"
+    )
+    razao_social = models.CharField(
+        # Cópia da razão social: a empresa deixa de existir ao final da exclusão
+        max_length=200,
+        verbose_name="Razão Social"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_EXCLUSAO_CHOICES,
+        default='pendente',
+        verbose_name="Situação"
+    )
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Solicitado por"
+    )
+
+    # Progresso: os totais são contados no início da execução (não na requisição)
+    veiculos_total = models.PositiveIntegerField(null=True, blank=True, verbose_name="Veículos a Excluir")
+    sinistros_total = models.PositiveIntegerField(null=True, blank=True, verbose_name="Sinistros a Excluir")
+    veiculos_excluidos = models.PositiveIntegerField(default=0, verbose_name="Veículos Excluídos")
+    sinistros_excluidos = models.PositiveIntegerField(default=0, verbose_name="Sinistros Excluídos")
+
+    tentativas = models.PositiveIntegerField(default=0, verbose_name="Tentativas")
+    erro = models.TextField(blank=True, verbose_name="Último Erro")
+
+    data_solicitacao = models.DateTimeField(auto_now_add=True, verbose_name="Data da Solicitação")
+    data_inicio = models.DateTimeField(null=True, blank=True, verbose_name="Início da Execução")
+    # Atualizada a cada lote: sem atualização por muito tempo, a execução é considerada interrompida
+    data_atualizacao = models.DateTimeField(null=True, blank=True, verbose_name="Última Atualização")
+    data_conclusao = models.DateTimeField(null=True, blank=True, verbose_name="Data da Conclusão")
+
+    class Meta:
+        verbose_name = "Exclusão de Empresa"
+        verbose_name_plural = "Exclusões de Empresas"
+        ordering = ['-data_solicitacao']
+        constraints = [
+            # No máximo uma exclusão em aberto por empresa (um novo pedido reaproveita a existente)
+            models.UniqueConstraint(
+                fields=['empresa'],
+                condition=models.Q(status__in=STATUS_EXCLUSAO_ABERTA),
+                name='exclusao_empresa_aberta_unica',
+            ),
+        ]
 
     def __str__(self):
-        return f"{self.placa} - {self.modelo} ({self.empresa.razao_social})"
\ No newline at end of file
+        return f"Exclusão de {self.razao_social} ({self.get_status_display()})"
+
+    @property
+    def aberta(self):
+        return self.status in STATUS_EXCLUSAO_ABERTA
+
+    @property
+    def percentual(self):
+        """Percentual de registros (veículos e sinistros) já excluídos, ou None antes da contagem."""
+        if self.status == 'concluida':
+            return 100
+        if self.veiculos_total is None or self.sinistros_total is None:
+            return None
+        total = self.veiculos_total + self.sinistros_total
+        if not total:
+            return 0
+        excluidos = self.veiculos_excluidos + self.sinistros_excluidos
+        return min(100, int(100 * excluidos / total))
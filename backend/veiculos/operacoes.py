@@ -0,0 +1,202 @@
+# backend/veiculos/operacoes.py
+
+"""
+Operações em massa sobre veículos: desativar, reativar, transferir para outra empresa e renovar o seguro.
+
+A operação é aplicada aos veículos selecionados na lista (ou a todos os de uma busca) com um único
+UPDATE baseado em conjunto, em vez de um get() e um save() da linha inteira para cada veículo:
+- os parâmetros são validados uma vez (OperacaoEmMassaForm); o que depende de outros veículos
+  (placa, chassi e renavam livres na frota ativa, para a reativação) é verificado com uma consulta
+  por campo para o conjunto inteiro, como na importação em massa;
+- o UPDATE incrementa a 'versao' de cada linha alterada (cache de fragmentos das listas);
+- estatísticas, alertas, índice de busca e sinistralidade são atualizados uma vez por operação,
+  pelo signal veiculos_alterados_em_lote (o UPDATE não dispara post_save);
+- o resultado informa a situação de cada veículo: alterado, sem alteração ou recusado (com o motivo).
+"""
+
+import copy
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import COLUNAS_DUPLICIDADE, MENSAGENS_DUPLICIDADE, Veiculo
+from .signals import veiculos_alterados_em_lote
+
+# Operações disponíveis
+ACOES_EM_MASSA = [
+    ('renovar', 'Renovar seguro'),
+    ('transferir', 'Transferir para outra empresa'),
+    ('desativar', 'Desativar'),
+    ('reativar', 'Reativar'),
+]
+
+# Campos alterados pela renovação do seguro (os não informados são mantidos)
+CAMPOS_RENOVACAO = ('seguradora', 'franquia', 'data_vencimento_seguro')
+
+# Campos únicos na frota ativa, verificados na reativação
+CAMPOS_UNICOS = ('placa', 'chassi', 'renavam')
+
+# Situações de cada veículo no resultado
+ALTERADO = 'alterado'
+SEM_ALTERACAO = 'sem_alteracao'
+RECUSADO = 'recusado'
+
+
+class ErroOperacao(Exception):
+    """Erro que impede a operação como um todo (seleção grande demais, conflito concorrente...)."""
+
+
+class ResultadoOperacao:
+    """
+    Resultado de uma operação em massa.
+    - acao: código da operação (ver ACOES_EM_MASSA).
+    - itens: lista de tuplas (veiculo, situacao, mensagem), na ordem da lista de veículos;
+      'situacao' é ALTERADO, SEM_ALTERACAO ou RECUSADO.
+    """
+
+    def __init__(self, acao):
+        self.acao = acao
+        self.itens = []
+
+    def _contar(self, situacao):
+        return sum(1 for _, item_situacao, _ in self.itens if item_situacao == situacao)
+
+    @property
+    def alterados(self):
+        return self._contar(ALTERADO)
+
+    @property
+    def sem_alteracao(self):
+        return self._contar(SEM_ALTERACAO)
+
+    @property
+    def recusados(self):
+        return self._contar(RECUSADO)
+
+    @property
+    def nome_acao(self):
+        return dict(ACOES_EM_MASSA)[self.acao]
+
+    def como_dicionario(self):
+        """Representação JSON do resultado (resposta da operação com 'formato=json')."""
+        return {
+            'acao': self.acao,
+            'alterados': self.alterados,
+            'sem_alteracao': self.sem_alteracao,
+            'recusados': self.recusados,
+            'resultados': [
+                {'id': veiculo.pk, 'placa': veiculo.placa, 'situacao': situacao, 'mensagem': mensagem}
+                for veiculo, situacao, mensagem in self.itens
+            ],
+        }
+
+
+def _campos_da_acao(acao, valores, agora):
+    """Campos gravados pelo UPDATE de cada operação."""
+    if acao == 'desativar':
+        return {'ativo': False, 'data_desativacao': agora}
+    if acao == 'reativar':
+        return {'ativo': True, 'data_desativacao': None}
+    if acao == 'transferir':
+        return {'empresa': valores['empresa']}
+    return {campo: valores[campo] for campo in CAMPOS_RENOVACAO if valores.get(campo) is not None}
+
+
+def _situacao(acao, veiculo, campos):
+    """Situação do veículo antes das verificações de conjunto: (situacao, mensagem)."""
+    if acao == 'desativar' and not veiculo.ativo:
+        return SEM_ALTERACAO, 'O veículo já está desativado.'
+    if acao == 'reativar' and veiculo.ativo:
+        return SEM_ALTERACAO, 'O veículo já está ativo.'
+    if acao == 'transferir' and veiculo.empresa_id == campos['empresa'].pk:
+        return SEM_ALTERACAO, 'O veículo já pertence a esta empresa.'
+    if acao == 'renovar':
+        if not veiculo.ativo:
+            return RECUSADO, 'Veículo desativado: reative-o antes de renovar o seguro.'
+        if all(getattr(veiculo, campo) == valor for campo, valor in campos.items()):
+            return SEM_ALTERACAO, 'O seguro já está com estes dados.'
+    return ALTERADO, ''
+
+
+def _conflitos_reativacao(veiculos):
+    """
+    Veículos que não podem ser reativados porque a placa, o chassi ou o renavam já estão em uso
+    na frota ativa (ou se repetem dentro da própria seleção: o primeiro da lista é reativado).
+    Uma consulta por campo para o conjunto inteiro. Retorna {pk: mensagem}.
+    """
+    colunas = [COLUNAS_DUPLICIDADE[campo] for campo in CAMPOS_UNICOS] # A placa pela chave canônica
+    em_uso = {
+        coluna: set(
+            Veiculo.ativos.filter(**{f'{coluna}__in': [getattr(veiculo, coluna) for veiculo in veiculos]})
+            .values_list(coluna, flat=True)
+        )
+        for coluna in colunas
+    }
+    conflitos = {}
+    for veiculo in veiculos:
+        colisoes = [
+            campo for campo, coluna in zip(CAMPOS_UNICOS, colunas) if getattr(veiculo, coluna) in em_uso[coluna]
+        ]
+        if colisoes:
+            conflitos[veiculo.pk] = ' '.join(MENSAGENS_DUPLICIDADE[campo] for campo in colisoes)
+            continue
+        for coluna in colunas:
+            em_uso[coluna].add(getattr(veiculo, coluna))
+    return conflitos
+
+
+def aplicar_operacao(acao, queryset, valores=None):
+    """
+    Aplica a operação aos veículos da queryset e retorna o ResultadoOperacao.
+    - valores: parâmetros da operação ('empresa' para transferir; seguradora, franquia e/ou
+      data_vencimento_seguro para renovar), já validados pelo formulário.
+    Levanta ErroOperacao se a seleção passar de AUTO_FROTA_LIMITE_OPERACAO_EM_MASSA veículos.
+    """
+    valores = valores or {}
+    limite = settings.AUTO_FROTA_LIMITE_OPERACAO_EM_MASSA
+    resultado = ResultadoOperacao(acao)
+    campos = _campos_da_acao(acao, valores, timezone.now())
+
+    with transaction.atomic():
+        veiculos = list(queryset.select_related('empresa').order_by('placa', 'id')[:limite + 1])
+        if len(veiculos) > limite:
+            raise ErroOperacao(
+                f'A operação em massa aceita no máximo {limite} veículos por vez. Refine a busca ou a seleção.'
+            )
+
+        situacoes = {veiculo.pk: _situacao(acao, veiculo, campos) for veiculo in veiculos}
+        if acao == 'reativar':
+            candidatos = [veiculo for veiculo in veiculos if situacoes[veiculo.pk][0] == ALTERADO]
+            for pk, mensagem in _conflitos_reativacao(candidatos).items():
+                situacoes[pk] = (RECUSADO, mensagem)
+
+        anteriores = [veiculo for veiculo in veiculos if situacoes[veiculo.pk][0] == ALTERADO]
+        if anteriores:
+            try:
+                # Um único UPDATE para o conjunto; a versão muda para renovar as linhas em cache
+                Veiculo.objects.filter(pk__in=[veiculo.pk for veiculo in anteriores]).update(
+                    versao=F('versao') + 1, **campos
+                )
+            except IntegrityError as erro: # Outro veículo ativado ao mesmo tempo com a mesma placa...
+                raise ErroOperacao(
+                    'Outro cadastro alterou a frota durante a operação. Tente novamente.'
+                ) from erro
+
+            atualizados = []
+            for veiculo in anteriores:
+                atualizado = copy.copy(veiculo)
+                for campo, valor in campos.items():
+                    setattr(atualizado, campo, valor)
+                atualizados.append(atualizado)
+            # O UPDATE não dispara post_save: avisa quem mantém índices, estatísticas e caches
+            veiculos_alterados_em_lote.send(
+                sender=Veiculo, anteriores=anteriores, atualizados=atualizados, campos=set(campos)
+            )
+            # O resultado mostra os veículos alterados já com os novos valores
+            atualizados_por_pk = {veiculo.pk: veiculo for veiculo in atualizados}
+            veiculos = [atualizados_por_pk.get(veiculo.pk, veiculo) for veiculo in veiculos]
+
+    resultado.itens = [(veiculo, *situacoes[veiculo.pk]) for veiculo in veiculos]
+    return resultado
@@ -0,0 +1,100 @@
+# backend/veiculos/signals.py
+
+"""
+Signals do app 'veiculos'.
+Mantêm estruturas derivadas (como o índice de busca) sincronizadas com os modelos
+e descartam as sugestões do autocompletar em cache (veiculos/sugestoes.py).
+Conectados em VeiculosConfig.ready().
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .busca import indexar_veiculos
+from .models import Empresa, Veiculo
+from .sugestoes import invalidar_sugestoes
+
+# Enviado após criações em massa de veículos, já que bulk_create() não dispara post_save.
+# Argumentos: sender=Veiculo, veiculos=lista de instâncias já gravadas (com pk e empresa carregada).
+veiculos_criados_em_lote = Signal()
+
+# Enviado após exclusões em massa de veículos (veiculos/exclusao.py), que não disparam post_delete.
+# Argumentos: sender=Veiculo, veiculos=lista de instâncias já removidas do banco e sinistros=dicionários
+# (pk, veiculo_id, data_sinistro, tipo_sinistro, status_sinistro) dos sinistros removidos com elas.
+# Os dependentes em CASCADE (sinistros, termos de busca, alertas) já foram removidos junto.
+veiculos_excluidos_em_lote = Signal()
+
+# Enviado após criações em massa de empresas (importação de frota), que não disparam post_save.
+# Argumentos: sender=Empresa, empresas=lista de instâncias já gravadas (com pk).
+empresas_criadas_em_lote = Signal()
+
+# Enviado após alterações em massa de veículos com UPDATE (veiculos/operacoes.py), que não disparam post_save.
+# Argumentos: sender=Veiculo, anteriores=instâncias com os valores de antes, atualizados=as mesmas
+# instâncias com os novos valores (na mesma ordem) e campos=nomes dos campos alterados.
+veiculos_alterados_em_lote = Signal()
+
+# Campos que alimentam o índice de busca; salvar apenas outros campos não exige reindexação
+CAMPOS_INDEXADOS = {'placa', 'renavam', 'chassi', 'modelo', 'empresa'}
+
+
+@receiver(post_save, sender=Veiculo)
+def atualizar_indice_veiculo(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Reindexa o veículo salvo. A remoção dos termos na exclusão é feita pelo CASCADE."""
+    if raw: # Carga de fixtures: o índice é reconstruído depois com 'reindexar_busca'
+        return
+    if update_fields is not None and not CAMPOS_INDEXADOS.intersection(update_fields):
+        return
+    indexar_veiculos([instance])
+
+
+@receiver(pre_save, sender=Empresa)
+def guardar_razao_social_anterior(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda na instância a razão social gravada no banco antes da alteração."""
+    instance._razao_social_anterior = None
+    if raw or not instance.pk or (update_fields is not None and 'razao_social' not in update_fields):
+        return
+    instance._razao_social_anterior = (
+        Empresa.objects.filter(pk=instance.pk).values_list('razao_social', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Empresa)
+def atualizar_indice_empresa(sender, instance, created=False, raw=False, **kwargs):
+    """
+    A razão social faz parte do índice: quando ela muda, reindexa os veículos da empresa.
+    Salvar a empresa sem mudar a razão social (ex: correção do CNPJ) não reescreve o índice.
+    """
+    if raw or created: # Uma empresa recém-criada ainda não possui veículos
+        return
+    anterior = getattr(instance, '_razao_social_anterior', None)
+    if anterior is None or anterior == instance.razao_social:
+        return
+    indexar_veiculos(instance.veiculos.select_related('empresa'))
+
+
+@receiver(veiculos_criados_em_lote, sender=Veiculo)
+def indexar_veiculos_criados_em_lote(sender, veiculos, **kwargs):
+    """Indexa de uma só vez os veículos criados por uma importação em massa."""
+    indexar_veiculos(veiculos)
+
+
+@receiver(veiculos_alterados_em_lote, sender=Veiculo)
+def reindexar_veiculos_alterados_em_lote(sender, atualizados, campos, **kwargs):
+    """Reindexa de uma só vez os veículos de uma operação em massa que mudou campos indexados (transferência)."""
+    if CAMPOS_INDEXADOS.intersection(campos):
+        indexar_veiculos(atualizados)
+
+
+@receiver(post_save, sender=Veiculo)
+@receiver(post_delete, sender=Veiculo)
+@receiver(post_save, sender=Empresa)
+@receiver(post_delete, sender=Empresa)
+@receiver(veiculos_criados_em_lote, sender=Veiculo)
+@receiver(veiculos_excluidos_em_lote, sender=Veiculo)
+@receiver(veiculos_alterados_em_lote, sender=Veiculo)
+@receiver(empresas_criadas_em_lote, sender=Empresa)
+def invalidar_sugestoes_ao_alterar(sender, raw=False, **kwargs):
+    """Placa, modelo, razão social e situação (ativo) aparecem nas sugestões do autocompletar."""
+    if not raw:
+        invalidar_sugestoes()
+
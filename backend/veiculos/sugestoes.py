@@ -0,0 +1,147 @@
+# backend/veiculos/sugestoes.py
+
+"""
+Sugestões de veículos e empresas para os campos de seleção com autocompletar
+(SelectAutocompletar em veiculos/forms.py, endpoints /api/v1/sugestoes/...).
+
+Em vez de enviar a frota inteira em um <select>, a página envia apenas o valor selecionado e o
+navegador pede as sugestões conforme o usuário digita. Cada sugestão vem de uma busca por prefixo
+feita como intervalo (campo >= 'ABC' e campo < 'ABC' + U+FFFF) sobre um índice ordenado:
+- placa: o índice único parcial dos veículos ativos (uma placa completa, em qualquer grafia, é antes
+  procurada exatamente pela chave canônica, Veiculo.placa_chave);
+- modelo e razão social: índices sobre as chaves Veiculo.modelo_chave e Empresa.razao_social_chave
+  (sem acentos e em maiúsculas, calculadas em Python: o UPPER() do SQLite só converte letras ASCII).
+Cada consulta lê no máximo 'limite' linhas do índice, qualquer que seja o tamanho da frota.
+
+As sugestões de um prefixo ficam no cache por AUTO_FROTA_CACHE_SUGESTOES segundos (os prefixos
+curtos, digitados por todos, são os mais pedidos). Qualquer alteração de veículo ou empresa troca
+a versão das chaves (invalidar_sugestoes, chamada pelos signals de veiculos/signals.py).
+"""
+
+import hashlib
+import re
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Empresa, Veiculo, chave_placa_completa, chave_texto
+
+# Quantidade padrão e máxima de sugestões por resposta
+LIMITE_SUGESTOES = 10
+LIMITE_MAXIMO_SUGESTOES = 30
+# Maior caractere do plano básico do Unicode: fecha o intervalo da busca por prefixo
+FIM_DO_PREFIXO = '\uffff'
+
+CHAVE_VERSAO_SUGESTOES = 'sugestoes:versao'
+
+
+def prefixo_normalizado(termo):
+    """Termo digitado, sem espaços nas pontas, sem acentos e em maiúsculas (como as chaves são gravadas)."""
+    return chave_texto(termo)
+
+
+def intervalo_de_prefixo(campo, prefixo):
+    """Filtro do prefixo como intervalo do índice (um LIKE 'X%' não usaria o índice em todos os bancos)."""
+    return {f'{campo}__gte': prefixo, f'{campo}__lt': prefixo + FIM_DO_PREFIXO}
+
+
+def prefixos_de_placa(prefixo):
+    """
+    Prefixos procurados na placa: o digitado sem separadores e, quando ele passa das 3 letras
+    iniciais, também no padrão antigo com hífen ('ABC1' procura 'ABC1...' e 'ABC-1...').
+    """
+    compacto = re.sub(r'[^A-Z0-9]', '', prefixo)
+    if not compacto:
+        return []
+    prefixos = [compacto]
+    if len(compacto) > 3 and compacto[:3].isalpha():
+        prefixos.append(f'{compacto[:3]}-{compacto[3:]}')
+    return prefixos
+
+
+def _serializar_veiculo(linha):
+    return {
+        'id': linha['id'],
+        'texto': f"{linha['placa']} - {linha['modelo']} ({linha['empresa__razao_social']})", # Igual a Veiculo.__str__
+        'placa': linha['placa'],
+        'modelo': linha['modelo'],
+        'empresa': linha['empresa__razao_social'],
+    }
+
+
+def buscar_sugestoes_veiculos(prefixo, limite=LIMITE_SUGESTOES):
+    """
+    Veículos ativos cuja placa, modelo ou razão social da empresa começa com o prefixo (sem cache).
+    As placas vêm primeiro, depois os modelos e por último as empresas; cada grupo só é consultado
+    se os anteriores não preencheram o limite. Retorna uma lista de dicionários (ver _serializar_veiculo).
+    """
+    colunas = ('id', 'placa', 'modelo', 'empresa__razao_social')
+    encontrados = {}
+
+    def acrescentar(queryset):
+        faltam = limite - len(encontrados)
+        if faltam <= 0:
+            return
+        for linha in queryset.exclude(pk__in=list(encontrados)).values(*colunas)[:faltam]:
+            encontrados[linha['id']] = _serializar_veiculo(linha)
+
+    chave = chave_placa_completa(prefixo)
+    if chave: # 'ABC-1234' também encontra o mesmo veículo já com a placa Mercosul 'ABC1C34'
+        acrescentar(Veiculo.ativos.filter(placa_chave=chave).order_by('placa'))
+    for placa in prefixos_de_placa(prefixo):
+        acrescentar(Veiculo.ativos.filter(**intervalo_de_prefixo('placa', placa)).order_by('placa'))
+    acrescentar(
+        Veiculo.ativos.filter(**intervalo_de_prefixo('modelo_chave', prefixo)).order_by('modelo_chave', 'id')
+    )
+    if len(encontrados) < limite:
+        empresas = list(
+            Empresa.objects.filter(**intervalo_de_prefixo('razao_social_chave', prefixo))
+            .order_by('razao_social_chave').values_list('pk', flat=True)[:limite]
+        )
+        if empresas:
+            acrescentar(Veiculo.ativos.filter(empresa_id__in=empresas).order_by('placa'))
+    return list(encontrados.values())
+
+
+def buscar_sugestoes_empresas(prefixo, limite=LIMITE_SUGESTOES):
+    """Empresas cuja razão social começa com o prefixo, em ordem alfabética (sem cache)."""
+    empresas = (
+        Empresa.objects.filter(**intervalo_de_prefixo('razao_social_chave', prefixo))
+        .order_by('razao_social_chave', 'id')
+        .values('id', 'razao_social', 'cnpj')[:limite]
+    )
+    return [{'id': empresa['id'], 'texto': empresa['razao_social'], 'cnpj': empresa['cnpj']} for empresa in empresas]
+
+
+BUSCAS = {
+    'veiculos': buscar_sugestoes_veiculos,
+    'empresas': buscar_sugestoes_empresas,
+}
+
+
+def _versao_cache():
+    return cache.get_or_set(CHAVE_VERSAO_SUGESTOES, uuid.uuid4().hex, timeout=None)
+
+
+def invalidar_sugestoes():
+    """Descarta as sugestões em cache (chamada quando veículos ou empresas mudam)."""
+    cache.set(CHAVE_VERSAO_SUGESTOES, uuid.uuid4().hex, timeout=None)
+
+
+def sugerir(recurso, termo, limite=LIMITE_SUGESTOES):
+    """
+    Sugestões de 'recurso' ('veiculos' ou 'empresas') para o termo digitado, lidas do cache quando possível.
+    Termos mais curtos que AUTO_FROTA_SUGESTOES_MINIMO caracteres não geram sugestões.
+    """
+    prefixo = prefixo_normalizado(termo)
+    if len(prefixo) < getattr(settings, 'AUTO_FROTA_SUGESTOES_MINIMO', 1):
+        return []
+    limite = max(1, min(limite, LIMITE_MAXIMO_SUGESTOES))
+    resumo = hashlib.sha1(prefixo.encode('utf-8')).hexdigest()[:16] # Chave de tamanho fixo para qualquer termo
+    chave = f'sugestoes:{recurso}:{_versao_cache()}:{limite}:{resumo}'
+    sugestoes = cache.get(chave)
+    if sugestoes is None:
+        sugestoes = BUSCAS[recurso](prefixo, limite)
+        cache.set(chave, sugestoes, getattr(settings, 'AUTO_FROTA_CACHE_SUGESTOES', 60))
+    return sugestoes
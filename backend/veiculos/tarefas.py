@@ -0,0 +1,64 @@
+# backend/veiculos/tarefas.py
+
+"""
+Operações de empresas e veículos executadas em segundo plano (executor de core/tarefas.py).
+"""
+
+from core.tarefas import ErroDefinitivo, armazenamento_de_tarefas, registrar_tarefa
+
+from .exclusao import executar_exclusao
+from .importacao import ErroImportacao, importar_frota as importar_arquivo_frota
+
+# Quantidade máxima de erros de importação guardados no resultado da tarefa (o total é sempre informado)
+LIMITE_ERROS_GUARDADOS = 500
+
+
+@registrar_tarefa(
+    'importar_frota',
+    'Importação de frota',
+    tentativas=1, # Uma nova execução recusaria como duplicados os veículos já gravados
+    modelo_resultado='veiculos/_resultado_importacao.html',
+)
+def importar_frota(progresso, arquivo, nome_arquivo):
+    """
+    Importa a planilha gravada na pasta das tarefas (veiculos/importacao.py) e a remove ao final.
+    O progresso é o número da última linha processada (o total de linhas não é conhecido antes da leitura).
+    """
+    armazenamento = armazenamento_de_tarefas()
+    try:
+        with armazenamento.open(arquivo, 'rb') as conteudo:
+            resultado = importar_arquivo_frota(
+                conteudo.file,
+                nome_arquivo,
+                progresso=lambda linha: progresso.atualizar(linha, mensagem=f'{linha - 1} linha(s) processada(s)'),
+            )
+    except ErroImportacao as erro:
+        raise ErroDefinitivo(str(erro)) from erro
+    finally:
+        armazenamento.delete(arquivo)
+
+    return {
+        'nome_arquivo': nome_arquivo,
+        'importados': resultado.importados,
+        'empresas_criadas': resultado.empresas_criadas,
+        'linhas_com_erro': resultado.linhas_com_erro,
+        'total_erros': len(resultado.erros),
+        'erros': [list(erro) for erro in resultado.erros[:LIMITE_ERROS_GUARDADOS]],
+    }
+
+
+@registrar_tarefa('excluir_empresa', 'Exclusão de empresa')
+def excluir_empresa(progresso, exclusao):
+    """
+    Executa (ou retoma, nas novas tentativas) a exclusão de empresa registrada por solicitar_exclusao.
+    A página de acompanhamento da exclusão continua mostrando os contadores de veículos e sinistros.
+    """
+    executada = executar_exclusao(exclusao, repetir_falhas=True, progresso=progresso)
+    if executada is None: # Concluída antes ou em execução pelo comando 'processar_exclusoes'
+        return {'exclusao': exclusao, 'executada': False}
+    return {
+        'exclusao': exclusao,
+        'executada': True,
+        'veiculos_excluidos': executada.veiculos_excluidos,
+        'sinistros_excluidos': executada.sinistros_excluidos,
+    }
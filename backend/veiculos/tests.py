@@ -1,3 +1,822 @@
-from django.test import TestCase
+# backend/veiculos/tests.py
 
-# Create your tests here.
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from importlib import import_module
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import sinistros_mensais
+from core.alertas import atualizar_alertas, verificar_alertas
+from core.alteracoes import cursor_atual, ler_alteracoes
+from core.estatisticas import verificar
+from core.models import Tarefa
+from core.paginacao import codificar_cursor, decodificar_cursor, _filtro_apos
+from core.tarefas import enfileirar, executar_tarefa, processar_tarefas
+from core.tests import OrcamentoConsultasMixin, PlanoDeConsultaMixin, criar_frota
+from sinistros.forms import SinistroForm
+from sinistros.models import Sinistro
+
+from .consultas import COLUNAS_EXPORTACAO_VEICULOS, filtrar_empresas, filtrar_veiculos
+from .exclusao import executar_exclusao, solicitar_exclusao
+from .forms import EmpresaForm, VeiculoForm
+from .importacao import importar_frota
+from .models import Empresa, TermoBusca, Veiculo, chave_placa, chave_placa_completa
+from .operacoes import ALTERADO, RECUSADO, SEM_ALTERACAO, ErroOperacao, aplicar_operacao
+from .sugestoes import intervalo_de_prefixo, prefixos_de_placa, sugerir
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Os planos esperados são os do SQLite.')
+class PlanoConsultasVeiculosTests(PlanoDeConsultaMixin, TestCase):
+    """Planos de execução das consultas de listar_carros, listar_empresas e da exportação."""
+
+    def pagina(self, parametros, cursor=None, tamanho=50):
+        # Reproduz a consulta feita por paginar() em listar_carros
+        veiculos, ordenacao = filtrar_veiculos(parametros)
+        veiculos = veiculos.select_related('empresa')
+        if cursor:
+            valores, _ = decodificar_cursor(cursor)
+            veiculos = veiculos.filter(_filtro_apos(ordenacao, valores, inverter=False))
+        return veiculos.order_by(*ordenacao)[:tamanho + 1]
+
+    def test_primeira_pagina_usa_indice_parcial(self):
+        self.assertUsaIndice(self.pagina({}), 'veiculo_ativo_placa_unica')
+
+    def test_paginas_seguintes_usam_indice_parcial(self):
+        cursor = codificar_cursor(['ABC-1234', 10])
+        self.assertUsaIndice(self.pagina({}, cursor=cursor), 'veiculo_ativo_placa_unica')
+
+    def test_exportacao_usa_indice_parcial(self):
+        # Mesma ordenação da lista, percorrida por completo com values_list()
+        veiculos, ordenacao = filtrar_veiculos({})
+        exportacao = veiculos.order_by(*ordenacao).values_list('placa', 'empresa__razao_social')
+        self.assertUsaIndice(exportacao, 'veiculo_ativo_placa_unica')
+
+    def test_busca_usa_indice_de_trigramas(self):
+        # Só os candidatos encontrados pelo índice são ordenados por relevância
+        self.assertSemVarreduraCompleta(self.pagina({'q': 'ABC 12'}), permitir_ordenacao=True)
+
+    def test_lista_de_empresas_usa_indice(self):
+        empresas, ordenacao = filtrar_empresas({})
+        self.assertUsaIndice(empresas.order_by(*ordenacao), 'empresa_razao_social_idx')
+
+    def test_busca_de_empresas_usa_indices(self):
+        for termo, indice in (
+            ('11.222.333/0001-81', 'empresa_cnpj_chave_idx'),
+            ('11222', 'empresa_cnpj_chave_idx'),
+            ('oliv', 'empresa_razao_social_chave_idx'),
+        ):
+            with self.subTest(termo=termo):
+                empresas, ordenacao = filtrar_empresas({'q': termo})
+                self.assertUsaIndice(empresas.order_by(*ordenacao)[:51], indice)
+
+    def test_busca_por_placa_na_frota_ativa_usa_indice_unico_parcial(self):
+        # Verificação de duplicidade do formulário e da importação
+        self.assertUsaIndice(Veiculo.ativos.filter(placa__in=['ABC1D23', 'ABC-1234']), 'veiculo_ativo_placa_unica')
+        # Sem ordenação, como em .exists()
+        self.assertUsaIndice(Veiculo.ativos.filter(chassi='9BWZZZ377VT004251').order_by(), 'veiculo_ativo_chassi_unico')
+        self.assertUsaIndice(Veiculo.ativos.filter(renavam='12345678901').order_by(), 'veiculo_ativo_renavam_unico')
+
+    def test_busca_por_placa_completa_usa_a_chave_canonica(self):
+        # Ordenar as poucas linhas da mesma placa não pesa: o que importa é a busca exata no índice
+        veiculos, ordenacao = filtrar_veiculos({'q': 'abc-1234'})
+        plano = self.assertSemVarreduraCompleta(veiculos.order_by(*ordenacao), permitir_ordenacao=True)
+        # Na frota ativa, o índice único parcial da chave; com os desativados, 'veiculo_placa_chave_idx'
+        self.assertTrue(any('veiculo_ativo_placa_chave_unica' in linha for linha in plano), '\n'.join(plano))
+
+    def test_sugestoes_por_prefixo_usam_indices(self):
+        # Mesmas consultas de veiculos/sugestoes.py, sem ordenar fora do índice
+        placa = Veiculo.ativos.filter(**intervalo_de_prefixo('placa', 'ABC1')).order_by('placa')[:10]
+        self.assertUsaIndice(placa, 'veiculo_ativo_placa_unica')
+        modelo = Veiculo.ativos.filter(**intervalo_de_prefixo('modelo_chave', 'ON')).order_by('modelo_chave', 'id')[:10]
+        self.assertUsaIndice(modelo, 'veiculo_ativo_modelo_chave_idx')
+        empresa = (
+            Empresa.objects.filter(**intervalo_de_prefixo('razao_social_chave', 'TRANS'))
+            .order_by('razao_social_chave', 'id')[:10]
+        )
+        self.assertUsaIndice(empresa, 'empresa_razao_social_chave_idx')
+
+
+class OrcamentoConsultasVeiculosTests(OrcamentoConsultasMixin, TestCase):
+    """Consultas das telas de empresas e veículos."""
+    modulo_urls = 'veiculos.urls'
+    ORCAMENTOS = {
+        'registrar_empresa': 2,
+        'listar_empresas': 3,
+        'excluir_empresa': 3,
+        'acompanhar_exclusao': 3,
+        'registrar_carro': 2,
+        'importar_frota': 2,
+        'listar_carros': 4,
+        'exportar_carros': 3,
+        'excluir_carro': 3,
+        'operacao_em_massa': 2,
+        'editar_carro': 4,
+    }
+
+    def argumentos_url(self, nome):
+        registros = {
+            'excluir_empresa': self.empresas[0],
+            'acompanhar_exclusao': self.exclusao,
+            'excluir_carro': self.veiculo,
+            'editar_carro': self.veiculo,
+        }
+        return {'pk': registros[nome].pk} if nome in registros else {}
+
+
+class SugestoesTests(TestCase):
+    """Sugestões por prefixo (veiculos/sugestoes.py) e o campo de seleção com autocompletar."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('sugestoes', password='senha-de-teste')
+        criar_frota(2)
+        cls.empresa = Empresa.objects.create(razao_social='Oliveira Cargas Ltda', cnpj='11.222.333/0001-81')
+        cls.veiculo = Veiculo.objects.create(
+            empresa=cls.empresa, marca='chevrolet', modelo='Onix', placa='QWE1R23', chassi='9BGKS48U0JG123456',
+            renavam='01234567897', ano_fabricacao=2022, ano_modelo=2022, classe_bonus=0,
+            seguradora='porto_seguro', franquia=2000, data_vencimento_seguro=date(2030, 1, 1),
+        )
+
+    def setUp(self):
+        cache.clear() # O rollback de cada teste não descarta as sugestões gravadas no cache
+
+    def placas(self, termo):
+        return [sugestao['placa'] for sugestao in sugerir('veiculos', termo)]
+
+    def test_prefixos_de_placa(self):
+        self.assertEqual(prefixos_de_placa('abc1'.upper()), ['ABC1', 'ABC-1'])
+        self.assertEqual(prefixos_de_placa('AB'), ['AB'])
+        self.assertEqual(prefixos_de_placa('--'), [])
+
+    def test_sugestoes_por_placa_modelo_e_empresa(self):
+        self.assertEqual(self.placas('a000'), ['A000-0000', 'A000-0001']) # O desativado fica de fora
+        self.assertEqual(self.placas('qwe1r'), ['QWE1R23'])
+        self.assertEqual(self.placas('oni'), ['QWE1R23']) # Modelo, sem diferenciar maiúsculas
+        self.assertEqual(self.placas('oliveira'), ['QWE1R23']) # Razão social da empresa
+        self.assertEqual(sugerir('empresas', 'olIV'), [
+            {'id': self.empresa.pk, 'texto': 'Oliveira Cargas Ltda', 'cnpj': '11.222.333/0001-81'},
+        ])
+        self.assertEqual(len(sugerir('veiculos', 'a', limite=1)), 1)
+
+    def test_sugestoes_com_acentos(self):
+        empresa = Empresa.objects.create(razao_social='Comércio São Paulo Ltda', cnpj='11222335000170')
+        Veiculo.objects.create(
+            empresa=empresa, marca='fiat', modelo='Fiorino Furgão', placa='RTY2U34', chassi='9BD00000000001234',
+            renavam='00000001234', ano_fabricacao=2021, ano_modelo=2021, classe_bonus=0,
+            seguradora='porto_seguro', franquia=2000, data_vencimento_seguro=date(2030, 1, 1),
+        )
+        for termo in ('Comércio São', 'comercio sao', 'FIORINO FURGÃO', 'fiorino furgao'):
+            with self.subTest(termo=termo):
+                self.assertEqual(self.placas(termo), ['RTY2U34'])
+        self.assertEqual([sugestao['id'] for sugestao in sugerir('empresas', 'Comérc')], [empresa.pk])
+
+    def test_alteracoes_descartam_sugestoes_em_cache(self):
+        self.assertEqual(self.placas('oni'), ['QWE1R23'])
+        self.veiculo.modelo = 'Cobalt'
+        self.veiculo.save()
+        self.assertEqual(self.placas('oni'), [])
+
+    def test_api_de_sugestoes(self):
+        url = reverse('api_v1:sugestoes_veiculos')
+        self.assertEqual(self.client.get(url, {'q': 'qwe'}).status_code, 401)
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(url, {'q': 'qwe'})
+        self.assertEqual([sugestao['id'] for sugestao in resposta.json()['resultados']], [self.veiculo.pk])
+        self.assertIn('max-age', resposta['Cache-Control'])
+        self.assertEqual(self.client.get(url, {'q': 'qwe', 'limite': 'x'}).status_code, 400)
+
+    def test_campo_renderiza_apenas_o_veiculo_selecionado(self):
+        opcoes = str(SinistroForm()['veiculo']).count('<option')
+        self.assertEqual(opcoes, 1) # Só a opção vazia, qualquer que seja o tamanho da frota
+        formulario = SinistroForm(data={
+            'veiculo': self.veiculo.pk, 'data_sinistro': '2024-01-10', 'tipo_sinistro': 'colisao',
+            'descricao': 'Colisão.', 'status_sinistro': 'aberto',
+        })
+        self.assertTrue(formulario.is_valid(), formulario.errors)
+        campo = str(formulario['veiculo'])
+        self.assertEqual(campo.count('<option'), 2)
+        self.assertIn(f'value="{self.veiculo.pk}" selected', campo)
+        self.assertIn(f'data-autocompletar="{reverse("api_v1:sugestoes_veiculos")}"', campo)
+
+
+class BuscaVeiculosTests(TestCase):
+    """Busca textual de veículos (veiculos/busca.py) nas listas, na exportação e na API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('busca', password='senha-de-teste')
+        cls.empresa = criar_frota(1)[0]
+
+    def test_busca_por_modelo_e_empresa(self):
+        veiculos, ordenacao = filtrar_veiculos({'q': 'strada'})
+        self.assertEqual(veiculos.order_by(*ordenacao).count(), 2) # Apenas os ativos
+        veiculos, ordenacao = filtrar_veiculos({'q': self.empresa.razao_social})
+        self.assertEqual(set(veiculos.order_by(*ordenacao)), set(Veiculo.ativos.filter(empresa=self.empresa)))
+
+    def test_empresa_so_reindexa_quando_a_razao_social_muda(self):
+        termos = TermoBusca.objects.filter(veiculo__empresa=self.empresa, campo='razao_social')
+        ids = set(termos.values_list('pk', flat=True))
+        self.empresa.cnpj = '11222335000170'
+        self.empresa.save()
+        self.assertEqual(set(termos.values_list('pk', flat=True)), ids) # Índice intocado
+        self.empresa.razao_social = 'Transportadora Nova Ltda'
+        self.empresa.save()
+        self.assertNotEqual(set(termos.values_list('pk', flat=True)), ids)
+        veiculos, ordenacao = filtrar_veiculos({'q': 'transportadora nova'})
+        self.assertEqual(set(veiculos.order_by(*ordenacao)), set(Veiculo.ativos.filter(empresa=self.empresa)))
+
+    def test_termo_so_com_pontuacao_nao_encontra_nada(self):
+        veiculos, ordenacao = filtrar_veiculos({'q': '-'})
+        self.assertEqual(list(veiculos.order_by(*ordenacao)), [])
+        self.client.force_login(self.usuario)
+        for rota, termo in (
+            ('veiculos:listar_carros', '-'), ('api_v1:veiculos', '!!'), ('veiculos:exportar_carros', '.'),
+        ):
+            with self.subTest(rota=rota):
+                resposta = self.client.get(reverse(rota), {'q': termo})
+                self.assertEqual(resposta.status_code, 200)
+                if resposta.streaming:
+                    b''.join(resposta.streaming_content)
+
+
+class PlacaCanonicaTests(TestCase):
+    """Chave canônica da placa (Veiculo.placa_chave): busca exata e duplicidade em qualquer grafia."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(razao_social='Placas Ltda', cnpj='11.222.333/0001-81')
+        cls.veiculo = Veiculo.objects.create(
+            empresa=cls.empresa, marca='fiat', modelo='Uno', placa='QWE-1234', chassi='9BD15827U77123456',
+            renavam='01234567897', ano_fabricacao=2010, ano_modelo=2010, classe_bonus=5,
+            seguradora='porto_seguro', franquia=1500, data_vencimento_seguro=date(2030, 1, 1),
+        )
+
+    def test_chave_da_placa(self):
+        self.assertEqual(chave_placa('ABC-1234'), 'ABC1C34') # Antiga: convertida para Mercosul
+        self.assertEqual(chave_placa('abc 1d23'), 'ABC1D23')
+        self.assertEqual(chave_placa_completa('abc1234'), 'ABC1C34')
+        self.assertIsNone(chave_placa_completa('ABC12'))
+        self.assertEqual(self.veiculo.placa_chave, 'QWE1C34')
+
+    def test_busca_exata_em_qualquer_grafia(self):
+        for termo in ('QWE-1234', 'qwe 1234', 'QWE1C34'):
+            with self.subTest(termo=termo):
+                veiculos, _ = filtrar_veiculos({'q': termo})
+                self.assertEqual(list(veiculos), [self.veiculo])
+                self.assertEqual([s['id'] for s in sugerir('veiculos', termo)], [self.veiculo.pk])
+
+    def test_placa_mercosul_da_mesma_placa_antiga_e_duplicada(self):
+        form = VeiculoForm(data={
+            'empresa': self.empresa.pk, 'marca': 'fiat', 'modelo': 'Uno', 'placa': 'QWE1C34',
+            'chassi': '9BD15827U77654321', 'renavam': '98765432100', 'ano_fabricacao': 2010,
+            'ano_modelo': 2010, 'classe_bonus': 0, 'seguradora': 'porto_seguro', 'franquia': '1500',
+            'data_vencimento_seguro': '2030-01-01', 'ativo': True,
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('placa', form.errors)
+
+    def test_banco_recusa_a_mesma_placa_em_outra_grafia(self):
+        # Sem passar pelo formulário, como duas gravações simultâneas que passaram pela verificação
+        dados = dict(
+            empresa=self.empresa, marca='fiat', modelo='Uno', placa='QWE1C34', chassi='9BD15827U77654321',
+            renavam='98765432100', ano_fabricacao=2010, ano_modelo=2010, classe_bonus=0,
+            seguradora='porto_seguro', franquia=1500, data_vencimento_seguro=date(2030, 1, 1),
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Veiculo.objects.create(**dados)
+        self.veiculo.desativar() # Entre os desativados, a placa pode se repetir
+        self.assertEqual(Veiculo.objects.create(**dados).placa_chave, self.veiculo.placa_chave)
+
+    def test_migracao_lista_as_placas_repetidas(self):
+        verificar_colisoes = import_module('veiculos.migrations.0013_placa_chave_unica').verificar_colisoes
+        verificar_colisoes(django_apps, None) # Sem placas repetidas: nada a fazer
+        with connection.cursor() as cursor: # Como antes da migração (desfeito no rollback do teste)
+            cursor.execute('DROP INDEX veiculo_ativo_placa_chave_unica')
+        Veiculo.objects.create(
+            empresa=self.empresa, marca='fiat', modelo='Uno', placa='QWE1C34', chassi='9BD15827U77654321',
+            renavam='98765432100', ano_fabricacao=2010, ano_modelo=2010, classe_bonus=0,
+            seguradora='porto_seguro', franquia=1500, data_vencimento_seguro=date(2030, 1, 1),
+        )
+        with self.assertRaisesMessage(RuntimeError, f'QWE1C34: #{self.veiculo.pk} (QWE-1234)'):
+            verificar_colisoes(django_apps, None)
+
+    def test_comando_preenche_as_chaves_existentes(self):
+        Veiculo.objects.update(placa_chave='') # Como logo após a migração que cria o campo
+        call_command('preencher_chave_placa', lote=1, verbosity=0)
+        self.veiculo.refresh_from_db()
+        self.assertEqual(self.veiculo.placa_chave, 'QWE1C34')
+
+
+class CnpjTests(TestCase):
+    """Validação do CNPJ e busca de empresas pela chave do CNPJ (Empresa.cnpj_chave)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(razao_social='Oliveira Cargas Ltda', cnpj='11.222.333/0001-81')
+        cls.outra = Empresa.objects.create(razao_social='Transportes Rio Ltda', cnpj='11222334000126')
+        cls.acentuada = Empresa.objects.create(razao_social='Comércio São Paulo Ltda', cnpj='11222335000170')
+
+    def test_digitos_verificadores(self):
+        self.assertTrue(EmpresaForm(data={'razao_social': 'Nova Ltda', 'cnpj': '11222335000170'}).is_valid())
+        for cnpj in ('11.222.333/0001-82', '00.000.000/0000-00'):
+            with self.subTest(cnpj=cnpj):
+                form = EmpresaForm(data={'razao_social': 'Nova Ltda', 'cnpj': cnpj})
+                self.assertFalse(form.is_valid())
+                self.assertIn('cnpj', form.errors)
+
+    def test_chave_do_cnpj(self):
+        self.assertEqual(self.empresa.cnpj_chave, '11222333000181')
+        self.assertEqual(self.outra.cnpj_chave, '11222334000126') # Gravado sem pontuação
+        self.assertEqual(self.acentuada.razao_social_chave, 'COMERCIO SAO PAULO LTDA')
+
+    def test_busca_por_cnpj_em_qualquer_formatacao(self):
+        for termo, esperadas in (
+            ('11.222.333/0001-81', [self.empresa]),
+            ('11222334000126', [self.outra]),
+            ('11.222.33', [self.empresa, self.outra, self.acentuada]), # Prefixo
+            ('oliveira', [self.empresa]),
+            ('TRANSP', [self.outra]),
+            ('Cargas', []), # Só o início da razão social
+            ('Comércio São', [self.acentuada]), # Digitada como foi gravada
+            ('comercio sao', [self.acentuada]), # Sem acentos e em minúsculas
+            ('COMÉRCIO', [self.acentuada]),
+        ):
+            with self.subTest(termo=termo):
+                empresas, ordenacao = filtrar_empresas({'q': termo})
+                self.assertEqual(list(empresas.order_by(*ordenacao)), esperadas)
+
+
+class ImportacaoFrotaTests(TestCase):
+    """Importação em lotes (veiculos/importacao.py): validação, duplicidades e criação de empresas."""
+
+    CABECALHO = 'cnpj;razao_social;marca;modelo;placa;chassi;renavam;ano_fabricacao;ano_modelo;classe_bonus;seguradora;franquia;data_vencimento_seguro'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(razao_social='Frota Existente Ltda', cnpj='11.222.333/0001-81')
+        Veiculo.objects.create(
+            empresa=cls.empresa, marca='fiat', modelo='Uno', placa='QWE-1234', chassi='9BD00000000009999',
+            renavam='00000009999', ano_fabricacao=2010, ano_modelo=2010, classe_bonus=5,
+            seguradora='porto_seguro', franquia=1500, data_vencimento_seguro=date(2030, 1, 1),
+        )
+
+    def linha(self, indice, cnpj='11.222.333/0001-81', razao_social='', placa=None):
+        placa = placa or f'ABC{indice}D{indice:02d}'
+        return (
+            f'{cnpj};{razao_social};fiat;Strada;{placa};9BD{indice:014d};{indice:011d};'
+            '2020;2021;0;porto_seguro;1500;31/12/2030'
+        )
+
+    def importar(self, *linhas, tamanho_lote=1000, progresso=None):
+        conteudo = '\n'.join([self.CABECALHO, *linhas]) + '\n'
+        return importar_frota(io.BytesIO(conteudo.encode('utf-8')), 'frota.csv', tamanho_lote, progresso)
+
+    def erros(self, resultado):
+        return sorted((linha, campo) for linha, campo, _ in resultado.erros)
+
+    def test_linhas_validas_e_empresa_nova(self):
+        resultado = self.importar(
+            self.linha(1),
+            self.linha(2, cnpj='11222334000126', razao_social='Transportes Novos Ltda'),
+            self.linha(3, cnpj='11222334000126'), # Mesma empresa nova, já sem a razão social
+        )
+        self.assertEqual((resultado.importados, resultado.empresas_criadas, resultado.erros), (3, 1, []))
+        nova = Empresa.objects.get(cnpj_chave='11222334000126')
+        self.assertEqual(Veiculo.ativos.filter(empresa=nova).count(), 2)
+        self.assertEqual(Veiculo.objects.get(placa='ABC1D01').placa_chave, 'ABC1D01')
+        self.assertEqual(verificar(), [])
+
+    def test_duplicidades_no_arquivo_e_no_banco(self):
+        resultado = self.importar(
+            self.linha(1),
+            self.linha(2, placa='ABC1D01'), # Mesma placa da linha anterior
+            self.linha(3, placa='qwe 1234'), # Placa de um veículo ativo, em outra grafia
+            self.linha(4, cnpj='11222335000170'), # Empresa não cadastrada e sem razão social
+            self.linha(5, placa='placa'), # Placa inválida
+        )
+        self.assertEqual(resultado.importados, 1)
+        self.assertEqual(self.erros(resultado), [(3, 'placa'), (4, 'placa'), (5, 'cnpj'), (6, 'placa')])
+        self.assertEqual(resultado.linhas_com_erro, 4)
+
+    def test_razao_social_repetida_em_cnpjs_novos(self):
+        resultado = self.importar(
+            self.linha(1, cnpj='11222334000126', razao_social='Mesma Razao Ltda'),
+            self.linha(2, cnpj='11222335000170', razao_social='Mesma Razao Ltda'),
+            self.linha(3, cnpj='11222336000115', razao_social='Frota Existente Ltda'), # Já cadastrada com outro CNPJ
+        )
+        self.assertEqual((resultado.importados, resultado.empresas_criadas), (1, 1))
+        self.assertEqual(self.erros(resultado), [(3, 'razao_social'), (4, 'razao_social')]) # Linha 1: cabeçalho
+        self.assertTrue(Empresa.objects.filter(cnpj_chave='11222334000126', razao_social='Mesma Razao Ltda').exists())
+
+    def test_limites_dos_lotes(self):
+        linhas = [
+            self.linha(1, cnpj='11222334000126', razao_social='Mesma Razao Ltda'),
+            self.linha(2, cnpj='11222335000170', razao_social='Mesma Razao Ltda'),
+            self.linha(3),
+            self.linha(4, placa='ABC3D03'), # Duplicada da linha anterior, em outro lote
+        ]
+        linhas_lidas = []
+        resultado = self.importar(*linhas, tamanho_lote=1, progresso=linhas_lidas.append)
+        self.assertEqual(linhas_lidas, [2, 3, 4, 5]) # Uma chamada por lote
+        self.assertEqual((resultado.importados, resultado.empresas_criadas), (2, 1))
+        self.assertEqual(self.erros(resultado), [(3, 'razao_social'), (5, 'placa')])
+        self.assertEqual(verificar(), [])
+
+
+class ImportacaoEmSegundoPlanoTests(TestCase):
+    """Importação de frota como tarefa em segundo plano (veiculos/tarefas.py)."""
+
+    CSV = (
+        'cnpj;razao_social;marca;modelo;placa;chassi;renavam;ano_fabricacao;ano_modelo;'
+        'classe_bonus;seguradora;franquia;data_vencimento_seguro\n'
+        '11.222.333/0001-81;Transportes Teste Ltda;fiat;Strada;ABC1D23;9BD00000000000001;01234567897;'
+        '2020;2021;0;porto_seguro;1500;31/12/2030\n'
+        '11.222.333/0001-81;Transportes Teste Ltda;fiat;Strada;placa;9BD00000000000002;01234567897;'
+        '2020;2021;0;porto_seguro;1500;31/12/2030\n'
+    )
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.pasta = pasta.name
+        configuracao = override_settings(AUTO_FROTA_PASTA_TAREFAS=self.pasta, AUTO_FROTA_TAREFAS_EM_SEGUNDO_PLANO=False)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.client.force_login(get_user_model().objects.create_user('importacao', password='senha-de-teste'))
+
+    def test_upload_registra_a_tarefa(self):
+        arquivo = SimpleUploadedFile('frota.csv', self.CSV.encode('utf-8'), content_type='text/csv')
+        resposta = self.client.post(reverse('veiculos:importar_frota'), {'arquivo': arquivo})
+        tarefa = Tarefa.objects.get(tipo='importar_frota')
+        self.assertRedirects(resposta, reverse('core:acompanhar_tarefa', kwargs={'pk': tarefa.pk}))
+        self.assertFalse(Veiculo.objects.exists()) # Nada importado dentro da requisição
+
+        [tarefa] = processar_tarefas()
+        self.assertEqual(tarefa.status, 'concluida')
+        self.assertEqual((tarefa.resultado['importados'], tarefa.resultado['linhas_com_erro']), (1, 1))
+        self.assertEqual(tarefa.progresso_atual, 3) # Última linha do arquivo
+        self.assertEqual(os.listdir(self.pasta), []) # O arquivo enviado é removido
+        resposta = self.client.get(reverse('core:acompanhar_tarefa', kwargs={'pk': tarefa.pk}))
+        self.assertContains(resposta, 'Resultado da Importação')
+        self.assertContains(resposta, '<td>3</td>')
+
+    def test_arquivo_ilegivel_falha_sem_nova_tentativa(self):
+        with open(os.path.join(self.pasta, 'frota.txt'), 'w', encoding='utf-8') as arquivo:
+            arquivo.write('qualquer coisa')
+        tarefa = executar_tarefa(enfileirar('importar_frota', {'arquivo': 'frota.txt', 'nome_arquivo': 'frota.txt'}).pk)
+        self.assertEqual(tarefa.status, 'falhou')
+        self.assertIn('Formato de arquivo não suportado', tarefa.erro)
+
+
+class OperacoesEmMassaTests(TestCase):
+    """Operações em massa (veiculos/operacoes.py): cada ação, conflitos, limite e consistência dos derivados."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('operacoes', password='senha-de-teste')
+        cls.empresa, cls.outra = criar_frota(2)
+        cls.ativos = list(Veiculo.ativos.filter(empresa=cls.empresa).order_by('placa'))
+        cls.inativo = Veiculo.objects.get(empresa=cls.empresa, ativo=False)
+
+    def novo_veiculo(self, placa, chassi, renavam, ativo=True):
+        return Veiculo.objects.create(
+            empresa=self.empresa, marca='fiat', modelo='Mobi', placa=placa, chassi=chassi, renavam=renavam,
+            ano_fabricacao=2021, ano_modelo=2021, classe_bonus=0, seguradora='porto_seguro', franquia=1000,
+            data_vencimento_seguro=date(2030, 1, 1), ativo=ativo,
+        )
+
+    def situacoes(self, resultado):
+        return {veiculo.pk: situacao for veiculo, situacao, _ in resultado.itens}
+
+    def versoes(self):
+        return dict(Veiculo.objects.values_list('pk', 'versao'))
+
+    def assertDerivadosConferem(self):
+        atualizar_alertas()
+        self.assertEqual(verificar(), [])
+        self.assertEqual(verificar_alertas(), [])
+        self.assertEqual(sinistros_mensais.verificar(), [])
+
+    def feed(self, cursor):
+        return [(alteracao['objeto_id'], alteracao['operacao']) for alteracao in ler_alteracoes(cursor)['alteracoes']]
+
+    def test_renovar(self):
+        selecao = Veiculo.objects.filter(empresa=self.empresa)
+        versoes = self.versoes()
+        cursor = cursor_atual()
+        valores = {'seguradora': 'allianz', 'franquia': None, 'data_vencimento_seguro': date(2031, 6, 30)}
+        resultado = aplicar_operacao('renovar', selecao, valores)
+        self.assertEqual((resultado.alterados, resultado.sem_alteracao, resultado.recusados), (2, 0, 1))
+        self.assertEqual(self.situacoes(resultado)[self.inativo.pk], RECUSADO)
+        for veiculo in Veiculo.ativos.filter(empresa=self.empresa):
+            self.assertEqual((veiculo.seguradora, veiculo.data_vencimento_seguro), ('allianz', date(2031, 6, 30)))
+            self.assertEqual(veiculo.franquia, 1500) # Não informada: mantida
+            self.assertEqual(veiculo.versao, versoes[veiculo.pk] + 1)
+        self.assertEqual(Veiculo.objects.get(pk=self.inativo.pk).versao, versoes[self.inativo.pk])
+        self.assertEqual(self.feed(cursor), [(veiculo.pk, 'alteracao') for veiculo in self.ativos])
+        self.assertDerivadosConferem()
+
+        # Repetida: nada muda
+        resultado = aplicar_operacao('renovar', selecao, valores)
+        self.assertEqual((resultado.alterados, resultado.sem_alteracao), (0, 2))
+        self.assertEqual(Veiculo.ativos.get(pk=self.ativos[0].pk).versao, versoes[self.ativos[0].pk] + 1)
+
+    def test_transferir(self):
+        destino = Veiculo.ativos.filter(empresa=self.outra).first()
+        selecao = Veiculo.objects.filter(pk__in=[self.ativos[0].pk, self.inativo.pk, destino.pk])
+        resultado = aplicar_operacao('transferir', selecao, {'empresa': self.outra})
+        self.assertEqual(
+            self.situacoes(resultado),
+            {self.ativos[0].pk: ALTERADO, self.inativo.pk: ALTERADO, destino.pk: SEM_ALTERACAO},
+        )
+        self.assertEqual(Veiculo.objects.filter(empresa=self.outra).count(), 5)
+        # O sinistro do veículo transferido passa a contar para a nova empresa
+        self.assertEqual(Sinistro.objects.filter(veiculo__empresa=self.outra).count(), 2)
+        self.assertDerivadosConferem()
+
+    def test_desativar_e_reativar(self):
+        selecao = Veiculo.objects.filter(empresa=self.empresa)
+        cursor = cursor_atual()
+        resultado = aplicar_operacao('desativar', selecao)
+        self.assertEqual((resultado.alterados, resultado.sem_alteracao), (2, 1))
+        self.assertFalse(Veiculo.ativos.filter(empresa=self.empresa).exists())
+        desativacoes = Veiculo.objects.filter(pk__in=[v.pk for v in self.ativos]).values_list('data_desativacao', flat=True)
+        self.assertTrue(all(desativacoes))
+        self.assertDerivadosConferem()
+
+        resultado = aplicar_operacao('reativar', selecao)
+        self.assertEqual((resultado.alterados, resultado.sem_alteracao, resultado.recusados), (3, 0, 0))
+        self.assertEqual(Veiculo.ativos.filter(empresa=self.empresa).count(), 3)
+        self.assertFalse(Veiculo.objects.filter(empresa=self.empresa, data_desativacao__isnull=False).exists())
+        self.assertEqual(
+            sorted(self.feed(cursor)),
+            sorted(
+                [(v.pk, 'desativacao') for v in self.ativos]
+                + [(v.pk, 'reativacao') for v in [*self.ativos, self.inativo]]
+            ),
+        )
+        self.assertDerivadosConferem()
+
+    def test_conflitos_na_reativacao(self):
+        # Placa do veículo desativado já em uso na frota ativa
+        self.novo_veiculo(self.inativo.placa.lower(), '9BDOPER0000000001', '80000000001')
+        # Dois desativados com o mesmo chassi na seleção: só o primeiro (pela placa) é reativado
+        primeiro = self.novo_veiculo('OPR-0001', '9BDOPER0000000002', '80000000002', ativo=False)
+        segundo = self.novo_veiculo('OPR-0002', '9BDOPER0000000002', '80000000003', ativo=False)
+        selecao = Veiculo.objects.filter(pk__in=[self.inativo.pk, primeiro.pk, segundo.pk])
+        resultado = aplicar_operacao('reativar', selecao)
+        self.assertEqual(
+            self.situacoes(resultado), {self.inativo.pk: RECUSADO, primeiro.pk: ALTERADO, segundo.pk: RECUSADO}
+        )
+        mensagens = {veiculo.pk: mensagem for veiculo, _, mensagem in resultado.itens}
+        self.assertIn('placa', mensagens[self.inativo.pk].lower())
+        self.assertIn('chassi', mensagens[segundo.pk].lower())
+        self.assertEqual(list(selecao.filter(ativo=True)), [primeiro])
+        self.assertDerivadosConferem()
+
+    @override_settings(AUTO_FROTA_LIMITE_OPERACAO_EM_MASSA=2)
+    def test_limite_da_selecao(self):
+        versoes = self.versoes()
+        with self.assertRaises(ErroOperacao):
+            aplicar_operacao('desativar', Veiculo.objects.filter(empresa=self.empresa))
+        self.assertEqual(self.versoes(), versoes) # Nada alterado
+        resultado = aplicar_operacao('desativar', Veiculo.objects.filter(pk__in=[v.pk for v in self.ativos]))
+        self.assertEqual(resultado.alterados, 2)
+
+    def test_view(self):
+        url = reverse('veiculos:operacao_em_massa')
+        dados = {'acao': 'desativar', 'veiculos': [self.ativos[0].pk, self.inativo.pk]}
+        resposta = self.client.post(url, dados)
+        self.assertRedirects(resposta, f'{settings.LOGIN_URL}?next={url}', fetch_redirect_response=False)
+        self.assertTrue(Veiculo.objects.get(pk=self.ativos[0].pk).ativo) # Anônimo: nada alterado
+        self.client.force_login(self.usuario)
+        self.assertRedirects(self.client.get(url), reverse('veiculos:listar_carros'))
+
+        resposta = self.client.post(f'{url}?formato=json', dados)
+        self.assertEqual(resposta.json(), {
+            'acao': 'desativar', 'alterados': 1, 'sem_alteracao': 1, 'recusados': 0,
+            'resultados': [
+                {'id': self.ativos[0].pk, 'placa': self.ativos[0].placa, 'situacao': ALTERADO, 'mensagem': ''},
+                {'id': self.inativo.pk, 'placa': self.inativo.placa, 'situacao': SEM_ALTERACAO,
+                 'mensagem': 'O veículo já está desativado.'},
+            ],
+        })
+        self.assertEqual(self.client.post(f'{url}?formato=json', {**dados, 'acao': 'transferir'}).status_code, 400)
+        with override_settings(AUTO_FROTA_LIMITE_OPERACAO_EM_MASSA=1):
+            resposta = self.client.post(f'{url}?formato=json', dados)
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('no máximo 1 veículos', resposta.json()['erro'])
+
+        # Todos os da busca, com o resultado em HTML
+        resposta = self.client.post(url, {'acao': 'reativar', 'todos_da_busca': 'on', 'empresa': self.empresa.pk})
+        self.assertContains(resposta, '2 veículo(s) alterado(s)')
+        self.assertEqual(Veiculo.ativos.filter(empresa=self.empresa).count(), 3)
+        self.assertDerivadosConferem()
+
+
+class Interrupcao(BaseException):
+    """Simula o encerramento do processo no meio da exclusão (não é capturada como Exception)."""
+
+
+class ProgressoFalso:
+    """Registra as chamadas de progresso; levanta 'erro' na chamada de número 'falhar_em'."""
+
+    def __init__(self, falhar_em=None, erro=None):
+        self.chamadas = []
+        self.falhar_em, self.erro = falhar_em, erro
+
+    def atualizar(self, atual, total=None, mensagem=None):
+        self.chamadas.append((atual, total))
+        if len(self.chamadas) == self.falhar_em:
+            raise self.erro
+
+
+@override_settings(AUTO_FROTA_EXCLUSAO_EM_SEGUNDO_PLANO=False)
+class ExclusaoEmpresaTests(TestCase):
+    """Exclusão de empresa em lotes (veiculos/exclusao.py): progresso, retomada e novas tentativas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa, cls.outra = criar_frota(2)
+        veiculo = Veiculo.objects.filter(empresa=cls.empresa, ativo=False).get()
+        Sinistro.objects.create( # Sinistro de um veículo desativado também é excluído
+            veiculo=veiculo, data_sinistro=date.today(), tipo_sinistro='furto',
+            descricao='Furto de peças.', status_sinistro='aberto',
+        )
+
+    def setUp(self):
+        self.exclusao, _ = solicitar_exclusao(self.empresa)
+
+    def assertExclusaoConcluida(self, exclusao):
+        self.assertEqual(exclusao.status, 'concluida')
+        self.assertEqual((exclusao.veiculos_total, exclusao.veiculos_excluidos), (3, 3))
+        self.assertEqual((exclusao.sinistros_total, exclusao.sinistros_excluidos), (2, 2))
+        self.assertFalse(Empresa.objects.filter(pk=self.empresa.pk).exists())
+        self.assertEqual(Veiculo.objects.filter(empresa=self.outra).count(), 3) # A outra empresa fica intacta
+        self.assertEqual(verificar(), [])
+        self.assertEqual(sinistros_mensais.verificar(), [])
+        self.assertEqual(verificar_alertas(), [])
+
+    def test_varios_lotes(self):
+        progresso = ProgressoFalso()
+        exclusao = executar_exclusao(self.exclusao.pk, tamanho_lote=1, progresso=progresso)
+        self.assertEqual(progresso.chamadas, [(1, 3), (2, 3), (3, 3)]) # Um lote por veículo
+        self.assertEqual(exclusao.tentativas, 1)
+        self.assertExclusaoConcluida(exclusao)
+        self.assertIsNone(executar_exclusao(self.exclusao.pk)) # Concluída: nada a fazer
+
+    def test_retoma_execucao_interrompida(self):
+        with self.assertRaises(Interrupcao):
+            executar_exclusao(self.exclusao.pk, tamanho_lote=1, progresso=ProgressoFalso(1, Interrupcao()))
+        self.exclusao.refresh_from_db()
+        self.assertEqual((self.exclusao.status, self.exclusao.veiculos_excluidos), ('em_andamento', 1))
+        self.assertEqual(verificar(), []) # O lote excluído já atualizou as estatísticas
+
+        # Ainda dentro do prazo de inatividade: pode estar em execução em outro processo
+        self.assertIsNone(executar_exclusao(self.exclusao.pk, tamanho_lote=1))
+        with override_settings(AUTO_FROTA_EXCLUSAO_INATIVIDADE=0):
+            progresso = ProgressoFalso()
+            exclusao = executar_exclusao(self.exclusao.pk, tamanho_lote=1, progresso=progresso)
+        self.assertEqual(progresso.chamadas, [(2, 3), (3, 3)]) # Continua a partir do que já foi excluído
+        self.assertEqual(exclusao.tentativas, 2)
+        self.assertExclusaoConcluida(exclusao)
+
+    def test_repete_exclusao_que_falhou(self):
+        with self.assertRaises(RuntimeError):
+            falha = ProgressoFalso(1, RuntimeError('Banco indisponível'))
+            executar_exclusao(self.exclusao.pk, tamanho_lote=2, progresso=falha)
+        self.exclusao.refresh_from_db()
+        self.assertEqual(self.exclusao.status, 'falhou')
+        self.assertEqual(self.exclusao.erro, 'RuntimeError: Banco indisponível')
+        self.assertEqual(self.exclusao.veiculos_excluidos, 2)
+
+        self.assertIsNone(executar_exclusao(self.exclusao.pk)) # Sem repetir_falhas, fica como está
+        exclusao = executar_exclusao(self.exclusao.pk, tamanho_lote=2, repetir_falhas=True)
+        self.assertEqual((exclusao.tentativas, exclusao.erro), (2, ''))
+        self.assertExclusaoConcluida(exclusao)
+
+
+class ExportacaoVeiculosTests(TestCase):
+    """Exportação em streaming dos veículos (core/exportacao.py, exportar_carros): mesma busca da lista."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('exportacao', password='senha-de-teste')
+        cls.empresas = criar_frota(3)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def exportar(self, **parametros):
+        resposta = self.client.get(reverse('veiculos:exportar_carros'), parametros)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta, b''.join(resposta.streaming_content).decode('utf-8')
+
+    def placas_da_lista(self, **parametros):
+        resposta = self.client.get(reverse('veiculos:listar_carros'), parametros)
+        return [veiculo.placa for veiculo in resposta.context['veiculos']]
+
+    def test_csv_segue_a_lista(self):
+        for parametros in ({}, {'empresa': self.empresas[1].pk}, {'q': 'A002'}):
+            with self.subTest(**parametros):
+                resposta, conteudo = self.exportar(**parametros)
+                self.assertEqual(resposta['Content-Type'], 'text/csv; charset=utf-8')
+                self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="veiculos.csv"')
+                cabecalho, *linhas = csv.reader(io.StringIO(conteudo))
+                self.assertEqual(cabecalho, [nome for nome, _ in COLUNAS_EXPORTACAO_VEICULOS])
+                placas = [linha[cabecalho.index('placa')] for linha in linhas]
+                self.assertEqual(placas, self.placas_da_lista(**parametros))
+                self.assertTrue(placas) # Apenas os ativos: dois por empresa
+        linha = dict(zip(cabecalho, linhas[0]))
+        vencimento = Veiculo.objects.get(placa=linha['placa']).data_vencimento_seguro
+        self.assertEqual(linha['data_vencimento_seguro'], vencimento.isoformat()) # Datas em ISO 8601
+
+    def test_ndjson(self):
+        resposta, conteudo = self.exportar(formato='ndjson', empresa=self.empresas[0].pk)
+        self.assertEqual(resposta['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="veiculos.ndjson"')
+        registros = [json.loads(linha) for linha in conteudo.splitlines()]
+        placas = [registro['placa'] for registro in registros]
+        self.assertEqual(placas, self.placas_da_lista(empresa=self.empresas[0].pk))
+        self.assertEqual(list(registros[0]), [nome for nome, _ in COLUNAS_EXPORTACAO_VEICULOS])
+        self.assertEqual(registros[0]['empresa'], 'Empresa A000 Ltda')
+        self.assertEqual(registros[0]['franquia'], '1500.00') # Decimal sem perda de precisão
+
+    def test_formato_desconhecido_recusado(self):
+        resposta = self.client.get(reverse('veiculos:exportar_carros'), {'formato': 'xlsx'})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('Formato de exportação não suportado', resposta.content.decode('utf-8'))
+        self.assertEqual(self.exportar(formato='')[0]['Content-Type'], 'text/csv; charset=utf-8') # Vazio: o padrão
+
+
+class ListasAssincronasVeiculosTests(TestCase):
+    """Views assíncronas de veículos e empresas (core/assincrono.py), pelo AsyncClient."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user('assincrono', password='senha-de-teste')
+        cls.empresas = criar_frota(3)
+
+    async def test_anonimo_vai_para_o_login(self):
+        for nome in ('veiculos:listar_carros', 'veiculos:listar_empresas'):
+            with self.subTest(rota=nome):
+                url = reverse(nome)
+                resposta = await self.async_client.get(url)
+                self.assertRedirects(resposta, f'{settings.LOGIN_URL}?next={url}', fetch_redirect_response=False)
+
+    async def test_listar_carros_pagina_por_cursor(self):
+        await self.async_client.aforce_login(self.usuario)
+        url = reverse('veiculos:listar_carros')
+        esperadas = [placa async for placa in Veiculo.ativos.order_by('placa').values_list('placa', flat=True)]
+        resposta = await self.async_client.get(url, {'por_pagina': 4})
+        pagina = resposta.context['veiculos']
+        self.assertEqual([veiculo.placa for veiculo in pagina], esperadas[:4])
+        self.assertEqual((resposta.context['quantidade_carros'], resposta.context['contagem_exata']), (6, True))
+        self.assertTrue(pagina.tem_proxima)
+
+        resposta = await self.async_client.get(url, {'por_pagina': 4, 'cursor': pagina.proximo_cursor})
+        pagina = resposta.context['veiculos']
+        self.assertEqual([veiculo.placa for veiculo in pagina], esperadas[4:])
+        self.assertFalse(pagina.tem_proxima)
+        self.assertTrue(pagina.tem_anterior)
+
+        # Cursor adulterado: aviso e primeira página
+        resposta = await self.async_client.get(url, {'por_pagina': 4, 'cursor': 'adulterado'})
+        self.assertEqual([veiculo.placa for veiculo in resposta.context['veiculos']], esperadas[:4])
+        self.assertContains(resposta, 'Link de paginação inválido')
+
+    async def test_listar_carros_com_busca(self):
+        await self.async_client.aforce_login(self.usuario)
+        resposta = await self.async_client.get(reverse('veiculos:listar_carros'), {'q': 'Empresa A001', 'contagem': 'exata'})
+        self.assertEqual(
+            [veiculo.empresa_id for veiculo in resposta.context['veiculos']], [self.empresas[1].pk] * 2
+        )
+        self.assertEqual(resposta.context['quantidade_carros'], 2)
+        self.assertContains(resposta, 'Exibindo resultados para a busca: &#x27;Empresa A001&#x27;')
+        self.assertNotContains(resposta, '{#') # Comentários do template não vazam para a página
+
+    async def test_listar_empresas(self):
+        await self.async_client.aforce_login(self.usuario)
+        url = reverse('veiculos:listar_empresas')
+        resposta = await self.async_client.get(url)
+        self.assertEqual(
+            [empresa.razao_social for empresa in resposta.context['empresas']],
+            ['Empresa A000 Ltda', 'Empresa A001 Ltda', 'Empresa A002 Ltda'],
+        )
+        self.assertTrue(all(empresa.exclusao_id is None for empresa in resposta.context['empresas']))
+        resposta = await self.async_client.get(url, {'q': 'empresa a002'})
+        self.assertEqual([empresa.pk for empresa in resposta.context['empresas']], [self.empresas[2].pk])
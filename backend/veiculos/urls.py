@@ -10,11 +10,15 @@ urlpatterns = [
     path('empresa/registrar/', views.registrar_empresa, name='registrar_empresa'),
     path('empresas/lista/', views.listar_empresas, name='listar_empresas'),
     path('empresas/excluir/<int:pk>/', views.excluir_empresa, name='excluir_empresa'),
+    path('empresas/exclusoes/<int:pk>/', views.acompanhar_exclusao, name='acompanhar_exclusao'), # Progresso da exclusão em segundo plano
 
     # URLs para Gestão de Veículos
     path('registrar/', views.registrar_carro, name='registrar_carro'),
+    path('importar/', views.importar_frota, name='importar_frota'), # Importação em massa (CSV/XLSX)
     path('lista/', views.listar_carros, name='listar_carros'),
+    path('exportar/', views.exportar_carros, name='exportar_carros'), # Exportação em streaming (CSV/NDJSON)
     path('excluir/<int:pk>/', views.excluir_carro, name='excluir_carro'),
+    path('operacoes/', views.operacao_em_massa, name='operacao_em_massa'), # Operações em massa (desativar, renovar...)
     # NOVA URL para editar um veículo
     path('editar/<int:pk>/', views.editar_carro, name='editar_carro'), 
 ]
\ No newline at end of file
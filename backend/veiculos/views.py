@@ -1,13 +1,28 @@
 # backend/veiculos/views.py
 
+import asyncio # Consultas independentes em paralelo nas views assíncronas
+from urllib.parse import urlencode
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required # Decorador para exigir login
 from django.contrib import messages # Para exibir mensagens de sucesso/erro
+from django.db.models import OuterRef, Subquery
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.urls import reverse
-from django.db.models import Q # Importa Q para realizar buscas complexas (OR)
 
-from .models import Veiculo, Empresa
-from .forms import VeiculoForm, EmpresaForm
+from core.assincrono import alistar, renderizar # Utilitários das views assíncronas
+from core.tarefas import enfileirar, guardar_arquivo # Tarefas executadas em segundo plano
+from core.exportacao import formato_solicitado, resposta_exportacao # Exportação em streaming (CSV/NDJSON)
+from core.paginacao import acontar_limitado, apagina_da_requisicao # Paginação por chave
+
+from .consultas import COLUNAS_EXPORTACAO_VEICULOS, filtrar_empresas, filtrar_veiculos # Filtros compartilhados com a exportação e a API
+from .models import STATUS_EXCLUSAO_ABERTA, ExclusaoEmpresa, Veiculo, Empresa
+from .forms import VeiculoForm, EmpresaForm, ImportacaoFrotaForm, OperacaoEmMassaForm
+from .exclusao import solicitar_exclusao # Exclusão de empresas em segundo plano
+from .operacoes import ErroOperacao, aplicar_operacao # Operações em massa (um UPDATE por operação)
+
+# Intervalo (segundos) de recarga da página de acompanhamento enquanto a exclusão não termina
+INTERVALO_ATUALIZACAO_EXCLUSAO = 3
 
 
 @login_required # Garante que apenas usuários logados possam acessar esta view
@@ -61,39 +76,157 @@ def registrar_carro(request):
     return render(request, 'veiculos/registrar_carro.html', {'form': form, 'is_edit': False})
 
 
+@login_required # Garante que apenas usuários logados possam acessar esta view
+def importar_frota(request):
+    """
+    Esta view gerencia a importação em massa de veículos a partir de um arquivo CSV ou XLSX.
+    - Se a requisição for POST, grava o arquivo e registra a tarefa de importação (veiculos/tarefas.py),
+      executada em segundo plano; redireciona para a página de acompanhamento da tarefa, que exibe
+      o resumo da importação com o relatório de erros por linha.
+    - Se a requisição for GET, exibe o formulário de upload.
+    """
+    if request.method == 'POST':
+        form = ImportacaoFrotaForm(request.POST, request.FILES)
+        if form.is_valid():
+            arquivo = form.cleaned_data['arquivo']
+            tarefa = enfileirar(
+                'importar_frota',
+                {'arquivo': guardar_arquivo(arquivo), 'nome_arquivo': arquivo.name},
+                request.user,
+            )
+            messages.success(request, f'Importação do arquivo "{arquivo.name}" iniciada em segundo plano.')
+            return redirect(reverse('core:acompanhar_tarefa', kwargs={'pk': tarefa.pk}))
+        messages.error(request, 'Erro ao importar frota. Verifique o arquivo enviado.')
+    else:
+        form = ImportacaoFrotaForm()
+
+    return render(request, 'veiculos/importar_frota.html', {'form': form})
+
+
 @login_required
-def listar_carros(request):
+async def listar_carros(request):
     """
-    Esta view busca e exibe uma lista de todos os veículos ativos registrados no sistema.
-    Permite busca por placa do veículo.
+    Esta view busca e exibe uma lista paginada dos veículos ativos registrados no sistema.
+    Permite busca por placa, modelo, chassi, renavam ou razão social da empresa (veiculos/busca.py).
+    - A paginação é por chave (placa, id; com busca, relevância primeiro): cada página custa o mesmo,
+      independente da profundidade.
+    - 'cursor' navega entre as páginas, 'por_pagina' define o tamanho da página.
+    - A contagem total é limitada por padrão; 'contagem=exata' força o COUNT completo.
+    - View assíncrona (core/assincrono.py): a página e a contagem são consultadas ao mesmo tempo.
     """
     # Inicializa a queryset com todos os veículos ativos
-    veiculos = Veiculo.objects.filter(ativo=True).select_related('empresa')
+    veiculos = Veiculo.ativos.select_related('empresa')
 
     # Obtém o termo de busca da requisição GET (se houver)
     query = request.GET.get('q') # 'q' será o nome do campo de busca no HTML
 
+    # Aplica a busca (veiculos/consultas.py), a mesma usada pela exportação da lista.
+    # Sem busca, a lista é ordenada por placa; com busca, do mais relevante ao menos relevante.
+    veiculos, ordenacao = filtrar_veiculos(request.GET, veiculos)
     if query:
-        # Se houver um termo de busca, filtra os veículos.
-        veiculos = veiculos.filter(
-            Q(placa__icontains=query) | # Busca por placa
-            Q(modelo__icontains=query) | # Opcional: buscar também por modelo para uma busca mais ampla
-            Q(chassi__icontains=query)   # Opcional: buscar também por chassi
-        )
         messages.info(request, f"Exibindo resultados para a busca: '{query}'")
 
-    # Ordena a lista de veículos (após a busca, se houver)
-    veiculos = veiculos.order_by('placa')
-    
-    # Adiciona a contagem de carros ativos (ou filtrados) ao contexto
-    quantidade_carros = veiculos.count() 
+    # Contagem de carros ativos (ou filtrados): limitada por padrão para não varrer a tabela toda
+    if request.GET.get('contagem') == 'exata':
+        contagem = _contagem_exata(veiculos)
+    else:
+        contagem = acontar_limitado(veiculos)
+
+    # Pagina a lista de veículos (após a busca, se houver) enquanto a contagem é feita
+    pagina, (quantidade_carros, contagem_exata) = await asyncio.gather(
+        apagina_da_requisicao(request, veiculos, ordenacao),
+        contagem,
+    )
 
     context = {
-        'veiculos': veiculos,
+        'veiculos': pagina,
+        'pagina': pagina,
         'quantidade_carros': quantidade_carros,
-        'query': query # Passa o termo de busca de volta para o template para manter no campo
+        'contagem_exata': contagem_exata,
+        'query': query, # Passa o termo de busca de volta para o template para manter no campo
+        # Operações em massa sobre os veículos marcados ou sobre toda a busca atual
+        'form_operacao': OperacaoEmMassaForm(initial={'q': query, 'empresa': request.GET.get('empresa')}),
     }
-    return render(request, 'veiculos/listar_carros.html', context)
+    return await renderizar(request, 'veiculos/listar_carros.html', context)
+
+
+async def _contagem_exata(queryset):
+    """COUNT completo, no mesmo formato (quantidade, exata) de acontar_limitado."""
+    return await queryset.acount(), True
+
+
+@login_required
+def exportar_carros(request):
+    """
+    Exporta os veículos ativos em CSV (padrão) ou NDJSON ('formato=ndjson').
+    Aceita a mesma busca ('q') de listar_carros e mantém a mesma ordenação.
+    O arquivo é enviado em streaming: a memória usada não depende do tamanho da frota.
+    Um formato desconhecido é recusado (400).
+    """
+    try:
+        formato = formato_solicitado(request.GET)
+    except ValueError as erro:
+        return HttpResponseBadRequest(str(erro))
+    veiculos, ordenacao = filtrar_veiculos(request.GET)
+    veiculos = veiculos.order_by(*ordenacao)
+    return resposta_exportacao(veiculos, COLUNAS_EXPORTACAO_VEICULOS, formato, 'veiculos')
+
+
+@login_required
+def operacao_em_massa(request):
+    """
+    Aplica uma operação em massa (veiculos/operacoes.py) aos veículos marcados na lista ou a todos os
+    da busca atual: desativar, reativar, transferir para outra empresa ou renovar o seguro.
+    - Aceita apenas POST (o formulário fica na lista de veículos).
+    - Exibe o resultado de cada veículo; com 'formato=json' na URL, responde em JSON.
+    """
+    if request.method != 'POST':
+        return redirect(reverse('veiculos:listar_carros'))
+
+    em_json = request.GET.get('formato') == 'json'
+    form = OperacaoEmMassaForm(request.POST)
+    if not form.is_valid():
+        if em_json:
+            return JsonResponse({
+                'erro': 'Parâmetros inválidos.',
+                'campos': {campo: list(erros) for campo, erros in form.errors.items()},
+            }, status=400)
+        for erros in form.errors.values():
+            for erro in erros:
+                messages.error(request, erro)
+        return _voltar_para_lista(request.POST)
+
+    acao = form.cleaned_data['acao']
+    if form.cleaned_data['todos_da_busca']:
+        # A mesma busca da lista; a reativação parte dos veículos desativados
+        veiculos, _ = filtrar_veiculos(form.filtros(), Veiculo.objects.filter(ativo=acao != 'reativar'))
+    else:
+        veiculos = Veiculo.objects.filter(pk__in=form.cleaned_data['veiculos'])
+
+    try:
+        resultado = aplicar_operacao(acao, veiculos, form.valores())
+    except ErroOperacao as erro:
+        if em_json:
+            return JsonResponse({'erro': str(erro)}, status=400)
+        messages.error(request, str(erro))
+        return _voltar_para_lista(request.POST)
+
+    if em_json:
+        return JsonResponse(resultado.como_dicionario())
+
+    messages.success(
+        request,
+        f'{resultado.nome_acao}: {resultado.alterados} veículo(s) alterado(s), '
+        f'{resultado.sem_alteracao} sem alteração, {resultado.recusados} recusado(s).'
+    )
+    return render(request, 'veiculos/resultado_operacao.html', {'resultado': resultado})
+
+
+def _voltar_para_lista(parametros):
+    """Redireciona para a lista de veículos mantendo a busca ('empresa' e 'q') de onde veio a operação."""
+    filtros = {campo: parametros[campo] for campo in ('empresa', 'q') if parametros.get(campo)}
+    url = reverse('veiculos:listar_carros')
+    return redirect(f'{url}?{urlencode(filtros)}' if filtros else url)
 
 
 @login_required # Garante que apenas usuários logados possam acessar esta view
@@ -108,8 +241,7 @@ def excluir_carro(request, pk):
     veiculo = get_object_or_404(Veiculo, pk=pk)
 
     if request.method == 'POST': # Garante que a ação seja via POST para segurança (formulário ou AJAX)
-        veiculo.ativo = False # Define o status do veículo como inativo
-        veiculo.save() # Salva a mudança no banco de dados
+        veiculo.desativar() # Define o status do veículo como inativo e registra a data da desativação
 
         messages.success(request, f'Veículo com placa {veiculo.placa} desativado com sucesso.')
         return redirect(reverse('veiculos:listar_carros'))
@@ -154,42 +286,67 @@ def editar_carro(request, pk): # Recebe o PK (Primary Key) do veículo a ser edi
 
 
 @login_required
-def listar_empresas(request):
+async def listar_empresas(request):
     """
     Lista todas as empresas cadastradas, com opção de busca por razão social ou CNPJ.
+    View assíncrona (core/assincrono.py).
     """
-    empresas = Empresa.objects.all().order_by('razao_social') # Ordena por razão social
     query = request.GET.get('q') # Obtém o termo de busca
 
+    # Aplica a busca (veiculos/consultas.py), a mesma usada pela API de empresas
+    empresas, ordenacao = filtrar_empresas(request.GET)
+    empresas = empresas.order_by(*ordenacao) # Ordena por razão social
+    # Exclusão em aberto de cada empresa (no lugar do botão Excluir, a lista mostra o acompanhamento)
+    empresas = empresas.annotate(exclusao_id=Subquery(
+        ExclusaoEmpresa.objects.filter(empresa=OuterRef('pk'), status__in=STATUS_EXCLUSAO_ABERTA).values('pk')[:1]
+    ))
     if query:
-        # Filtra empresas usando Q objects para buscar em razão social ou CNPJ
-        empresas = empresas.filter(
-            Q(razao_social__icontains=query) |
-            Q(cnpj__icontains=query)
-        ).distinct() # distinct() para evitar duplicatas se um termo corresponder a ambos os campos
-
         messages.info(request, f"Exibindo resultados para a busca por empresa: '{query}'")
 
     context = {
-        'empresas': empresas,
+        'empresas': await alistar(empresas), # Carregadas com o ORM assíncrono antes de renderizar
         'query': query, # Passa o termo de busca de volta para o template
     }
-    return render(request, 'veiculos/listar_empresas.html', context)
+    return await renderizar(request, 'veiculos/listar_empresas.html', context)
 
 
 @login_required
 def excluir_empresa(request, pk):
     """
-    Exclui uma empresa do banco de dados.  **CUIDADO: ESTA EXCLUSÃO É PERMANENTE.**
-    Todos os veículos associados a esta empresa também serão excluídos devido ao CASCADE.
-    É recomendável ter uma confirmação visual robusta no template.
+    Exclui uma empresa com todos os seus veículos e sinistros.  **CUIDADO: ESTA EXCLUSÃO É PERMANENTE.**
+    - Se a requisição for POST, registra a exclusão (veiculos/exclusao.py), que é executada em segundo
+      plano, em lotes, e redireciona para a página de acompanhamento sem esperar o fim da exclusão.
+    - Se a requisição for GET, exibe a página de confirmação.
     """
     empresa = get_object_or_404(Empresa, pk=pk)
-    
+
     if request.method == 'POST':
-        empresa.delete() # Exclui a empresa do banco de dados
-        messages.success(request, f'Empresa "{empresa.razao_social}" excluída permanentemente.')
-        return redirect(reverse('veiculos:listar_empresas')) # Redireciona para a lista de empresas
+        exclusao, criada = solicitar_exclusao(empresa, request.user)
+        if criada:
+            messages.success(
+                request,
+                f'Exclusão da empresa "{empresa.razao_social}" iniciada. '
+                'Os veículos e sinistros estão sendo excluídos em segundo plano.'
+            )
+        else:
+            messages.info(request, f'A exclusão da empresa "{empresa.razao_social}" já está em andamento.')
+        return redirect(reverse('veiculos:acompanhar_exclusao', kwargs={'pk': exclusao.pk}))
 
     # Se a requisição não for POST, exibe a página de confirmação
-    return render(request, 'veiculos/confirmar_excluir_empresa.html', {'empresa': empresa})
\ No newline at end of file
+    return render(request, 'veiculos/confirmar_excluir_empresa.html', {'empresa': empresa})
+
+
+@login_required
+def acompanhar_exclusao(request, pk):
+    """
+    Página de acompanhamento de uma exclusão de empresa: situação e progresso (veículos e sinistros
+    excluídos). Recarrega sozinha enquanto a exclusão está pendente ou em andamento.
+    """
+    exclusao = get_object_or_404(ExclusaoEmpresa.objects.select_related('solicitado_por'), pk=pk)
+    context = {
+        'exclusao': exclusao,
+        'intervalo_atualizacao': (
+            INTERVALO_ATUALIZACAO_EXCLUSAO if exclusao.status in ('pendente', 'em_andamento') else None
+        ),
+    }
+    return render(request, 'veiculos/acompanhar_exclusao.html', context)
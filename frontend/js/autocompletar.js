@@ -0,0 +1,99 @@
+// frontend/js/autocompletar.js
+
+/**
+ * Autocompletar dos campos de seleção de veículo e empresa (SelectAutocompletar em veiculos/forms.py).
+ *
+ * O <select> chega do servidor apenas com o valor selecionado. Um campo de texto é inserido antes
+ * dele: a cada digitação, as sugestões são pedidas ao endereço do atributo 'data-autocompletar'
+ * (API /api/v1/sugestoes/...) e viram as opções do <select> e da lista do campo de texto.
+ * Escolher uma sugestão (no campo de texto ou no próprio <select>) define o valor enviado.
+ */
+
+// Espera (ms) após a última tecla antes de pedir as sugestões
+const ESPERA_AUTOCOMPLETAR = 200;
+
+/**
+ * Substitui as opções do <select> pelas sugestões, mantendo a opção vazia e a selecionada.
+ *
+ * @param {HTMLSelectElement} select O campo de seleção.
+ * @param {Array<{id: number, texto: string}>} sugestoes Sugestões devolvidas pela API.
+ */
+function preencherOpcoes(select, sugestoes) {
+    const selecionada = select.options[select.selectedIndex];
+    Array.from(select.options).forEach(function (opcao) {
+        if (opcao.value !== '' && opcao !== selecionada) {
+            opcao.remove();
+        }
+    });
+    sugestoes.forEach(function (sugestao) {
+        if (selecionada && selecionada.value === String(sugestao.id)) {
+            return; // Já está na lista
+        }
+        select.add(new Option(sugestao.texto, sugestao.id));
+    });
+}
+
+/**
+ * Liga o autocompletar a um <select data-autocompletar="URL">.
+ *
+ * @param {HTMLSelectElement} select O campo de seleção.
+ */
+function aplicarAutocompletar(select) {
+    const url = select.dataset.autocompletar;
+    const minimo = parseInt(select.dataset.autocompletarMinimo || '1', 10);
+
+    const lista = document.createElement('datalist');
+    lista.id = select.id + '_sugestoes';
+    const busca = document.createElement('input');
+    busca.type = 'search';
+    busca.autocomplete = 'off';
+    busca.className = 'autocompletar-busca';
+    busca.placeholder = select.dataset.autocompletarPlaceholder || 'Digite para buscar...';
+    busca.setAttribute('list', lista.id);
+    busca.setAttribute('aria-controls', select.id);
+    select.parentNode.insertBefore(busca, select);
+    select.parentNode.insertBefore(lista, select);
+
+    let textos = new Map(); // Texto da sugestão -> id
+    let espera = null;
+    let pedido = null;
+
+    function buscar() {
+        const termo = busca.value.trim();
+        if (termo.length < minimo || textos.has(busca.value)) {
+            return;
+        }
+        if (pedido) {
+            pedido.abort(); // Resposta de um termo que já mudou
+        }
+        pedido = new AbortController();
+        const endereco = url + (url.includes('?') ? '&' : '?') + new URLSearchParams({ q: termo });
+        fetch(endereco, { signal: pedido.signal, credentials: 'same-origin', headers: { Accept: 'application/json' } })
+            .then(function (resposta) { return resposta.ok ? resposta.json() : { resultados: [] }; })
+            .then(function (dados) {
+                textos = new Map(dados.resultados.map(function (sugestao) { return [sugestao.texto, sugestao.id]; }));
+                lista.replaceChildren(...dados.resultados.map(function (sugestao) { return new Option(sugestao.texto); }));
+                preencherOpcoes(select, dados.resultados);
+            })
+            .catch(function (erro) {
+                if (erro.name !== 'AbortError') {
+                    console.error('Falha ao buscar sugestões:', erro);
+                }
+            });
+    }
+
+    busca.addEventListener('input', function () {
+        // Escolha de uma sugestão da lista: define o valor do <select>
+        if (textos.has(busca.value)) {
+            select.value = String(textos.get(busca.value));
+            select.dispatchEvent(new Event('change', { bubbles: true }));
+            return;
+        }
+        clearTimeout(espera);
+        espera = setTimeout(buscar, ESPERA_AUTOCOMPLETAR);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('select[data-autocompletar]').forEach(aplicarAutocompletar);
+});